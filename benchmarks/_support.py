@@ -0,0 +1,139 @@
+"""Shared helpers for the offline benchmarks.
+
+Benchmarks run against moto's in-process AWS backend. Real network round trips
+are simulated by sleeping in a botocore ``before-call`` hook, so results reflect
+call counts and concurrency rather than moto's own overhead.
+"""
+
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+os.environ.setdefault("CONTACT_EMAIL", "bench@example.com")
+os.environ.setdefault("DYNAMODB_TABLE", "bench-contact-table")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+
+REGION = "us-east-1"
+
+
+def inject_latency(client: Any, service: str, seconds: float) -> None:
+    """Sleep for ``seconds`` before every API call made through ``client``."""
+    if seconds > 0:
+        client.meta.events.register(f"before-call.{service}", _sleeper(seconds))
+
+
+def inject_session_latency(services: Dict[str, float]) -> None:
+    """Sleep before every call from clients later built by ``boto3.client``.
+
+    ``services`` maps a service name to its simulated round trip in seconds.
+    Hooks registered on the default session are copied into each new client,
+    so this also covers clients the handler creates lazily.
+    """
+    import boto3
+
+    session = boto3._get_default_session()
+    for service, seconds in services.items():
+        if seconds > 0:
+            session.events.register(f"before-call.{service}", _sleeper(seconds))
+
+
+def _sleeper(seconds: float) -> Callable[..., None]:
+    def _delay(**kwargs: Any) -> None:
+        time.sleep(seconds)
+
+    return _delay
+
+
+@contextmanager
+def moto_backend(table_name: str = "", verify_email: str = "", state_table_name: str = "") -> Iterator[None]:
+    """Start moto and provision the tables (and SES identity) used by the handler."""
+    import boto3
+    from moto import mock_aws
+
+    with mock_aws():
+        client = boto3.client("dynamodb", region_name=REGION)
+        create_submissions_table(client, table_name or os.environ["DYNAMODB_TABLE"])
+        if state_table_name:
+            create_state_table(client, state_table_name)
+        if verify_email:
+            boto3.client("ses", region_name=REGION).verify_email_identity(EmailAddress=verify_email)
+        yield
+
+
+def create_submissions_table(client: Any, table_name: str) -> None:
+    """Create a table shaped like ContactSubmissionsTable in template.yaml, GSIs included.
+
+    The single definition: tests/conftest.py imports it too.
+    """
+    client.create_table(
+        TableName=table_name,
+        KeySchema=[
+            {"AttributeName": "submissionId", "KeyType": "HASH"},
+            {"AttributeName": "timestamp", "KeyType": "RANGE"},
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "submissionId", "AttributeType": "S"},
+            {"AttributeName": "timestamp", "AttributeType": "S"},
+            {"AttributeName": "outboxQueue", "AttributeType": "S"},
+            {"AttributeName": "nextAttemptAt", "AttributeType": "N"},
+            {"AttributeName": "emailNormalized", "AttributeType": "S"},
+            {"AttributeName": "dayBucket", "AttributeType": "S"},
+        ],
+        GlobalSecondaryIndexes=[
+            {
+                "IndexName": "EmailOutboxIndex",
+                "KeySchema": [
+                    {"AttributeName": "outboxQueue", "KeyType": "HASH"},
+                    {"AttributeName": "nextAttemptAt", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "SubmissionsByEmailIndex",
+                "KeySchema": [
+                    {"AttributeName": "emailNormalized", "KeyType": "HASH"},
+                    {"AttributeName": "timestamp", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": "SubmissionsByDayIndex",
+                "KeySchema": [
+                    {"AttributeName": "dayBucket", "KeyType": "HASH"},
+                    {"AttributeName": "timestamp", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+
+
+def create_state_table(client: Any, table_name: str) -> None:
+    """Create a key/value table shaped like ContactStateTable in template.yaml."""
+    client.create_table(
+        TableName=table_name,
+        KeySchema=[{"AttributeName": "pk", "KeyType": "HASH"}, {"AttributeName": "sk", "KeyType": "RANGE"}],
+        AttributeDefinitions=[
+            {"AttributeName": "pk", "AttributeType": "S"},
+            {"AttributeName": "sk", "AttributeType": "S"},
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+
+
+def percentile(samples: list, pct: float) -> float:
+    """Nearest-rank percentile of ``samples``."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
@@ -0,0 +1,111 @@
+"""Throughput and memory of the TTL archive consumer (``archiver.stream_handler``).
+
+Usage:
+    python benchmarks/bench_archiver.py --records 100000 --batch-size 1000
+
+Feeds synthetic DynamoDB Streams batches of TTL removals (old images in the
+original item format, spread over a few days) through ``stream_handler`` into a
+local archive directory. Reports records per second, bytes archived against
+the NDJSON size, and the peak memory traced while handling one batch with the
+default and with a small ``ARCHIVE_MAX_BUFFER_BYTES``.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+
+import _support  # noqa: F401  (sets up sys.path)
+
+import archiver
+import contact_handler
+import item_codec
+
+TTL_IDENTITY = {"type": "Service", "principalId": "dynamodb.amazonaws.com"}
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0 Safari/537.36"
+)
+
+
+def batches(records: int, batch_size: int, days: int) -> list:
+    message = "Hello, I would like to talk about a cloud migration and a security review for our team. " * 3
+    result, batch = [], []
+    for i in range(records):
+        item = contact_handler.build_submission_item(
+            f"{i:032x}",
+            f"2024-05-{1 + i % days:02d}T12:00:00.{i % 1000000:06d}",
+            f"Person {i}",
+            f"person{i}@example.com",
+            message,
+            "203.0.113.7",
+            USER_AGENT,
+        )
+        batch.append(
+            {
+                "eventName": "REMOVE",
+                "userIdentity": TTL_IDENTITY,
+                "dynamodb": {"SequenceNumber": str(10**20 + i), "OldImage": item_codec.encode_item(item, 0)},
+            }
+        )
+        if len(batch) == batch_size:
+            result.append({"Records": batch})
+            batch = []
+    if batch:
+        result.append({"Records": batch})
+    return result
+
+
+def directory_bytes(root: str) -> int:
+    return sum(os.path.getsize(os.path.join(d, n)) for d, _, names in os.walk(root) for n in names)
+
+
+def run(events: list, max_buffer_bytes: int) -> None:
+    with tempfile.TemporaryDirectory() as root:
+        archiver._sink = archiver.LocalSink(root)
+        archiver.ARCHIVE_MAX_BUFFER_BYTES = max_buffer_bytes
+
+        # stream_handler prints a summary per batch
+        with contextlib.redirect_stdout(io.StringIO()):
+            tracemalloc.start()
+            archiver.stream_handler(events[0], None)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            records = 0
+            started = time.perf_counter()
+            for event in events[1:]:
+                archiver.stream_handler(event, None)
+                records += len(event["Records"])
+            elapsed = time.perf_counter() - started
+
+        ndjson = sum(
+            len(archiver.format_page([item_codec.decode_item(r["dynamodb"]["OldImage"])], "ndjson", (), False))
+            for event in events
+            for r in event["Records"]
+        )
+        stored = directory_bytes(root)
+        print(
+            f"buffer {max_buffer_bytes / 1024:>8.0f} KiB  {records / elapsed:>9,.0f} records/s  "
+            f"peak {peak / 1024:>7.0f} KiB per batch  archive {stored / 1024:>8.0f} KiB "
+            f"({stored / ndjson:.1%} of NDJSON)"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=3)
+    args = parser.parse_args()
+
+    events = batches(args.records, args.batch_size, args.days)
+    print(f"{args.records} records in batches of {args.batch_size} across {args.days} days")
+    for max_buffer_bytes in (archiver.ARCHIVE_MAX_BUFFER_BYTES, 64 * 1024):
+        run(events, max_buffer_bytes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Compare per-item put_item against the micro-batched BatchWriter.
+
+Usage:
+    python benchmarks/bench_batch_writer.py --items 500 --threads 16 --latency-ms 10
+
+Each DynamoDB call sleeps ``--latency-ms`` before reaching moto, approximating
+the round trip to the real service. The per-item path issues one call per
+submission; the batched path lets concurrent callers share batch_write_item calls.
+"""
+
+import argparse
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import _support  # noqa: F401  (sets up sys.path and environment)
+import boto3
+
+from batch_writer import BatchWriter
+
+
+def make_item(i: int) -> dict:
+    return {
+        "submissionId": str(uuid.uuid4()),
+        "timestamp": f"2024-01-01T00:00:{i:06d}",
+        "name": "Bench User",
+        "email": "bench@example.com",
+        "message": "Benchmark submission message body " * 4,
+        "status": "received",
+    }
+
+
+def run_per_item(table, items, threads):
+    latencies = []
+
+    def put(item):
+        started = time.perf_counter()
+        table.put_item(Item=item)
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(put, items))
+    return time.perf_counter() - started, latencies
+
+
+def run_batched(resource, table_name, items, threads, linger_ms):
+    writer = BatchWriter(resource.batch_write_item, table_name, max_linger_seconds=linger_ms / 1000)
+    latencies = []
+
+    def put(item):
+        started = time.perf_counter()
+        writer.write(item)
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(put, items))
+    elapsed = time.perf_counter() - started
+    writer.close()
+    return elapsed, latencies
+
+
+def report(label, elapsed, latencies, calls):
+    print(
+        f"{label:<12} {len(latencies) / elapsed:10.0f} items/s   "
+        f"p50 {_support.percentile(latencies, 50) * 1000:7.2f} ms   "
+        f"p99 {_support.percentile(latencies, 99) * 1000:7.2f} ms   "
+        f"{calls:6d} DynamoDB calls"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=10.0)
+    parser.add_argument("--linger-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    table_name = "bench-batch-writer"
+    with _support.moto_backend(table_name):
+        resource = boto3.resource("dynamodb", region_name=_support.REGION)
+        calls = {"count": 0}
+
+        def count(**kwargs):
+            calls["count"] += 1
+
+        resource.meta.client.meta.events.register("before-call.dynamodb", count)
+        _support.inject_latency(resource.meta.client, "dynamodb", args.latency_ms / 1000)
+        table = resource.Table(table_name)
+
+        print(f"{args.items} items, {args.threads} threads, {args.latency_ms} ms simulated round trip")
+
+        elapsed, latencies = run_per_item(table, [make_item(i) for i in range(args.items)], args.threads)
+        report("put_item", elapsed, latencies, calls["count"])
+
+        calls["count"] = 0
+        elapsed, latencies = run_batched(
+            resource, table_name, [make_item(i) for i in range(args.items)], args.threads, args.linger_ms
+        )
+        report("batched", elapsed, latencies, calls["count"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Bulk NDJSON import throughput and memory against moto.
+
+Usage:
+    python benchmarks/bench_bulk_ingest.py --records 200000 --writers 4 --latency-ms 5
+
+Synthetic records are generated as a byte stream, fed through the same
+``iter_lines`` and ``ingest`` path as the CLI, and written to the moto
+submissions table. Every ``batch_write_item`` call sleeps ``--latency-ms``. The
+script reports records per second and peak RSS. The importer buffers at most
+``BULK_INGEST_MAX_IN_FLIGHT`` records, plus the set of submission IDs already
+seen. moto keeps the whole table in process memory, though, so RSS here grows
+with the record count. Throughput is mostly bounded by moto's own CPU cost.
+"""
+
+import argparse
+import json
+import os
+import resource
+import time
+from typing import Iterator
+
+import _support
+import boto3
+
+import bulk_ingest
+
+
+def generate(records: int, invalid_every: int) -> Iterator[bytes]:
+    """Yield NDJSON in ~64 KiB chunks, with an invalid line every ``invalid_every`` records."""
+    chunk = []
+    size = 0
+    for i in range(records):
+        if invalid_every and i % invalid_every == invalid_every - 1:
+            line = b'{"name": "", "email": "not-an-email", "message": "x"}\n'
+        else:
+            line = (
+                json.dumps(
+                    {
+                        "name": f"Imported Person {i}",
+                        "email": f"person{i}@example.com",
+                        "message": f"Historical inquiry {i} about a cloud architecture engagement.",
+                        "timestamp": "2021-06-01T12:00:00Z",
+                    }
+                )
+                + "\n"
+            ).encode("utf-8")
+        chunk.append(line)
+        size += len(line)
+        if size >= 64 * 1024:
+            yield b"".join(chunk)
+            chunk, size = [], 0
+    if chunk:
+        yield b"".join(chunk)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=100000)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="simulated batch_write_item round trip")
+    parser.add_argument("--invalid-every", type=int, default=100, help="make every Nth record invalid (0 = none)")
+    args = parser.parse_args()
+
+    os.environ.setdefault("CONTACT_EMAIL", "")
+    table = os.environ["DYNAMODB_TABLE"]
+    with _support.moto_backend(table):
+        client = boto3.client("dynamodb", region_name=_support.REGION)
+        _support.inject_latency(client, "dynamodb", args.latency_ms / 1000)
+        counts = {"accepted": 0, "rejected": 0}
+
+        def report(entry: dict) -> None:
+            counts[entry["status"]] += 1
+
+        started = time.perf_counter()
+        summary = bulk_ingest.ingest(
+            bulk_ingest.iter_lines(generate(args.records, args.invalid_every)),
+            client,
+            table,
+            report,
+            writers=args.writers,
+        )
+        elapsed = time.perf_counter() - started
+
+    peak_rss_mib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"records:   {summary['lines']} ({summary['accepted']} accepted, {summary['rejected']} rejected)")
+    print(f"elapsed:   {elapsed:.1f} s  ({summary['lines'] / elapsed:,.0f} lines/s)")
+    print(f"peak RSS:  {peak_rss_mib:.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
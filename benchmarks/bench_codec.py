@@ -0,0 +1,128 @@
+"""Per-request JSON cost: codec + precomputed bodies vs per-request json.dumps.
+
+Usage:
+    python benchmarks/bench_codec.py --repeat 50000
+
+The legacy path below is what ``lambda_handler`` did before ``codec`` was
+introduced: ``json.loads`` on the request, a fresh ``json.dumps`` for every
+success and error body, and a new header dict for each 429. The new path uses
+the handler's own ``create_success_response``/``create_error_response``. Both
+codec backends are measured: orjson (when installed) and the stdlib fallback.
+"""
+
+import argparse
+import importlib
+import json
+import sys
+import time
+import uuid
+from typing import Any, Callable, Dict
+
+import _support  # noqa: F401  (sets up sys.path)
+
+import codec
+import contact_handler
+
+REQUEST_BODY = json.dumps(
+    {
+        "name": "Jane Doe",
+        "email": "jane@example.com",
+        "message": "Hello! I'd like to talk about a cloud migration and a security review. " * 4,
+    }
+)
+SUBMISSION_ID = str(uuid.uuid4())
+EMF_RECORD = {
+    "_aws": {
+        "Timestamp": 1_700_000_000_000,
+        "CloudWatchMetrics": [
+            {
+                "Namespace": "PortfolioContactForm",
+                "Dimensions": [["FunctionName"]],
+                "Metrics": [
+                    {"Name": f"{stage}Latency", "Unit": "Milliseconds"} for stage in ("Parse", "Store", "Email")
+                ],
+            }
+        ],
+    },
+    "FunctionName": "bench",
+    "ParseLatency": 0.012,
+    "StoreLatency": 4.2,
+    "EmailLatency": 38.5,
+    "StatusCode": 200,
+}
+
+
+def legacy_request() -> Dict[str, Any]:
+    json.loads(REQUEST_BODY)
+    json.dumps(EMF_RECORD)
+    return {
+        "statusCode": 200,
+        "headers": contact_handler.CORS_HEADERS,
+        "body": json.dumps(
+            {"message": "Thank you for your message! I will get back to you soon.", "submissionId": SUBMISSION_ID}
+        ),
+    }
+
+
+def legacy_error() -> Dict[str, Any]:
+    return {
+        "statusCode": 429,
+        "headers": {**contact_handler.CORS_HEADERS, "Retry-After": "60"},
+        "body": json.dumps({"error": "Too many requests. Please try again later.", "statusCode": 429}),
+    }
+
+
+def codec_request() -> Dict[str, Any]:
+    codec.loads(REQUEST_BODY)
+    codec.dumps(EMF_RECORD)
+    return contact_handler.create_success_response(SUBMISSION_ID, contact_handler.CORS_HEADERS)
+
+
+def codec_error() -> Dict[str, Any]:
+    return contact_handler.create_error_response(
+        429, "Too many requests. Please try again later.", contact_handler.RATE_LIMITED_HEADERS
+    )
+
+
+def per_call_us(fn: Callable[[], Any], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def use_stdlib_backend() -> str:
+    """Reload codec and the handler as if orjson were not installed; return the active backend."""
+    global codec
+    sys.modules["orjson"] = None  # makes "import orjson" raise ImportError
+    codec = importlib.reload(codec)
+    importlib.reload(contact_handler)
+    return codec.BACKEND
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=50000)
+    args = parser.parse_args()
+
+    assert json.loads(codec_request()["body"]) == json.loads(legacy_request()["body"])
+    legacy = (per_call_us(legacy_request, args.repeat), per_call_us(legacy_error, args.repeat))
+    print(f"{'json.dumps per request':<26} success {legacy[0]:6.2f} us   429 {legacy[1]:6.2f} us")
+
+    def report() -> None:
+        current = (per_call_us(codec_request, args.repeat), per_call_us(codec_error, args.repeat))
+        print(
+            f"{'codec (' + codec.BACKEND + ')':<26} success {current[0]:6.2f} us   429 {current[1]:6.2f} us   "
+            f"saving {legacy[0] - current[0]:5.2f} us / {legacy[1] - current[1]:5.2f} us per request"
+        )
+
+    if codec.BACKEND == "orjson":
+        report()
+        use_stdlib_backend()
+    else:
+        print("orjson not installed; measuring the stdlib fallback only")
+    report()
+
+
+if __name__ == "__main__":
+    main()
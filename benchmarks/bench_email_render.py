@@ -0,0 +1,130 @@
+"""Render cost per message: precompiled templates vs the previous f-string bodies.
+
+Usage:
+    python benchmarks/bench_email_render.py --repeat 20000
+
+The legacy path below is the f-string code ``send_email_notification`` used
+before templates were introduced (two ``utcnow()`` calls, no escaping). The new
+path renders the bundled HTML and text templates with every value escaped in the
+HTML body.
+"""
+
+import argparse
+import time
+from datetime import datetime
+
+import _support  # noqa: F401  (sets up sys.path)
+
+import email_templates
+
+FIELDS = {
+    "name": "Jane <Doe>",
+    "email": "jane@example.com",
+    "message": "Hello! I'd like to talk about a cloud migration & security review. " * 6,
+    "submission_id": "0b7e6a4e-5a0e-4f8e-9d53-7b4c2f1f9c11",
+}
+
+
+def legacy_render(name: str, email: str, message: str, submission_id: str) -> tuple:
+    html_body = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <style>
+            body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
+            .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+            .header {{ background: linear-gradient(135deg, #ff9900, #146eb4);
+                       color: white; padding: 20px; border-radius: 8px 8px 0 0; }}
+            .content {{ background: #f9f9f9; padding: 20px; border-radius: 0 0 8px 8px; }}
+            .field {{ margin-bottom: 15px; }}
+            .label {{ font-weight: bold; color: #232f3e; }}
+            .value {{ background: white; padding: 10px; border-radius: 4px; border-left: 4px solid #ff9900; }}
+            .footer {{ margin-top: 20px; padding-top: 20px; border-top: 1px solid #ddd; font-size: 12px; color: #666; }}
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <div class="header">
+                <h2>New Portfolio Contact Form Submission</h2>
+            </div>
+            <div class="content">
+                <div class="field">
+                    <div class="label">Name:</div>
+                    <div class="value">{name}</div>
+                </div>
+
+                <div class="field">
+                    <div class="label">Email:</div>
+                    <div class="value">{email}</div>
+                </div>
+
+                <div class="field">
+                    <div class="label">Message:</div>
+                    <div class="value">{message}</div>
+                </div>
+
+                <div class="footer">
+                    <p><strong>Submission Details:</strong></p>
+                    <p>Submission ID: {submission_id}</p>
+                    <p>Timestamp: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC</p>
+                    <p>Sent from: Christopher Corbin Portfolio Contact Form</p>
+                </div>
+            </div>
+        </div>
+    </body>
+    </html>
+    """
+
+    text_body = f"""
+New Portfolio Contact Form Submission
+
+Name: {name}
+Email: {email}
+
+Message:
+{message}
+
+---
+Submission ID: {submission_id}
+Timestamp: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC
+Sent from: Christopher Corbin Portfolio Contact Form
+    """
+    return html_body, text_body
+
+
+def template_render(name: str, email: str, message: str, submission_id: str) -> tuple:
+    return email_templates.get_templates("contact_notification").render(
+        {
+            "name": name,
+            "email": email,
+            "message": message,
+            "submission_id": submission_id,
+            "timestamp": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+    )
+
+
+def per_call_us(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(**FIELDS)
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20000)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    email_templates.get_templates("contact_notification")
+    print(f"template load + compile (once per container): {(time.perf_counter() - started) * 1e3:.2f} ms")
+
+    legacy = per_call_us(legacy_render, args.repeat)
+    compiled = per_call_us(template_render, args.repeat)
+    print(f"f-string render (unescaped):   {legacy:7.2f} us/message")
+    print(f"compiled template (escaped):   {compiled:7.2f} us/message")
+
+
+if __name__ == "__main__":
+    main()
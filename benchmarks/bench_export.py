@@ -0,0 +1,146 @@
+"""Export time of the parallel-scan table export against segment count.
+
+Usage:
+    python benchmarks/bench_export.py --items 50000 --segments 1 2 4 8 16 --latency-ms 20
+    python benchmarks/bench_export.py --backend moto --items 5000
+    python benchmarks/bench_export.py --endpoint-url http://localhost:8000 --items 50000   # DynamoDB Local
+
+The table is seeded with ``--items`` synthetic submissions and exported to gzip
+NDJSON once per segment count. Every Scan page sleeps ``--latency-ms``, standing
+in for the service round trip that parallel segments overlap. ``--page-size``
+caps the items per page, so the table spans many pages, like a real 1 MB-page
+scan of a large table.
+
+The default ``stub`` backend is an in-memory table that answers segmented,
+paginated Scans in constant time per page. Use it to see how the export itself
+scales. moto re-scans the whole table on every page, so with ``--backend moto``
+the results measure moto more than the exporter. ``--endpoint-url`` runs
+against a real local DynamoDB instead.
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+import zlib
+from typing import Any, Dict, List
+
+import _support
+import boto3
+from botocore.config import Config
+
+from batch_writer import BatchWriter
+from dynamo_serializer import serialize_item
+from export_table import export_table
+
+
+class StubScanTable:
+    """Minimal in-memory stand-in for ``scan`` and ``batch_write_item`` with simulated latency."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.segments: Dict[Any, List[Dict[str, Any]]] = {}  # -1 holds every item
+        self._lock = threading.Lock()
+
+    def batch_write_item(self, RequestItems: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            for requests in RequestItems.values():
+                for request in requests:
+                    self.segments.setdefault(-1, []).append(request["PutRequest"]["Item"])
+        return {"UnprocessedItems": {}}
+
+    def scan(self, TotalSegments: int, Segment: int, Limit: int, **kwargs: Any) -> Dict[str, Any]:
+        time.sleep(self.latency)
+        with self._lock:
+            key = (TotalSegments, Segment)
+            if key not in self.segments:
+                self.segments[key] = [
+                    item
+                    for item in self.segments.get(-1, [])
+                    if zlib.crc32(item["submissionId"]["S"].encode()) % TotalSegments == Segment
+                ]
+            items = self.segments[key]
+        start = int(kwargs.get("ExclusiveStartKey", {}).get("offset", {}).get("N", 0))
+        page = items[start : start + Limit]
+        response: Dict[str, Any] = {"Items": page}
+        if start + Limit < len(items):
+            response["LastEvaluatedKey"] = {"offset": {"N": str(start + Limit)}}
+        return response
+
+
+def seed(client: Any, table_name: str, items: int) -> None:
+    writer = BatchWriter(client.batch_write_item, table_name)
+    for i in range(items):
+        writer.submit(
+            serialize_item(
+                {
+                    "submissionId": str(uuid.uuid4()),
+                    "timestamp": f"2024-01-01T00:{(i // 60) % 60:02d}:{i % 60:02d}",
+                    "name": f"Seeded Person {i}",
+                    "email": f"person{i}@example.com",
+                    "message": "Seeded submission for the export benchmark. " * 3,
+                    "clientIp": "203.0.113.1",
+                    "userAgent": "bench",
+                    "status": "received",
+                    "ttl": 1_900_000_000,
+                }
+            )
+        )
+    writer.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=50000)
+    parser.add_argument("--segments", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--page-size", type=int, default=250)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="simulated Scan round trip")
+    parser.add_argument("--backend", choices=["stub", "moto"], default="stub")
+    parser.add_argument("--endpoint-url", help="seed and export a real DynamoDB endpoint (e.g. DynamoDB Local)")
+    args = parser.parse_args()
+
+    table = os.environ["DYNAMODB_TABLE"]
+    latency = args.latency_ms / 1000
+    config = Config(max_pool_connections=max(10, max(args.segments)))
+    if args.endpoint_url:
+        client = boto3.client("dynamodb", endpoint_url=args.endpoint_url, region_name=_support.REGION, config=config)
+        _support.create_submissions_table(client, table)
+        seed(client, table, args.items)
+        _support.inject_latency(client, "dynamodb", latency)
+        run(client, table, args)
+    elif args.backend == "moto":
+        with _support.moto_backend(table):
+            client = boto3.client("dynamodb", region_name=_support.REGION, config=config)
+            seed(client, table, args.items)
+            _support.inject_latency(client, "dynamodb", latency)
+            run(client, table, args)
+    else:
+        stub = StubScanTable(latency)
+        seed(stub, table, args.items)
+        run(stub, table, args)
+
+
+def run(client: Any, table: str, args: argparse.Namespace) -> None:
+    print(f"{args.items} items, {args.page_size} per page, {args.latency_ms:.0f} ms per Scan call")
+    baseline = None
+    for segments in args.segments:
+        out_dir = tempfile.mkdtemp(prefix="export-bench-")
+        try:
+            started = time.perf_counter()
+            summary = export_table(client, table, out_dir, segments=segments, page_size=args.page_size)
+            elapsed = time.perf_counter() - started
+            size = sum(os.path.getsize(os.path.join(out_dir, name)) for name in os.listdir(out_dir))
+        finally:
+            shutil.rmtree(out_dir)
+        baseline = baseline or elapsed
+        print(
+            f"segments {segments:>3}: {elapsed:7.2f} s  {summary['totalItems'] / elapsed:9.0f} items/s  "
+            f"speedup {baseline / elapsed:5.2f}x  output {size / 1024:,.0f} KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""Offline load and latency benchmark for lambda_handler.
+
+Usage:
+    python benchmarks/bench_handler.py --requests 500 --threads 1 4 16 --latency-ms 8
+    python benchmarks/bench_handler.py --output results.json --compare previous.json
+    python benchmarks/bench_handler.py --delivery-mode digest   # store for the digest worker, no email
+
+The handler runs end to end against moto-backed DynamoDB and SES. Every AWS call
+sleeps for the injected latency first, approximating the real round trip. Each
+synthetic submission has its own source IP and message text, so the rate limiter
+and idempotency checks take their normal path without rejecting anything.
+
+The script reports four things:
+
+* cold: the first invocation after module state is reset. This covers client
+  construction, template and blocklist compilation, and the first AWS calls.
+  It does not cover interpreter or package import time; measure_cold_start.py
+  measures that.
+* warm: sequential latency percentiles on a warmed-up container, broken down by
+  handler stage using the in-process metrics collector.
+* concurrency: latency percentiles and throughput for each thread count.
+* allocations: tracemalloc peak and retained bytes per warm request.
+
+``--output`` writes everything as JSON. ``--compare`` prints p50/p95/p99 deltas
+against an earlier JSON file.
+"""
+
+import argparse
+import importlib
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+
+import _support
+
+STATE_TABLE_NAME = "bench-state-table"
+
+_sequence = itertools.count()
+
+
+def make_event() -> Dict[str, Any]:
+    """A valid submission with a source IP and message no other event uses."""
+    i = next(_sequence)
+    return {
+        "httpMethod": "POST",
+        "body": json.dumps(
+            {
+                "name": "Bench User",
+                "email": "bench.user@example.com",
+                "message": f"Benchmark submission {i}: I'd like to discuss a cloud architecture review.",
+            }
+        ),
+        "headers": {"Content-Type": "application/json", "User-Agent": "bench-handler"},
+        "requestContext": {"identity": {"sourceIp": f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}"}},
+    }
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Latency percentiles in milliseconds."""
+    return {
+        "count": len(samples),
+        "mean_ms": statistics.mean(samples) * 1000 if samples else 0.0,
+        "p50_ms": _support.percentile(samples, 50) * 1000,
+        "p95_ms": _support.percentile(samples, 95) * 1000,
+        "p99_ms": _support.percentile(samples, 99) * 1000,
+        "max_ms": max(samples) * 1000 if samples else 0.0,
+    }
+
+
+def invoke(handler: Any) -> float:
+    started = time.perf_counter()
+    response = handler.lambda_handler(make_event(), None)
+    elapsed = time.perf_counter() - started
+    if response["statusCode"] != 200:
+        raise RuntimeError(f"Unexpected response: {response}")
+    return elapsed
+
+
+def reset_container(handler: Any) -> Any:
+    """Drop everything a fresh Lambda container would not have yet."""
+    import email_templates
+    import spam_filter
+
+    if handler is not None and handler._batch_writer is not None:
+        handler._batch_writer.close()
+    spam_filter._matcher = None
+    email_templates._cache.clear()
+    if handler is None:
+        return importlib.import_module("contact_handler")
+    return importlib.reload(handler)
+
+
+def measure_cold(samples: int) -> Tuple[Dict[str, Any], Any]:
+    handler = None
+    first_calls, second_calls = [], []
+    for _ in range(samples):
+        handler = reset_container(handler)
+        first_calls.append(invoke(handler))
+        second_calls.append(invoke(handler))
+    return {"first_invocation": summarize(first_calls), "second_invocation": summarize(second_calls)}, handler
+
+
+def measure_warm(handler: Any, requests: int) -> Dict[str, Any]:
+    import metrics
+
+    metrics.collector.reset()
+    results = summarize([invoke(handler) for _ in range(requests)])
+    # Per-stage breakdown from the handler's own instrumentation
+    stages = sorted({stage for record in metrics.collector.records() for stage in record["stages"]})
+    results["stages"] = {
+        stage: summarize([ms / 1000 for ms in metrics.collector.stage_samples(stage)]) for stage in stages
+    }
+    return results
+
+
+def measure_concurrency(handler: Any, requests: int, thread_counts: List[int]) -> List[Dict[str, Any]]:
+    results = []
+    for threads in thread_counts:
+        latencies: List[float] = []
+        lock = threading.Lock()
+
+        def call(_: int) -> None:
+            elapsed = invoke(handler)
+            with lock:
+                latencies.append(elapsed)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(call, range(requests)))
+        wall = time.perf_counter() - started
+        results.append({"threads": threads, "throughput_rps": requests / wall, **summarize(latencies)})
+    return results
+
+
+def measure_allocations(handler: Any, requests: int) -> Dict[str, float]:
+    peaks = []
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        for _ in range(requests):
+            baseline = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            handler.lambda_handler(make_event(), None)
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    return {
+        "requests": requests,
+        "peak_kib_per_request": statistics.mean(peaks) / 1024,
+        "max_peak_kib": max(peaks) / 1024,
+        "retained_bytes_per_request": sum(stat.size_diff for stat in stats) / requests,
+        "retained_blocks_per_request": sum(stat.count_diff for stat in stats) / requests,
+    }
+
+
+def print_report(results: Dict[str, Any]) -> None:
+    def row(label: str, summary: Dict[str, float], extra: str = "") -> None:
+        print(
+            f"{label:<22} p50 {summary['p50_ms']:7.2f} ms  p95 {summary['p95_ms']:7.2f} ms  "
+            f"p99 {summary['p99_ms']:7.2f} ms{extra}"
+        )
+
+    row("cold (1st invocation)", results["cold"]["first_invocation"])
+    row("cold (2nd invocation)", results["cold"]["second_invocation"])
+    row("warm (sequential)", results["warm"])
+    for stage, summary in results["warm"].get("stages", {}).items():
+        row(f"  stage {stage}", summary)
+    for entry in results["concurrency"]:
+        row(f"{entry['threads']:>3} threads", entry, f"  {entry['throughput_rps']:8.1f} req/s")
+    alloc = results["allocations"]
+    print(
+        f"allocations: peak {alloc['peak_kib_per_request']:.1f} KiB/request, "
+        f"retained {alloc['retained_bytes_per_request']:.0f} B/request"
+    )
+
+
+def print_comparison(results: Dict[str, Any], previous: Dict[str, Any]) -> None:
+    """Show percentile changes against an earlier run."""
+
+    def delta(label: str, new: Dict[str, float], old: Dict[str, float]) -> None:
+        parts = []
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            change = (new[key] - old[key]) / old[key] * 100 if old.get(key) else 0.0
+            parts.append(f"{key[:3]} {change:+6.1f}%")
+        print(f"{label:<22} " + "  ".join(parts))
+
+    print(f"\nvs {previous['meta']['started_at']}:")
+    delta("warm (sequential)", results["warm"], previous["warm"])
+    old_by_threads = {entry["threads"]: entry for entry in previous.get("concurrency", [])}
+    for entry in results["concurrency"]:
+        if entry["threads"] in old_by_threads:
+            delta(f"{entry['threads']:>3} threads", entry, old_by_threads[entry["threads"]])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300, help="requests per warm and per concurrency run")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--cold-samples", type=int, default=5)
+    parser.add_argument("--alloc-requests", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=8.0, help="simulated DynamoDB round trip")
+    parser.add_argument("--ses-latency-ms", type=float, default=40.0, help="simulated SES round trip")
+    parser.add_argument("--delivery-mode", choices=["sync", "concurrent", "outbox", "digest"], default="sync")
+    parser.add_argument("--batch-writes", action="store_true")
+    parser.add_argument("--shared-state", action="store_true", help="use the state table for rate limits/idempotency")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="earlier JSON results to compare against")
+    args = parser.parse_args()
+
+    # Module-level configuration is read at import time
+    os.environ["EMAIL_DELIVERY_MODE"] = args.delivery_mode
+    os.environ["BATCH_WRITES"] = "true" if args.batch_writes else "false"
+    # Measure the admission check too, although it is off by default
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "true")
+    # Keep every warm request in the metrics collector and skip printing EMF lines
+    os.environ["METRICS_SAMPLE_RATE"] = "0"
+    os.environ["METRICS_COLLECTOR_SIZE"] = str(max(args.requests, 1000))
+    if args.shared_state:
+        os.environ["STATE_TABLE"] = STATE_TABLE_NAME
+
+    started_at = datetime.now(timezone.utc).isoformat()
+    with _support.moto_backend(
+        verify_email=os.environ["CONTACT_EMAIL"], state_table_name=STATE_TABLE_NAME if args.shared_state else ""
+    ):
+        _support.inject_session_latency({"dynamodb": args.latency_ms / 1000, "ses": args.ses_latency_ms / 1000})
+        cold, handler = measure_cold(args.cold_samples)
+        warm = measure_warm(handler, args.requests)
+        concurrency = measure_concurrency(handler, args.requests, args.threads)
+        allocations = measure_allocations(handler, args.alloc_requests)
+        if handler._batch_writer is not None:
+            handler._batch_writer.close()
+
+    results = {
+        "meta": {
+            "started_at": started_at,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "cold": cold,
+        "warm": warm,
+        "concurrency": concurrency,
+        "allocations": allocations,
+    }
+    print_report(results)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            print_comparison(results, json.load(fh))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+        print(f"\nresults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""Throughput of the HTTP adapter vs Lambda-style per-invocation execution.
+
+Usage:
+    python benchmarks/bench_http_adapter.py --requests 400 --concurrency 4 16 32 --latency-ms 8
+
+Three ways of serving the same submissions, all against moto with simulated
+DynamoDB/SES round trips:
+
+* lambda-cold: one request per execution environment, with fresh AWS clients
+  built for every invocation. This is what each new Lambda container pays.
+* lambda-warm: ``lambda_handler`` called directly from N threads with warm,
+  shared clients. This is an upper bound with no HTTP overhead.
+* http: N keep-alive connections to ``http_adapter`` over real sockets, with
+  pooled clients shared by the server's worker threads.
+
+The load generator runs in the same process as the server, so absolute numbers
+include some GIL contention. Compare the modes against each other rather than
+against production.
+"""
+
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
+
+import _support
+
+_counter_lock = threading.Lock()
+_counter = [0]
+
+
+def next_request() -> Tuple[str, str]:
+    """A unique (body, source IP) pair, so rate limiting and idempotency admit every request."""
+    with _counter_lock:
+        _counter[0] += 1
+        i = _counter[0]
+    body = json.dumps(
+        {"name": "Bench User", "email": "bench.user@example.com", "message": f"HTTP adapter benchmark message {i}."}
+    )
+    return body, f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}"
+
+
+def next_event() -> Dict[str, Any]:
+    body, ip = next_request()
+    return {
+        "httpMethod": "POST",
+        "body": body,
+        "headers": {"Content-Type": "application/json"},
+        "requestContext": {"identity": {"sourceIp": ip}},
+    }
+
+
+def run_load(worker: Callable[[], float], requests: int, concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    lock = threading.Lock()
+
+    def call(_: int) -> None:
+        elapsed = worker()
+        with lock:
+            latencies.append(elapsed)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(call, range(requests)))
+    wall = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "throughput_rps": requests / wall,
+        "p50_ms": _support.percentile(latencies, 50) * 1000,
+        "p95_ms": _support.percentile(latencies, 95) * 1000,
+        "p99_ms": _support.percentile(latencies, 99) * 1000,
+    }
+
+
+def lambda_cold_worker(contact_handler: Any, latency: Dict[str, float]) -> Callable[[], float]:
+    """Each invocation builds its own session and clients, like a fresh container."""
+    import boto3
+
+    local = threading.local()
+    contact_handler.get_dynamodb_client = lambda: local.dynamodb
+    contact_handler.get_ses_client = lambda: local.ses
+
+    def invoke() -> float:
+        started = time.perf_counter()
+        session = boto3.session.Session()
+        local.dynamodb = session.client("dynamodb")
+        local.ses = session.client("ses")
+        _support.inject_latency(local.dynamodb, "dynamodb", latency["dynamodb"])
+        _support.inject_latency(local.ses, "ses", latency["ses"])
+        response = contact_handler.lambda_handler(next_event(), None)
+        assert response["statusCode"] == 200, response
+        return time.perf_counter() - started
+
+    return invoke
+
+
+def lambda_warm_worker(contact_handler: Any) -> Callable[[], float]:
+    def invoke() -> float:
+        started = time.perf_counter()
+        response = contact_handler.lambda_handler(next_event(), None)
+        assert response["statusCode"] == 200, response
+        return time.perf_counter() - started
+
+    return invoke
+
+
+def http_worker(port: int) -> Callable[[], float]:
+    local = threading.local()
+
+    def invoke() -> float:
+        connection = getattr(local, "connection", None)
+        if connection is None:
+            connection = local.connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        started = time.perf_counter()
+        body, ip = next_request()
+        connection.request("POST", "/contact", body, {"Content-Type": "application/json", "X-Forwarded-For": ip})
+        response = connection.getresponse()
+        response.read()
+        assert response.status == 200, response.status
+        return time.perf_counter() - started
+
+    return invoke
+
+
+def start_server(http_adapter: Any, workers: int) -> Tuple[int, Callable[[], None]]:
+    """Run the adapter on an ephemeral port in a background thread; return a stop function."""
+    app = http_adapter.ContactFormApp(workers=workers)
+    ready = threading.Event()
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(http_adapter.serve(app, "127.0.0.1", 0, ready))
+
+    def run() -> None:
+        try:
+            loop.run_until_complete(task)
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    ready.wait()
+
+    def stop() -> None:
+        loop.call_soon_threadsafe(task.cancel)
+        thread.join()
+        loop.close()
+
+    return app.port, stop
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--cold-requests", type=int, default=50, help="requests per lambda-cold run (slow)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4, 16, 32])
+    parser.add_argument("--latency-ms", type=float, default=8.0, help="simulated DynamoDB round trip")
+    parser.add_argument("--ses-latency-ms", type=float, default=40.0, help="simulated SES round trip")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    workers = max(args.concurrency)
+    os.environ["HTTP_WORKERS"] = str(workers)
+    os.environ["AWS_MAX_POOL_CONNECTIONS"] = str(workers)
+    os.environ["HTTP_TRUST_FORWARDED_FOR"] = "true"
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "true")
+    os.environ["METRICS_SAMPLE_RATE"] = "0"
+    latency = {"dynamodb": args.latency_ms / 1000, "ses": args.ses_latency_ms / 1000}
+
+    results: Dict[str, List[Dict[str, Any]]] = {"lambda-cold": [], "lambda-warm": [], "http": []}
+    with _support.moto_backend(verify_email=os.environ["CONTACT_EMAIL"]):
+        _support.inject_session_latency(latency)
+        import contact_handler
+        import http_adapter
+
+        port, stop = start_server(http_adapter, workers)
+        try:
+            for concurrency in args.concurrency:
+                results["http"].append(run_load(http_worker(port), args.requests, concurrency))
+                results["lambda-warm"].append(run_load(lambda_warm_worker(contact_handler), args.requests, concurrency))
+        finally:
+            stop()
+
+        # Last, because it replaces the handler's client getters
+        for concurrency in args.concurrency:
+            results["lambda-cold"].append(
+                run_load(lambda_cold_worker(contact_handler, latency), args.cold_requests, concurrency)
+            )
+
+    for mode, rows in results.items():
+        for row in rows:
+            print(
+                f"{mode:<12} x{row['concurrency']:<3} {row['throughput_rps']:8.1f} req/s  "
+                f"p50 {row['p50_ms']:7.2f} ms  p95 {row['p95_ms']:7.2f} ms  p99 {row['p99_ms']:7.2f} ms"
+            )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump({"args": vars(args), "results": results}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Stored size and write units of submission items: original vs compact format.
+
+Usage:
+    python benchmarks/bench_item_codec.py --items 5000
+
+Builds a synthetic corpus of submissions (messages of 20-1000 characters drawn
+from a word list, a mix of browser user agents) with ``build_submission_item``,
+then encodes every item in format 0 and format 1. Write units are counted for
+the base table and for the two lookup GSIs, which project ``ALL`` attributes
+and so are billed for the full item on every write. Encode and decode times
+are per item.
+"""
+
+import argparse
+import random
+import time
+
+import _support  # noqa: F401  (sets up sys.path)
+
+import contact_handler
+import item_codec
+
+WORDS = (
+    "hello hi thanks project cloud migration security review aws devops pipeline cost budget timeline team "
+    "startup company role position opportunity consulting architecture kubernetes terraform lambda serverless "
+    "would like discuss available call next week please let me know your experience portfolio website great "
+    "interested help our we are looking for someone with and the to of a in for on is it that this"
+).split()
+USER_AGENTS = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.3 "
+    "Safari/605.1.15",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_3 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.3 "
+    "Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (X11; Linux x86_64; rv:123.0) Gecko/20100101 Firefox/123.0",
+    "Mozilla/5.0 (Linux; Android 14; SM-S918B) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Mobile "
+    "Safari/537.36",
+)
+# Base table plus SubmissionsByEmailIndex and SubmissionsByDayIndex
+TABLES_PER_WRITE = 3
+
+
+def corpus(count: int, rng: random.Random) -> list:
+    items = []
+    for i in range(count):
+        length = min(1000, int(rng.lognormvariate(5.3, 0.7)) + 20)
+        words = []
+        while sum(len(w) + 1 for w in words) < length:
+            words.append(rng.choice(WORDS))
+        message = " ".join(words)[:length].capitalize() + "."
+        items.append(
+            contact_handler.build_submission_item(
+                f"{rng.getrandbits(128):032x}",
+                f"2024-05-{1 + i % 28:02d}T{rng.randrange(24):02d}:{rng.randrange(60):02d}:00.{i:06d}",
+                f"Person {i}",
+                f"person{i}@example.com",
+                message,
+                f"203.0.{rng.randrange(256)}.{rng.randrange(256)}",
+                rng.choice(USER_AGENTS),
+            )
+        )
+    return items
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    items = corpus(args.items, random.Random(args.seed))
+    report = item_codec.measure(items)
+    print(f"{len(items)} items, compression {item_codec.ITEM_COMPRESSION}\n")
+    print(
+        f"{'format':<8} {'avg bytes':>10} {'total KiB':>10} {'over 1 KB':>10} {'WCU/write':>10} "
+        f"{'WCU incl. GSIs':>15} {'encode':>10} {'decode':>10}"
+    )
+    for version in (0, item_codec.COMPACT_VERSION):
+        started = time.perf_counter()
+        encoded = [item_codec.encode_item(item, version) for item in items]
+        encode_us = (time.perf_counter() - started) / len(items) * 1e6
+        started = time.perf_counter()
+        for raw in encoded:
+            item_codec.decode_item(raw)
+        decode_us = (time.perf_counter() - started) / len(items) * 1e6
+
+        totals = report[f"v{version}"]
+        over = sum(item_codec.item_size(raw) > 1024 for raw in encoded) / len(items)
+        print(
+            f"v{version:<7} {totals['bytes'] / len(items):10.0f} {totals['bytes'] / 1024:10.0f} {over:10.1%} "
+            f"{totals['writeUnits'] / len(items):10.3f} {totals['writeUnits'] * TABLES_PER_WRITE / len(items):15.3f} "
+            f"{encode_us:8.1f}us {decode_us:8.1f}us"
+        )
+
+    before, after = report["v0"], report[f"v{item_codec.COMPACT_VERSION}"]
+    print(
+        f"\nsize -{1 - after['bytes'] / before['bytes']:.0%}, "
+        f"write units -{1 - after['writeUnits'] / before['writeUnits']:.0%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
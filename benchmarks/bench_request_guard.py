@@ -0,0 +1,93 @@
+"""Rejection cost of hostile payloads: request_guard vs parsing the whole body first.
+
+Usage:
+    python benchmarks/bench_request_guard.py --repeat 20
+
+The legacy path is what ``lambda_handler`` did before ``request_guard``: parse
+the full body with ``json.loads`` and let ``validate_form_data`` reject it. The
+new path is ``request_guard.parse_body`` followed by the same validation when
+the guard lets the body through. Each payload reports time per request and the
+peak memory traced while handling it.
+"""
+
+import argparse
+import base64
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, Dict
+
+import _support  # noqa: F401  (sets up sys.path)
+
+import contact_handler
+import request_guard
+
+VALID = {"name": "Jane Doe", "email": "jane@example.com", "message": "Hello, I would like to get in touch. " * 3}
+
+
+def payloads() -> Dict[str, Dict[str, Any]]:
+    huge_message = json.dumps({**VALID, "message": "x" * 5_000_000})
+    return {
+        "valid submission": {"body": json.dumps(VALID)},
+        "5 MB message": {"body": huge_message},
+        "5 MB base64 body": {"body": base64.b64encode(huge_message.encode()).decode(), "isBase64Encoded": True},
+        "200k extra fields": {"body": json.dumps({**VALID, **{f"f{i}": i for i in range(200_000)}})},
+        "10 KB message": {"body": json.dumps({**VALID, "message": "x" * 10_000})},
+        "nested arrays (8 KB)": {"body": '{"name": ' + "[" * 4000 + "]" * 4000 + "}"},
+        "text/plain form": {"body": json.dumps(VALID), "headers": {"Content-Type": "text/plain"}},
+    }
+
+
+def legacy(event: Dict[str, Any]) -> str:
+    try:
+        body = event["body"]
+        if event.get("isBase64Encoded"):
+            body = base64.b64decode(body).decode("utf-8")
+        data = json.loads(body)
+    except ValueError:
+        return "400"
+    except RecursionError:
+        return "500"
+    return "ok" if contact_handler.validate_form_data(data)["valid"] else "400"
+
+
+def guarded(event: Dict[str, Any]) -> str:
+    try:
+        data = request_guard.parse_body(event)
+    except request_guard.RequestRejected as e:
+        return str(e.status_code)
+    except ValueError:
+        return "400"
+    return "ok" if contact_handler.validate_form_data(data)["valid"] else "400"
+
+
+def measure(handle: Callable[[Dict[str, Any]], str], event: Dict[str, Any], repeat: int) -> tuple:
+    tracemalloc.start()
+    outcome = handle(event)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        handle(event)
+    return outcome, (time.perf_counter() - started) / repeat * 1000, peak / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"guard limit: {request_guard.REQUEST_MAX_BODY_BYTES} bytes, {request_guard.REQUEST_MAX_FIELDS} fields\n")
+    print(f"{'payload':<22} {'legacy':>26}   {'request_guard':>26}")
+    for name, event in payloads().items():
+        before = measure(legacy, event, args.repeat)
+        after = measure(guarded, event, args.repeat)
+        print(
+            f"{name:<22} {before[0]:>4} {before[1]:9.3f} ms {before[2]:8.0f} KiB   "
+            f"{after[0]:>4} {after[1]:9.3f} ms {after[2]:8.0f} KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Per-message scoring latency of the naive Bayes spam model (``spam_model``).
+
+Usage:
+    python benchmarks/bench_spam_model.py --train 20000 --test 5000
+
+Trains a model on a synthetic corpus of contact messages and spam (words drawn
+from overlapping vocabularies, 20-1000 characters), then reports the model file
+size and load time, held-out accuracy, and the time to score one message:
+single messages in plain Python (the Lambda path) at several lengths, the
+NumPy batch path, and the keyword blocklist for comparison.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+import _support  # noqa: F401  (sets up sys.path)
+
+import spam_filter
+import spam_model
+
+COMMON = "hello hi thanks please you your we our the a to of and in for on is it this that with".split()
+HAM_WORDS = (
+    "project cloud migration security review aws devops pipeline budget timeline team startup role position "
+    "consulting architecture kubernetes terraform lambda serverless discuss available call next week portfolio "
+    "experience interested help looking someone contract remote opportunity meeting schedule question"
+).split()
+SPAM_WORDS = (
+    "cheap loan loans cash bonus casino spins deposit crypto bitcoin trading signals guaranteed returns income "
+    "followers likes ranking seo backlinks offer limited winner prize gift card click here now free viagra pills "
+    "discount deal act fast investment opportunity profit"
+).split()
+
+
+def message(rng: random.Random, is_spam: bool, length: int) -> str:
+    vocabulary = SPAM_WORDS if is_spam else HAM_WORDS
+    words = []
+    while sum(len(w) + 1 for w in words) < length:
+        # Mostly common words; a few from the class vocabulary and a few from the other one
+        roll = rng.random()
+        if roll < 0.55:
+            words.append(rng.choice(COMMON))
+        elif roll < 0.9:
+            words.append(rng.choice(vocabulary))
+        else:
+            words.append(rng.choice(HAM_WORDS if is_spam else SPAM_WORDS))
+    return " ".join(words)[:length].capitalize() + "."
+
+
+def corpus(count: int, rng: random.Random) -> list:
+    return [
+        (message(rng, is_spam, min(1000, int(rng.lognormvariate(5.3, 0.7)) + 20)), is_spam)
+        for is_spam in (rng.random() < 0.3 for _ in range(count))
+    ]
+
+
+def per_call_us(fn, texts: list) -> list:
+    samples = []
+    for text in texts:
+        started = time.perf_counter()
+        fn(text)
+        samples.append((time.perf_counter() - started) * 1e6)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--train", type=int, default=20000)
+    parser.add_argument("--test", type=int, default=5000)
+    parser.add_argument("--bits", type=int, default=spam_model.DEFAULT_BITS)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    model = spam_model.train(corpus(args.train, rng), args.bits)
+    train_s = time.perf_counter() - started
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "spam_model.bin")
+        model.save(path)
+        size = os.path.getsize(path)
+        started = time.perf_counter()
+        model = spam_model.SpamModel.load(path)
+        load_ms = (time.perf_counter() - started) * 1000
+    print(f"trained on {args.train} messages in {train_s:.1f}s; 2**{args.bits} buckets")
+    print(f"model file {size / 1024:.0f} KiB, load {load_ms:.1f} ms\n")
+
+    held_out = corpus(args.test, rng)
+    texts = [text for text, _ in held_out]
+    predicted = model.score_batch(texts) >= 0.5
+    accuracy = sum(bool(p) == is_spam for p, (_, is_spam) in zip(predicted, held_out)) / len(held_out)
+    blocklist = spam_filter.get_matcher()
+    keyword_accuracy = sum(blocklist.contains_any(text) == is_spam for text, is_spam in held_out) / len(held_out)
+    print(f"held-out accuracy: model {accuracy:.1%}, keyword blocklist {keyword_accuracy:.1%}\n")
+
+    print(f"{'path':<28} {'mean us':>9} {'p50 us':>9} {'p99 us':>9}")
+    for length in (100, 300, 1000):
+        sample = [message(rng, i % 3 == 0, length) for i in range(2000)]
+        for name, fn in (("model", model.probability), ("blocklist", blocklist.contains_any)):
+            timings = sorted(per_call_us(fn, sample))
+            print(
+                f"{f'{name}, {length} chars':<28} {statistics.fmean(timings):9.1f} "
+                f"{timings[len(timings) // 2]:9.1f} {timings[int(len(timings) * 0.99)]:9.1f}"
+            )
+
+    started = time.perf_counter()
+    model.score_batch(texts)
+    batch_us = (time.perf_counter() - started) / len(texts) * 1e6
+    print(f"{'model, NumPy batch':<28} {batch_us:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Measure contact_handler import time and first-use client construction.
+
+Usage:
+    python benchmarks/measure_cold_start.py --runs 10
+    python benchmarks/measure_cold_start.py --max-import-ms 400   # exit 1 on regression (run in CI)
+    python benchmarks/measure_cold_start.py --bytecode none       # no .pyc files for src/
+
+Every sample runs in a fresh interpreter so nothing is cached between runs. The
+script reports the median cost of importing the module and of building the AWS
+clients on first use. The AWS SDK part of that (``aws_clients`` plus the two
+clients) is compared with what the handler used to do at import time: import
+boto3, build the SES client and the DynamoDB resource layer. That comparison
+is like for like. The rest of the import is the handler's own modules, which
+grow with features. ``-X importtime`` output is summarised to show the
+heaviest direct imports.
+
+The children import a copy of ``src/``. By default the copy is precompiled
+with unchecked-hash ``.pyc`` files, as the deploy workflows do after
+``sam build``. With ``--bytecode none``, every import compiles from source,
+as it did in Lambda before that step (the code directory is read-only, so
+nothing is cached between cold starts).
+"""
+
+import argparse
+import compileall
+import json
+import os
+import py_compile
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+import _support
+
+# Current init path: import, then build the low-level clients on first use
+CHILD = r"""
+import json, time
+started = time.perf_counter()
+import aws_clients
+sdk = time.perf_counter()
+import contact_handler
+imported = time.perf_counter()
+contact_handler.get_dynamodb_client()
+contact_handler.get_ses_client()
+clients = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "sdk_import_ms": (sdk - started) * 1000,
+    "clients_ms": (clients - imported) * 1000,
+}))
+"""
+
+# Previous init path, for comparison: SES client plus the DynamoDB resource layer
+LEGACY_CHILD = r"""
+import json, os, time
+started = time.perf_counter()
+import boto3
+boto3.client("ses")
+boto3.resource("dynamodb").Table(os.environ["DYNAMODB_TABLE"])
+print(json.dumps({"legacy_init_ms": (time.perf_counter() - started) * 1000}))
+"""
+
+
+def prepare_source(directory: str, bytecode: str) -> str:
+    """Copy src/ into ``directory``, precompiled unless ``bytecode`` is ``none``."""
+    target = os.path.join(directory, "src")
+    shutil.copytree(_support.SRC_DIR, target, ignore=shutil.ignore_patterns("__pycache__", "*.pyc"))
+    if bytecode == "precompiled":
+        compileall.compile_dir(target, quiet=1, invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH)
+    return target
+
+
+def child_env(source_dir: str) -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [source_dir, env.get("PYTHONPATH")]))
+    # Like Lambda's read-only code directory: nothing compiled by one run is reused by the next
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+
+def run_child(code: str, source_dir: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", code], env=child_env(source_dir), check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def sample(runs: int, source_dir: str) -> list:
+    return [{**run_child(CHILD, source_dir), **run_child(LEGACY_CHILD, source_dir)} for _ in range(runs)]
+
+
+def heaviest_imports(limit: int, source_dir: str) -> list:
+    """Return (cumulative_ms, module) for the slowest direct imports of contact_handler."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import contact_handler"],
+        env=child_env(source_dir),
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+    # importtime lists children before their parent, indenting two spaces per level
+    children = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:") :].split("|")
+        depth = (len(module) - len(module.lstrip(" ")) - 1) // 2
+        if depth == 0:
+            if module.strip() == "contact_handler":
+                return sorted(children, reverse=True)[:limit]
+            children = []
+        elif depth == 1:
+            children.append((int(cumulative) / 1000, module.strip()))
+    return []
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=10, help="number of heaviest imports to list")
+    parser.add_argument("--max-import-ms", type=float, help="fail if the median import time exceeds this")
+    parser.add_argument("--bytecode", choices=["precompiled", "none"], default="precompiled")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        source_dir = prepare_source(directory, args.bytecode)
+        samples = sample(args.runs, source_dir)
+        imports = heaviest_imports(args.top, source_dir)
+    medians = {key: statistics.median(s[key] for s in samples) for key in samples[0]}
+
+    sdk_ms = medians["sdk_import_ms"] + medians["clients_ms"]
+    print(f"Median over {args.runs} fresh interpreters ({args.bytecode} bytecode for src/):")
+    print(f"  import contact_handler            {medians['import_ms']:8.1f} ms")
+    print(f"    of which aws_clients (botocore) {medians['sdk_import_ms']:8.1f} ms")
+    print(f"  first-use SES + DynamoDB clients  {medians['clients_ms']:8.1f} ms")
+    print(f"  total                             {medians['import_ms'] + medians['clients_ms']:8.1f} ms")
+    print(f"  AWS SDK init (import + clients)   {sdk_ms:8.1f} ms")
+    print(f"  legacy boto3 + resource init      {medians['legacy_init_ms']:8.1f} ms")
+    print(f"  AWS SDK init saved                {medians['legacy_init_ms'] - sdk_ms:8.1f} ms")
+    print("Heaviest direct imports of contact_handler (cumulative):")
+    for cumulative_ms, module in imports:
+        print(f"  {cumulative_ms:8.1f} ms  {module}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump({"runs": args.runs, "median": medians, "samples": samples, "imports": imports}, fh, indent=2)
+
+    if args.max_import_ms is not None and medians["import_ms"] > args.max_import_ms:
+        print(f"FAIL: import time {medians['import_ms']:.1f} ms exceeds budget of {args.max_import_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
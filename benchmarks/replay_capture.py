@@ -0,0 +1,141 @@
+"""Replay captured production traffic and compare it with the capture.
+
+Usage:
+    python benchmarks/replay_capture.py capture.jsonl --speed 1
+    python benchmarks/replay_capture.py capture.jsonl --speed max --concurrency 32 --output replay.json
+    python benchmarks/replay_capture.py capture.jsonl --speed 4 --url http://127.0.0.1:8080/contact
+
+A capture is the JSONL written by ``lambda_handler`` with ``CAPTURE_ENABLED``
+(see ``src/traffic_capture.py``); an exported CloudWatch Logs stream works as
+it is. Requests are sent at their captured pace divided by ``--speed``, or as
+fast as ``--concurrency`` allows with ``--speed max``.
+
+Without ``--url`` the handler runs in-process against moto-backed DynamoDB and
+SES, with the simulated round trips of ``bench_handler.py``. With ``--url`` the
+events are POSTed to a running ``http_adapter`` (or any API stand-in); start it
+with ``HTTP_TRUST_FORWARDED_FOR=true`` so each request keeps its captured source
+IP for rate limiting.
+
+The report shows replay latency percentiles next to the captured ones, how far
+sends fell behind schedule, response codes, and every request whose outcome
+differs from the capture. Spam outcomes that changed on requests captured with
+a spam model are counted apart: masking keeps only blocklisted terms, so the
+model cannot judge the replayed text the same way.
+"""
+
+import argparse
+import base64
+import http.client
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict
+from urllib.parse import urlsplit
+
+import _support
+
+import traffic_capture
+
+STATE_TABLE_NAME = "bench-state-table"
+
+
+def http_invoker(url: str) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """POST each event's body to ``url`` over one keep-alive connection per thread."""
+    target = urlsplit(url)
+    local = threading.local()
+
+    def invoke(event: Dict[str, Any]) -> Dict[str, Any]:
+        if getattr(local, "connection", None) is None:
+            connection_class = http.client.HTTPSConnection if target.scheme == "https" else http.client.HTTPConnection
+            local.connection = connection_class(target.netloc, timeout=30)
+        headers = dict(event.get("headers") or {})
+        source_ip = ((event.get("requestContext") or {}).get("identity") or {}).get("sourceIp")
+        if source_ip:
+            headers["X-Forwarded-For"] = source_ip
+        body = event.get("body") or ""
+        payload = base64.b64decode(body) if event.get("isBase64Encoded") else body.encode("utf-8")
+        try:
+            local.connection.request(event.get("httpMethod", "POST"), target.path or "/", body=payload, headers=headers)
+            response = local.connection.getresponse()
+            return {"statusCode": response.status, "body": response.read().decode("utf-8", "replace")}
+        except (OSError, http.client.HTTPException):
+            local.connection.close()
+            local.connection = None
+            raise
+
+    return invoke
+
+
+def print_report(summary: Dict[str, Any], wall: float) -> None:
+    def row(label: str, latency: Dict[str, float]) -> None:
+        print(
+            f"{label:<18} p50 {latency['p50_ms']:8.2f} ms  p90 {latency['p90_ms']:8.2f} ms  "
+            f"p99 {latency['p99_ms']:8.2f} ms  max {latency['max_ms']:8.2f} ms"
+        )
+
+    print(f"{summary['requests']} requests in {wall:.1f}s ({summary['requests'] / wall:.1f} req/s)")
+    row("replay latency", summary["latency"])
+    row("captured latency", summary["capturedLatency"])
+    row("send lag", summary["lag"])
+    print(f"status codes: {json.dumps(summary['byStatus'], sort_keys=True)}")
+    print(f"outcomes matching the capture: {summary['matched']}/{summary['requests']}")
+    for mismatch in summary["mismatches"][:10]:
+        print(f"  #{mismatch['index']}: expected {mismatch['expected']}, got {mismatch['actual']}")
+    if summary["spamModelDiffs"]:
+        print(f"spam outcomes changed by masking (captured with a spam model): {len(summary['spamModelDiffs'])}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("capture", help="capture JSONL file")
+    parser.add_argument("--speed", default="1", help="pace multiplier, or 'max' for no pacing")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--url", help="send to this endpoint instead of the in-process handler")
+    parser.add_argument("--latency-ms", type=float, default=8.0, help="simulated DynamoDB round trip (in-process)")
+    parser.add_argument("--ses-latency-ms", type=float, default=40.0, help="simulated SES round trip (in-process)")
+    parser.add_argument("--shared-state", action="store_true", help="use the state table (in-process)")
+    parser.add_argument("--output", help="write the report as JSON to this file")
+    args = parser.parse_args()
+    speed = 0.0 if args.speed == "max" else float(args.speed)
+
+    with open(args.capture, encoding="utf-8") as fh:
+        records = traffic_capture.load(fh)
+    if not records:
+        parser.exit(1, "error: no captured requests in the file\n")
+
+    if args.url:
+        started = time.perf_counter()
+        results = traffic_capture.replay(records, http_invoker(args.url), speed, args.concurrency)
+        wall = time.perf_counter() - started
+    else:
+        # Module-level configuration is read at import time
+        os.environ["CAPTURE_ENABLED"] = "false"
+        os.environ["METRICS_SAMPLE_RATE"] = "0"
+        if args.shared_state:
+            os.environ["STATE_TABLE"] = STATE_TABLE_NAME
+        with _support.moto_backend(
+            verify_email=os.environ["CONTACT_EMAIL"], state_table_name=STATE_TABLE_NAME if args.shared_state else ""
+        ):
+            _support.inject_session_latency({"dynamodb": args.latency_ms / 1000, "ses": args.ses_latency_ms / 1000})
+            import contact_handler
+
+            # Build the clients up front: concurrent first requests would race to create them
+            contact_handler.get_dynamodb_client()
+            contact_handler.get_ses_client()
+            started = time.perf_counter()
+            results = traffic_capture.replay(
+                records, lambda event: contact_handler.lambda_handler(event, None), speed, args.concurrency
+            )
+            wall = time.perf_counter() - started
+
+    summary = traffic_capture.report(records, results)
+    print_report(summary, wall)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(summary, fh, indent=2)
+        print(f"\nreport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
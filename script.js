@@ -127,6 +127,14 @@ document.addEventListener('DOMContentLoaded', () => {
   const config = getConfig();
   console.log('Contact form initialized with API URL:', config.CONTACT_API_URL);
 
+  // Retries of the same payload reuse one Idempotency-Key so the API never
+  // stores or emails a submission twice
+  let pendingSubmission = null;
+  const newIdempotencyKey = () =>
+    window.crypto && typeof window.crypto.randomUUID === 'function'
+      ? window.crypto.randomUUID()
+      : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+
   contactForm.addEventListener('submit', async e => {
     e.preventDefault();
 
@@ -192,16 +200,22 @@ document.addEventListener('DOMContentLoaded', () => {
       const controller = new AbortController();
       const timeoutId = setTimeout(() => controller.abort(), config.FORM_SUBMIT_TIMEOUT);
 
+      const payload = JSON.stringify({
+        name: name,
+        email: email,
+        message: message,
+      });
+      if (!pendingSubmission || pendingSubmission.payload !== payload) {
+        pendingSubmission = { payload: payload, key: newIdempotencyKey() };
+      }
+
       const response = await fetch(config.CONTACT_API_URL, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          'Idempotency-Key': pendingSubmission.key,
         },
-        body: JSON.stringify({
-          name: name,
-          email: email,
-          message: message,
-        }),
+        body: payload,
         signal: controller.signal,
       });
 
@@ -215,6 +229,7 @@ document.addEventListener('DOMContentLoaded', () => {
           'success'
         );
         contactForm.reset();
+        pendingSubmission = null;
 
         // Optional: Add Google Analytics event tracking
         if (config.ENABLE_ANALYTICS && typeof gtag !== 'undefined') {
@@ -0,0 +1,324 @@
+"""Archive of submissions removed by DynamoDB TTL.
+
+``ContactSubmissionsTable`` streams the old image of every removed row to
+``ArchiverFunction`` (``archiver.stream_handler``). Only removals made by the
+TTL service are archived. A row deleted on purpose, for example on an erasure
+request, stays deleted.
+
+Archived rows are written as gzip NDJSON (the ``export_table`` line format),
+partitioned by the row's UTC day::
+
+    <ARCHIVE_PREFIX>/day=2024-05-01/<first sequence>-<last sequence>.ndjson.gz
+
+Files go to ``ARCHIVE_BUCKET`` on S3 or, for local runs and tests, to the
+directory ``ARCHIVE_DIR``. Lines are compressed as they arrive. A partition is
+written out as soon as it holds ``ARCHIVE_PART_BYTES`` of uncompressed NDJSON,
+and everything buffered is written out once ``ARCHIVE_MAX_BUFFER_BYTES`` is
+reached, so memory stays bounded however large the stream batch is. File names
+come from the stream sequence numbers, so a retried batch overwrites its own
+files instead of adding copies.
+
+Usage:
+    python src/archiver.py list --dir ./archive
+    python src/archiver.py replay --bucket <archive-bucket> --day 2024-05-01 --table <submissions-table>
+"""
+
+import argparse
+import gzip
+import os
+import tempfile
+import time
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import codec
+from batch_writer import BatchWriter
+from export_table import format_page
+from item_codec import decode_item, encode_item
+
+# Destination: an S3 bucket, or a local directory when no bucket is set
+ARCHIVE_BUCKET = os.environ.get("ARCHIVE_BUCKET", "")
+ARCHIVE_DIR = os.environ.get("ARCHIVE_DIR", "")
+ARCHIVE_PREFIX = os.environ.get("ARCHIVE_PREFIX", "submissions")
+# Uncompressed NDJSON bytes per archive file, and in memory across all partitions
+ARCHIVE_PART_BYTES = int(os.environ.get("ARCHIVE_PART_BYTES", str(8 * 1024 * 1024)))
+ARCHIVE_MAX_BUFFER_BYTES = int(os.environ.get("ARCHIVE_MAX_BUFFER_BYTES", str(32 * 1024 * 1024)))
+# TTL given to replayed rows, in days
+ARCHIVE_REPLAY_TTL_DAYS = int(os.environ.get("ARCHIVE_REPLAY_TTL_DAYS", "30"))
+
+# Attributes dropped on replay so a restored row never re-enters the email outbox
+REPLAY_DROPPED_ATTRIBUTES = ("outboxQueue", "nextAttemptAt")
+
+
+class LocalSink:
+    """Archive files in a local directory (object store stand-in)."""
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+
+    def put(self, key: str, data: bytes) -> None:
+        path = os.path.join(self.root, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename, so a reader never sees half a file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp_path, path)
+
+    def get(self, key: str) -> bytes:
+        with open(os.path.join(self.root, key), "rb") as fh:
+            return fh.read()
+
+    def list(self, prefix: str) -> List[str]:
+        keys = []
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if not name.endswith(".tmp"):
+                    key = os.path.relpath(os.path.join(directory, name), self.root).replace(os.sep, "/")
+                    if key.startswith(prefix):
+                        keys.append(key)
+        return sorted(keys)
+
+
+class S3Sink:
+    """Archive files in an S3 bucket."""
+
+    def __init__(self, client: Any, bucket: str) -> None:
+        self.client = client
+        self.bucket = bucket
+
+    def put(self, key: str, data: bytes) -> None:
+        self.client.put_object(
+            Bucket=self.bucket, Key=key, Body=data, ContentType="application/x-ndjson", ContentEncoding="gzip"
+        )
+
+    def get(self, key: str) -> bytes:
+        return self.client.get_object(Bucket=self.bucket, Key=key)["Body"].read()
+
+    def list(self, prefix: str) -> List[str]:
+        keys = []
+        for page in self.client.get_paginator("list_objects_v2").paginate(Bucket=self.bucket, Prefix=prefix):
+            keys.extend(entry["Key"] for entry in page.get("Contents", []))
+        return sorted(keys)
+
+
+_sink = None
+
+
+def get_sink() -> Any:
+    """Return the container-wide archive destination from ``ARCHIVE_BUCKET`` or ``ARCHIVE_DIR``."""
+    global _sink
+    if _sink is None:
+        if ARCHIVE_BUCKET:
+            import aws_clients
+
+            _sink = S3Sink(aws_clients.create_client("s3"), ARCHIVE_BUCKET)
+        elif ARCHIVE_DIR:
+            _sink = LocalSink(ARCHIVE_DIR)
+        else:
+            raise RuntimeError("Set ARCHIVE_BUCKET or ARCHIVE_DIR")
+    return _sink
+
+
+class _Part:
+    """One archive file being compressed in memory."""
+
+    def __init__(self, first_sequence: str) -> None:
+        # wbits 31: gzip container, readable by gzip.decompress and zcat
+        self.compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        self.chunks: List[bytes] = []
+        self.raw_bytes = 0
+        self.first_sequence = first_sequence
+        self.last_sequence = first_sequence
+        self.count = 0
+
+    def add(self, line: bytes, sequence: str) -> None:
+        self.chunks.append(self.compressor.compress(line))
+        self.raw_bytes += len(line)
+        self.last_sequence = sequence
+        self.count += 1
+
+    def finish(self) -> bytes:
+        self.chunks.append(self.compressor.flush())
+        return b"".join(self.chunks)
+
+
+class ArchiveWriter:
+    """Buffers removed rows per day partition and writes them out as gzip NDJSON files."""
+
+    def __init__(
+        self,
+        sink: Any,
+        prefix: str = ARCHIVE_PREFIX,
+        part_bytes: int = ARCHIVE_PART_BYTES,
+        max_buffer_bytes: int = ARCHIVE_MAX_BUFFER_BYTES,
+    ) -> None:
+        self.sink = sink
+        self.prefix = prefix
+        self.part_bytes = part_bytes
+        self.max_buffer_bytes = max_buffer_bytes
+        self._parts: Dict[str, _Part] = {}
+        self._buffered = 0
+        self.keys: List[str] = []
+        self.archived = 0
+
+    def add(self, item: Dict[str, Any], sequence: str) -> None:
+        """Buffer one row; ``sequence`` orders it within the stream shard."""
+        day = partition_day(item)
+        part = self._parts.get(day)
+        if part is None:
+            part = self._parts[day] = _Part(sequence)
+        line = format_page([item], "ndjson", (), False)
+        part.add(line, sequence)
+        self._buffered += len(line)
+        self.archived += 1
+
+        if part.raw_bytes >= self.part_bytes:
+            self._write(day)
+        elif self._buffered >= self.max_buffer_bytes:
+            self.flush()
+
+    def flush(self) -> List[str]:
+        """Write every buffered partition; returns the keys written so far."""
+        for day in list(self._parts):
+            self._write(day)
+        return self.keys
+
+    def _write(self, day: str) -> None:
+        part = self._parts.pop(day)
+        key = f"{self.prefix}/day={day}/{part.first_sequence}-{part.last_sequence}.ndjson.gz"
+        self.sink.put(key, part.finish())
+        self._buffered -= part.raw_bytes
+        self.keys.append(key)
+
+
+def partition_day(item: Dict[str, Any]) -> str:
+    """UTC day a row is archived under."""
+    return str(item.get("dayBucket") or str(item.get("timestamp", ""))[:10] or "unknown")
+
+
+def is_ttl_removal(record: Dict[str, Any]) -> bool:
+    """Whether a stream record is a row deleted by the TTL service."""
+    identity = record.get("userIdentity") or {}
+    return (
+        record.get("eventName") == "REMOVE"
+        and identity.get("type") == "Service"
+        and identity.get("principalId") == "dynamodb.amazonaws.com"
+        and "OldImage" in record.get("dynamodb", {})
+    )
+
+
+def stream_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    DynamoDB Streams consumer for the submissions table.
+    Archives TTL-expired rows; any error fails the batch so Lambda retries it.
+    """
+    writer = ArchiveWriter(get_sink(), ARCHIVE_PREFIX, ARCHIVE_PART_BYTES, ARCHIVE_MAX_BUFFER_BYTES)
+    skipped = 0
+    for record in event.get("Records", []):
+        if not is_ttl_removal(record):
+            skipped += 1
+            continue
+        writer.add(decode_item(record["dynamodb"]["OldImage"]), record["dynamodb"]["SequenceNumber"])
+    keys = writer.flush()
+
+    summary = {"archived": writer.archived, "skipped": skipped, "files": len(keys)}
+    print(f"Archive batch complete: {codec.dumps(summary)}")
+    return summary
+
+
+def read_partition(sink: Any, day: str, prefix: str = ARCHIVE_PREFIX) -> Iterator[Dict[str, Any]]:
+    """Rows archived for ``day``, file by file (one decompressed file in memory at a time)."""
+    for key in sink.list(f"{prefix}/day={day}/"):
+        for line in gzip.decompress(sink.get(key)).splitlines():
+            if line.strip():
+                yield codec.loads(line)
+
+
+def list_partitions(sink: Any, prefix: str = ARCHIVE_PREFIX) -> List[Tuple[str, int]]:
+    """(day, file count) for every archived partition."""
+    counts: Dict[str, int] = {}
+    for key in sink.list(f"{prefix}/day="):
+        day = key[len(prefix) + len("/day=") :].split("/", 1)[0]
+        counts[day] = counts.get(day, 0) + 1
+    return sorted(counts.items())
+
+
+def replay(
+    sink: Any,
+    day: str,
+    client: Any,
+    table_name: str,
+    prefix: str = ARCHIVE_PREFIX,
+    ttl_days: Optional[int] = ARCHIVE_REPLAY_TTL_DAYS,
+    now: Optional[int] = None,
+    page_size: int = 500,
+) -> int:
+    """Write the rows archived for ``day`` back to ``table_name``; returns rows written.
+
+    Rows are written in the current ``item_codec`` format with a fresh TTL
+    (``ttl_days`` from now, or none when ``ttl_days`` is None) and without
+    outbox attributes, so no email is sent again. Replaying twice is harmless:
+    the same keys are overwritten.
+    """
+    now = int(time.time()) if now is None else now
+    writer = BatchWriter(client.batch_write_item, table_name)
+    written = 0
+    page: List[Dict[str, Any]] = []
+    try:
+        for item in read_partition(sink, day, prefix):
+            for name in REPLAY_DROPPED_ATTRIBUTES:
+                item.pop(name, None)
+            if ttl_days is None:
+                item.pop("ttl", None)
+            else:
+                item["ttl"] = now + ttl_days * 86400
+            page.append(encode_item(item))
+            if len(page) >= page_size:
+                writer.write_many(page)
+                written += len(page)
+                page = []
+        writer.write_many(page)
+        written += len(page)
+    finally:
+        writer.close()
+    return written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="List or replay archived submission partitions")
+    parser.add_argument("command", choices=["list", "replay"])
+    parser.add_argument("--bucket", default=ARCHIVE_BUCKET, help="archive S3 bucket")
+    parser.add_argument("--dir", default=ARCHIVE_DIR, help="local archive directory (instead of a bucket)")
+    parser.add_argument("--prefix", default=ARCHIVE_PREFIX)
+    parser.add_argument("--day", help="partition to replay (YYYY-MM-DD)")
+    parser.add_argument("--table", default=os.environ.get("DYNAMODB_TABLE", ""), help="submissions table name")
+    parser.add_argument(
+        "--ttl-days", type=int, default=ARCHIVE_REPLAY_TTL_DAYS, help="TTL for replayed rows; 0 for none"
+    )
+    parser.add_argument("--endpoint-url", help="DynamoDB endpoint, e.g. DynamoDB Local")
+    args = parser.parse_args()
+
+    import aws_clients
+
+    if args.bucket:
+        sink: Any = S3Sink(aws_clients.create_client("s3"), args.bucket)
+    elif args.dir:
+        sink = LocalSink(args.dir)
+    else:
+        parser.error("--bucket or --dir is required")
+
+    if args.command == "list":
+        for day, files in list_partitions(sink, args.prefix):
+            print(f"{day}  {files} file(s)")
+        return
+
+    if not args.day or not args.table:
+        parser.error("replay needs --day and --table")
+    client = aws_clients.create_client("dynamodb", endpoint_url=args.endpoint_url)
+    written = replay(sink, args.day, client, args.table, args.prefix, args.ttl_days or None)
+    print(f"Replayed {written} rows from {args.day}")
+
+
+if __name__ == "__main__":
+    main()
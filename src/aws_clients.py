@@ -0,0 +1,263 @@
+"""Shared AWS client construction and per-dependency circuit breakers.
+
+Every client gets the same explicit botocore ``Config``:
+
+* connect and read timeouts. A hung SES or DynamoDB call gives up in seconds
+  instead of holding the invocation until the Lambda timeout.
+* ``adaptive`` retry mode. This adds client-side rate limiting on top of the
+  standard exponential backoff when the service throttles.
+* a keep-alive connection pool sized by ``AWS_MAX_POOL_CONNECTIONS``.
+
+A ``CircuitBreaker`` tracks recent calls to one dependency. When the share of
+failed calls in ``BREAKER_WINDOW_SECONDS`` reaches ``BREAKER_FAILURE_RATE``, it
+opens and rejects calls without touching the network for
+``BREAKER_OPEN_SECONDS``. After that, one trial call decides whether it closes
+again. The contact handler uses the ``ses`` breaker to hand emails to the
+outbox while SES is degraded.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+import botocore.session
+from botocore.config import Config
+from botocore.exceptions import ClientError, HTTPClientError
+from botocore.exceptions import ConnectionError as EndpointError
+
+# Seconds to wait for a connection and for each response
+AWS_CONNECT_TIMEOUT = float(os.environ.get("AWS_CONNECT_TIMEOUT", "2"))
+AWS_READ_TIMEOUT = float(os.environ.get("AWS_READ_TIMEOUT", "5"))
+# Total attempts per call, including the first, and the botocore retry mode
+AWS_MAX_ATTEMPTS = int(os.environ.get("AWS_MAX_ATTEMPTS", "3"))
+AWS_RETRY_MODE = os.environ.get("AWS_RETRY_MODE", "adaptive")
+# HTTP connections each AWS client keeps open; raise it when serving requests concurrently
+AWS_MAX_POOL_CONNECTIONS = int(os.environ.get("AWS_MAX_POOL_CONNECTIONS", "10"))
+
+# Circuit breaker: failure share over the window that opens it, and how long it stays open
+BREAKER_ENABLED = os.environ.get("BREAKER_ENABLED", "true").lower() == "true"
+BREAKER_FAILURE_RATE = float(os.environ.get("BREAKER_FAILURE_RATE", "0.5"))
+BREAKER_MIN_CALLS = int(os.environ.get("BREAKER_MIN_CALLS", "5"))
+BREAKER_WINDOW_SECONDS = float(os.environ.get("BREAKER_WINDOW_SECONDS", "30"))
+BREAKER_OPEN_SECONDS = float(os.environ.get("BREAKER_OPEN_SECONDS", "30"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Error codes that mean the service is struggling, not that the request was wrong
+_RETRYABLE_CODES = {
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "RequestThrottled",
+    "ProvisionedThroughputExceededException",
+    "RequestLimitExceeded",
+    "ServiceUnavailable",
+    "InternalFailure",
+    "InternalError",
+}
+
+T = TypeVar("T")
+
+_session: Optional[botocore.session.Session] = None
+_session_lock = threading.Lock()
+
+
+def build_config(**overrides: Any) -> Config:
+    """The shared client ``Config``; keyword arguments override single settings."""
+    settings: Dict[str, Any] = {
+        "connect_timeout": AWS_CONNECT_TIMEOUT,
+        "read_timeout": AWS_READ_TIMEOUT,
+        "retries": {"mode": AWS_RETRY_MODE, "total_max_attempts": AWS_MAX_ATTEMPTS},
+        "max_pool_connections": AWS_MAX_POOL_CONNECTIONS,
+        "tcp_keepalive": True,
+    }
+    settings.update(overrides)
+    return Config(**settings)
+
+
+def create_client(service: str, endpoint_url: Optional[str] = None, **config_overrides: Any) -> Any:
+    """Build a low-level client for ``service`` with the shared configuration.
+
+    Clients come from one botocore session rather than ``boto3.client``:
+    importing boto3 also imports s3transfer, which is over a third of the
+    handler's import time and is never used here.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = botocore.session.get_session()
+        # Session.create_client is not thread-safe
+        return _session.create_client(service, endpoint_url=endpoint_url, config=build_config(**config_overrides))
+
+
+def is_dependency_failure(error: BaseException) -> bool:
+    """Whether ``error`` says the dependency is unhealthy (timeouts, 5xx, throttling).
+
+    Of botocore's own errors, only transport failures count: connection, endpoint
+    and TLS errors (``ConnectionError``) and read timeouts or dropped connections
+    (``HTTPClientError``). Client-side problems such as
+    ``ParamValidationError`` or missing credentials come from our side and must
+    not open the breaker for all traffic.
+    """
+    if isinstance(error, CircuitOpenError):
+        return True
+    if isinstance(error, ClientError):
+        code = error.response.get("Error", {}).get("Code", "")
+        status = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0)
+        return code in _RETRYABLE_CODES or status >= 500
+    return isinstance(error, (HTTPClientError, EndpointError, ConnectionError, TimeoutError))
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose breaker is open."""
+
+    def __init__(self, name: str, retry_after: float) -> None:
+        super().__init__(f"Circuit for {name} is open; retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker over a sliding time window."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = BREAKER_FAILURE_RATE,
+        min_calls: int = BREAKER_MIN_CALLS,
+        window_seconds: float = BREAKER_WINDOW_SECONDS,
+        open_seconds: float = BREAKER_OPEN_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        # (time, failed) per call in the window
+        self._calls: Deque[Tuple[float, bool]] = deque()
+        self._failures = 0
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+                return HALF_OPEN
+            return self._state
+
+    def is_open(self) -> bool:
+        """True while calls would be rejected, without using up the half-open trial."""
+        with self._lock:
+            if self._state == OPEN:
+                return self._clock() - self._opened_at < self.open_seconds
+            return self._state == HALF_OPEN and self._trial_in_flight
+
+    def allow(self) -> bool:
+        """Reserve a call. Every True must be followed by ``record``."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+                self._state = HALF_OPEN
+            if self._state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record(self, failed: bool) -> None:
+        """Record the outcome of a call admitted by ``allow``."""
+        now = self._clock()
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._trial_in_flight = False
+                if failed:
+                    self._open(now)
+                else:
+                    self._state = CLOSED
+                    self._calls.clear()
+                    self._failures = 0
+                return
+
+            self._calls.append((now, failed))
+            self._failures += failed
+            while self._calls and self._calls[0][0] <= now - self.window_seconds:
+                self._failures -= self._calls.popleft()[1]
+            if (
+                self._state == CLOSED
+                and len(self._calls) >= self.min_calls
+                and self._failures >= self.failure_rate * len(self._calls)
+            ):
+                self._open(now)
+
+    def call(self, function: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run ``function`` through the breaker, raising ``CircuitOpenError`` when it is open."""
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_after())
+        try:
+            result = function(*args, **kwargs)
+        except Exception as e:
+            self.record(is_dependency_failure(e))
+            raise
+        self.record(False)
+        return result
+
+    def retry_after(self) -> float:
+        with self._lock:
+            return max(0.0, self.open_seconds - (self._clock() - self._opened_at))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._calls.clear()
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def _open(self, now: float) -> None:
+        print(f"Circuit breaker for {self.name} opened")
+        self._state = OPEN
+        self._opened_at = now
+        self._calls.clear()
+        self._failures = 0
+
+
+class _DisabledBreaker(CircuitBreaker):
+    """Breaker that always admits calls (``BREAKER_ENABLED=false``)."""
+
+    def allow(self) -> bool:
+        return True
+
+    def is_open(self) -> bool:
+        return False
+
+    def record(self, failed: bool) -> None:
+        pass
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Return the container-wide breaker for the dependency ``name``."""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                breaker = _breakers[name] = CircuitBreaker(name) if BREAKER_ENABLED else _DisabledBreaker(name)
+    return breaker
+
+
+def reset_breakers() -> None:
+    """Forget every breaker's state (for tests and benchmarks)."""
+    with _breakers_lock:
+        _breakers.clear()
@@ -0,0 +1,199 @@
+"""Micro-batched DynamoDB writer.
+
+Groups individual ``put`` requests into ``batch_write_item`` calls of up to 25
+items. A batch is flushed when it is full or when the oldest buffered item has
+waited ``max_linger_seconds``. Unprocessed items, throttling and 5xx errors are
+retried with jittered exponential backoff. Any other error (a validation error
+from one bad item, a missing table) is not retried: the batch is written again
+one item at a time, so only the futures of items that fail on their own fail.
+Every caller receives a future that resolves only once its own item has been
+durably written. Unprocessed items are matched back to their callers by the
+table's primary key (``key_names``).
+
+The writer is agnostic of the client layer: pass the ``batch_write_item`` method
+of a low-level client or of a ``boto3.resource("dynamodb")`` together with items
+in the matching shape.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+from aws_clients import is_dependency_failure
+
+MAX_BATCH_SIZE = 25  # DynamoDB hard limit for batch_write_item
+# Primary key of the submissions table
+DEFAULT_KEY_NAMES = ("submissionId", "timestamp")
+
+
+class BatchWriteError(Exception):
+    """Raised on a write future when an item could not be written."""
+
+
+class BatchWriter:
+    """Thread-safe buffered writer shared by concurrent callers."""
+
+    def __init__(
+        self,
+        batch_write_item: Callable[..., Dict[str, Any]],
+        table_name: str,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_linger_seconds: float = 0.005,
+        max_attempts: int = 8,
+        base_backoff_seconds: float = 0.025,
+        max_backoff_seconds: float = 1.0,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: Optional[random.Random] = None,
+        key_names: Sequence[str] = DEFAULT_KEY_NAMES,
+    ) -> None:
+        if not 1 <= max_batch_size <= MAX_BATCH_SIZE:
+            raise ValueError(f"max_batch_size must be between 1 and {MAX_BATCH_SIZE}")
+        self._batch_write_item = batch_write_item
+        self._table_name = table_name
+        self._max_batch_size = max_batch_size
+        self._max_linger = max_linger_seconds
+        self._max_attempts = max_attempts
+        self._base_backoff = base_backoff_seconds
+        self._max_backoff = max_backoff_seconds
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+        self._key_names = tuple(key_names)
+
+        self._pending: List[Tuple[Dict[str, Any], Future]] = []
+        self._first_enqueued_at = 0.0
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def submit(self, item: Dict[str, Any]) -> "Future[None]":
+        """Buffer an item and return a future that resolves once it is written."""
+        future: "Future[None]" = Future()
+        with self._condition:
+            if self._closed:
+                raise BatchWriteError("BatchWriter is closed")
+            if not self._pending:
+                self._first_enqueued_at = time.monotonic()
+            self._pending.append((item, future))
+            self._ensure_thread()
+            self._condition.notify()
+        return future
+
+    def write(self, item: Dict[str, Any], timeout: Optional[float] = None) -> None:
+        """Buffer an item and block until it has been durably written."""
+        self.submit(item).result(timeout)
+
+    def write_many(self, items: Iterable[Dict[str, Any]], timeout: Optional[float] = None) -> None:
+        """Write several items, blocking until all of them are acknowledged."""
+        futures = [self.submit(item) for item in items]
+        for future in futures:
+            future.result(timeout)
+
+    def flush(self) -> None:
+        """Write everything currently buffered from the calling thread."""
+        while True:
+            with self._condition:
+                batch = self._take_batch()
+            if not batch:
+                return
+            self._write_batch(batch)
+
+    def close(self) -> None:
+        """Flush remaining items and stop the background flusher."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        self.flush()
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="dynamodb-batch-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                # Wait for the batch to fill up or the oldest item to reach its linger deadline
+                deadline = self._first_enqueued_at + self._max_linger
+                while len(self._pending) < self._max_batch_size and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                batch = self._take_batch()
+            if batch:
+                self._write_batch(batch)
+
+    def _take_batch(self) -> List[Tuple[Dict[str, Any], Future]]:
+        batch = self._pending[: self._max_batch_size]
+        del self._pending[: self._max_batch_size]
+        if self._pending:
+            self._first_enqueued_at = time.monotonic()
+        return batch
+
+    def _write_batch(self, batch: List[Tuple[Dict[str, Any], Future]]) -> None:
+        remaining = batch
+        last_error: Optional[Exception] = None
+
+        for attempt in range(self._max_attempts):
+            if attempt:
+                self._sleep(self._backoff(attempt))
+            try:
+                response = self._batch_write_item(
+                    RequestItems={self._table_name: [{"PutRequest": {"Item": item}} for item, _ in remaining]}
+                )
+            except Exception as e:
+                if is_dependency_failure(e):
+                    # Throttling or transient service errors: retry the whole batch
+                    last_error = e
+                    continue
+                if len(remaining) == 1:
+                    # The request itself is wrong; retrying cannot help
+                    self._fail(remaining, BatchWriteError(f"Item not written: {e}"), e)
+                    return
+                # One bad item fails the whole call: write each alone so only it fails
+                for entry in remaining:
+                    self._write_batch([entry])
+                return
+
+            unprocessed = {
+                self._key(request["PutRequest"]["Item"])
+                for request in response.get("UnprocessedItems", {}).get(self._table_name, [])
+            }
+            still_pending = []
+            for item, future in remaining:
+                if unprocessed and self._key(item) in unprocessed:
+                    still_pending.append((item, future))
+                else:
+                    future.set_result(None)
+            remaining = still_pending
+            if not remaining:
+                return
+            last_error = None
+
+        error = BatchWriteError(f"{len(remaining)} item(s) not written after {self._max_attempts} attempts")
+        self._fail(remaining, error, last_error)
+
+    def _key(self, item: Dict[str, Any]) -> Hashable:
+        # Low-level attribute values are dicts, so compare their text form
+        return tuple(str(item.get(name)) for name in self._key_names)
+
+    def _fail(
+        self, batch: List[Tuple[Dict[str, Any], Future]], error: BatchWriteError, cause: Optional[Exception]
+    ) -> None:
+        if cause is not None:
+            error.__cause__ = cause
+        for _, future in batch:
+            future.set_exception(error)
+
+    def _backoff(self, attempt: int) -> float:
+        ceiling = min(self._max_backoff, self._base_backoff * (2 ** (attempt - 1)))
+        return self._rng.uniform(0, ceiling)
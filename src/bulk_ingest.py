@@ -0,0 +1,274 @@
+"""Bulk NDJSON import of historical contact submissions.
+
+Each input line is one JSON object with ``name``, ``email`` and ``message``.
+Optional fields are ``submissionId``, ``timestamp`` (ISO 8601), ``clientIp``
+and ``userAgent``. Input is read as a stream. Beyond the set of submission
+IDs already seen (used to reject duplicates), memory stays flat however large
+the file is.
+
+Each record goes through ``validate_form_data``, the same check the contact
+endpoint uses. Valid records are written with ``batch_write_item`` through a few
+``BatchWriter`` instances. No email is sent. For every input line the report
+gets one accepted or rejected entry, in input order. The number of writes in
+flight is bounded, so the report follows closely behind the input.
+
+Usage:
+    python src/bulk_ingest.py inquiries.ndjson --table contact-submissions --report report.ndjson
+    python src/bulk_ingest.py - --table contact-submissions --endpoint-url http://localhost:8000 < inquiries.ndjson
+
+``http_adapter`` exposes the same import as ``POST /bulk`` when
+``BULK_INGEST_TOKEN`` is set.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import codec
+import item_codec
+from batch_writer import BatchWriteError, BatchWriter
+
+# Lines longer than this are rejected without being parsed
+BULK_INGEST_MAX_LINE_BYTES = int(os.environ.get("BULK_INGEST_MAX_LINE_BYTES", str(64 * 1024)))
+# Writes awaiting acknowledgement before reading more input
+BULK_INGEST_MAX_IN_FLIGHT = int(os.environ.get("BULK_INGEST_MAX_IN_FLIGHT", "2000"))
+# Parallel BatchWriters (each flushes on its own thread)
+BULK_INGEST_WRITERS = int(os.environ.get("BULK_INGEST_WRITERS", "4"))
+# Bearer token for POST /bulk on http_adapter; the route is disabled when unset
+BULK_INGEST_TOKEN = os.environ.get("BULK_INGEST_TOKEN", "")
+
+IMPORTED_STATUS = "imported"
+MAX_SUBMISSION_ID_LENGTH = 128
+READ_CHUNK_BYTES = 64 * 1024
+
+
+def iter_lines(chunks: Iterable[bytes], max_line_bytes: int = BULK_INGEST_MAX_LINE_BYTES) -> Iterator[Optional[bytes]]:
+    """Split a stream of byte chunks into lines.
+
+    Yields None in place of a line longer than ``max_line_bytes``. Such a line
+    is dropped as it streams past instead of being buffered.
+    """
+    buffer = b""
+    oversized = False
+    for chunk in chunks:
+        buffer += chunk
+        while True:
+            newline = buffer.find(b"\n")
+            if newline < 0:
+                break
+            line, buffer = buffer[:newline], buffer[newline + 1 :]
+            yield None if oversized or len(line) > max_line_bytes else line
+            oversized = False
+        if len(buffer) > max_line_bytes:
+            buffer = b""
+            oversized = True
+    if oversized:
+        yield None
+    elif buffer:
+        yield buffer
+
+
+def iter_file(fh: Any) -> Iterator[bytes]:
+    """Read a binary file object in fixed-size chunks."""
+    return iter(lambda: fh.read(READ_CHUNK_BYTES), b"")
+
+
+def _validate_form_data(record: Dict[str, Any]) -> Dict[str, Any]:
+    # contact_handler reads its required environment at import time; importing it
+    # on first use lets the CLI fill that in from its arguments first
+    import contact_handler
+
+    return contact_handler.validate_form_data(record)
+
+
+def _build_item(
+    record: Dict[str, Any],
+    data: Dict[str, str],
+    submission_id: str,
+    timestamp: str,
+    source: str,
+    ttl: Optional[int],
+) -> Dict[str, Any]:
+    import contact_handler
+
+    item = contact_handler.build_submission_item(
+        submission_id,
+        timestamp,
+        data["name"],
+        data["email"].lower(),
+        data["message"],
+        str(record.get("clientIp") or "unknown"),
+        str(record.get("userAgent") or "bulk-import"),
+    )
+    item["status"] = IMPORTED_STATUS
+    item["importSource"] = source
+    if ttl is None:
+        del item["ttl"]
+    else:
+        item["ttl"] = ttl
+    return item
+
+
+def parse_timestamp(value: Any) -> str:
+    """Return ``value`` as the naive UTC ISO string the submissions table uses."""
+    if not isinstance(value, str):
+        raise ValueError("timestamp must be a string")
+    parsed = datetime.fromisoformat(value[:-1] + "+00:00" if value.endswith("Z") else value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.isoformat()
+
+
+def _rejected(line: int, error: str, errors: Optional[List[str]] = None) -> Dict[str, Any]:
+    entry: Dict[str, Any] = {"line": line, "status": "rejected", "error": error}
+    if errors and len(errors) > 1:
+        entry["errors"] = errors
+    return entry
+
+
+def ingest(
+    lines: Iterable[Optional[bytes]],
+    client: Any,
+    table_name: str,
+    report: Callable[[Dict[str, Any]], None],
+    source: str = "bulk",
+    ttl_days: Optional[int] = None,
+    writers: int = BULK_INGEST_WRITERS,
+    max_in_flight: int = BULK_INGEST_MAX_IN_FLIGHT,
+    clock: Callable[[], float] = time.time,
+) -> Dict[str, Any]:
+    """Validate and write every line, calling ``report`` once per non-blank line in order.
+
+    Records are stored without a TTL unless ``ttl_days`` is given, which counts
+    from the time of import.
+    Returns a summary of counts and timing.
+    """
+    started = time.perf_counter()
+    ttl = None if ttl_days is None else int(clock()) + ttl_days * 86400
+    batch_writers = [BatchWriter(client.batch_write_item, table_name) for _ in range(max(1, writers))]
+    # (line number, submission ID or rejection, write future)
+    in_flight: Deque[Tuple[int, Any, Optional["Future[None]"]]] = deque()
+    seen_ids: Set[str] = set()
+    counts = {"lines": 0, "accepted": 0, "rejected": 0, "blank": 0}
+
+    def settle_oldest() -> None:
+        line, outcome, future = in_flight.popleft()
+        if future is not None:
+            try:
+                future.result()
+                outcome = {"line": line, "status": "accepted", "submissionId": outcome}
+            except BatchWriteError as e:
+                outcome = _rejected(line, f"Write failed: {str(e)}")
+        counts[outcome["status"]] += 1
+        report(outcome)
+
+    try:
+        for line_number, raw in enumerate(lines, start=1):
+            counts["lines"] += 1
+            entry = _prepare(line_number, raw, seen_ids, source, ttl)
+            if entry is None:
+                counts["blank"] += 1
+                continue
+            if isinstance(entry, dict):
+                in_flight.append((line_number, entry, None))
+            else:
+                submission_id, item = entry
+                writer = batch_writers[line_number % len(batch_writers)]
+                in_flight.append((line_number, submission_id, writer.submit(item_codec.encode_item(item))))
+            while len(in_flight) > max_in_flight:
+                settle_oldest()
+        while in_flight:
+            settle_oldest()
+    finally:
+        for writer in batch_writers:
+            writer.close()
+
+    elapsed = time.perf_counter() - started
+    return {**counts, "seconds": round(elapsed, 3), "recordsPerSecond": round(counts["accepted"] / elapsed, 1)}
+
+
+def _prepare(line_number: int, raw: Optional[bytes], seen_ids: Set[str], source: str, ttl: Optional[int]) -> Any:
+    """Return None for a blank line, a rejection dict, or (submission ID, item)."""
+    if raw is None:
+        return _rejected(line_number, f"Line exceeds {BULK_INGEST_MAX_LINE_BYTES} bytes")
+    raw = raw.strip()
+    if not raw:
+        return None
+
+    try:
+        record = codec.loads(raw)
+    except ValueError:
+        return _rejected(line_number, "Invalid JSON")
+    if not isinstance(record, dict):
+        return _rejected(line_number, "Each line must be a JSON object")
+
+    validation_result = _validate_form_data(record)
+    if not validation_result["valid"]:
+        return _rejected(line_number, validation_result["error"], validation_result.get("errors"))
+
+    submission_id = record.get("submissionId") or str(uuid.uuid4())
+    if not isinstance(submission_id, str) or len(submission_id) > MAX_SUBMISSION_ID_LENGTH:
+        return _rejected(line_number, "submissionId must be a string of at most 128 characters")
+    if submission_id in seen_ids:
+        return _rejected(line_number, "Duplicate submissionId in this import")
+
+    try:
+        timestamp = parse_timestamp(record["timestamp"]) if "timestamp" in record else datetime.utcnow().isoformat()
+    except ValueError:
+        return _rejected(line_number, "timestamp must be an ISO 8601 date-time")
+
+    seen_ids.add(submission_id)
+    return submission_id, _build_item(record, validation_result["data"], submission_id, timestamp, source, ttl)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import NDJSON contact submissions without sending email")
+    parser.add_argument("input", help="NDJSON file, or - for stdin")
+    parser.add_argument("--table", default=os.environ.get("DYNAMODB_TABLE", ""), help="submissions table name")
+    parser.add_argument("--report", default="-", help="where to write the per-line NDJSON report (- for stdout)")
+    parser.add_argument("--source", default="bulk", help="stored as importSource on every record")
+    parser.add_argument("--ttl-days", type=int, default=0, help="TTL from import time; 0 (default) keeps records")
+    parser.add_argument("--writers", type=int, default=BULK_INGEST_WRITERS)
+    parser.add_argument("--endpoint-url", help="DynamoDB endpoint, e.g. DynamoDB Local")
+    args = parser.parse_args()
+    if not args.table:
+        parser.error("--table (or DYNAMODB_TABLE) is required")
+
+    # No email is sent during imports
+    os.environ.setdefault("CONTACT_EMAIL", "")
+    os.environ.setdefault("DYNAMODB_TABLE", args.table)
+
+    import aws_clients
+
+    client = aws_clients.create_client(
+        "dynamodb", endpoint_url=args.endpoint_url, max_pool_connections=max(10, args.writers)
+    )
+    source = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+    report_fh = sys.stdout if args.report == "-" else open(args.report, "w", encoding="utf-8")
+    try:
+        summary = ingest(
+            iter_lines(iter_file(source)),
+            client,
+            args.table,
+            lambda entry: report_fh.write(codec.dumps(entry) + "\n"),
+            source=args.source,
+            ttl_days=args.ttl_days or None,
+            writers=args.writers,
+        )
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+        if report_fh is not sys.stdout:
+            report_fh.close()
+    print(json.dumps(summary), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
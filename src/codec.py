@@ -0,0 +1,41 @@
+"""JSON encoding and decoding for request and response bodies.
+
+Uses ``orjson`` when it is installed in the deployment package and falls back
+to the standard library otherwise. Both produce compact JSON (no spaces after
+separators) and keep non-ASCII text as UTF-8, so the output is the same bytes
+either way. Decode errors are ``JSONDecodeError``, which is
+``json.JSONDecodeError`` or ``orjson.JSONDecodeError`` (a subclass of it).
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson is not installed
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+JSONDecodeError = json.JSONDecodeError
+
+if orjson is not None:
+
+    def loads(data: Union[str, bytes]) -> Any:
+        """Parse a JSON document."""
+        return orjson.loads(data)
+
+    def dumps(value: Any) -> str:
+        """Serialize ``value`` to compact JSON text."""
+        return orjson.dumps(value).decode("utf-8")
+
+else:
+    _encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+    def loads(data: Union[str, bytes]) -> Any:
+        """Parse a JSON document."""
+        return json.loads(data)
+
+    def dumps(value: Any) -> str:
+        """Serialize ``value`` to compact JSON text."""
+        return _encoder.encode(value)
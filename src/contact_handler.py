@@ -1,22 +1,164 @@
+import functools
 import json
-import boto3
+from concurrent.futures import ThreadPoolExecutor
 import os
+import threading
+import time
 import uuid
 from datetime import datetime, timedelta
-from typing import Dict, Any
-import re
-
-# Initialize AWS clients
-ses_client = boto3.client("ses")
-dynamodb = boto3.resource("dynamodb")
+from typing import Dict, Any, List, Optional
+
+import aws_clients
+import codec
+import digest
+import email_templates
+import idempotency
+import item_codec
+import metrics
+import outbox
+import profiling
+import rate_limit
+import request_guard
+import spam_filter
+import spam_model
+import stats
+import submission_queries
+import traffic_capture
+from batch_writer import BatchWriter
+from validation import CONTACT_FORM_VALIDATOR
 
 # Environment variables
 CONTACT_EMAIL = os.environ["CONTACT_EMAIL"]
 DYNAMODB_TABLE = os.environ["DYNAMODB_TABLE"]
 CORS_ORIGIN = os.environ.get("CORS_ORIGIN", "*")
-
-# Get DynamoDB table
-table = dynamodb.Table(DYNAMODB_TABLE)
+# "sync" sends the email inside the request; "outbox" defers it to outbox_handler;
+# "digest" batches it into a summary email sent by digest_handler; "concurrent" sends it
+# inside the request, in parallel with the DynamoDB write
+EMAIL_DELIVERY_MODE = os.environ.get("EMAIL_DELIVERY_MODE", "sync")
+# Threads in the container-wide pool that sends emails in concurrent mode
+EMAIL_SEND_WORKERS = int(os.environ.get("EMAIL_SEND_WORKERS", "4"))
+# Route submission writes through the shared micro-batching writer
+BATCH_WRITES = os.environ.get("BATCH_WRITES", "false").lower() == "true"
+BATCH_WRITE_LINGER_MS = float(os.environ.get("BATCH_WRITE_LINGER_MS", "5"))
+# Base name of the notification templates in EMAIL_TEMPLATE_DIR
+EMAIL_TEMPLATE = os.environ.get("EMAIL_TEMPLATE", "contact_notification")
+
+# Static request/response data, built once per container
+
+# CORS headers - More permissive for local development
+CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",  # Allow all origins for now
+    "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token,"
+    "Idempotency-Key",
+    "Access-Control-Allow-Methods": "POST,OPTIONS",
+    "Access-Control-Allow-Credentials": "false",
+}
+RATE_LIMITED_HEADERS = {**CORS_HEADERS, "Retry-After": "60"}
+PREFLIGHT_BODY = codec.dumps({"message": "CORS preflight successful"})
+SUCCESS_MESSAGE = "Thank you for your message! I will get back to you soon."
+# Success body up to the submission ID, so only the ID is encoded per request
+SUCCESS_BODY_PREFIX = codec.dumps({"message": SUCCESS_MESSAGE})[:-1] + ',"submissionId":'
+
+# AWS clients are created on first use rather than at import time, with the shared
+# timeouts, retries and pooling from aws_clients. The low-level DynamoDB client is
+# used instead of boto3.resource, which is much slower to build.
+_ses_client = None
+_dynamodb_client = None
+_batch_writer = None
+_rate_limiter = None
+_idempotency_store = None
+_burst_detector = None
+_email_executor = None
+_stats_counter = None
+# http_adapter runs the handler from many threads: build each shared object once. Reentrant
+# because getters call each other (the limiter needs the DynamoDB client).
+_init_lock = threading.RLock()
+
+
+def get_ses_client() -> Any:
+    """Return the container-wide SES client."""
+    global _ses_client
+    if _ses_client is None:
+        with _init_lock:
+            if _ses_client is None:
+                _ses_client = aws_clients.create_client("ses")
+    return _ses_client
+
+
+def get_dynamodb_client() -> Any:
+    """Return the container-wide low-level DynamoDB client."""
+    global _dynamodb_client
+    if _dynamodb_client is None:
+        with _init_lock:
+            if _dynamodb_client is None:
+                _dynamodb_client = aws_clients.create_client("dynamodb")
+    return _dynamodb_client
+
+
+def get_batch_writer() -> BatchWriter:
+    """Return the container-wide batch writer for the submissions table."""
+    global _batch_writer
+    if _batch_writer is None:
+        with _init_lock:
+            if _batch_writer is None:
+                _batch_writer = BatchWriter(
+                    get_dynamodb_client().batch_write_item,
+                    DYNAMODB_TABLE,
+                    max_linger_seconds=BATCH_WRITE_LINGER_MS / 1000,
+                )
+    return _batch_writer
+
+
+def get_rate_limiter() -> rate_limit.RateLimiter:
+    """Return the container-wide per-client rate limiter."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _init_lock:
+            if _rate_limiter is None:
+                _rate_limiter = rate_limit.build_limiter(get_dynamodb_client)
+    return _rate_limiter
+
+
+def get_idempotency_store() -> idempotency.IdempotencyStore:
+    """Return the container-wide idempotency store."""
+    global _idempotency_store
+    if _idempotency_store is None:
+        with _init_lock:
+            if _idempotency_store is None:
+                _idempotency_store = idempotency.build_store(get_dynamodb_client)
+    return _idempotency_store
+
+
+def get_burst_detector() -> digest.BurstDetector:
+    """Return the container-wide submission rate tracker for automatic digest delivery."""
+    global _burst_detector
+    if _burst_detector is None:
+        with _init_lock:
+            if _burst_detector is None:
+                _burst_detector = digest.BurstDetector(
+                    client=get_dynamodb_client() if rate_limit.STATE_TABLE else None, table_name=rate_limit.STATE_TABLE
+                )
+    return _burst_detector
+
+
+def get_email_executor() -> ThreadPoolExecutor:
+    """Return the container-wide thread pool for concurrent email sends."""
+    global _email_executor
+    if _email_executor is None:
+        with _init_lock:
+            if _email_executor is None:
+                _email_executor = ThreadPoolExecutor(max_workers=EMAIL_SEND_WORKERS, thread_name_prefix="email-send")
+    return _email_executor
+
+
+def get_stats_counter() -> stats.StatsCounter:
+    """Return the container-wide dashboard counter writer."""
+    global _stats_counter
+    if _stats_counter is None:
+        with _init_lock:
+            if _stats_counter is None:
+                _stats_counter = stats.build_counter(get_dynamodb_client)
+    return _stats_counter
 
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
@@ -25,13 +167,24 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     Processes form data, stores in DynamoDB, and sends email via SES.
     """
 
-    # CORS headers - More permissive for local development
-    cors_headers = {
-        "Access-Control-Allow-Origin": "*",  # Allow all origins for now
-        "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token",
-        "Access-Control-Allow-Methods": "POST,OPTIONS",
-        "Access-Control-Allow-Credentials": "false",
-    }
+    # cProfile and tracemalloc around a sampled or requested invocation (see profiling)
+    profile = profiling.start(event) if profiling.PROFILING_ENABLED else None
+    arrived = time.time()
+    request_metrics = metrics.start_request()
+    response = _handle_submission(event, request_metrics)
+    request_metrics.finish(response["statusCode"])
+    if traffic_capture.CAPTURE_ENABLED:
+        # Sampled, sanitized copy of the request for replay (see traffic_capture)
+        traffic_capture.record(event, response, arrived, time.time() - arrived)
+    if profile is not None:
+        profile.finish(response["statusCode"])
+    return response
+
+
+def _handle_submission(event: Dict[str, Any], request_metrics: metrics.RequestMetrics) -> Dict[str, Any]:
+    """Process one request, timing each stage and counting its outcome in ``request_metrics``."""
+
+    cors_headers = CORS_HEADERS
 
     try:
         # Handle preflight OPTIONS request
@@ -39,192 +192,357 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             return {
                 "statusCode": 200,
                 "headers": cors_headers,
-                "body": json.dumps({"message": "CORS preflight successful"}),
+                "body": PREFLIGHT_BODY,
             }
 
         # Parse request body
         if not event.get("body"):
+            request_metrics.count(metrics.BAD_REQUEST)
             return create_error_response(400, "Request body is required", cors_headers)
 
+        # Size, Content-Type and structure checks come before any real parsing work
         try:
-            body = json.loads(event["body"])
-        except json.JSONDecodeError:
+            with request_metrics.stage("Parse"):
+                body = request_guard.parse_body(event)
+        except request_guard.RequestRejected as e:
+            request_metrics.count(metrics.BAD_REQUEST)
+            _count_stats(request_metrics, stats.INVALID)
+            return create_error_response(e.status_code, e.message, cors_headers)
+        except codec.JSONDecodeError:
+            request_metrics.count(metrics.BAD_REQUEST)
+            _count_stats(request_metrics, stats.INVALID)
             return create_error_response(400, "Invalid JSON in request body", cors_headers)
 
         # Validate required fields
-        validation_result = validate_form_data(body)
+        with request_metrics.stage("Validate"):
+            validation_result = validate_form_data(body)
         if not validation_result["valid"]:
+            if validation_result.get("spam"):
+                request_metrics.count(metrics.SPAM_REJECTED)
+                _count_stats(request_metrics, stats.SPAM, validation_result["data"]["email"])
+            else:
+                request_metrics.count(metrics.VALIDATION_FAILED)
+                _count_stats(request_metrics, stats.INVALID)
             return create_error_response(400, validation_result["error"], cors_headers)
 
-        # Extract validated data
-        name = body["name"].strip()
-        email = body["email"].strip().lower()
-        message = body["message"].strip()
-
-        # Generate unique submission ID
+        # Extract validated data (strings, already stripped)
+        data = validation_result["data"]
+        name = data["name"]
+        email = data["email"].lower()
+        message = data["message"]
+
+        # Reject floods before they cost an idempotency claim, a DynamoDB write and an SES send
+        if rate_limit.RATE_LIMIT_ENABLED:
+            with request_metrics.stage("RateLimit"):
+                admitted = get_rate_limiter().admit(get_client_ip(event))
+            if not admitted:
+                request_metrics.count(metrics.RATE_LIMITED)
+                return create_error_response(429, "Too many requests. Please try again later.", RATE_LIMITED_HEADERS)
+
+        # Duplicate submissions (client retries, double-clicks) get the original ID back
         submission_id = str(uuid.uuid4())
-        timestamp = datetime.utcnow().isoformat()
-
-        # Store submission in DynamoDB
-        store_submission(submission_id, timestamp, name, email, message, event)
+        idempotency_key = None
+        if idempotency.IDEMPOTENCY_ENABLED:
+            with request_metrics.stage("Idempotency"):
+                idempotency_key = idempotency.derive_key(event.get("headers"), name, email, message)
+                try:
+                    original_id = get_idempotency_store().claim(
+                        idempotency_key, submission_id, idempotency.content_hash(name, email, message)
+                    )
+                except idempotency.KeyReusedError:
+                    # Same Idempotency-Key, different content: answering 200 would drop this message
+                    request_metrics.count(metrics.BAD_REQUEST)
+                    return create_error_response(
+                        422, "Idempotency-Key was already used for a different submission", cors_headers
+                    )
+            if original_id is not None:
+                request_metrics.count(metrics.DUPLICATE)
+                return create_success_response(original_id, cors_headers)
 
-        # Send email notification
-        send_email_notification(name, email, message, submission_id)
+        try:
+            timestamp = datetime.utcnow().isoformat()
+
+            delivery_mode = EMAIL_DELIVERY_MODE
+            if delivery_mode != "digest" and digest.DIGEST_AUTO_THRESHOLD and get_burst_detector().hit():
+                # Burst in progress: coalesce notifications instead of one email per submission
+                delivery_mode = "digest"
+            if delivery_mode in ("sync", "concurrent") and aws_clients.get_breaker("ses").is_open():
+                # SES is failing: queue the email for the outbox worker instead of waiting on it
+                delivery_mode = "outbox"
+                request_metrics.count(metrics.EMAIL_DEFERRED)
+            request_metrics.set_property("DeliveryMode", delivery_mode)
+
+            if delivery_mode in ("outbox", "digest"):
+                # Store submission with an "email pending" marker; outbox_handler or digest_handler sends it later
+                queue = outbox.DIGEST_QUEUE if delivery_mode == "digest" else outbox.EMAIL_QUEUE
+                with request_metrics.stage("Store"):
+                    store_submission(
+                        submission_id,
+                        timestamp,
+                        name,
+                        email,
+                        message,
+                        event,
+                        extra_attributes=outbox.pending_attributes(int(time.time()), queue),
+                    )
+            elif delivery_mode == "concurrent":
+                store_and_send_concurrently(submission_id, timestamp, name, email, message, event, request_metrics)
+            else:
+                # Store submission in DynamoDB
+                with request_metrics.stage("Store"):
+                    store_submission(submission_id, timestamp, name, email, message, event)
+
+                # Send email notification
+                with request_metrics.stage("Email"):
+                    try:
+                        aws_clients.get_breaker("ses").call(
+                            send_email_notification, name, email, message, submission_id, timestamp
+                        )
+                    except Exception as e:
+                        if not aws_clients.is_dependency_failure(e):
+                            raise
+                        _defer_email(submission_id, timestamp, e, request_metrics)
+        except Exception:
+            # Let a retry of the failed submission go through instead of being treated as a duplicate
+            if idempotency_key is not None:
+                get_idempotency_store().release(idempotency_key)
+            raise
 
         # Return success response
-        return {
-            "statusCode": 200,
-            "headers": cors_headers,
-            "body": json.dumps(
-                {"message": "Thank you for your message! I will get back to you soon.", "submissionId": submission_id}
-            ),
-        }
+        request_metrics.count(metrics.SUBMITTED)
+        _count_stats(request_metrics, stats.ACCEPTED, email)
+        return create_success_response(submission_id, cors_headers)
 
     except Exception as e:
         print(f"Unexpected error: {str(e)}")
+        _count_stats(request_metrics, stats.FAILED)
         return create_error_response(500, "Internal server error. Please try again later.", cors_headers)
 
 
+def _count_stats(request_metrics: metrics.RequestMetrics, outcome: str, email: Optional[str] = None) -> None:
+    # Dashboard counters; StatsCounter logs and swallows its own errors
+    if stats.is_enabled():
+        with request_metrics.stage("Stats"):
+            get_stats_counter().record(outcome, email)
+
+
+def store_and_send_concurrently(
+    submission_id: str,
+    timestamp: str,
+    name: str,
+    email: str,
+    message: str,
+    event: Dict[str, Any],
+    request_metrics: metrics.RequestMetrics,
+) -> None:
+    """Store the submission while the notification email is sent on the shared pool.
+
+    The request waits for the slower of the two calls instead of their sum. When
+    the store fails the request fails, as in sync mode; the email may already be
+    out, so the client's retry can send a second one. Once the store succeeds the
+    request succeeds and the email outcome is recorded on the row: dependency
+    failures (timeouts, throttling, 5xx, open breaker) go to the outbox for retry,
+    and anything else marks the row's email as failed.
+    """
+
+    # Build the SES client here: creating boto3 clients from several threads at once is not safe
+    get_ses_client()
+    sending = get_email_executor().submit(
+        _send_in_pool, request_metrics, name, email, message, submission_id, timestamp
+    )
+
+    try:
+        with request_metrics.stage("Store"):
+            store_submission(submission_id, timestamp, name, email, message, event)
+    except Exception:
+        # Never leave a send running past the response; Lambda freezes the container after it
+        if not sending.cancel() and sending.exception() is None:
+            print(f"Email for {submission_id} was sent but the submission was not stored")
+        raise
+
+    error = sending.exception()
+    if error is None:
+        return
+    if aws_clients.is_dependency_failure(error):
+        _defer_email(submission_id, timestamp, error, request_metrics)
+    else:
+        print(f"Email failed for {submission_id}: {str(error)}")
+        outbox.record_failure(
+            get_dynamodb_client(), DYNAMODB_TABLE, {"submissionId": submission_id, "timestamp": timestamp}, str(error)
+        )
+        request_metrics.count(metrics.EMAIL_FAILED)
+
+
+def _send_in_pool(request_metrics: metrics.RequestMetrics, *args: Any) -> None:
+    with request_metrics.stage("Email"):
+        aws_clients.get_breaker("ses").call(send_email_notification, *args)
+
+
+def _defer_email(
+    submission_id: str, timestamp: str, error: BaseException, request_metrics: metrics.RequestMetrics
+) -> None:
+    # The submission is stored; let the outbox worker retry the email
+    print(f"Email deferred to outbox: {str(error)}")
+    outbox.defer(
+        get_dynamodb_client(),
+        DYNAMODB_TABLE,
+        {"submissionId": submission_id, "timestamp": timestamp},
+        int(time.time()),
+        str(error),
+    )
+    request_metrics.count(metrics.EMAIL_DEFERRED)
+
+
 def validate_form_data(data: Dict[str, Any]) -> Dict[str, Any]:
-    """Validate contact form data."""
+    """Validate contact form data; ``data`` holds the cleaned fields when the schema checks pass."""
+
+    # Check required fields, lengths and formats against the API schema
+    result = CONTACT_FORM_VALIDATOR.validate(data)
+    if not result.valid:
+        return {"valid": False, "error": result.error, "errors": [e.message for e in result.errors]}
+
+    # Spam detection: the blocklist (whole words, Unicode-normalized) is a hard check,
+    # then the trained classifier when a model is bundled
+    model = spam_model.get_model()
+    message = result.data["message"]
+    if model is not None and spam_model.SPAM_MODEL_SKIP_BLOCKLIST:
+        spam = model.is_spam(message)
+    else:
+        spam = spam_filter.get_matcher().contains_any(message) or (model is not None and model.is_spam(message))
+    if spam:
+        return {"valid": False, "error": spam_filter.SPAM_ERROR, "spam": True, "data": result.data}
 
-    # Check required fields
-    required_fields = ["name", "email", "message"]
-    for field in required_fields:
-        if field not in data or not data[field] or not str(data[field]).strip():
-            return {"valid": False, "error": f'Field "{field}" is required'}
+    return {"valid": True, "data": result.data}
 
-    name = str(data["name"]).strip()
-    email = str(data["email"]).strip()
-    message = str(data["message"]).strip()
 
-    # Validate name length
-    if len(name) < 1 or len(name) > 100:
-        return {"valid": False, "error": "Name must be between 1 and 100 characters"}
+def outbox_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Scheduled worker that drains pending outbox rows.
+    Sends the notification email for each row and records sent/failed/retry state.
+    """
+    summary = outbox.drain(
+        get_dynamodb_client(),
+        DYNAMODB_TABLE,
+        _send_outbox_item,
+        context,
+        paused=aws_clients.get_breaker("ses").is_open,
+    )
+    print(f"Outbox drain complete: {json.dumps(summary)}")
+    return summary
 
-    # Validate email format
-    email_pattern = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
-    if not re.match(email_pattern, email):
-        return {"valid": False, "error": "Please provide a valid email address"}
 
-    # Validate message length
-    if len(message) < 10 or len(message) > 1000:
-        return {"valid": False, "error": "Message must be between 10 and 1000 characters"}
+def _send_outbox_item(item: Dict[str, Any]) -> None:
+    aws_clients.get_breaker("ses").call(
+        send_email_notification, item["name"], item["email"], item["message"], item["submissionId"], item["timestamp"]
+    )
 
-    # Basic spam detection
-    spam_indicators = ["viagra", "casino", "loan", "bitcoin", "crypto"]
-    message_lower = message.lower()
-    if any(indicator in message_lower for indicator in spam_indicators):
-        return {"valid": False, "error": "Message content appears to be spam"}
 
-    return {"valid": True}
+def digest_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Scheduled worker that sends digest emails.
+    Groups waiting digest rows into one summary email once their window closes or the batch fills.
+    """
+    summary = digest.drain(
+        get_dynamodb_client(),
+        DYNAMODB_TABLE,
+        lambda items: aws_clients.get_breaker("ses").call(send_digest_notification, items),
+        context,
+        paused=aws_clients.get_breaker("ses").is_open,
+    )
+    print(f"Digest drain complete: {json.dumps(summary)}")
+    return summary
 
 
 def store_submission(
-    submission_id: str, timestamp: str, name: str, email: str, message: str, event: Dict[str, Any]
+    submission_id: str,
+    timestamp: str,
+    name: str,
+    email: str,
+    message: str,
+    event: Dict[str, Any],
+    extra_attributes: Optional[Dict[str, Any]] = None,
 ) -> None:
     """Store form submission in DynamoDB."""
 
+    item = build_submission_item(
+        submission_id,
+        timestamp,
+        name,
+        email,
+        message,
+        get_client_ip(event),
+        event.get("headers", {}).get("User-Agent", "unknown"),
+    )
+    if extra_attributes:
+        item.update(extra_attributes)
+
+    # Store in DynamoDB
+    if BATCH_WRITES:
+        get_batch_writer().write(item_codec.encode_item(item))
+    else:
+        get_dynamodb_client().put_item(TableName=DYNAMODB_TABLE, Item=item_codec.encode_item(item))
+
+
+def build_submission_item(
+    submission_id: str, timestamp: str, name: str, email: str, message: str, client_ip: str, user_agent: str
+) -> Dict[str, Any]:
+    """Build a submissions table item with the standard 30-day TTL and lookup index keys."""
+
     # Calculate TTL (30 days from now)
     ttl = int((datetime.utcnow() + timedelta(days=30)).timestamp())
 
-    # Get client IP (if available)
-    client_ip = "unknown"
-    if "requestContext" in event and "identity" in event["requestContext"]:
-        client_ip = event["requestContext"]["identity"].get("sourceIp", "unknown")
+    return {
+        "submissionId": submission_id,
+        "timestamp": timestamp,
+        "name": name,
+        "email": email,
+        "message": message,
+        "clientIp": client_ip,
+        "userAgent": user_agent,
+        "status": "received",
+        "ttl": ttl,
+        **submission_queries.index_attributes(email, timestamp),
+    }
 
-    # Store in DynamoDB
-    table.put_item(
-        Item={
-            "submissionId": submission_id,
-            "timestamp": timestamp,
+
+def send_email_notification(name: str, email: str, message: str, submission_id: str, timestamp: str) -> None:
+    """Send email notification via SES.
+
+    ``timestamp`` is the submission's stored ISO timestamp, so an email sent
+    later by the outbox worker still shows when the message was submitted.
+    """
+
+    subject = f"Portfolio Contact Form: Message from {name}"
+
+    # Render HTML and plain text bodies from the precompiled templates
+    html_body, text_body = email_templates.get_templates(EMAIL_TEMPLATE).render(
+        {
             "name": name,
             "email": email,
             "message": message,
-            "clientIp": client_ip,
-            "userAgent": event.get("headers", {}).get("User-Agent", "unknown"),
-            "status": "received",
-            "ttl": ttl,
+            "submission_id": submission_id,
+            "timestamp": datetime.fromisoformat(timestamp).strftime("%Y-%m-%d %H:%M:%S"),
         }
     )
 
+    _send_email(subject, html_body, text_body, [email])
 
-def send_email_notification(name: str, email: str, message: str, submission_id: str) -> None:
-    """Send email notification via SES."""
 
-    subject = f"Portfolio Contact Form: Message from {name}"
+def send_digest_notification(items: List[Dict[str, Any]]) -> None:
+    """Send one summary email for several stored submissions via SES."""
 
-    # Create HTML email body
-    html_body = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <style>
-            body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-            .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-            .header {{ background: linear-gradient(135deg, #ff9900, #146eb4);
-                       color: white; padding: 20px; border-radius: 8px 8px 0 0; }}
-            .content {{ background: #f9f9f9; padding: 20px; border-radius: 0 0 8px 8px; }}
-            .field {{ margin-bottom: 15px; }}
-            .label {{ font-weight: bold; color: #232f3e; }}
-            .value {{ background: white; padding: 10px; border-radius: 4px; border-left: 4px solid #ff9900; }}
-            .footer {{ margin-top: 20px; padding-top: 20px; border-top: 1px solid #ddd; font-size: 12px; color: #666; }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h2>New Portfolio Contact Form Submission</h2>
-            </div>
-            <div class="content">
-                <div class="field">
-                    <div class="label">Name:</div>
-                    <div class="value">{name}</div>
-                </div>
-
-                <div class="field">
-                    <div class="label">Email:</div>
-                    <div class="value">{email}</div>
-                </div>
-
-                <div class="field">
-                    <div class="label">Message:</div>
-                    <div class="value">{message}</div>
-                </div>
-
-                <div class="footer">
-                    <p><strong>Submission Details:</strong></p>
-                    <p>Submission ID: {submission_id}</p>
-                    <p>Timestamp: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC</p>
-                    <p>Sent from: Christopher Corbin Portfolio Contact Form</p>
-                </div>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
-
-    # Create plain text version
-    text_body = f"""
-New Portfolio Contact Form Submission
-
-Name: {name}
-Email: {email}
-
-Message:
-{message}
+    subject, html_body, text_body = digest.render(items)
+    # Reply-To only when the digest holds a single sender
+    senders = sorted({item["email"] for item in items})
+    _send_email(subject, html_body, text_body, senders if len(senders) == 1 else [])
 
----
-Submission ID: {submission_id}
-Timestamp: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC
-Sent from: Christopher Corbin Portfolio Contact Form
-    """
 
+def _send_email(subject: str, html_body: str, text_body: str, reply_to: List[str]) -> None:
     # Send email via SES
-    ses_client.send_email(
+    get_ses_client().send_email(
         Source=CONTACT_EMAIL,
         Destination={"ToAddresses": [CONTACT_EMAIL]},
-        ReplyToAddresses=[email],
+        ReplyToAddresses=reply_to,
         Message={
             "Subject": {"Data": subject, "Charset": "UTF-8"},
             "Body": {"Html": {"Data": html_body, "Charset": "UTF-8"}, "Text": {"Data": text_body, "Charset": "UTF-8"}},
@@ -232,10 +550,32 @@ Sent from: Christopher Corbin Portfolio Contact Form
     )
 
 
+def get_client_ip(event: Dict[str, Any]) -> str:
+    """Return the caller's source IP from the API Gateway request context."""
+    if "requestContext" in event and "identity" in event["requestContext"]:
+        return event["requestContext"]["identity"].get("sourceIp", "unknown")
+    return "unknown"
+
+
+def create_success_response(submission_id: str, headers: Dict[str, str]) -> Dict[str, Any]:
+    """Create the response for an accepted (or already accepted) submission."""
+    return {
+        "statusCode": 200,
+        "headers": headers,
+        "body": SUCCESS_BODY_PREFIX + codec.dumps(submission_id) + "}",
+    }
+
+
 def create_error_response(status_code: int, message: str, headers: Dict[str, str]) -> Dict[str, Any]:
     """Create standardized error response."""
     return {
         "statusCode": status_code,
         "headers": headers,
-        "body": json.dumps({"error": message, "statusCode": status_code}),
+        "body": _error_body(status_code, message),
     }
+
+
+@functools.lru_cache(maxsize=256)
+def _error_body(status_code: int, message: str) -> str:
+    # Error messages come from a small fixed set, so each body is encoded once per container
+    return codec.dumps({"error": message, "statusCode": status_code})
@@ -0,0 +1,214 @@
+"""Digest delivery: one summary email for a burst of contact form submissions.
+
+In digest mode the handler stores each submission with the outbox "email
+pending" marker on the ``digest`` queue instead of sending it. A scheduled
+worker (``contact_handler.digest_handler``) waits until the oldest waiting row
+is ``DIGEST_WINDOW_SECONDS`` old, or until ``DIGEST_MAX_ITEMS`` rows are
+waiting. It then sends one email rendered from the stored rows and records the
+outcome on every row, with the same leases and retries as the outbox.
+
+Immediate delivery stays the default. With ``DIGEST_AUTO_THRESHOLD`` set, the
+handler switches to digest delivery on its own when more than that many
+submissions arrive within ``DIGEST_AUTO_WINDOW_SECONDS``. It stays switched for
+the following window too, so a burst does not flip the mode back and forth.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import email_templates
+import outbox
+from dynamo_serializer import serialize_item
+
+# Longest a submission waits for its digest, and the most rows in one digest email
+DIGEST_WINDOW_SECONDS = int(os.environ.get("DIGEST_WINDOW_SECONDS", "300"))
+DIGEST_MAX_ITEMS = int(os.environ.get("DIGEST_MAX_ITEMS", "50"))
+# Submissions per window that switch immediate delivery to digest; 0 disables
+DIGEST_AUTO_THRESHOLD = int(os.environ.get("DIGEST_AUTO_THRESHOLD", "0"))
+DIGEST_AUTO_WINDOW_SECONDS = int(os.environ.get("DIGEST_AUTO_WINDOW_SECONDS", "60"))
+# Templates for the whole email and for each submission in it
+DIGEST_TEMPLATE = os.environ.get("DIGEST_TEMPLATE", "digest_notification")
+DIGEST_ENTRY_TEMPLATE = os.environ.get("DIGEST_ENTRY_TEMPLATE", "digest_entry")
+
+
+class BurstDetector:
+    """Counts submissions per fixed window and reports when the rate is over the threshold.
+
+    With a state table the count is shared by all containers through an atomic
+    ``ADD``. To keep that ``UpdateItem`` off most requests, each container adds
+    its hits in steps of ``sync_every`` (a tenth of the threshold by default)
+    and counts in between on top of the last shared total. That estimate never
+    exceeds the true count, so the switch is never early; it can be late by up
+    to ``sync_every - 1`` hits per container. Without a state table (or if the
+    update fails) each container counts its own.
+    """
+
+    def __init__(
+        self,
+        threshold: int = DIGEST_AUTO_THRESHOLD,
+        window_seconds: int = DIGEST_AUTO_WINDOW_SECONDS,
+        client: Any = None,
+        table_name: str = "",
+        clock: Callable[[], float] = time.time,
+        sync_every: int = 0,
+    ) -> None:
+        self.threshold = threshold
+        self.window_seconds = window_seconds
+        self.sync_every = sync_every or max(1, threshold // 10)
+        self._client = client
+        self._table_name = table_name
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._window_start = 0
+        self._count = 0
+        self._unsynced = 0
+        self._hot_until = 0
+
+    def hit(self) -> bool:
+        """Count one submission; True while digest delivery should be used."""
+        now = int(self._clock())
+        window_start = now - now % self.window_seconds
+        with self._lock:
+            if window_start != self._window_start:
+                self._window_start = window_start
+                self._count = 0
+                self._unsynced = 0
+            self._count += 1
+            self._unsynced += 1
+            pending = 0
+            if self._client is not None and self._table_name and self._unsynced >= self.sync_every:
+                pending, self._unsynced = self._unsynced, 0
+
+        if pending:
+            shared = self._shared_count(window_start, pending)
+            with self._lock:
+                if window_start == self._window_start:
+                    if shared is None:
+                        self._unsynced += pending
+                    else:
+                        # Hits counted here while the update was in flight are not in the shared total yet
+                        self._count = max(self._count, shared + self._unsynced)
+
+        with self._lock:
+            if self._count > self.threshold:
+                self._hot_until = max(self._hot_until, window_start + 2 * self.window_seconds)
+            return now < self._hot_until
+
+    def _shared_count(self, window_start: int, hits: int) -> Optional[int]:
+        try:
+            response = self._client.update_item(
+                TableName=self._table_name,
+                Key=serialize_item({"pk": "digest#rate", "sk": str(window_start)}),
+                UpdateExpression="ADD hits :hits SET #ttl = :ttl",
+                ExpressionAttributeNames={"#ttl": "ttl"},
+                ExpressionAttributeValues=serialize_item(
+                    {":hits": hits, ":ttl": window_start + 2 * self.window_seconds}
+                ),
+                ReturnValues="UPDATED_NEW",
+            )
+            return int(response["Attributes"]["hits"]["N"])
+        except Exception as e:
+            print(f"Shared digest rate count failed: {str(e)}")
+            return None
+
+
+def render(items: List[Dict[str, Any]]) -> Tuple[str, str, str]:
+    """Return the (subject, html, text) of the digest email for ``items``."""
+    entry_templates = email_templates.get_templates(DIGEST_ENTRY_TEMPLATE)
+    html_entries: List[str] = []
+    text_entries: List[str] = []
+    for item in items:
+        html_entry, text_entry = entry_templates.render(
+            {
+                "name": item["name"],
+                "email": item["email"],
+                "message": item["message"],
+                "submission_id": item["submissionId"],
+                "timestamp": item["timestamp"][:19].replace("T", " "),
+            }
+        )
+        html_entries.append(html_entry)
+        text_entries.append(text_entry)
+
+    # Rows arrive in nextAttemptAt order, which retries reshuffle; stored ISO timestamps sort as text
+    timestamps = [item["timestamp"] for item in items]
+    count = len(items)
+    subject = f"Portfolio Contact Form: {count} new message{'s' if count != 1 else ''}"
+    fields = {
+        "summary": f"{count} submission{'s' if count != 1 else ''}",
+        "first_timestamp": min(timestamps)[:19].replace("T", " "),
+        "last_timestamp": max(timestamps)[:19].replace("T", " "),
+    }
+    # Entries are already rendered (and escaped), so the HTML wrapper inserts them as-is
+    templates = email_templates.get_templates(DIGEST_TEMPLATE)
+    html_body = templates.html.render({**fields, "entries": "".join(html_entries)}, raw=("entries",))
+    text_body = templates.text.render({**fields, "entries": "".join(text_entries)})
+    return subject, html_body, text_body
+
+
+def is_ready(waiting: List[Dict[str, Any]], now: int, window_seconds: int, max_items: int) -> bool:
+    """Whether the waiting rows (oldest first) should go out now."""
+    if not waiting:
+        return False
+    oldest = waiting[0]
+    # A row that already failed once is retried as soon as its backoff ends
+    return (
+        len(waiting) >= max_items
+        or int(oldest["nextAttemptAt"]) <= now - window_seconds
+        or int(oldest.get("emailAttempts", 0)) > 0
+    )
+
+
+def drain(
+    client: Any,
+    table_name: str,
+    send: Callable[[List[Dict[str, Any]]], None],
+    context: Any = None,
+    window_seconds: int = DIGEST_WINDOW_SECONDS,
+    max_items: int = DIGEST_MAX_ITEMS,
+    clock: Callable[[], float] = time.time,
+    paused: Optional[Callable[[], bool]] = None,
+) -> Dict[str, int]:
+    """Send digest emails for every ready group of waiting rows.
+
+    ``send`` receives the rows of one digest in ``nextAttemptAt`` order. Returns counts of
+    digests sent, rows sent, retried and failed, rows skipped because another
+    worker holds them, and rows still waiting for their window to close.
+    Nothing is sent while ``paused()`` is true.
+    """
+    summary = {"digests": 0, "sent": 0, "retried": 0, "failed": 0, "skipped": 0, "waiting": 0}
+
+    while paused is None or not paused():
+        now = int(clock())
+        waiting = outbox.fetch_due(client, table_name, now, max_items, queue=outbox.DIGEST_QUEUE)
+        if not is_ready(waiting, now, window_seconds, max_items):
+            summary["waiting"] = len(waiting)
+            break
+
+        claimed = []
+        for item in waiting:
+            if outbox.claim(client, table_name, item, now):
+                claimed.append(item)
+            else:
+                summary["skipped"] += 1
+
+        if claimed:
+            try:
+                send(claimed)
+            except Exception as e:
+                print(f"Digest delivery failed for {len(claimed)} submissions: {str(e)}")
+                for item in claimed:
+                    status = outbox.mark_failed(client, table_name, item, now, str(e))
+                    summary["failed" if status == outbox.STATUS_FAILED else "retried"] += 1
+            else:
+                for item in claimed:
+                    outbox.record_sent(client, table_name, item, now)
+                summary["digests"] += 1
+                summary["sent"] += len(claimed)
+
+        if len(waiting) < max_items or outbox.out_of_time(context):
+            break
+
+    return summary
@@ -0,0 +1,75 @@
+"""Minimal DynamoDB attribute-value serializer.
+
+The handler talks to the low-level DynamoDB client, which avoids building the
+much heavier ``boto3.resource`` layer on cold start. This module converts the
+plain Python values the handler stores to and from the wire format
+(``{"S": "..."}``, ``{"N": "..."}``, ...).
+"""
+
+import base64
+from decimal import Decimal
+from typing import Any, Dict, Union
+
+
+def to_attribute_value(value: Any) -> Dict[str, Any]:
+    """Convert a Python value to a DynamoDB attribute value."""
+    if isinstance(value, str):
+        return {"S": value}
+    if isinstance(value, bool):
+        return {"BOOL": value}
+    if isinstance(value, (int, float, Decimal)):
+        return {"N": str(value)}
+    if value is None:
+        return {"NULL": True}
+    if isinstance(value, (bytes, bytearray)):
+        return {"B": bytes(value)}
+    if isinstance(value, dict):
+        return {"M": {k: to_attribute_value(v) for k, v in value.items()}}
+    if isinstance(value, (list, tuple)):
+        return {"L": [to_attribute_value(v) for v in value]}
+    if isinstance(value, (set, frozenset)) and all(isinstance(v, str) for v in value):
+        return {"SS": sorted(value)}
+    raise TypeError(f"Unsupported DynamoDB value type: {type(value).__name__}")
+
+
+def _binary(value: Union[str, bytes, bytearray]) -> bytes:
+    # The client returns bytes; JSON images (DynamoDB Streams events) carry base64 strings
+    if isinstance(value, str):
+        return base64.b64decode(value)
+    return bytes(value)
+
+
+def from_attribute_value(attribute: Dict[str, Any]) -> Any:
+    """Convert a DynamoDB attribute value back to a Python value."""
+    (kind, value) = next(iter(attribute.items()))
+    if kind == "S":
+        return value
+    if kind == "N":
+        return int(value) if value.lstrip("-").isdigit() else Decimal(value)
+    if kind == "BOOL":
+        return value
+    if kind == "NULL":
+        return None
+    if kind == "B":
+        return _binary(value)
+    if kind == "M":
+        return {k: from_attribute_value(v) for k, v in value.items()}
+    if kind == "L":
+        return [from_attribute_value(v) for v in value]
+    if kind == "SS":
+        return set(value)
+    if kind == "NS":
+        return {from_attribute_value({"N": v}) for v in value}
+    if kind == "BS":
+        return {_binary(v) for v in value}
+    raise TypeError(f"Unsupported DynamoDB attribute type: {kind}")
+
+
+def serialize_item(item: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Serialize a flat item dict for the low-level client."""
+    return {key: to_attribute_value(value) for key, value in item.items()}
+
+
+def deserialize_item(item: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Deserialize an item returned by the low-level client."""
+    return {key: from_attribute_value(value) for key, value in item.items()}
@@ -0,0 +1,95 @@
+"""Precompiled notification email templates.
+
+Templates live as files next to the handler (``templates/<name>.html`` and
+``templates/<name>.txt``) and use ``string.Template`` placeholders such as
+``${name}``. Each file is parsed once per warm container into literal chunks and
+field slots, so rendering is a single join over pre-split parts. HTML templates
+escape every substituted value. Point ``EMAIL_TEMPLATE_DIR`` at another
+directory to swap templates without code changes.
+"""
+
+import html
+import os
+import string
+from typing import Callable, Collection, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+EMAIL_TEMPLATE_DIR = os.environ.get(
+    "EMAIL_TEMPLATE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+)
+
+
+class TemplateError(Exception):
+    """Raised when a template cannot be parsed or rendered."""
+
+
+class CompiledTemplate:
+    """A template split into literal text and named field slots."""
+
+    def __init__(self, source: str, escape: Optional[Callable[[str], str]] = None) -> None:
+        self._escape = escape
+        # Even indexes hold literal text, odd indexes hold field names
+        self._parts: List[str] = []
+        literal: List[str] = []
+        position = 0
+        for match in string.Template.pattern.finditer(source):
+            literal.append(source[position : match.start()])
+            position = match.end()
+            if match.group("escaped") is not None:
+                literal.append("$")
+                continue
+            field = match.group("named") or match.group("braced")
+            if field is None:
+                raise TemplateError(f"Invalid placeholder at offset {match.start()}")
+            self._parts.append("".join(literal))
+            self._parts.append(field)
+            literal = []
+        literal.append(source[position:])
+        self._parts.append("".join(literal))
+        self.fields: Tuple[str, ...] = tuple(self._parts[1::2])
+
+    def render(self, fields: Mapping[str, str], raw: Collection[str] = ()) -> str:
+        """Fill the template; HTML templates escape each value except the fields named in ``raw``."""
+        parts = self._parts[:]
+        escape = self._escape
+        try:
+            for index in range(1, len(parts), 2):
+                value = str(fields[parts[index]])
+                parts[index] = escape(value) if escape and parts[index] not in raw else value
+        except KeyError as e:
+            raise TemplateError(f"Missing template field {e.args[0]!r}") from e
+        return "".join(parts)
+
+
+class EmailTemplates(NamedTuple):
+    """HTML and plain-text bodies of one notification email."""
+
+    html: CompiledTemplate
+    text: CompiledTemplate
+
+    def render(self, fields: Mapping[str, str], raw: Collection[str] = ()) -> Tuple[str, str]:
+        """Return the (html, text) bodies for ``fields``; ``raw`` fields are inserted unescaped."""
+        return self.html.render(fields, raw), self.text.render(fields)
+
+
+def _escape_html(value: str) -> str:
+    return html.escape(value, quote=True)
+
+
+def load_templates(name: str, directory: str = EMAIL_TEMPLATE_DIR) -> EmailTemplates:
+    """Read and compile ``<name>.html`` and ``<name>.txt`` from ``directory``."""
+    with open(os.path.join(directory, f"{name}.html"), encoding="utf-8") as fh:
+        html_template = CompiledTemplate(fh.read(), escape=_escape_html)
+    with open(os.path.join(directory, f"{name}.txt"), encoding="utf-8") as fh:
+        text_template = CompiledTemplate(fh.read())
+    return EmailTemplates(html_template, text_template)
+
+
+_cache: Dict[str, EmailTemplates] = {}
+
+
+def get_templates(name: str) -> EmailTemplates:
+    """Return compiled templates, loading them once per container."""
+    templates = _cache.get(name)
+    if templates is None:
+        templates = _cache[name] = load_templates(name)
+    return templates
@@ -0,0 +1,289 @@
+"""Streaming, resumable export of the submissions table.
+
+The table is read with a DynamoDB parallel Scan. Each of ``--segments`` workers
+scans its own segment on a thread pool and writes pages to its own output file:
+``segment-0003.ndjson.gz`` or ``segment-0003.csv.gz``. Every page is appended
+as a complete gzip member. The whole table is never held in memory.
+
+After a page is written and fsynced, the segment's ``LastEvaluatedKey`` and
+file size go into ``checkpoint.json``. ``--resume`` truncates each file back to
+its checkpointed size, which drops any page written after the last checkpoint.
+It then continues every unfinished segment from its saved key, so each item is
+exported exactly once. Multi-member gzip files read back as one stream with
+``gzip``/``zcat``.
+
+Usage:
+    python src/export_table.py --table contact-submissions --out export/ --segments 8
+    python src/export_table.py --table contact-submissions --out export/ --format csv \\
+        --attributes submissionId,timestamp,email,status
+    python src/export_table.py --table contact-submissions --out export/ --resume
+"""
+
+import argparse
+import base64
+import csv
+import gzip
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from item_codec import decode_item, stored_names
+
+FORMATS = ("ndjson", "csv")
+CHECKPOINT_FILE = "checkpoint.json"
+
+# CSV columns when no projection is given (the attributes store_submission writes)
+DEFAULT_CSV_COLUMNS = (
+    "submissionId",
+    "timestamp",
+    "name",
+    "email",
+    "message",
+    "clientIp",
+    "userAgent",
+    "status",
+    "ttl",
+)
+
+
+class ExportError(Exception):
+    """Raised when an export cannot start or resume."""
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode("ascii")
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def format_page(items: List[Dict[str, Any]], fmt: str, columns: Sequence[str], header: bool) -> bytes:
+    """Render deserialized items as NDJSON lines or CSV rows."""
+    if fmt == "ndjson":
+        return "".join(json.dumps(item, default=_json_default, ensure_ascii=False) + "\n" for item in items).encode(
+            "utf-8"
+        )
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(columns), extrasaction="ignore")
+    if header:
+        writer.writeheader()
+    for item in items:
+        writer.writerow(
+            {k: json.dumps(v, default=_json_default) if isinstance(v, (dict, list)) else v for k, v in item.items()}
+        )
+    return buffer.getvalue().encode("utf-8")
+
+
+class Checkpoint:
+    """Per-segment progress, persisted atomically after every page."""
+
+    def __init__(self, path: str, state: Dict[str, Any]) -> None:
+        self.path = path
+        self.state = state
+        self._lock = threading.Lock()
+
+    @classmethod
+    def start(cls, path: str, params: Dict[str, Any], segments: int) -> "Checkpoint":
+        state = {
+            **params,
+            "segments": {
+                str(i): {"lastEvaluatedKey": None, "bytes": 0, "items": 0, "done": False} for i in range(segments)
+            },
+        }
+        checkpoint = cls(path, state)
+        checkpoint.save()
+        return checkpoint
+
+    @classmethod
+    def load(cls, path: str, params: Dict[str, Any]) -> "Checkpoint":
+        with open(path, encoding="utf-8") as fh:
+            state = json.load(fh)
+        mismatched = [key for key, value in params.items() if state.get(key) != value]
+        if mismatched:
+            raise ExportError(f"Checkpoint was written with different {', '.join(mismatched)}; start a new export")
+        return cls(path, state)
+
+    def segment(self, segment: int) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.state["segments"][str(segment)])
+
+    def update(self, segment: int, **values: Any) -> None:
+        with self._lock:
+            self.state["segments"][str(segment)].update(values)
+            self.save()
+
+    def save(self) -> None:
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as fh:
+            json.dump(self.state, fh)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(temp_path, self.path)
+
+
+def _projection(attributes: Optional[Sequence[str]]) -> Dict[str, Any]:
+    if not attributes:
+        return {}
+    # Project both the original and the compact name of each attribute (see item_codec)
+    names = {f"#a{i}": name for i, name in enumerate(stored_names(attributes))}
+    return {"ProjectionExpression": ", ".join(names), "ExpressionAttributeNames": names}
+
+
+def export_segment(
+    client: Any,
+    table_name: str,
+    segment: int,
+    total_segments: int,
+    path: str,
+    checkpoint: Checkpoint,
+    fmt: str,
+    columns: Sequence[str],
+    attributes: Optional[Sequence[str]] = None,
+    page_size: Optional[int] = None,
+) -> int:
+    """Scan one segment to ``path``; returns the number of items exported in this run."""
+    progress = checkpoint.segment(segment)
+    if progress["done"]:
+        return 0
+
+    scan_args: Dict[str, Any] = {
+        "TableName": table_name,
+        "Segment": segment,
+        "TotalSegments": total_segments,
+        **_projection(attributes),
+    }
+    if page_size:
+        scan_args["Limit"] = page_size
+
+    exported = 0
+    mode = "r+b" if os.path.exists(path) else "wb"
+    with open(path, mode) as fh:
+        # Drop anything written after the last checkpoint
+        fh.truncate(progress["bytes"])
+        fh.seek(progress["bytes"])
+        start_key = progress["lastEvaluatedKey"]
+        items_total = progress["items"]
+        while True:
+            if start_key:
+                scan_args["ExclusiveStartKey"] = start_key
+            response = client.scan(**scan_args)
+            items = [decode_item(item) for item in response.get("Items", [])]
+            header = fmt == "csv" and fh.tell() == 0
+            if items or header:
+                fh.write(gzip.compress(format_page(items, fmt, columns, header), compresslevel=6))
+                fh.flush()
+                os.fsync(fh.fileno())
+            exported += len(items)
+            items_total += len(items)
+
+            start_key = response.get("LastEvaluatedKey")
+            checkpoint.update(
+                segment, lastEvaluatedKey=start_key, bytes=fh.tell(), items=items_total, done=start_key is None
+            )
+            if start_key is None:
+                return exported
+
+
+def export_table(
+    client: Any,
+    table_name: str,
+    out_dir: str,
+    fmt: str = "ndjson",
+    segments: int = 4,
+    attributes: Optional[Sequence[str]] = None,
+    resume: bool = False,
+    page_size: Optional[int] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict[str, Any]:
+    """Export ``table_name`` into ``out_dir`` and return a summary.
+
+    ``progress`` is called as ``progress(segment, items)`` when a segment finishes.
+    """
+    if fmt not in FORMATS:
+        raise ExportError(f"Unsupported format {fmt!r}; use one of {', '.join(FORMATS)}")
+    if segments < 1:
+        raise ExportError("segments must be at least 1")
+
+    os.makedirs(out_dir, exist_ok=True)
+    checkpoint_path = os.path.join(out_dir, CHECKPOINT_FILE)
+    params = {"table": table_name, "format": fmt, "totalSegments": segments, "attributes": list(attributes or [])}
+    if resume:
+        if not os.path.exists(checkpoint_path):
+            raise ExportError(f"No checkpoint found in {out_dir}")
+        checkpoint = Checkpoint.load(checkpoint_path, params)
+    else:
+        if os.path.exists(checkpoint_path):
+            raise ExportError(f"{out_dir} already holds an export; pass resume=True or use another directory")
+        checkpoint = Checkpoint.start(checkpoint_path, params, segments)
+
+    columns = list(attributes) if attributes else list(DEFAULT_CSV_COLUMNS)
+    started = time.perf_counter()
+
+    def run(segment: int) -> int:
+        path = os.path.join(out_dir, f"segment-{segment:04d}.{fmt}.gz")
+        count = export_segment(
+            client, table_name, segment, segments, path, checkpoint, fmt, columns, attributes, page_size
+        )
+        if progress is not None:
+            progress(segment, count)
+        return count
+
+    with ThreadPoolExecutor(max_workers=segments, thread_name_prefix="export") as pool:
+        exported = sum(pool.map(run, range(segments)))
+
+    total = sum(checkpoint.segment(i)["items"] for i in range(segments))
+    return {
+        "exported": exported,
+        "totalItems": total,
+        "segments": segments,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export the submissions table to gzip NDJSON or CSV")
+    parser.add_argument("--table", default=os.environ.get("DYNAMODB_TABLE", ""), help="table name")
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument("--format", choices=FORMATS, default="ndjson")
+    parser.add_argument("--segments", type=int, default=4, help="parallel scan segments (one thread each)")
+    parser.add_argument("--attributes", help="comma-separated attributes to export (default: all)")
+    parser.add_argument("--page-size", type=int, help="Scan Limit per page")
+    parser.add_argument("--resume", action="store_true", help="continue from checkpoint.json in --out")
+    parser.add_argument("--endpoint-url", help="DynamoDB endpoint, e.g. DynamoDB Local")
+    args = parser.parse_args()
+    if not args.table:
+        parser.error("--table (or DYNAMODB_TABLE) is required")
+
+    import aws_clients
+
+    client = aws_clients.create_client(
+        "dynamodb", endpoint_url=args.endpoint_url, max_pool_connections=max(10, args.segments)
+    )
+    attributes = [name.strip() for name in args.attributes.split(",") if name.strip()] if args.attributes else None
+    try:
+        summary = export_table(
+            client,
+            args.table,
+            args.out,
+            fmt=args.format,
+            segments=args.segments,
+            attributes=attributes,
+            resume=args.resume,
+            page_size=args.page_size,
+            progress=lambda segment, count: print(f"segment {segment} finished ({count} items)"),
+        )
+    except ExportError as e:
+        parser.exit(1, f"error: {str(e)}\n")
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
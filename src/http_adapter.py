@@ -0,0 +1,495 @@
+"""Serve the contact form handler over HTTP outside Lambda.
+
+``ContactFormApp`` is a plain ASGI application. It turns each HTTP request into
+the API Gateway proxy event that ``lambda_handler`` expects. The handler runs on
+a bounded thread pool, so many requests are in flight at once. All of them share
+the module's AWS clients, which are built once at startup with at least one
+pooled connection per worker (``AWS_MAX_POOL_CONNECTIONS`` is raised to
+``workers`` when lower).
+
+Routes:
+
+* ``POST``/``OPTIONS`` on ``HTTP_CONTACT_PATH`` (default ``/contact``) go to
+  ``lambda_handler``.
+* ``GET /healthz`` is a liveness check.
+* ``GET /metrics`` returns request and stage metrics in Prometheus text format,
+  read from the metrics collector.
+* ``POST /bulk`` streams an NDJSON import through ``bulk_ingest`` and streams
+  the per-line report back. It is enabled only when ``BULK_INGEST_TOKEN`` is
+  set, and callers must send ``Authorization: Bearer <token>``.
+* ``GET /submissions`` lists stored submissions through
+  ``submission_queries.lambda_handler``. It is enabled only when
+  ``SUBMISSIONS_QUERY_TOKEN`` is set and requires that bearer token.
+
+Any ASGI server can run the app, e.g. ``uvicorn http_adapter:app``. The small
+asyncio HTTP/1.1 server in ``serve`` needs no extra dependencies:
+
+    python src/http_adapter.py --port 8080 --workers 32
+"""
+
+import argparse
+import asyncio
+import base64
+import hmac
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl
+
+HTTP_WORKERS = int(os.environ.get("HTTP_WORKERS", "32"))
+HTTP_CONTACT_PATH = os.environ.get("HTTP_CONTACT_PATH", "/contact")
+HTTP_MAX_BODY_BYTES = int(os.environ.get("HTTP_MAX_BODY_BYTES", str(64 * 1024)))
+# Take the client IP from X-Forwarded-For (only behind a proxy that sets it)
+HTTP_TRUST_FORWARDED_FOR = os.environ.get("HTTP_TRUST_FORWARDED_FOR", "false").lower() == "true"
+
+# Size the AWS connection pools to the worker pool before the handler builds its clients
+os.environ.setdefault("AWS_MAX_POOL_CONNECTIONS", str(HTTP_WORKERS))
+
+import aws_clients  # noqa: E402
+import bulk_ingest  # noqa: E402
+import codec  # noqa: E402
+import contact_handler  # noqa: E402
+import metrics  # noqa: E402
+import submission_queries  # noqa: E402
+
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+
+READ_CHUNK_BYTES = 64 * 1024
+
+STATUS_PHRASES = {
+    200: "OK",
+    400: "Bad Request",
+    401: "Unauthorized",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    429: "Too Many Requests",
+    500: "Internal Server Error",
+}
+
+
+def build_event(
+    method: str, path: str, query: str, headers: List[Tuple[str, str]], body: bytes, client_ip: str
+) -> Dict[str, Any]:
+    """Build an API Gateway REST (v1) proxy event for an HTTP request."""
+    single: Dict[str, str] = {}
+    multi: Dict[str, List[str]] = {}
+    for name, value in headers:
+        # ASGI lowercases header names; API Gateway passes them as sent (e.g. "User-Agent")
+        name = "-".join(part.capitalize() for part in name.split("-"))
+        single[name] = value
+        multi.setdefault(name, []).append(value)
+
+    if HTTP_TRUST_FORWARDED_FOR:
+        forwarded = single.get("X-Forwarded-For", "")
+        if forwarded:
+            client_ip = forwarded.split(",")[0].strip()
+
+    try:
+        text_body: Optional[str] = body.decode("utf-8") if body else None
+        is_base64 = False
+    except UnicodeDecodeError:
+        text_body = base64.b64encode(body).decode("ascii")
+        is_base64 = True
+
+    query_params = dict(parse_qsl(query, keep_blank_values=True)) if query else None
+    return {
+        "resource": path,
+        "path": path,
+        "httpMethod": method,
+        "headers": single,
+        "multiValueHeaders": multi,
+        "queryStringParameters": query_params,
+        "body": text_body,
+        "isBase64Encoded": is_base64,
+        "requestContext": {"httpMethod": method, "path": path, "identity": {"sourceIp": client_ip}},
+    }
+
+
+def render_metrics(collector: metrics.MetricsCollector) -> str:
+    """Prometheus text exposition of the collector's totals and recent stage latencies."""
+    lines = ["# TYPE contact_requests_total counter"]
+    for status, count in sorted(collector.status_totals().items()):
+        lines.append(f'contact_requests_total{{status="{status}"}} {count}')
+    lines.append("# TYPE contact_outcomes_total counter")
+    for name, count in sorted(collector.totals().items()):
+        lines.append(f'contact_outcomes_total{{outcome="{name}"}} {count}')
+
+    lines.append("# TYPE contact_stage_latency_ms summary")
+    stages = sorted({stage for record in collector.records() for stage in record["stages"]})
+    for stage in stages:
+        samples = sorted(collector.stage_samples(stage))
+        for quantile in (0.5, 0.95, 0.99):
+            value = samples[min(len(samples) - 1, int(quantile * len(samples)))]
+            lines.append(f'contact_stage_latency_ms{{stage="{stage}",quantile="{quantile}"}} {value:.3f}')
+        lines.append(f'contact_stage_latency_ms_count{{stage="{stage}"}} {len(samples)}')
+    return "\n".join(lines) + "\n"
+
+
+class ContactFormApp:
+    """ASGI application wrapping ``lambda_handler``."""
+
+    def __init__(
+        self,
+        handler: Callable[[Dict[str, Any], Any], Dict[str, Any]] = contact_handler.lambda_handler,
+        workers: int = HTTP_WORKERS,
+        contact_path: str = HTTP_CONTACT_PATH,
+        max_body_bytes: int = HTTP_MAX_BODY_BYTES,
+    ) -> None:
+        self.handler = handler
+        self.contact_path = contact_path
+        self.max_body_bytes = max_body_bytes
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="contact")
+        self.port: Optional[int] = None  # set by serve() once listening
+
+    def startup(self) -> None:
+        """Build the shared AWS clients before the first request arrives."""
+        # One connection per worker, or the threads queue for connections; a client keeps the size it is built with
+        aws_clients.AWS_MAX_POOL_CONNECTIONS = max(aws_clients.AWS_MAX_POOL_CONNECTIONS, self.workers)
+        contact_handler.get_dynamodb_client()
+        contact_handler.get_ses_client()
+
+    def shutdown(self) -> None:
+        if contact_handler._batch_writer is not None:
+            contact_handler._batch_writer.close()
+        self.executor.shutdown(wait=True)
+
+    async def __call__(self, scope: Dict[str, Any], receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await loop.run_in_executor(self.executor, self.startup)
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await loop.run_in_executor(None, self.shutdown)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope: Dict[str, Any], receive: Receive, send: Send) -> None:
+        method, path = scope["method"], scope["path"]
+
+        if path == "/healthz" and method == "GET":
+            await _respond(send, 200, {"Content-Type": "application/json"}, b'{"status":"ok"}')
+            return
+        if path == "/metrics" and method == "GET":
+            body = render_metrics(metrics.collector).encode("utf-8")
+            await _respond(send, 200, {"Content-Type": "text/plain; version=0.0.4"}, body)
+            return
+        if path == "/bulk" and bulk_ingest.BULK_INGEST_TOKEN:
+            await self._bulk(scope, receive, send)
+            return
+        if path == "/submissions" and submission_queries.SUBMISSIONS_QUERY_TOKEN:
+            await self._submissions(scope, send)
+            return
+        if path != self.contact_path:
+            await _respond(send, 404, {"Content-Type": "application/json"}, b'{"error":"Not found"}')
+            return
+        if method not in ("POST", "OPTIONS"):
+            await _respond(send, 405, {"Content-Type": "application/json", "Allow": "POST, OPTIONS"}, b"")
+            return
+
+        body = bytearray()
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if len(body) > self.max_body_bytes:
+                await _respond(send, 413, {"Content-Type": "application/json"}, b'{"error":"Request too large"}')
+                return
+            if not message.get("more_body"):
+                break
+
+        headers = [(name.decode("latin-1"), value.decode("latin-1")) for name, value in scope.get("headers", [])]
+        client = scope.get("client") or ("unknown", 0)
+        event = build_event(
+            method, path, scope.get("query_string", b"").decode("latin-1"), headers, bytes(body), client[0]
+        )
+
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(self.executor, self.handler, event, None)
+        response_headers = {"Content-Type": "application/json", **(response.get("headers") or {})}
+        await _respond(send, response["statusCode"], response_headers, (response.get("body") or "").encode("utf-8"))
+
+    async def _submissions(self, scope: Dict[str, Any], send: Send) -> None:
+        """Run an admin submissions query on the worker pool."""
+        if scope["method"] != "GET":
+            await _respond(send, 405, {"Content-Type": "application/json", "Allow": "GET"}, b"")
+            return
+        if not _authorized(scope, submission_queries.SUBMISSIONS_QUERY_TOKEN):
+            await _respond(send, 401, {"Content-Type": "application/json"}, b'{"error":"Unauthorized"}')
+            return
+
+        client = scope.get("client") or ("unknown", 0)
+        event = build_event("GET", scope["path"], scope.get("query_string", b"").decode("latin-1"), [], b"", client[0])
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(self.executor, submission_queries.lambda_handler, event, None)
+        await _respond(send, response["statusCode"], response["headers"], response["body"].encode("utf-8"))
+
+    async def _bulk(self, scope: Dict[str, Any], receive: Receive, send: Send) -> None:
+        """Stream an NDJSON body into bulk_ingest and stream the per-line report back."""
+        if scope["method"] != "POST":
+            await _respond(send, 405, {"Content-Type": "application/json", "Allow": "POST"}, b"")
+            return
+        if not _authorized(scope, bulk_ingest.BULK_INGEST_TOKEN):
+            await _respond(send, 401, {"Content-Type": "application/json"}, b'{"error":"Unauthorized"}')
+            return
+
+        params = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+        source = params.get("source", "bulk")
+        ttl_days = int(params["ttlDays"]) if params.get("ttlDays", "").isdigit() else 0
+
+        loop = asyncio.get_running_loop()
+        # Bounded so a fast uploader waits for the importer instead of filling memory
+        chunks: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=16)
+        reports: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue()
+        import_done = threading.Event()
+
+        def emit(block: List[str]) -> None:
+            loop.call_soon_threadsafe(reports.put_nowait, "".join(block).encode("utf-8"))
+
+        def run_import() -> None:
+            block: List[str] = []
+
+            def report(entry: Dict[str, Any]) -> None:
+                block.append(codec.dumps(entry) + "\n")
+                if len(block) >= 500:
+                    emit(block)
+                    block.clear()
+
+            try:
+                summary = bulk_ingest.ingest(
+                    bulk_ingest.iter_lines(iter(chunks.get, None)),
+                    contact_handler.get_dynamodb_client(),
+                    contact_handler.DYNAMODB_TABLE,
+                    report,
+                    source=source,
+                    ttl_days=ttl_days or None,
+                )
+                block.append(codec.dumps({"summary": summary}) + "\n")
+            except Exception as e:
+                print(f"Bulk import failed: {str(e)}")
+                block.append(codec.dumps({"error": "Import aborted"}) + "\n")
+            finally:
+                import_done.set()
+                emit(block)
+                loop.call_soon_threadsafe(reports.put_nowait, None)
+
+        def put(chunk: Optional[bytes]) -> None:
+            # Give up if the import stopped early, rather than waiting on a full queue forever
+            while not import_done.is_set():
+                try:
+                    chunks.put(chunk, timeout=0.25)
+                    return
+                except queue.Full:
+                    pass
+
+        async def upload() -> None:
+            while True:
+                message = await receive()
+                if message["type"] != "http.request":
+                    break
+                if message.get("body"):
+                    await loop.run_in_executor(None, put, message["body"])
+                if not message.get("more_body"):
+                    break
+            await loop.run_in_executor(None, put, None)
+
+        importer = loop.run_in_executor(self.executor, run_import)
+        uploader = asyncio.ensure_future(upload())
+        await send(
+            {"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/x-ndjson")]}
+        )
+        while True:
+            block = await reports.get()
+            if block is None:
+                break
+            await send({"type": "http.response.body", "body": block, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+        await uploader
+        await importer
+
+
+def _authorized(scope: Dict[str, Any], token: str) -> bool:
+    """Whether the request carries ``Authorization: Bearer <token>``."""
+    authorization = dict(scope.get("headers", [])).get(b"authorization", b"").decode("latin-1")
+    return hmac.compare_digest(authorization, f"Bearer {token}")
+
+
+async def _respond(send: Send, status: int, headers: Dict[str, str], body: bytes) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(k.lower().encode("latin-1"), str(v).encode("latin-1")) for k, v in headers.items()],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _serve_connection(app: Any, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Minimal HTTP/1.1 keep-alive loop for requests with Content-Length bodies.
+
+    Request bodies are handed to the app in chunks as they arrive. A response
+    sent in several body messages goes out with chunked transfer encoding.
+    """
+    peer = writer.get_extra_info("peername") or ("unknown", 0)
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                return
+            request_line, *header_lines = head.decode("latin-1").rstrip("\r\n").split("\r\n")
+            headers = []
+            for line in header_lines:
+                name, _, value = line.partition(":")
+                headers.append((name.strip().lower().encode("latin-1"), value.strip().encode("latin-1")))
+            header_map = {name: value for name, value in headers}
+            try:
+                method, target, version = request_line.split(" ", 2)
+                remaining = int(header_map.get(b"content-length", b"0"))
+                if not version.startswith("HTTP/") or remaining < 0:
+                    raise ValueError(request_line)
+            except ValueError:
+                writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                await writer.drain()
+                return
+            keep_alive = header_map.get(b"connection", b"").lower() != b"close" and version == "HTTP/1.1"
+
+            if b"transfer-encoding" in header_map:
+                writer.write(b"HTTP/1.1 411 Length Required\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                await writer.drain()
+                return
+
+            path, _, query = target.partition("?")
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0"},
+                "http_version": version.split("/", 1)[1],
+                "method": method.upper(),
+                "scheme": "http",
+                "path": path,
+                "raw_path": path.encode("latin-1"),
+                "query_string": query.encode("latin-1"),
+                "headers": headers,
+                "client": peer[:2],
+                "server": writer.get_extra_info("sockname")[:2],
+            }
+            requested = False
+            pending_start: Optional[Dict[str, Any]] = None
+            chunked = False
+
+            async def receive() -> Dict[str, Any]:
+                nonlocal remaining, requested
+                if requested and remaining <= 0:
+                    return {"type": "http.disconnect"}
+                requested = True
+                chunk = await reader.readexactly(min(remaining, READ_CHUNK_BYTES)) if remaining else b""
+                remaining -= len(chunk)
+                return {"type": "http.request", "body": chunk, "more_body": remaining > 0}
+
+            async def send(message: Dict[str, Any]) -> None:
+                nonlocal pending_start, chunked
+                if message["type"] == "http.response.start":
+                    pending_start = message
+                    return
+                body = message.get("body", b"")
+                more = message.get("more_body", False)
+                if pending_start is not None:
+                    # The first body message decides between Content-Length and chunked encoding
+                    chunked = more
+                    writer.write(_response_head(pending_start, None if more else len(body), keep_alive))
+                    pending_start = None
+                if chunked:
+                    if body:
+                        writer.write(b"%x\r\n%s\r\n" % (len(body), body))
+                    if not more:
+                        writer.write(b"0\r\n\r\n")
+                else:
+                    writer.write(body)
+                await writer.drain()
+
+            await app(scope, receive, send)
+            # Discard any request body the app did not read
+            while remaining > 0:
+                remaining -= len(await reader.readexactly(min(remaining, READ_CHUNK_BYTES)))
+            if not keep_alive:
+                return
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return
+    finally:
+        writer.close()
+
+
+def _response_head(start: Dict[str, Any], content_length: Optional[int], keep_alive: bool) -> bytes:
+    status = start["status"]
+    lines = [f"HTTP/1.1 {status} {STATUS_PHRASES.get(status, 'Unknown')}"]
+    lines += [f"{k.decode('latin-1')}: {v.decode('latin-1')}" for k, v in start.get("headers", [])]
+    lines.append("Transfer-Encoding: chunked" if content_length is None else f"Content-Length: {content_length}")
+    lines.append("Connection: keep-alive" if keep_alive else "Connection: close")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def serve(app: ContactFormApp, host: str = "127.0.0.1", port: int = 8080, ready: Any = None) -> None:
+    """Run ``app`` on the built-in HTTP/1.1 server until cancelled.
+
+    ``ready`` may be a ``threading.Event``; it is set once the socket is listening
+    and the app has started up, and the bound port is stored in ``app.port``.
+    """
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(app.executor, app.startup)
+    connections: Set["asyncio.Task[None]"] = set()
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        connections.add(task)
+        try:
+            await _serve_connection(app, reader, writer)
+        finally:
+            connections.discard(task)
+
+    server = await asyncio.start_server(handle, host, port)
+    app.port = server.sockets[0].getsockname()[1]
+    if ready is not None:
+        ready.set()
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        # Close idle keep-alive connections too, not just the listening socket
+        for task in list(connections):
+            task.cancel()
+        await asyncio.gather(*connections, return_exceptions=True)
+        await loop.run_in_executor(None, app.shutdown)
+
+
+app = ContactFormApp()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the contact form handler over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=HTTP_WORKERS)
+    args = parser.parse_args()
+
+    print(f"Serving {HTTP_CONTACT_PATH} on http://{args.host}:{args.port} with {args.workers} workers")
+    try:
+        asyncio.run(serve(ContactFormApp(workers=args.workers), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
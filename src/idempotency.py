@@ -0,0 +1,195 @@
+"""Idempotent contact form submissions.
+
+Each submission gets an idempotency key: the client's ``Idempotency-Key`` header
+when present, otherwise a hash of the normalized name, email and message within
+a time window. A duplicate is detected first by an in-container TTL cache and
+then by a conditional put in the shared state table (``STATE_TABLE``); the
+caller gets back the original ``submissionId`` and no email is re-sent.
+
+Every claim also stores a hash of the submission's content. A header key
+reused with a different name, email or message raises ``KeyReusedError``
+instead of silently answering with the first submission.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from dynamo_serializer import deserialize_item, serialize_item
+
+IDEMPOTENCY_ENABLED = os.environ.get("IDEMPOTENCY_ENABLED", "true").lower() == "true"
+# Identical content within this window (and header keys for this long) count as duplicates
+IDEMPOTENCY_WINDOW_SECONDS = int(os.environ.get("IDEMPOTENCY_WINDOW_SECONDS", "300"))
+IDEMPOTENCY_CACHE_SIZE = int(os.environ.get("IDEMPOTENCY_CACHE_SIZE", "1024"))
+STATE_TABLE = os.environ.get("STATE_TABLE", "")
+
+HEADER_NAME = "idempotency-key"
+MAX_HEADER_LENGTH = 256
+# Conditional puts tried before a claim fails open
+CLAIM_ATTEMPTS = 3
+
+
+class KeyReusedError(Exception):
+    """Raised when an idempotency key is claimed again for different content."""
+
+    def __init__(self, submission_id: str) -> None:
+        super().__init__(f"Idempotency key already used by submission {submission_id}")
+        self.submission_id = submission_id
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def _normalize(value: str) -> str:
+    return " ".join(value.casefold().split())
+
+
+def derive_key(
+    headers: Optional[Dict[str, str]], name: str, email: str, message: str, now: Optional[float] = None
+) -> str:
+    """Return the idempotency key for a submission."""
+    for header, value in (headers or {}).items():
+        if header.lower() == HEADER_NAME and value and len(value) <= MAX_HEADER_LENGTH:
+            return "header#" + _digest(value)
+
+    window = int((time.time() if now is None else now) // IDEMPOTENCY_WINDOW_SECONDS)
+    return "content#" + content_hash(name, email, message, str(window))
+
+
+def content_hash(*fields: str) -> str:
+    """Hash of the normalized submission fields, stored with each claim."""
+    return _digest(*(_normalize(field) for field in fields))
+
+
+class TTLCache:
+    """Small thread-safe LRU map whose entries expire after ``ttl_seconds``."""
+
+    def __init__(self, max_size: int, ttl_seconds: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (value, self._clock() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class IdempotencyStore:
+    """Claims idempotency keys in the local cache and, when configured, the state table."""
+
+    def __init__(
+        self,
+        client: Any = None,
+        table_name: str = "",
+        ttl_seconds: int = IDEMPOTENCY_WINDOW_SECONDS,
+        cache: Optional[TTLCache] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._client = client
+        self._table_name = table_name
+        self.ttl_seconds = ttl_seconds
+        self.cache = cache or TTLCache(IDEMPOTENCY_CACHE_SIZE, ttl_seconds)
+        self._clock = clock
+
+    def claim(self, key: str, submission_id: str, fingerprint: str = "") -> Optional[str]:
+        """Claim ``key`` for ``submission_id`` and the content hash ``fingerprint``.
+
+        Returns None when the claim succeeds (a new submission), or the
+        submission ID that already owns the key (a duplicate). Raises
+        ``KeyReusedError`` when the owner was claimed with another fingerprint.
+        """
+        existing = self.cache.get(key)
+        if existing is None and self._client is not None:
+            existing = self._claim_shared(key, submission_id, fingerprint)
+            if existing is not None:
+                self.cache.put(key, existing)
+        if existing is None:
+            self.cache.put(key, (submission_id, fingerprint))
+            return None
+
+        original_id, original_fingerprint = existing
+        # Claims stored before content hashes were recorded match any content
+        if original_fingerprint and fingerprint and original_fingerprint != fingerprint:
+            raise KeyReusedError(original_id)
+        return original_id
+
+    def release(self, key: str) -> None:
+        """Forget a claim whose submission failed, so a retry is processed normally."""
+        self.cache.discard(key)
+        if self._client is None:
+            return
+        try:
+            self._client.delete_item(TableName=self._table_name, Key=self._key(key))
+        except Exception as e:
+            print(f"Failed to release idempotency key: {str(e)}")
+
+    def _claim_shared(self, key: str, submission_id: str, fingerprint: str) -> Optional[Tuple[str, str]]:
+        try:
+            for _ in range(CLAIM_ATTEMPTS):
+                now = int(self._clock())
+                record = {
+                    **self._key_values(key),
+                    "submissionId": submission_id,
+                    "contentHash": fingerprint,
+                    "ttl": now + self.ttl_seconds,
+                }
+                try:
+                    self._client.put_item(
+                        TableName=self._table_name,
+                        Item=serialize_item(record),
+                        ConditionExpression="attribute_not_exists(pk) OR #ttl < :now",
+                        ExpressionAttributeNames={"#ttl": "ttl"},
+                        ExpressionAttributeValues=serialize_item({":now": now}),
+                    )
+                    return None
+                except self._client.exceptions.ConditionalCheckFailedException:
+                    response = self._client.get_item(
+                        TableName=self._table_name, Key=self._key(key), ConsistentRead=True
+                    )
+                    item = deserialize_item(response.get("Item", {}))
+                    # Gone or expired since the put: another claim was released, so try again
+                    if item and int(item.get("ttl", 0)) >= int(self._clock()):
+                        return item["submissionId"], item.get("contentHash", "")
+            print(f"Idempotency claim for {key} kept losing races; processing as new")
+        except Exception as e:
+            # Fail open: the local cache still catches duplicates hitting this container
+            print(f"Idempotency check failed: {str(e)}")
+        return None
+
+    @staticmethod
+    def _key_values(key: str) -> Dict[str, str]:
+        return {"pk": f"idempotency#{key}", "sk": "-"}
+
+    def _key(self, key: str) -> Dict[str, Any]:
+        return serialize_item(self._key_values(key))
+
+
+def build_store(client_factory: Callable[[], Any]) -> IdempotencyStore:
+    """Build a store from the environment; ``client_factory`` supplies the DynamoDB client."""
+    if STATE_TABLE:
+        return IdempotencyStore(client_factory(), STATE_TABLE, IDEMPOTENCY_WINDOW_SECONDS)
+    return IdempotencyStore(ttl_seconds=IDEMPOTENCY_WINDOW_SECONDS)
@@ -0,0 +1,258 @@
+"""Versioned storage format for submission items.
+
+Version 0 is the original layout: descriptive attribute names and plain
+strings. Version 1 (``ITEM_FORMAT=1``) stores the same data in less space:
+
+* payload attributes get short names (``name`` -> ``n``, ``message`` -> ``m``,
+  ...). Key, index, TTL and outbox attributes keep their names, because the
+  table schema, the GSIs and update expressions refer to them.
+* ``message`` and ``userAgent`` values longer than ``ITEM_COMPRESS_MIN_BYTES``
+  are stored as Binary, compressed, when that makes them smaller. The first byte
+  says how they were compressed: zlib with the built-in dictionary below, or
+  zstd if ``ITEM_COMPRESSION=zstd`` and the optional ``zstandard`` package is
+  installed.
+* the row carries ``v = 1``.
+
+``decode_item`` reads both versions, so rows of either format can live in the
+table while it is migrated. ``item_codec.py`` can rewrite old rows with
+``migrate`` and report the size of a sample with ``measure``. Readers must be
+deployed before ``ITEM_FORMAT=1`` is turned on for writers.
+"""
+
+import argparse
+import math
+import os
+import zlib
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from dynamo_serializer import deserialize_item, serialize_item
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - exercised when zstandard is not installed
+    zstandard = None
+
+# Format written by encode_item: 0 keeps the original layout, 1 is the compact one
+ITEM_FORMAT = int(os.environ.get("ITEM_FORMAT", "0"))
+# "zlib" (always available) or "zstd" (needs the zstandard package wherever rows are read)
+ITEM_COMPRESSION = os.environ.get("ITEM_COMPRESSION", "zlib")
+# Values shorter than this many bytes are stored as plain strings
+ITEM_COMPRESS_MIN_BYTES = int(os.environ.get("ITEM_COMPRESS_MIN_BYTES", "64"))
+
+VERSION_ATTRIBUTE = "v"
+COMPACT_VERSION = 1
+
+# Logical attribute name -> stored name in version 1
+COMPACT_NAMES = {
+    "name": "n",
+    "email": "e",
+    "message": "m",
+    "clientIp": "ip",
+    "userAgent": "ua",
+    "status": "st",
+    "importSource": "src",
+}
+LOGICAL_NAMES = {short: name for name, short in COMPACT_NAMES.items()}
+COMPRESSED_FIELDS = ("message", "userAgent")
+# Attributes the outbox and digest workers change in place
+_OUTBOX_ATTRIBUTES = ("emailStatus", "emailAttempts", "nextAttemptAt")
+
+# First byte of a compressed value
+ZLIB_DICT = b"\x01"
+ZSTD = b"\x02"
+
+# Preset dictionary for ZLIB_DICT: user-agent fragments and common words in contact
+# messages. Rows written with it can only be read with these exact bytes, so a new
+# dictionary needs a new tag byte rather than an edit here.
+_ZDICT_V1 = (
+    b"I would like to discuss a project with you. Please let me know if you are available for a call. "
+    b"Thank you for your time. Hello, Hi, I am interested in your work and experience with AWS, cloud, "
+    b"security, DevOps, infrastructure, migration, architecture, consulting, opportunity, position, role. "
+    b"Best regards, Kind regards, Thanks, "
+    b"Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) "
+    b"Version/17.0 Mobile/15E148 Safari/604.1 "
+    b"Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) "
+    b"Version/17.0 Safari/605.1.15 "
+    b"Mozilla/5.0 (X11; Linux x86_64; rv:121.0) Gecko/20100101 Firefox/121.0 "
+    b"Mozilla/5.0 (Linux; Android 14; Pixel 8) AppleWebKit/537.36 (KHTML, like Gecko) "
+    b"Chrome/120.0.0.0 Mobile Safari/537.36 "
+    b"Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    b"Chrome/120.0.0.0 Safari/537.36 Edg/120.0.0.0 "
+    b"Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    b"Chrome/120.0.0.0 Safari/537.36"
+)
+
+
+def encode_item(item: Dict[str, Any], version: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """Serialize a submission for the low-level client in format ``version`` (default ``ITEM_FORMAT``)."""
+    version = ITEM_FORMAT if version is None else version
+    if version == 0:
+        return serialize_item(item)
+    if version != COMPACT_VERSION:
+        raise ValueError(f"Unknown item format {version}")
+
+    stored: Dict[str, Any] = {}
+    for name, value in item.items():
+        if name in COMPRESSED_FIELDS and isinstance(value, str):
+            value = compress(value)
+        stored[COMPACT_NAMES.get(name, name)] = value
+    stored[VERSION_ATTRIBUTE] = COMPACT_VERSION
+    return serialize_item(stored)
+
+
+def decode_item(raw: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Deserialize a submission stored in any format into its logical attributes."""
+    item = deserialize_item(raw)
+    version = item.pop(VERSION_ATTRIBUTE, 0)
+    if version == 0:
+        return item
+    if version != COMPACT_VERSION:
+        raise ValueError(f"Unknown item format {version}")
+
+    decoded = {}
+    for name, value in item.items():
+        name = LOGICAL_NAMES.get(name, name)
+        if name in COMPRESSED_FIELDS and isinstance(value, bytes):
+            value = decompress(value)
+        decoded[name] = value
+    return decoded
+
+
+def stored_names(names: Iterable[str]) -> List[str]:
+    """Attribute names to project so that ``names`` can be decoded from rows in any format."""
+    result = [VERSION_ATTRIBUTE]
+    for name in names:
+        result.append(name)
+        if name in COMPACT_NAMES:
+            result.append(COMPACT_NAMES[name])
+    return result
+
+
+def compress(text: str) -> Any:
+    """``text`` compressed with its tag byte, or unchanged when compressing does not make it smaller."""
+    data = text.encode("utf-8")
+    if len(data) < ITEM_COMPRESS_MIN_BYTES:
+        return text
+    if ITEM_COMPRESSION == "zstd" and zstandard is not None:
+        packed = ZSTD + zstandard.ZstdCompressor(level=9).compress(data)
+    else:
+        compressor = zlib.compressobj(9, zlib.DEFLATED, -15, 9, zlib.Z_DEFAULT_STRATEGY, _ZDICT_V1)
+        packed = ZLIB_DICT + compressor.compress(data) + compressor.flush()
+    return packed if len(packed) < len(data) else text
+
+
+def decompress(value: bytes) -> str:
+    """Inverse of ``compress`` for a Binary value."""
+    tag, payload = value[:1], value[1:]
+    if tag == ZLIB_DICT:
+        return zlib.decompressobj(-15, _ZDICT_V1).decompress(payload).decode("utf-8")
+    if tag == ZSTD:
+        if zstandard is None:
+            raise ValueError("Item is zstd-compressed but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(payload).decode("utf-8")
+    raise ValueError(f"Unknown compression tag {tag!r}")
+
+
+def item_size(raw: Dict[str, Dict[str, Any]]) -> int:
+    """Approximate DynamoDB item size in bytes: attribute names plus values."""
+    return sum(len(name.encode("utf-8")) + _value_size(value) for name, value in raw.items())
+
+
+def write_units(raw: Dict[str, Dict[str, Any]]) -> int:
+    """Write capacity units one standard write of the item consumes (1 KB each, rounded up)."""
+    return max(1, math.ceil(item_size(raw) / 1024))
+
+
+def _value_size(attribute: Dict[str, Any]) -> int:
+    (kind, value) = next(iter(attribute.items()))
+    if kind == "S":
+        return len(value.encode("utf-8"))
+    if kind == "B":
+        return len(value)
+    if kind == "N":
+        digits = len(Decimal(value).as_tuple().digits)
+        return math.ceil(digits / 2) + 1
+    if kind == "M":
+        return 3 + sum(len(k.encode("utf-8")) + _value_size(v) + 1 for k, v in value.items())
+    if kind == "L":
+        return 3 + sum(_value_size(v) + 1 for v in value)
+    return 1
+
+
+def migrate(client: Any, table_name: str, page_size: int = 100) -> int:
+    """Rewrite every version 0 row in the compact format; returns rows rewritten.
+
+    Each row is replaced with a put that only succeeds if the outbox attributes
+    are still as scanned, so a row the outbox worker touched in the meantime is
+    left for the next run.
+    """
+    scan_args: Dict[str, Any] = {
+        "TableName": table_name,
+        "FilterExpression": "attribute_not_exists(#v)",
+        "ExpressionAttributeNames": {"#v": VERSION_ATTRIBUTE},
+        "Limit": page_size,
+    }
+    rewritten = 0
+    while True:
+        response = client.scan(**scan_args)
+        for raw in response.get("Items", []):
+            conditions = ["attribute_not_exists(#v)"]
+            values = {}
+            for i, name in enumerate(_OUTBOX_ATTRIBUTES):
+                if name in raw:
+                    conditions.append(f"{name} = :o{i}")
+                    values[f":o{i}"] = raw[name]
+                else:
+                    conditions.append(f"attribute_not_exists({name})")
+            try:
+                client.put_item(
+                    TableName=table_name,
+                    Item=encode_item(decode_item(raw), COMPACT_VERSION),
+                    ConditionExpression=" AND ".join(conditions),
+                    ExpressionAttributeNames={"#v": VERSION_ATTRIBUTE},
+                    **({"ExpressionAttributeValues": values} if values else {}),
+                )
+            except client.exceptions.ConditionalCheckFailedException:
+                continue
+            rewritten += 1
+        if "LastEvaluatedKey" not in response:
+            return rewritten
+        scan_args["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def measure(items: Sequence[Dict[str, Any]]) -> Dict[str, Dict[str, int]]:
+    """Total bytes and write units for ``items`` in each format."""
+    report = {}
+    for version in (0, COMPACT_VERSION):
+        encoded = [encode_item(item, version) for item in items]
+        report[f"v{version}"] = {
+            "bytes": sum(item_size(raw) for raw in encoded),
+            "writeUnits": sum(write_units(raw) for raw in encoded),
+        }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Migrate submission rows to the compact item format")
+    parser.add_argument("command", choices=["migrate", "measure"])
+    parser.add_argument("--table", default=os.environ.get("DYNAMODB_TABLE", ""), help="submissions table name")
+    parser.add_argument("--sample", type=int, default=1000, help="rows scanned by measure")
+    parser.add_argument("--endpoint-url", help="DynamoDB endpoint, e.g. DynamoDB Local")
+    args = parser.parse_args()
+    if not args.table:
+        parser.error("--table or DYNAMODB_TABLE is required")
+
+    import aws_clients
+    import codec
+
+    client = aws_clients.create_client("dynamodb", endpoint_url=args.endpoint_url)
+    if args.command == "migrate":
+        print(f"Rewrote {migrate(client, args.table)} rows")
+        return
+    response = client.scan(TableName=args.table, Limit=args.sample)
+    print(codec.dumps(measure([decode_item(raw) for raw in response.get("Items", [])])))
+
+
+if __name__ == "__main__":
+    main()
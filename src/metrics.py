@@ -0,0 +1,202 @@
+"""Per-stage request metrics in CloudWatch Embedded Metric Format (EMF).
+
+``lambda_handler`` times each stage of a request (parse, validate, store, email,
+...) with a monotonic clock and counts outcomes such as validation failures,
+spam and server errors. When a request finishes, one EMF JSON line is printed.
+CloudWatch Logs turns that line into metrics without any extra API calls.
+
+``METRICS_SAMPLE_RATE`` sets the fraction of requests that get logged. Requests
+that end in a 5xx are always logged. So that sums stay unbiased, the counters
+on a sampled line are divided by the chance the line had of being logged
+(``METRICS_SAMPLE_RATE``, or 1 for a 5xx), which is also written as the
+``SampleRate`` field. Every line carries a ``Requests`` counter on the same
+scale, so ``Sum`` of ``Requests`` estimates throughput and
+``ServerError / Requests`` the error rate. Latency statistics are not weighted,
+and 5xx latencies are over-represented in them while sampling. Every finished
+request is also kept in the bounded in-process ``collector``, which tests and
+benchmarks can read.
+"""
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+import codec
+
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() == "true"
+METRICS_NAMESPACE = os.environ.get("METRICS_NAMESPACE", "PortfolioContactForm")
+# Fraction of requests whose EMF line is printed (5xx responses are always printed)
+METRICS_SAMPLE_RATE = float(os.environ.get("METRICS_SAMPLE_RATE", "1.0"))
+# Finished requests kept in memory for tests and benchmarks
+METRICS_COLLECTOR_SIZE = int(os.environ.get("METRICS_COLLECTOR_SIZE", "1000"))
+
+FUNCTION_NAME = os.environ.get("AWS_LAMBDA_FUNCTION_NAME", "local")
+
+# Outcome counters
+REQUESTS = "Requests"
+SUBMITTED = "Submitted"
+DUPLICATE = "Duplicate"
+BAD_REQUEST = "BadRequest"
+VALIDATION_FAILED = "ValidationFailed"
+SPAM_REJECTED = "SpamRejected"
+RATE_LIMITED = "RateLimited"
+SERVER_ERROR = "ServerError"
+EMAIL_DEFERRED = "EmailDeferred"
+EMAIL_FAILED = "EmailFailed"
+
+
+class MetricsCollector:
+    """Thread-safe ring buffer of finished requests.
+
+    Each record is a dict with ``stages`` (milliseconds), ``counters`` and ``statusCode``.
+    Counter and status-code totals are also kept for the collector's lifetime, so
+    long-running processes can expose them as monotonic counters.
+    """
+
+    def __init__(self, max_records: int = METRICS_COLLECTOR_SIZE) -> None:
+        self._records: Deque[Dict[str, Any]] = deque(maxlen=max_records)
+        self._totals: Dict[str, int] = {}
+        self._status_totals: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._records.append(record)
+            for name, value in record["counters"].items():
+                self._totals[name] = self._totals.get(name, 0) + value
+            status = record["statusCode"]
+            self._status_totals[status] = self._status_totals.get(status, 0) + 1
+
+    def totals(self) -> Dict[str, int]:
+        """Lifetime totals of every outcome counter."""
+        with self._lock:
+            return dict(self._totals)
+
+    def status_totals(self) -> Dict[int, int]:
+        """Lifetime request counts by HTTP status code."""
+        with self._lock:
+            return dict(self._status_totals)
+
+    def records(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._records)
+
+    def stage_samples(self, stage: str) -> List[float]:
+        """Durations in milliseconds recorded for ``stage``."""
+        return [record["stages"][stage] for record in self.records() if stage in record["stages"]]
+
+    def count(self, name: str) -> int:
+        """Total of counter ``name`` across the kept records."""
+        return sum(record["counters"].get(name, 0) for record in self.records())
+
+    def reset(self) -> None:
+        with self._lock:
+            self._records.clear()
+            self._totals.clear()
+            self._status_totals.clear()
+
+
+collector = MetricsCollector()
+
+
+class RequestMetrics:
+    """Timers and counters for one request."""
+
+    def __init__(
+        self,
+        emit: Callable[[str], None] = print,
+        sample_rate: float = METRICS_SAMPLE_RATE,
+        clock: Callable[[], float] = time.perf_counter,
+        sink: Optional[MetricsCollector] = None,
+    ) -> None:
+        self._emit = emit
+        self._sample_rate = sample_rate
+        self._clock = clock
+        self._sink = collector if sink is None else sink
+        self._started = clock()
+        self.stages: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self.properties: Dict[str, Any] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as ``name`` (milliseconds, accumulated on repeat)."""
+        started = self._clock()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (self._clock() - started) * 1000
+
+    def count(self, name: str, value: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_property(self, name: str, value: Any) -> None:
+        """Attach a searchable, non-metric field to the log line."""
+        self.properties[name] = value
+
+    def finish(self, status_code: int) -> Dict[str, Any]:
+        """Record the request and print its EMF line if it is sampled."""
+        self.stages["Total"] = (self._clock() - self._started) * 1000
+        if status_code >= 500:
+            self.count(SERVER_ERROR)
+        record = {"stages": dict(self.stages), "counters": dict(self.counters), "statusCode": status_code}
+        self._sink.add(record)
+        if status_code >= 500:
+            self._emit(codec.dumps(self.to_emf(status_code, sample_rate=1.0)))
+        elif random.random() < self._sample_rate:
+            self._emit(codec.dumps(self.to_emf(status_code)))
+        return record
+
+    def to_emf(
+        self, status_code: int, timestamp_ms: Optional[int] = None, sample_rate: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Build the EMF document for this request, with counters scaled by ``1 / sample_rate``."""
+        rate = self._sample_rate if sample_rate is None else sample_rate
+        weight = 1 / rate if rate > 0 else 1.0
+        metric_values: Dict[str, Any] = {f"{name}Latency": round(ms, 3) for name, ms in self.stages.items()}
+        definitions = [{"Name": name, "Unit": "Milliseconds"} for name in metric_values]
+        for name, value in {REQUESTS: 1, **self.counters}.items():
+            metric_values[name] = round(value * weight, 6)
+            definitions.append({"Name": name, "Unit": "Count"})
+
+        return {
+            "_aws": {
+                "Timestamp": int(time.time() * 1000) if timestamp_ms is None else timestamp_ms,
+                "CloudWatchMetrics": [
+                    {"Namespace": METRICS_NAMESPACE, "Dimensions": [["FunctionName"]], "Metrics": definitions}
+                ],
+            },
+            "FunctionName": FUNCTION_NAME,
+            "StatusCode": status_code,
+            "SampleRate": rate,
+            **self.properties,
+            **metric_values,
+        }
+
+
+class _NullMetrics(RequestMetrics):
+    """Stand-in used when METRICS_ENABLED is false; records nothing."""
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        yield
+
+    def count(self, name: str, value: int = 1) -> None:
+        pass
+
+    def set_property(self, name: str, value: Any) -> None:
+        pass
+
+    def finish(self, status_code: int) -> Dict[str, Any]:
+        return {"stages": {}, "counters": {}, "statusCode": status_code}
+
+
+def start_request() -> RequestMetrics:
+    """Begin collecting metrics for one request."""
+    if not METRICS_ENABLED:
+        return _NullMetrics()
+    return RequestMetrics(sample_rate=METRICS_SAMPLE_RATE)
@@ -0,0 +1,217 @@
+"""Transactional email outbox for contact form submissions.
+
+In outbox mode the handler writes the submission together with an "email
+pending" marker and returns without calling SES. The marker attributes place the
+row in the sparse ``EmailOutboxIndex`` GSI; a scheduled worker drains that index
+in batches, sends the notification emails and records the outcome on each row.
+"""
+
+import os
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from dynamo_serializer import serialize_item
+from item_codec import decode_item
+
+OUTBOX_INDEX = os.environ.get("OUTBOX_INDEX", "EmailOutboxIndex")
+OUTBOX_BATCH_SIZE = int(os.environ.get("OUTBOX_BATCH_SIZE", "25"))
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get("OUTBOX_MAX_ATTEMPTS", "5"))
+OUTBOX_BASE_DELAY_SECONDS = int(os.environ.get("OUTBOX_BASE_DELAY_SECONDS", "30"))
+OUTBOX_MAX_DELAY_SECONDS = int(os.environ.get("OUTBOX_MAX_DELAY_SECONDS", "3600"))
+OUTBOX_LEASE_SECONDS = int(os.environ.get("OUTBOX_LEASE_SECONDS", "120"))
+
+EMAIL_QUEUE = "email"
+# Rows batched into summary emails by digest.drain
+DIGEST_QUEUE = "digest"
+
+STATUS_PENDING = "pending"
+STATUS_SENT = "sent"
+STATUS_FAILED = "failed"
+
+# Stop draining when the invocation has less than this much time left
+MIN_REMAINING_MS = 5000
+
+
+def pending_attributes(now: int, queue: str = EMAIL_QUEUE) -> Dict[str, Any]:
+    """Attributes that mark a new submission as waiting for email delivery."""
+    return {
+        "emailStatus": STATUS_PENDING,
+        "emailAttempts": 0,
+        "outboxQueue": queue,
+        "nextAttemptAt": now,
+    }
+
+
+def defer(client: Any, table_name: str, item: Dict[str, Any], now: int, error: str) -> None:
+    """Queue an already stored submission for the outbox worker after a failed send."""
+    client.update_item(
+        TableName=table_name,
+        Key=_key(item),
+        UpdateExpression="SET emailStatus = :pending, emailAttempts = :zero, outboxQueue = :queue, "
+        "nextAttemptAt = :now, lastError = :error",
+        ExpressionAttributeValues=serialize_item(
+            {":pending": STATUS_PENDING, ":zero": 0, ":queue": EMAIL_QUEUE, ":now": now, ":error": error[:500]}
+        ),
+    )
+
+
+def record_failure(client: Any, table_name: str, item: Dict[str, Any], error: str) -> None:
+    """Record a send that failed for good (not worth retrying) on an already stored submission."""
+    client.update_item(
+        TableName=table_name,
+        Key=_key(item),
+        UpdateExpression="SET emailStatus = :failed, emailAttempts = :one, lastError = :error",
+        ExpressionAttributeValues=serialize_item({":failed": STATUS_FAILED, ":one": 1, ":error": error[:500]}),
+    )
+
+
+def backoff_delay(attempts: int, rng: Optional[random.Random] = None) -> int:
+    """Seconds to wait before the next attempt (exponential backoff with jitter)."""
+    ceiling = min(OUTBOX_MAX_DELAY_SECONDS, OUTBOX_BASE_DELAY_SECONDS * (2 ** max(attempts - 1, 0)))
+    jitter = (rng or random).uniform(0, ceiling / 2)
+    return int(ceiling / 2 + jitter)
+
+
+def fetch_due(client: Any, table_name: str, now: int, limit: int, queue: str = EMAIL_QUEUE) -> List[Dict[str, Any]]:
+    """Return up to ``limit`` outbox rows whose next attempt is due."""
+    response = client.query(
+        TableName=table_name,
+        IndexName=OUTBOX_INDEX,
+        KeyConditionExpression="outboxQueue = :queue AND nextAttemptAt <= :now",
+        ExpressionAttributeValues=serialize_item({":queue": queue, ":now": now}),
+        Limit=limit,
+    )
+    return [decode_item(item) for item in response.get("Items", [])]
+
+
+def claim(client: Any, table_name: str, item: Dict[str, Any], now: int) -> bool:
+    """Lease a row so concurrent workers do not send the same email twice."""
+    try:
+        client.update_item(
+            TableName=table_name,
+            Key=_key(item),
+            UpdateExpression="SET nextAttemptAt = :lease",
+            ConditionExpression="nextAttemptAt = :seen AND emailStatus = :pending",
+            ExpressionAttributeValues=serialize_item(
+                {
+                    ":lease": now + OUTBOX_LEASE_SECONDS,
+                    ":seen": item["nextAttemptAt"],
+                    ":pending": STATUS_PENDING,
+                }
+            ),
+        )
+    except client.exceptions.ConditionalCheckFailedException:
+        return False
+    return True
+
+
+def mark_sent(client: Any, table_name: str, item: Dict[str, Any], now: int) -> None:
+    """Record a successful delivery and drop the row out of the outbox index."""
+    client.update_item(
+        TableName=table_name,
+        Key=_key(item),
+        UpdateExpression="SET emailStatus = :sent, emailSentAt = :now, emailAttempts = emailAttempts + :one "
+        "REMOVE outboxQueue, nextAttemptAt, lastError",
+        ExpressionAttributeValues=serialize_item({":sent": STATUS_SENT, ":now": now, ":one": 1}),
+    )
+
+
+def record_sent(client: Any, table_name: str, item: Dict[str, Any], now: int) -> bool:
+    """``mark_sent`` after the email went out; a failure is logged instead of raised.
+
+    Raising would abort the drain and leave every later row of the batch to a
+    re-send. The unmarked row keeps its lease and is sent again once it ends.
+    """
+    try:
+        mark_sent(client, table_name, item, now)
+    except Exception as e:
+        print(f"Email for {item['submissionId']} was sent but not marked sent: {str(e)}")
+        return False
+    return True
+
+
+def mark_failed(client: Any, table_name: str, item: Dict[str, Any], now: int, error: str) -> str:
+    """Record a failed attempt, scheduling a retry or giving up. Returns the new status."""
+    attempts = int(item.get("emailAttempts", 0)) + 1
+    if attempts >= OUTBOX_MAX_ATTEMPTS:
+        client.update_item(
+            TableName=table_name,
+            Key=_key(item),
+            UpdateExpression="SET emailStatus = :failed, emailAttempts = :attempts, lastError = :error "
+            "REMOVE outboxQueue, nextAttemptAt",
+            ExpressionAttributeValues=serialize_item(
+                {":failed": STATUS_FAILED, ":attempts": attempts, ":error": error[:500]}
+            ),
+        )
+        return STATUS_FAILED
+
+    client.update_item(
+        TableName=table_name,
+        Key=_key(item),
+        UpdateExpression="SET emailAttempts = :attempts, nextAttemptAt = :next, lastError = :error",
+        ExpressionAttributeValues=serialize_item(
+            {
+                ":attempts": attempts,
+                ":next": now + backoff_delay(attempts),
+                ":error": error[:500],
+            }
+        ),
+    )
+    return STATUS_PENDING
+
+
+def drain(
+    client: Any,
+    table_name: str,
+    send: Callable[[Dict[str, Any]], None],
+    context: Any = None,
+    batch_size: int = OUTBOX_BATCH_SIZE,
+    clock: Callable[[], float] = time.time,
+    paused: Optional[Callable[[], bool]] = None,
+) -> Dict[str, int]:
+    """Send emails for all due outbox rows, batch by batch.
+
+    Stops when no due rows remain, the Lambda invocation is close to its
+    timeout, or ``paused()`` turns true (e.g. the SES circuit breaker opened);
+    unsent rows stay pending without using up an attempt. Returns counts of
+    sent, retried and permanently failed rows.
+    """
+    summary = {"sent": 0, "retried": 0, "failed": 0, "skipped": 0}
+
+    while True:
+        now = int(clock())
+        batch = fetch_due(client, table_name, now, batch_size)
+        if not batch:
+            break
+
+        for item in batch:
+            if paused is not None and paused():
+                return summary
+            if not claim(client, table_name, item, now):
+                summary["skipped"] += 1
+                continue
+            try:
+                send(item)
+            except Exception as e:
+                print(f"Outbox delivery failed for {item['submissionId']}: {str(e)}")
+                status = mark_failed(client, table_name, item, now, str(e))
+                summary["failed" if status == STATUS_FAILED else "retried"] += 1
+            else:
+                record_sent(client, table_name, item, now)
+                summary["sent"] += 1
+
+        if len(batch) < batch_size or out_of_time(context):
+            break
+
+    return summary
+
+
+def _key(item: Dict[str, Any]) -> Dict[str, Any]:
+    return serialize_item({"submissionId": item["submissionId"], "timestamp": item["timestamp"]})
+
+
+def out_of_time(context: Any) -> bool:
+    """Whether the Lambda invocation is too close to its timeout to start another batch."""
+    get_remaining = getattr(context, "get_remaining_time_in_millis", None)
+    return bool(get_remaining) and get_remaining() < MIN_REMAINING_MS
@@ -0,0 +1,304 @@
+"""On-demand profiling of single ``lambda_handler`` invocations.
+
+An invocation is profiled when it is sampled (``PROFILE_SAMPLE_RATE``) or when
+it carries ``X-Profile: <PROFILE_TOKEN>``. It then runs under cProfile and
+tracemalloc, and one JSON line is logged when it finishes::
+
+    {"profile": 1, "t": ..., "status": 200, "wallMs": 48.2, "overheadMs": 3.1,
+     "cpu": {"top": [...], "stacks": {"contact_handler.py:lambda_handler;...": 812}},
+     "memory": {"peakKiB": 412.5, "top": [...], "stacks": {"codec.py:41;...": 2048}}}
+
+``cpu.top`` lists the ``PROFILE_TOP_N`` functions with the most own time.
+``cpu.stacks`` holds folded call stacks with their own time in microseconds.
+cProfile records caller/callee pairs, not whole stacks, so each function's
+time is split over its callers in proportion to their call counts.
+``memory.top`` lists the allocation sites holding the most memory when the
+invocation ends, and ``memory.stacks`` gives their tracebacks in bytes.
+
+Profiling slows the invocation it wraps several times over. To bound the
+cost, at most ``PROFILE_MAX_PER_MINUTE`` invocations per container are
+profiled, only one at a time (cProfile and tracemalloc are process-wide), and
+the record is capped at ``PROFILE_MAX_STACKS`` stacks per kind.
+
+``python src/profiling.py`` merges the records found in log files into one
+folded-stacks file for flamegraph.pl, speedscope or inferno, and prints the
+hottest functions:
+
+    python src/profiling.py exported-logs/*.txt --out cpu.folded
+    python src/profiling.py exported-logs/*.txt --kind memory --out memory.folded
+"""
+
+import argparse
+import cProfile
+import hmac
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import codec
+from rate_limit import LocalRateLimiter
+
+# Fraction of invocations profiled (0 turns sampling off)
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+# Requests sending "X-Profile: <token>" are profiled; the header is ignored when unset
+PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN", "")
+# Most invocations profiled per container per minute, whatever triggered them
+PROFILE_MAX_PER_MINUTE = int(os.environ.get("PROFILE_MAX_PER_MINUTE", "6"))
+PROFILE_TOP_N = int(os.environ.get("PROFILE_TOP_N", "15"))
+PROFILE_MAX_STACKS = int(os.environ.get("PROFILE_MAX_STACKS", "30"))
+# Traceback depth kept for allocations; 0 profiles CPU only
+PROFILE_MEMORY_FRAMES = int(os.environ.get("PROFILE_MEMORY_FRAMES", "8"))
+
+PROFILE_HEADER = "x-profile"
+# Deepest caller chain followed when folding cProfile data into stacks
+MAX_STACK_DEPTH = 32
+# Caller chains carrying less than this share of a function's calls are not followed
+MIN_STACK_SHARE = 0.01
+
+PROFILING_ENABLED = PROFILE_SAMPLE_RATE > 0 or bool(PROFILE_TOKEN)
+
+_busy = threading.Lock()
+_budget = LocalRateLimiter(
+    capacity=PROFILE_MAX_PER_MINUTE, refill_per_second=PROFILE_MAX_PER_MINUTE / 60, max_clients=1
+)
+
+FunctionKey = Tuple[str, int, str]
+
+
+def _requested(event: Dict[str, Any]) -> bool:
+    if not PROFILE_TOKEN:
+        return False
+    for name, value in (event.get("headers") or {}).items():
+        if name.lower() == PROFILE_HEADER and value:
+            return hmac.compare_digest(value.encode("utf-8"), PROFILE_TOKEN.encode("utf-8"))
+    return False
+
+
+def start(event: Dict[str, Any]) -> Optional["ProfileSession"]:
+    """Begin profiling this invocation if it is sampled or asked for; None otherwise."""
+    if not (_requested(event) or random.random() < PROFILE_SAMPLE_RATE):
+        return None
+    if not _busy.acquire(blocking=False):
+        return None
+    if not _budget.allow("profile"):
+        _busy.release()
+        return None
+    return ProfileSession()
+
+
+class ProfileSession:
+    """cProfile and tracemalloc running around one invocation."""
+
+    def __init__(self) -> None:
+        self._started = time.perf_counter()
+        # Leave tracemalloc alone if something else (a benchmark, a debugger) is already tracing
+        self._memory = PROFILE_MEMORY_FRAMES > 0 and not tracemalloc.is_tracing()
+        if self._memory:
+            tracemalloc.start(PROFILE_MEMORY_FRAMES)
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+
+    def finish(self, status_code: int) -> Optional[Dict[str, Any]]:
+        """Stop profiling and log the record; returns it, or None when it could not be built."""
+        try:
+            self._profiler.disable()
+            wall = time.perf_counter() - self._started
+            finished = time.perf_counter()
+            record: Dict[str, Any] = {"profile": 1, "t": round(time.time(), 3), "status": status_code}
+            record["wallMs"] = round(wall * 1000, 3)
+            if self._memory:
+                # Snapshot before building the CPU summary, so its allocations are not in it
+                peak = tracemalloc.get_traced_memory()[1]
+                snapshot = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+                record["memory"] = memory_summary(snapshot, peak, PROFILE_TOP_N, PROFILE_MAX_STACKS)
+            record["cpu"] = cpu_summary(pstats.Stats(self._profiler).stats, PROFILE_TOP_N, PROFILE_MAX_STACKS)
+            record["overheadMs"] = round((time.perf_counter() - finished) * 1000, 3)
+            print(codec.dumps(record))
+            return record
+        except Exception as e:
+            # Never fail a request because it could not be profiled
+            print(f"Profiling failed: {str(e)}")
+            return None
+        finally:
+            if self._memory and tracemalloc.is_tracing():
+                tracemalloc.stop()
+            _busy.release()
+
+
+def _profiled(key: FunctionKey) -> bool:
+    # The profiler's own disable() call and this module's frames are not part of the invocation
+    return key[0] != __file__ and "_lsprof.Profiler" not in key[2]
+
+
+def _label(key: FunctionKey) -> str:
+    filename, lineno, name = key
+    if filename == "~":
+        # Built-ins: "<built-in method time.sleep>", "<method 'append' of 'list' objects>"
+        return name
+    return f"{os.path.basename(filename)}:{name}"
+
+
+def fold(
+    stats: Dict[FunctionKey, Any], max_depth: int = MAX_STACK_DEPTH, min_share: float = MIN_STACK_SHARE
+) -> Dict[str, float]:
+    """Own time in seconds per folded stack (``root;...;leaf``) from cProfile stats.
+
+    Caller chains are followed up to ``max_depth`` frames; chains carrying less
+    than ``min_share`` of a function's calls are cut short at that function.
+    Recursive calls are left out of the chains.
+    """
+    chains: Dict[FunctionKey, Dict[str, float]] = {}
+    active: Set[FunctionKey] = set()
+
+    def chains_to(key: FunctionKey) -> Dict[str, float]:
+        # Call chains ending at key, with the share of key's calls made along each
+        if key in chains:
+            return chains[key]
+        label = _label(key)
+        active.add(key)
+        callers = {
+            caller: calls[1]
+            for caller, calls in stats[key][4].items()
+            if caller in stats and caller not in active and _profiled(caller)
+        }
+        total = sum(callers.values())
+        found: Dict[str, float] = {}
+        if not total or len(active) > max_depth:
+            found[label] = 1.0
+        else:
+            for caller, calls in callers.items():
+                for chain, share in chains_to(caller).items():
+                    share *= calls / total
+                    chain = chain + ";" + label if share >= min_share else label
+                    found[chain] = found.get(chain, 0.0) + share
+        active.discard(key)
+        chains[key] = found
+        return found
+
+    folded: Dict[str, float] = {}
+    for key, (_, _, own, _, _) in stats.items():
+        if own > 0 and _profiled(key):
+            for chain, share in chains_to(key).items():
+                folded[chain] = folded.get(chain, 0.0) + own * share
+    return folded
+
+
+def _top_stacks(stacks: Dict[str, float], limit: int, scale: float) -> Dict[str, int]:
+    ordered = sorted(stacks.items(), key=lambda pair: -pair[1])
+    kept = {stack: round(value * scale) for stack, value in ordered[:limit]}
+    rest = sum(value for _, value in ordered[limit:])
+    if rest:
+        kept["(other)"] = round(rest * scale)
+    return {stack: value for stack, value in kept.items() if value > 0}
+
+
+def cpu_summary(stats: Dict[FunctionKey, Any], top_n: int, max_stacks: int) -> Dict[str, Any]:
+    """Hottest functions by own time, and folded stacks in microseconds."""
+    ranked = sorted(((key, value) for key, value in stats.items() if _profiled(key)), key=lambda kv: -kv[1][2])
+    top = [
+        {"fn": _label(key), "calls": calls, "ownMs": round(own * 1000, 3), "cumMs": round(cumulative * 1000, 3)}
+        for key, (_, calls, own, cumulative, _) in ranked[:top_n]
+    ]
+    return {"top": top, "stacks": _top_stacks(fold(stats), max_stacks, 1e6)}
+
+
+def memory_summary(snapshot: tracemalloc.Snapshot, peak: int, top_n: int, max_stacks: int) -> Dict[str, Any]:
+    """Peak traced memory, the allocation sites holding the most, and their tracebacks in bytes."""
+    sites: Dict[str, List[int]] = {}
+    stacks: Dict[str, float] = {}
+    for stat in snapshot.statistics("traceback"):
+        frames = [f"{os.path.basename(frame.filename)}:{frame.lineno}" for frame in stat.traceback]
+        stacks[";".join(frames)] = float(stat.size)
+        site = sites.setdefault(frames[-1], [0, 0])
+        site[0] += stat.size
+        site[1] += stat.count
+    ranked = sorted(sites.items(), key=lambda pair: -pair[1][0])[:top_n]
+    return {
+        "peakKiB": round(peak / 1024, 1),
+        "top": [{"site": site, "bytes": size, "count": count} for site, (size, count) in ranked],
+        "stacks": _top_stacks(stacks, max_stacks, 1),
+    }
+
+
+def load(lines: Iterable[str]) -> List[Dict[str, Any]]:
+    """Profile records from log lines; other lines and any prefix before ``{`` are skipped."""
+    records = []
+    for line in lines:
+        start = line.find("{")
+        if start < 0 or '"profile"' not in line:
+            continue
+        try:
+            entry = codec.loads(line[start:])
+        except (codec.JSONDecodeError, ValueError):
+            continue
+        if isinstance(entry, dict) and entry.get("profile") == 1:
+            records.append(entry)
+    return records
+
+
+def merge(records: List[Dict[str, Any]], kind: str = "cpu") -> Dict[str, int]:
+    """Sum the folded stacks of ``kind`` (``cpu`` or ``memory``) across records."""
+    merged: Dict[str, int] = {}
+    for entry in records:
+        for stack, value in entry.get(kind, {}).get("stacks", {}).items():
+            merged[stack] = merged.get(stack, 0) + value
+    return merged
+
+
+def hottest(records: List[Dict[str, Any]], limit: int) -> List[Tuple[str, float, int]]:
+    """``(function, total own ms, records it appeared in)`` across records, hottest first."""
+    totals: Dict[str, List[float]] = {}
+    for entry in records:
+        for row in entry.get("cpu", {}).get("top", []):
+            total = totals.setdefault(row["fn"], [0.0, 0])
+            total[0] += row["ownMs"]
+            total[1] += 1
+    ranked = sorted(totals.items(), key=lambda pair: -pair[1][0])[:limit]
+    return [(name, own, int(count)) for name, (own, count) in ranked]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Merge logged profile records into one folded-stacks report")
+    parser.add_argument("logs", nargs="+", help="log files holding profile records")
+    parser.add_argument("--kind", choices=["cpu", "memory"], default="cpu")
+    parser.add_argument("--out", help="folded-stacks file to write (default: stdout)")
+    parser.add_argument("--top", type=int, default=20, help="hottest functions printed")
+    args = parser.parse_args()
+
+    records: List[Dict[str, Any]] = []
+    for path in args.logs:
+        with open(path, encoding="utf-8", errors="replace") as fh:
+            records.extend(load(fh))
+    if not records:
+        parser.exit(1, "error: no profile records found\n")
+
+    merged = merge(records, args.kind)
+    lines = [f"{stack} {value}" for stack, value in sorted(merged.items())]
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write("\n".join(lines) + "\n")
+    else:
+        print("\n".join(lines))
+
+    wall = sorted(entry["wallMs"] for entry in records)
+    summary = [f"{len(records)} profiled invocations, wall p50 {wall[len(wall) // 2]:.1f} ms, max {wall[-1]:.1f} ms"]
+    if args.kind == "cpu":
+        summary.append(f"{'own ms':>10} {'seen in':>8}  function")
+        summary.extend(f"{own:10.2f} {count:8d}  {name}" for name, own, count in hottest(records, args.top))
+    else:
+        peaks = sorted(entry["memory"]["peakKiB"] for entry in records if "memory" in entry)
+        if peaks:
+            summary.append(f"peak traced memory p50 {peaks[len(peaks) // 2]:.0f} KiB, max {peaks[-1]:.0f} KiB")
+    # The summary goes to stderr when the folded stacks go to stdout
+    for text in summary:
+        print(text, file=sys.stdout if args.out else sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
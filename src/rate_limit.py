@@ -0,0 +1,143 @@
+"""Per-client admission control for contact form submissions.
+
+Two tiers run in front of ``store_submission``:
+
+* an in-container token bucket per source IP, kept in a bounded LRU map, that
+  rejects floods without any network call, and
+* an optional shared fixed-window counter in the state table (``STATE_TABLE``),
+  updated with an atomic conditional ``UpdateItem`` so the limit holds across
+  concurrent Lambda instances.
+
+The shared tier fails open: if DynamoDB errors, the request is admitted and the
+local bucket still applies.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from dynamo_serializer import serialize_item
+
+# Off unless set; under http_adapter behind a proxy, also trust X-Forwarded-For or all clients share a bucket
+RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "false").lower() == "true"
+# Local token bucket: burst size and sustained submissions per minute per IP
+RATE_LIMIT_BURST = int(os.environ.get("RATE_LIMIT_BURST", "10"))
+RATE_LIMIT_PER_MINUTE = float(os.environ.get("RATE_LIMIT_PER_MINUTE", "10"))
+RATE_LIMIT_MAX_CLIENTS = int(os.environ.get("RATE_LIMIT_MAX_CLIENTS", "10000"))
+# Shared fixed window across all containers (only when STATE_TABLE is set)
+STATE_TABLE = os.environ.get("STATE_TABLE", "")
+RATE_LIMIT_WINDOW_SECONDS = int(os.environ.get("RATE_LIMIT_WINDOW_SECONDS", "60"))
+RATE_LIMIT_WINDOW_MAX = int(os.environ.get("RATE_LIMIT_WINDOW_MAX", "20"))
+
+
+class TokenBucket:
+    """Classic token bucket; refilled lazily on each check."""
+
+    __slots__ = ("tokens", "updated_at")
+
+    def __init__(self, tokens: float, now: float) -> None:
+        self.tokens = tokens
+        self.updated_at = now
+
+
+class LocalRateLimiter:
+    """Token buckets per client key with least-recently-used eviction."""
+
+    def __init__(
+        self,
+        capacity: int = RATE_LIMIT_BURST,
+        refill_per_second: float = RATE_LIMIT_PER_MINUTE / 60,
+        max_clients: int = RATE_LIMIT_MAX_CLIENTS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_clients = max_clients
+        self._clock = clock
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def allow(self, key: str) -> bool:
+        """Take one token from ``key``'s bucket; False when it is empty."""
+        now = self._clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self.capacity, now)
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket.tokens = min(self.capacity, bucket.tokens + (now - bucket.updated_at) * self.refill_per_second)
+                bucket.updated_at = now
+
+            if bucket.tokens < 1:
+                return False
+            bucket.tokens -= 1
+            return True
+
+
+class SharedRateLimiter:
+    """Fixed-window counter per client key stored in the shared state table."""
+
+    def __init__(
+        self,
+        client: Any,
+        table_name: str,
+        limit: int = RATE_LIMIT_WINDOW_MAX,
+        window_seconds: int = RATE_LIMIT_WINDOW_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._client = client
+        self._table_name = table_name
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self._clock = clock
+
+    def allow(self, key: str) -> bool:
+        """Atomically count one hit; False when the window is already full."""
+        now = int(self._clock())
+        window_start = now - now % self.window_seconds
+        try:
+            self._client.update_item(
+                TableName=self._table_name,
+                Key=serialize_item({"pk": f"ratelimit#{key}", "sk": str(window_start)}),
+                UpdateExpression="ADD hits :one SET #ttl = :ttl",
+                ConditionExpression="attribute_not_exists(hits) OR hits < :limit",
+                ExpressionAttributeNames={"#ttl": "ttl"},
+                ExpressionAttributeValues=serialize_item(
+                    {":one": 1, ":limit": self.limit, ":ttl": window_start + 2 * self.window_seconds}
+                ),
+            )
+        except self._client.exceptions.ConditionalCheckFailedException:
+            return False
+        except Exception as e:
+            # Fail open: the local bucket still protects this container
+            print(f"Shared rate limit check failed: {str(e)}")
+        return True
+
+
+class RateLimiter:
+    """Local bucket first, then the shared counter."""
+
+    def __init__(self, local: LocalRateLimiter, shared: Optional[SharedRateLimiter] = None) -> None:
+        self.local = local
+        self.shared = shared
+
+    def admit(self, key: str) -> bool:
+        if not self.local.allow(key):
+            return False
+        return self.shared is None or self.shared.allow(key)
+
+
+def build_limiter(client_factory: Callable[[], Any]) -> RateLimiter:
+    """Build a limiter from the environment; ``client_factory`` supplies the DynamoDB client."""
+    shared = None
+    if STATE_TABLE:
+        shared = SharedRateLimiter(client_factory(), STATE_TABLE, RATE_LIMIT_WINDOW_MAX, RATE_LIMIT_WINDOW_SECONDS)
+    return RateLimiter(LocalRateLimiter(RATE_LIMIT_BURST, RATE_LIMIT_PER_MINUTE / 60, RATE_LIMIT_MAX_CLIENTS), shared)
@@ -0,0 +1,171 @@
+"""Cheap checks that reject oversized or malformed request bodies before parsing.
+
+``lambda_handler`` used to ``json.loads`` any body API Gateway handed it (up to
+10 MB) and only then find out the message was too long. ``parse_body`` does the
+cheap checks first, each one bounded by the size of a valid submission:
+
+* ``Content-Type``, when sent, must be JSON.
+* The body length, in bytes, must fit ``REQUEST_MAX_BODY_BYTES``. By default this
+  is derived from ``CONTACT_FORM_SCHEMA``: every field at its ``maxLength`` with
+  each character in its longest escaped form. Base64 bodies
+  (``isBase64Encoded``) are measured before they are decoded.
+* The JSON object is read member by member and the read stops at the first
+  nested object or array or once there are more than ``REQUEST_MAX_FIELDS``
+  members. String values are decoded by the ``json`` module's C scanner.
+
+Rejections raise ``RequestRejected`` with the HTTP status to return. Malformed
+JSON raises ``codec.JSONDecodeError``, just as parsing with ``codec.loads`` did.
+"""
+
+import base64
+import binascii
+import os
+import re
+from json.decoder import scanstring
+from typing import Any, Dict, Optional, Tuple
+
+import codec
+from validation import CONTACT_FORM_SCHEMA
+
+# Longest escaped form of one character: a surrogate pair, "\uXXXX\uXXXX"
+MAX_BYTES_PER_CHAR = 12
+# Characters allowed for schema fields without a maxLength (RFC 3696 email length)
+UNBOUNDED_FIELD_CHARS = 320
+# Room for whitespace between tokens and a few fields outside the schema
+BODY_SLACK_BYTES = 1024
+
+
+def max_body_bytes(schema: Dict[str, Any]) -> int:
+    """Largest JSON body, in bytes, that a valid payload for ``schema`` can need."""
+    total = 2 + BODY_SLACK_BYTES  # braces
+    for name, spec in schema.get("properties", {}).items():
+        chars = spec.get("maxLength", UNBOUNDED_FIELD_CHARS)
+        # quoted key, colon, comma, quoted value
+        total += len(name) + 6 + chars * MAX_BYTES_PER_CHAR
+    return total
+
+
+# Largest accepted body in bytes; 0 derives it from the contact form schema
+REQUEST_MAX_BODY_BYTES = int(os.environ.get("REQUEST_MAX_BODY_BYTES", "0")) or max_body_bytes(CONTACT_FORM_SCHEMA)
+# Most members accepted in the top-level JSON object
+REQUEST_MAX_FIELDS = int(os.environ.get("REQUEST_MAX_FIELDS", "20"))
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_SCALAR = re.compile(r"-?(?:0|[1-9][0-9]*)(\.[0-9]+)?([eE][-+]?[0-9]+)?|true|false|null")
+_CONSTANTS = {"true": True, "false": False, "null": None}
+
+
+class RequestRejected(Exception):
+    """A request refused before parsing, with the HTTP status to answer with."""
+
+    def __init__(self, status_code: int, message: str) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+TOO_LARGE = (413, "Request body is too large")
+UNSUPPORTED_TYPE = (415, "Content-Type must be application/json")
+NOT_A_FORM = (400, "Request body must be a JSON object of form fields")
+INVALID_ENCODING = (400, "Request body is not valid base64-encoded UTF-8")
+
+
+def parse_body(event: Dict[str, Any], max_bytes: Optional[int] = None, max_fields: Optional[int] = None) -> Any:
+    """Check and parse the JSON body of an API Gateway proxy ``event``."""
+    max_bytes = REQUEST_MAX_BODY_BYTES if max_bytes is None else max_bytes
+    check_content_type(event.get("headers"))
+    text = decode_body(event.get("body") or "", bool(event.get("isBase64Encoded")), max_bytes)
+    return parse_form(text, REQUEST_MAX_FIELDS if max_fields is None else max_fields)
+
+
+def check_content_type(headers: Optional[Dict[str, str]]) -> None:
+    """Reject a ``Content-Type`` that is present and not JSON (header names are case-insensitive)."""
+    for name, value in (headers or {}).items():
+        if name.lower() == "content-type":
+            media_type = value.split(";", 1)[0].strip().lower()
+            if media_type != "application/json" and not (
+                media_type.startswith("application/") and media_type.endswith("+json")
+            ):
+                raise RequestRejected(*UNSUPPORTED_TYPE)
+            return
+
+
+def decode_body(body: str, is_base64: bool, max_bytes: int) -> str:
+    """Return the body as text, refusing anything longer than ``max_bytes`` before decoding it."""
+    if is_base64:
+        # Every 4 base64 characters carry at most 3 bytes
+        if len(body) // 4 * 3 > max_bytes + 2:
+            raise RequestRejected(*TOO_LARGE)
+        try:
+            raw = base64.b64decode(body, validate=True)
+            if len(raw) > max_bytes:
+                raise RequestRejected(*TOO_LARGE)
+            return raw.decode("utf-8")
+        except (binascii.Error, UnicodeDecodeError):
+            raise RequestRejected(*INVALID_ENCODING) from None
+
+    # A character takes at least one byte, so only bodies that pass this need encoding to measure
+    if len(body) > max_bytes or (not body.isascii() and len(body.encode("utf-8")) > max_bytes):
+        raise RequestRejected(*TOO_LARGE)
+    return body
+
+
+def parse_form(text: str, max_fields: int) -> Any:
+    """Parse a flat JSON object, stopping at the first nested value or extra member.
+
+    Bodies that are not objects at all are parsed by ``codec.loads`` so the
+    validator reports them as before.
+    """
+    position = _WHITESPACE.match(text).end()
+    if text[position : position + 1] != "{":
+        return codec.loads(text)
+
+    result: Dict[str, Any] = {}
+    position = _WHITESPACE.match(text, position + 1).end()
+    if text[position : position + 1] == "}":
+        return _end(text, position + 1, result)
+
+    while True:
+        if text[position : position + 1] != '"':
+            raise codec.JSONDecodeError("Expecting property name enclosed in double quotes", text, position)
+        key, position = scanstring(text, position + 1)
+        position = _WHITESPACE.match(text, position).end()
+        if text[position : position + 1] != ":":
+            raise codec.JSONDecodeError("Expecting ':' delimiter", text, position)
+        position = _WHITESPACE.match(text, position + 1).end()
+
+        value, position = _scalar(text, position)
+        result[key] = value
+        if len(result) > max_fields:
+            raise RequestRejected(*NOT_A_FORM)
+
+        position = _WHITESPACE.match(text, position).end()
+        delimiter = text[position : position + 1]
+        position = _WHITESPACE.match(text, position + 1).end()
+        if delimiter == "}":
+            return _end(text, position, result)
+        if delimiter != ",":
+            raise codec.JSONDecodeError("Expecting ',' delimiter", text, position)
+
+
+def _scalar(text: str, position: int) -> Tuple[Any, int]:
+    first = text[position : position + 1]
+    if first == '"':
+        return scanstring(text, position + 1)
+    if first in ("{", "["):
+        raise RequestRejected(*NOT_A_FORM)
+    match = _SCALAR.match(text, position)
+    if match is None:
+        raise codec.JSONDecodeError("Expecting value", text, position)
+    token = match.group()
+    if token in _CONSTANTS:
+        return _CONSTANTS[token], match.end()
+    value = float(token) if match.group(1) or match.group(2) else int(token)
+    return value, match.end()
+
+
+def _end(text: str, position: int, result: Dict[str, Any]) -> Dict[str, Any]:
+    position = _WHITESPACE.match(text, position).end()
+    if position != len(text):
+        raise codec.JSONDecodeError("Extra data", text, position)
+    return result
@@ -0,0 +1,188 @@
+"""Multi-pattern spam term matcher.
+
+Blocklist terms are compiled into an Aho-Corasick automaton once per container,
+so scanning a message costs time proportional to the message length no matter
+how many terms are loaded. Text and terms go through the same normalization
+(compatibility decomposition, accent stripping, case folding and whitespace
+collapsing), and matches only count on word boundaries, so "loan" matches
+"LOAN" and "lóan" but not "loaned".
+"""
+
+import os
+import unicodedata
+from collections import deque
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+DEFAULT_SPAM_TERMS = ("viagra", "casino", "loan", "bitcoin", "crypto")
+# Error message of a submission rejected as spam
+SPAM_ERROR = "Message content appears to be spam"
+
+# Optional newline-separated blocklist file; "#" starts a comment
+SPAM_TERMS_FILE = os.environ.get("SPAM_TERMS_FILE", "")
+
+
+class SpamMatch(NamedTuple):
+    """A blocklist term found in a message; positions index the original text."""
+
+    term: str
+    start: int
+    end: int
+
+
+_char_cache: Dict[str, str] = {}
+
+
+def _normalize_char(ch: str) -> str:
+    normalized = _char_cache.get(ch)
+    if normalized is None:
+        if ch.isspace():
+            normalized = " "
+        else:
+            decomposed = unicodedata.normalize("NFKD", ch)
+            normalized = "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+        _char_cache[ch] = normalized
+    return normalized
+
+
+def normalize(text: str) -> Tuple[str, List[int]]:
+    """Normalize text for matching.
+
+    Returns the normalized string and, for every normalized character, the index
+    of the original character it came from.
+    """
+    chars: List[str] = []
+    offsets: List[int] = []
+    previous_space = True  # also strips leading whitespace
+    for index, ch in enumerate(text):
+        for out in _normalize_char(ch):
+            if out == " ":
+                if previous_space:
+                    continue
+                previous_space = True
+            else:
+                previous_space = False
+            chars.append(out)
+            offsets.append(index)
+    if chars and chars[-1] == " ":
+        chars.pop()
+        offsets.pop()
+    return "".join(chars), offsets
+
+
+def normalize_text(text: str) -> str:
+    """Same string as ``normalize(text)[0]``, with a fast path for ASCII text."""
+    if text.isascii():
+        return " ".join(text.lower().split())
+    return normalize(text)[0]
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class SpamMatcher:
+    """Aho-Corasick automaton over a set of normalized blocklist terms."""
+
+    def __init__(self, terms: Iterable[str]) -> None:
+        self.terms: List[str] = []
+        self._lengths: List[int] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+
+        seen = set()
+        for term in terms:
+            normalized = normalize(term)[0]
+            if not normalized or normalized in seen:
+                continue
+            seen.add(normalized)
+            self._add(normalized, term.strip())
+        self._build_failure_links()
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def _add(self, normalized: str, original: str) -> None:
+        state = 0
+        for ch in normalized:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = next_state
+        self._out[state] = self._out[state] + (len(self.terms),)
+        self.terms.append(original)
+        self._lengths.append(len(normalized))
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                # Inherit matches that end at the failure target (suffix terms)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def _scan(self, text: str, first_only: bool) -> List[SpamMatch]:
+        normalized = normalize_text(text)
+        offsets: Optional[List[int]] = None  # only needed once something matches
+        goto, fail, out, lengths = self._goto, self._fail, self._out, self._lengths
+        size = len(normalized)
+        matches: List[SpamMatch] = []
+        state = 0
+        for index, ch in enumerate(normalized):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not out[state]:
+                continue
+            for term_id in out[state]:
+                start = index - lengths[term_id] + 1
+                if start > 0 and _is_word_char(normalized[start - 1]):
+                    continue
+                if index + 1 < size and _is_word_char(normalized[index + 1]):
+                    continue
+                if offsets is None:
+                    offsets = normalize(text)[1]
+                matches.append(SpamMatch(self.terms[term_id], offsets[start], offsets[index] + 1))
+                if first_only:
+                    return matches
+        return matches
+
+    def find_all(self, text: str) -> List[SpamMatch]:
+        """Return every whole-word blocklist match in ``text``."""
+        return self._scan(text, first_only=False)
+
+    def contains_any(self, text: str) -> bool:
+        """Return True as soon as one blocklist term is found."""
+        return bool(self._scan(text, first_only=True))
+
+
+def load_terms(path: str) -> List[str]:
+    """Read blocklist terms from a file, one per line."""
+    terms = []
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            term = line.split("#", 1)[0].strip()
+            if term:
+                terms.append(term)
+    return terms
+
+
+_matcher: Optional[SpamMatcher] = None
+
+
+def get_matcher() -> SpamMatcher:
+    """Return the container-wide matcher, building it on first use."""
+    global _matcher
+    if _matcher is None:
+        _matcher = SpamMatcher(load_terms(SPAM_TERMS_FILE) if SPAM_TERMS_FILE else DEFAULT_SPAM_TERMS)
+    return _matcher
@@ -0,0 +1,326 @@
+"""Naive Bayes spam classifier over hashed token features.
+
+A message is normalized like the blocklist matcher does it, split into words,
+and turned into a set of hashed features: every word (CRC32) and every pair of
+adjacent words (a mix of the two word hashes), in ``2 ** bits`` buckets. The model is one
+weight per bucket (the log-likelihood ratio of spam to ham, multinomial naive
+Bayes with add-one smoothing) plus a bias, the log ratio of the class priors.
+A message's spam probability is the sigmoid of the bias plus the weights of
+its features.
+
+The weights are stored as int8 with one scale factor and zlib-compressed. With
+the default 2 ** 18 buckets, the model trained on the benchmark corpus is a
+31 KiB file. Lambda
+loads ``SPAM_MODEL_FILE`` once per container. Scoring one message is a few
+dozen array lookups in plain Python: NumPy is not needed in the function and,
+at this size, its per-call overhead would cost more than the lookups.
+``SpamModel.score_batch`` scores many messages at once with NumPy, for
+re-scoring stored submissions.
+
+Training streams labeled rows out of the submissions table. A row is labeled
+by setting its ``spamLabel`` attribute to ``spam`` or ``ham``. Spam is
+rejected before it is stored, so spam examples usually come from NDJSON files
+(``{"message": ..., "label": "spam"}`` per line) given with ``--extra``.
+
+Usage:
+    python src/spam_model.py train --table <submissions-table> --extra spam.ndjson --out spam_model.bin
+    python src/spam_model.py rescore --table <submissions-table> --model spam_model.bin [--update]
+    python src/spam_model.py score --model spam_model.bin "Cheap loans, click here"
+"""
+
+import argparse
+import itertools
+import json
+import math
+import os
+import re
+import string
+import struct
+import zlib
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from dynamo_serializer import serialize_item
+from item_codec import decode_item, stored_names
+from spam_filter import normalize_text
+
+# Model bundled with the function; the keyword blocklist is used when unset
+SPAM_MODEL_FILE = os.environ.get("SPAM_MODEL_FILE", "")
+# Let the model alone decide; by default blocklisted terms are rejected before the model runs
+SPAM_MODEL_SKIP_BLOCKLIST = os.environ.get("SPAM_MODEL_SKIP_BLOCKLIST", "false").lower() == "true"
+# Messages scoring at or above this spam probability are rejected
+SPAM_MODEL_THRESHOLD = float(os.environ.get("SPAM_MODEL_THRESHOLD", "0.9"))
+
+DEFAULT_BITS = 18
+LABEL_ATTRIBUTE = "spamLabel"
+SCORE_ATTRIBUTE = "spamScore"
+
+MAGIC = b"SPNB"
+FORMAT_VERSION = 1
+# magic, version, hash bits, weight scale, bias
+_HEADER = struct.Struct("<4sBB2xff")
+_TOKEN = re.compile(r"\w+")
+# ASCII punctuation splits words like \w+ does, without the regex
+_PUNCTUATION = str.maketrans({ch: " " for ch in string.punctuation if ch != "_"})
+_PAIR_MULTIPLIER = 0x9E3779B1
+# Word hashes kept per container; the vocabulary of contact messages is small
+TOKEN_CACHE_SIZE = 100000
+_token_hashes: Dict[str, int] = {}
+
+
+def features(text: str, bits: int = DEFAULT_BITS) -> List[int]:
+    """Distinct hashed unigram and bigram buckets of ``text``."""
+    mask = (1 << bits) - 1
+    normalized = normalize_text(text)
+    tokens = normalized.translate(_PUNCTUATION).split() if normalized.isascii() else _TOKEN.findall(normalized)
+    cached = _token_hashes.get
+    hashes = [cached(token) for token in tokens]
+    if None in hashes:
+        hashes = [_hash_token(token) for token in tokens]
+    found = {h & mask for h in hashes}
+    # A word pair's bucket mixes the two word hashes instead of hashing the pair's text
+    found.update(((first * _PAIR_MULTIPLIER) ^ second) & mask for first, second in zip(hashes, hashes[1:]))
+    return list(found)
+
+
+def _hash_token(token: str) -> int:
+    value = _token_hashes.get(token)
+    if value is None:
+        value = zlib.crc32(token.encode("utf-8"))
+        if len(_token_hashes) < TOKEN_CACHE_SIZE:
+            _token_hashes[token] = value
+    return value
+
+
+def _sigmoid(value: float) -> float:
+    if value >= 0:
+        return 1.0 / (1.0 + math.exp(-value))
+    exp = math.exp(value)
+    return exp / (1.0 + exp)
+
+
+class SpamModel:
+    """Quantized weights per feature bucket plus a bias."""
+
+    def __init__(self, weights: array, scale: float, bias: float, bits: int) -> None:
+        if len(weights) != 1 << bits:
+            raise ValueError(f"Expected {1 << bits} weights, got {len(weights)}")
+        self.weights = weights
+        self.scale = scale
+        self.bias = bias
+        self.bits = bits
+        self._numpy_weights = None
+
+    def logit(self, text: str) -> float:
+        return self.bias + self.scale * sum(map(self.weights.__getitem__, features(text, self.bits)))
+
+    def probability(self, text: str) -> float:
+        """Spam probability of one message."""
+        return _sigmoid(self.logit(text))
+
+    def is_spam(self, text: str, threshold: float = SPAM_MODEL_THRESHOLD) -> bool:
+        return self.probability(text) >= threshold
+
+    def score_batch(self, texts: Sequence[str]) -> Any:
+        """Spam probabilities of many messages as a NumPy array."""
+        import numpy as np
+
+        if self._numpy_weights is None:
+            self._numpy_weights = np.frombuffer(self.weights.tobytes(), dtype=np.int8).astype(np.float32)
+        indexes: List[int] = []
+        rows: List[int] = []
+        for row, text in enumerate(texts):
+            found = features(text, self.bits)
+            indexes.extend(found)
+            rows.extend([row] * len(found))
+        totals = np.bincount(
+            np.asarray(rows, dtype=np.intp),
+            weights=self._numpy_weights[np.asarray(indexes, dtype=np.intp)],
+            minlength=len(texts),
+        )
+        logits = self.bias + self.scale * totals
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    def to_bytes(self) -> bytes:
+        return _HEADER.pack(MAGIC, FORMAT_VERSION, self.bits, self.scale, self.bias) + zlib.compress(
+            self.weights.tobytes(), 9
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "SpamModel":
+        magic, version, bits, scale, bias = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("Not a spam model file, or an unsupported version")
+        weights = array("b")
+        weights.frombytes(zlib.decompress(data[_HEADER.size :]))
+        return cls(weights, scale, bias, bits)
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as fh:
+            fh.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> "SpamModel":
+        with open(path, "rb") as fh:
+            return cls.from_bytes(fh.read())
+
+
+_model: Optional[SpamModel] = None
+
+
+def get_model() -> Optional[SpamModel]:
+    """Return the container-wide model, loading it on first use; None when no model is configured."""
+    global _model
+    if _model is None and SPAM_MODEL_FILE:
+        _model = SpamModel.load(SPAM_MODEL_FILE)
+    return _model
+
+
+def train(samples: Iterable[Tuple[str, bool]], bits: int = DEFAULT_BITS, chunk_size: int = 10000) -> SpamModel:
+    """Fit a model on ``(message, is_spam)`` pairs, streamed in chunks (needs NumPy)."""
+    import numpy as np
+
+    size = 1 << bits
+    counts = {True: np.zeros(size, dtype=np.int64), False: np.zeros(size, dtype=np.int64)}
+    documents = {True: 0, False: 0}
+    pending: Dict[bool, List[int]] = {True: [], False: []}
+
+    def flush() -> None:
+        for label, indexes in pending.items():
+            if indexes:
+                counts[label] += np.bincount(np.asarray(indexes, dtype=np.intp), minlength=size)
+                indexes.clear()
+
+    for seen, (text, is_spam) in enumerate(samples, 1):
+        pending[is_spam].extend(features(text, bits))
+        documents[is_spam] += 1
+        if seen % chunk_size == 0:
+            flush()
+    flush()
+    if not documents[True] or not documents[False]:
+        raise ValueError("Training needs both spam and ham examples")
+
+    log_spam = np.log(counts[True] + 1.0) - math.log(counts[True].sum() + size)
+    log_ham = np.log(counts[False] + 1.0) - math.log(counts[False].sum() + size)
+    ratios = log_spam - log_ham
+    scale = float(np.abs(ratios).max()) / 127 or 1.0
+    quantized = np.clip(np.rint(ratios / scale), -127, 127).astype(np.int8)
+    weights = array("b")
+    weights.frombytes(quantized.tobytes())
+    return SpamModel(weights, scale, math.log(documents[True] / documents[False]), bits)
+
+
+def labeled_rows(client: Any, table_name: str, page_size: int = 500) -> Iterator[Tuple[str, bool]]:
+    """Stream ``(message, is_spam)`` for every row with a ``spamLabel``."""
+    names = stored_names(["message"]) + [LABEL_ATTRIBUTE]
+    scan_args: Dict[str, Any] = {
+        "TableName": table_name,
+        "FilterExpression": "attribute_exists(#label)",
+        "ProjectionExpression": ", ".join(f"#p{i}" for i in range(len(names))),
+        "ExpressionAttributeNames": {"#label": LABEL_ATTRIBUTE, **{f"#p{i}": name for i, name in enumerate(names)}},
+        "Limit": page_size,
+    }
+    while True:
+        response = client.scan(**scan_args)
+        for raw in response.get("Items", []):
+            item = decode_item(raw)
+            if "message" in item:
+                yield item["message"], item[LABEL_ATTRIBUTE] == "spam"
+        if "LastEvaluatedKey" not in response:
+            return
+        scan_args["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def read_examples(path: str) -> Iterator[Tuple[str, bool]]:
+    """Stream ``(message, is_spam)`` from an NDJSON file of ``{"message", "label"}`` lines."""
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                record = json.loads(line)
+                yield record["message"], record["label"] == "spam"
+
+
+def rescore(
+    client: Any,
+    table_name: str,
+    model: SpamModel,
+    threshold: float = SPAM_MODEL_THRESHOLD,
+    update: bool = False,
+    page_size: int = 500,
+) -> Dict[str, Any]:
+    """Score every stored submission, one NumPy batch per scan page.
+
+    Returns the number of rows scanned and the IDs at or above ``threshold``.
+    With ``update``, each row's ``spamScore`` attribute is set to its score.
+    """
+    names = stored_names(["submissionId", "timestamp", "message"])
+    scan_args: Dict[str, Any] = {
+        "TableName": table_name,
+        "ProjectionExpression": ", ".join(f"#p{i}" for i in range(len(names))),
+        "ExpressionAttributeNames": {f"#p{i}": name for i, name in enumerate(names)},
+        "Limit": page_size,
+    }
+    scanned, flagged = 0, []
+    while True:
+        response = client.scan(**scan_args)
+        items = [decode_item(raw) for raw in response.get("Items", [])]
+        items = [item for item in items if "message" in item]
+        scores = model.score_batch([item["message"] for item in items]) if items else []
+        for item, score in zip(items, scores):
+            if score >= threshold:
+                flagged.append(item["submissionId"])
+            if update:
+                client.update_item(
+                    TableName=table_name,
+                    Key=serialize_item({"submissionId": item["submissionId"], "timestamp": item["timestamp"]}),
+                    UpdateExpression="SET #s = :s",
+                    ExpressionAttributeNames={"#s": SCORE_ATTRIBUTE},
+                    ExpressionAttributeValues=serialize_item({":s": round(float(score), 4)}),
+                )
+        scanned += len(items)
+        if "LastEvaluatedKey" not in response:
+            return {"scanned": scanned, "flagged": flagged}
+        scan_args["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train, apply or inspect the spam classifier")
+    parser.add_argument("command", choices=["train", "rescore", "score"])
+    parser.add_argument("text", nargs="*", help="messages to score (score)")
+    parser.add_argument("--table", default=os.environ.get("DYNAMODB_TABLE", ""), help="submissions table name")
+    parser.add_argument("--extra", action="append", default=[], help="NDJSON file of labeled examples (train)")
+    parser.add_argument("--out", default="spam_model.bin", help="model file written by train")
+    parser.add_argument("--model", default=SPAM_MODEL_FILE or "spam_model.bin", help="model file to use")
+    parser.add_argument("--bits", type=int, default=DEFAULT_BITS, help="log2 of the feature buckets (train)")
+    parser.add_argument("--threshold", type=float, default=SPAM_MODEL_THRESHOLD)
+    parser.add_argument("--update", action="store_true", help="write spamScore on every row (rescore)")
+    parser.add_argument("--endpoint-url", help="DynamoDB endpoint, e.g. DynamoDB Local")
+    args = parser.parse_args()
+
+    if args.command == "score":
+        model = SpamModel.load(args.model)
+        for text in args.text:
+            print(f"{model.probability(text):.4f}  {text}")
+        return
+
+    if not args.table and (args.command == "rescore" or not args.extra):
+        parser.error("--table (or DYNAMODB_TABLE) is required")
+
+    import aws_clients
+
+    client = aws_clients.create_client("dynamodb", endpoint_url=args.endpoint_url) if args.table else None
+    if args.command == "train":
+        sources = [read_examples(path) for path in args.extra]
+        if client is not None:
+            sources.append(labeled_rows(client, args.table))
+        model = train(itertools.chain(*sources), args.bits)
+        model.save(args.out)
+        print(f"Wrote {args.out} ({os.path.getsize(args.out)} bytes)")
+        return
+
+    result = rescore(client, args.table, SpamModel.load(args.model), args.threshold, args.update)
+    print(json.dumps({"scanned": result["scanned"], "flagged": len(result["flagged"]), "ids": result["flagged"]}))
+
+
+if __name__ == "__main__":
+    main()
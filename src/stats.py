@@ -0,0 +1,305 @@
+"""Pre-aggregated submission counters for dashboards.
+
+``lambda_handler`` counts every form submission in the state table
+(``STATE_TABLE``). Each day has ``STATS_SHARDS`` counter rows, and every write
+goes to one of them at random, so a busy day's writes are spread over several
+partition keys instead of one hot key::
+
+    pk = stats#2024-05-01#3   sk = counters
+    accepted = 41, invalid = 3, spam = 2, failed = 0,
+    domain#example.com = 12, domain#gmail.com = 29, domainCount = 2, ...
+
+Outcomes are ``accepted``, ``invalid`` (bad body or failed validation),
+``spam`` and ``failed`` (server error). Counts build up in memory and are
+written with one atomic ``UpdateItem ADD`` when a submission is accepted, or
+once ``STATS_FLUSH_SECONDS`` have passed since the last write. A flood of
+rejected requests therefore costs at most one write per interval per
+container. Counts a container holds when it is shut down are lost.
+
+The sender's email domain is counted for accepted submissions only. Each row
+tracks at most ``STATS_MAX_DOMAINS`` domains (``domainCount``); the first
+time a container writes a domain to a row, a conditional update claims a slot,
+and domains beyond the cap are counted as ``other``. This keeps a row far
+below the 400 KB item limit.
+
+Reading a date range is one ``BatchGetItem`` of ``days * STATS_SHARDS`` keys,
+so the cost grows with the number of days, not the number of submissions.
+
+Counting fails open: a DynamoDB error is logged and the request carries on.
+
+Usage:
+    python src/stats.py --from 2024-05-01 --to 2024-05-31 --table <state-table>
+"""
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from dynamo_serializer import deserialize_item, serialize_item
+
+STATS_ENABLED = os.environ.get("STATS_ENABLED", "true").lower() == "true"
+STATE_TABLE = os.environ.get("STATE_TABLE", "")
+# Counter rows per day; more shards spread writes, each read fetches all of them
+STATS_SHARDS = int(os.environ.get("STATS_SHARDS", "8"))
+# Counter rows expire this many days after their day
+STATS_RETENTION_DAYS = int(os.environ.get("STATS_RETENTION_DAYS", "400"))
+# Counts are written when a submission is accepted, or at most this often otherwise
+STATS_FLUSH_SECONDS = float(os.environ.get("STATS_FLUSH_SECONDS", "10"))
+# Distinct sender domains per counter row; further domains are counted as "other"
+STATS_MAX_DOMAINS = int(os.environ.get("STATS_MAX_DOMAINS", "200"))
+
+ACCEPTED = "accepted"
+INVALID = "invalid"
+SPAM = "spam"
+FAILED = "failed"
+OUTCOMES = (ACCEPTED, INVALID, SPAM, FAILED)
+
+DOMAIN_PREFIX = "domain#"
+OTHER_DOMAIN = DOMAIN_PREFIX + "other"
+DOMAIN_COUNT = "domainCount"
+# Longest domain counted; longer values are grouped under "other"
+MAX_DOMAIN_LENGTH = 253
+# BatchGetItem accepts at most this many keys per call
+BATCH_GET_LIMIT = 100
+BATCH_GET_ATTEMPTS = 5
+
+
+def stats_key(day: str, shard: int) -> Dict[str, Any]:
+    return serialize_item({"pk": f"stats#{day}#{shard}", "sk": "counters"})
+
+
+def email_domain(email: str) -> str:
+    """The lowercased domain of ``email``, or ``other`` when there is none."""
+    domain = email.rpartition("@")[2].strip().lower()
+    if "@" not in email or not domain or len(domain) > MAX_DOMAIN_LENGTH:
+        return "other"
+    return domain
+
+
+class StatsCounter:
+    """Collects submission outcomes and adds them to the sharded daily counter rows."""
+
+    def __init__(
+        self,
+        client: Any,
+        table_name: str,
+        shards: int = STATS_SHARDS,
+        retention_days: int = STATS_RETENTION_DAYS,
+        clock: Callable[[], float] = time.time,
+        rng: Optional[random.Random] = None,
+        flush_seconds: float = STATS_FLUSH_SECONDS,
+        max_domains: int = STATS_MAX_DOMAINS,
+    ) -> None:
+        self._client = client
+        self._table_name = table_name
+        self.shards = shards
+        self.retention_days = retention_days
+        self.flush_seconds = flush_seconds
+        self.max_domains = max_domains
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+        # Start of the UTC day -> counter name -> count not yet written
+        self._pending: Dict[int, Dict[str, int]] = {}
+        self._last_flush = clock()
+        # Where this container writes each domain in a (day, shard) row: its own attribute or "other"
+        self._placed: Dict[Tuple[int, int], Dict[str, str]] = {}
+
+    def record(self, outcome: str, email: Optional[str] = None) -> bool:
+        """Count one submission with ``outcome``; False when a write it triggered failed."""
+        now = self._clock()
+        with self._lock:
+            counts = self._pending.setdefault(int(now - now % 86400), {})
+            counts[outcome] = counts.get(outcome, 0) + 1
+            if outcome == ACCEPTED and email is not None:
+                domain = DOMAIN_PREFIX + email_domain(email)
+                counts[domain] = counts.get(domain, 0) + 1
+            if outcome != ACCEPTED and now - self._last_flush < self.flush_seconds:
+                return True
+        return self.flush()
+
+    def flush(self) -> bool:
+        """Write every pending count; False when a write failed (its counts are dropped)."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = self._clock()
+        ok = True
+        for day_start, counts in pending.items():
+            try:
+                self._write(day_start, counts)
+            except Exception as e:
+                # Fail open: a missed count must never fail the submission
+                print(f"Stats update failed: {str(e)}")
+                ok = False
+        return ok
+
+    def _write(self, day_start: int, counts: Dict[str, int]) -> None:
+        shard = self._rng.randrange(self.shards)
+        key = stats_key(datetime.utcfromtimestamp(day_start).strftime("%Y-%m-%d"), shard)
+        ttl = day_start + (self.retention_days + 1) * 86400
+        with self._lock:
+            # Only today's rows (and yesterday's, around midnight) are still written to
+            self._placed = {row: placed for row, placed in self._placed.items() if row[0] >= day_start - 86400}
+            placed = self._placed.setdefault((day_start, shard), {OTHER_DOMAIN: OTHER_DOMAIN})
+            if len(placed) > 4 * self.max_domains:
+                placed.clear()
+                placed[OTHER_DOMAIN] = OTHER_DOMAIN
+
+        adds: Dict[str, int] = {}
+        new_domains = []
+        for name, count in counts.items():
+            if name.startswith(DOMAIN_PREFIX) and name not in placed:
+                new_domains.append((name, count))
+            else:
+                attribute = placed.get(name, name)
+                adds[attribute] = adds.get(attribute, 0) + count
+        if adds:
+            names = {"#ttl": "ttl"}
+            values: Dict[str, Any] = {":ttl": ttl}
+            for index, (attribute, count) in enumerate(adds.items()):
+                names[f"#c{index}"] = attribute
+                values[f":c{index}"] = count
+            self._client.update_item(
+                TableName=self._table_name,
+                Key=key,
+                UpdateExpression="ADD " + ", ".join(f"#c{i} :c{i}" for i in range(len(adds))) + " SET #ttl = :ttl",
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=serialize_item(values),
+            )
+        for name, count in new_domains:
+            attribute = self._add_domain(key, name, count, ttl)
+            with self._lock:
+                placed[name] = attribute
+
+    def _add_domain(self, key: Dict[str, Any], name: str, count: int, ttl: int) -> str:
+        """Add a domain this container has not written to the row yet; returns the attribute used.
+
+        The domain takes a free slot if it is new to the row, adds to its attribute
+        if another container already placed it, and goes to "other" once the row
+        holds ``max_domains`` domains.
+        """
+        attempts = (
+            (
+                "ADD #d :n, #dc :one SET #ttl = :ttl",
+                "attribute_not_exists(#d) AND (attribute_not_exists(#dc) OR #dc < :max)",
+            ),
+            ("ADD #d :n SET #ttl = :ttl", "attribute_exists(#d)"),
+        )
+        for update, condition in attempts:
+            names = {"#d": name, "#ttl": "ttl"}
+            values: Dict[str, Any] = {":n": count, ":ttl": ttl}
+            if "#dc" in update:
+                names["#dc"] = DOMAIN_COUNT
+                values.update({":one": 1, ":max": self.max_domains})
+            try:
+                self._client.update_item(
+                    TableName=self._table_name,
+                    Key=key,
+                    UpdateExpression=update,
+                    ConditionExpression=condition,
+                    ExpressionAttributeNames=names,
+                    ExpressionAttributeValues=serialize_item(values),
+                )
+                return name
+            except self._client.exceptions.ConditionalCheckFailedException:
+                continue
+        self._client.update_item(
+            TableName=self._table_name,
+            Key=key,
+            UpdateExpression="ADD #d :n SET #ttl = :ttl",
+            ExpressionAttributeNames={"#d": OTHER_DOMAIN, "#ttl": "ttl"},
+            ExpressionAttributeValues=serialize_item({":n": count, ":ttl": ttl}),
+        )
+        return OTHER_DOMAIN
+
+
+def is_enabled() -> bool:
+    """Counting needs the state table."""
+    return STATS_ENABLED and bool(STATE_TABLE)
+
+
+def build_counter(client_factory: Callable[[], Any]) -> StatsCounter:
+    """Build a counter from the environment; ``client_factory`` supplies the DynamoDB client."""
+    return StatsCounter(
+        client_factory(),
+        STATE_TABLE,
+        STATS_SHARDS,
+        STATS_RETENTION_DAYS,
+        flush_seconds=STATS_FLUSH_SECONDS,
+        max_domains=STATS_MAX_DOMAINS,
+    )
+
+
+def _batch_get(client: Any, table_name: str, keys: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    items: List[Dict[str, Any]] = []
+    for start in range(0, len(keys), BATCH_GET_LIMIT):
+        request = {table_name: {"Keys": keys[start : start + BATCH_GET_LIMIT]}}
+        for attempt in range(BATCH_GET_ATTEMPTS):
+            if attempt:
+                time.sleep(min(1.0, 0.05 * 2**attempt))
+            response = client.batch_get_item(RequestItems=request)
+            items.extend(response["Responses"].get(table_name, []))
+            request = response.get("UnprocessedKeys") or {}
+            if not request:
+                break
+        if request:
+            raise RuntimeError(f"{len(request[table_name]['Keys'])} stats row(s) not read after retries")
+    return items
+
+
+def daily_counts(
+    client: Any, table_name: str, start: date, end: date, shards: int = STATS_SHARDS
+) -> List[Dict[str, Any]]:
+    """One entry per day from ``start`` to ``end`` (inclusive), oldest first.
+
+    Each entry holds ``day``, a count per outcome and ``domains`` (domain ->
+    count). Days without submissions are included with zero counts.
+    """
+    days = [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+    series = {day: {"day": day, **{outcome: 0 for outcome in OUTCOMES}, "domains": {}} for day in days}
+
+    keys = [stats_key(day, shard) for day in days for shard in range(shards)]
+    for raw in _batch_get(client, table_name, keys):
+        row = deserialize_item(raw)
+        entry = series[row["pk"].split("#")[1]]
+        for name, value in row.items():
+            if name in OUTCOMES:
+                entry[name] += int(value)
+            elif name.startswith(DOMAIN_PREFIX):
+                domain = name[len(DOMAIN_PREFIX) :]
+                entry["domains"][domain] = entry["domains"].get(domain, 0) + int(value)
+    return [series[day] for day in days]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Print daily submission counters")
+    parser.add_argument("--from", dest="start", required=True, help="first day (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end", help="last day (YYYY-MM-DD, default today)")
+    parser.add_argument("--table", default=STATE_TABLE, help="state table name")
+    parser.add_argument("--shards", type=int, default=STATS_SHARDS, help="STATS_SHARDS used by the writers")
+    parser.add_argument("--top-domains", type=int, default=10, help="domains listed per day")
+    parser.add_argument("--endpoint-url", help="DynamoDB endpoint, e.g. DynamoDB Local")
+    args = parser.parse_args()
+    if not args.table:
+        parser.error("--table (or STATE_TABLE) is required")
+
+    start = datetime.strptime(args.start, "%Y-%m-%d").date()
+    end = datetime.strptime(args.end, "%Y-%m-%d").date() if args.end else datetime.utcnow().date()
+
+    import aws_clients
+
+    client = aws_clients.create_client("dynamodb", endpoint_url=args.endpoint_url)
+    series = daily_counts(client, args.table, start, end, args.shards)
+    for entry in series:
+        top = sorted(entry["domains"].items(), key=lambda pair: (-pair[1], pair[0]))[: args.top_domains]
+        entry["domains"] = dict(top)
+    print(json.dumps(series, indent=2))
+
+
+if __name__ == "__main__":
+    main()
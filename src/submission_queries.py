@@ -0,0 +1,329 @@
+"""Indexed lookups of contact submissions by email address and by date.
+
+``store_submission`` writes two extra attributes on every row:
+
+* ``emailNormalized``: the lowercased, trimmed sender address. This is the hash
+  key of ``SubmissionsByEmailIndex``.
+* ``dayBucket``: the UTC date of ``timestamp`` (``YYYY-MM-DD``). This is the
+  hash key of ``SubmissionsByDayIndex``.
+
+Both indexes use ``timestamp`` as their range key. A lookup is one Query per
+page of results (plus one per empty day in a date range) instead of a Scan of
+the whole table. Results come newest first. ``nextCursor`` is an opaque token
+for the next page, and it is None once the results are exhausted.
+
+``lambda_handler`` serves ``GET /submissions`` (IAM-authorized in
+template.yaml; ``http_adapter`` serves it with a bearer token):
+
+    GET /submissions?email=someone@example.com&limit=25
+    GET /submissions?from=2024-05-01&to=2024-05-31&cursor=<nextCursor>
+
+Rows written before the indexes existed lack the attributes. Add them once with:
+
+    python src/submission_queries.py backfill --table contact-submissions
+"""
+
+import argparse
+import base64
+import json
+import os
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from dynamo_serializer import deserialize_item, serialize_item
+from item_codec import decode_item, stored_names
+
+EMAIL_INDEX = os.environ.get("SUBMISSIONS_EMAIL_INDEX", "SubmissionsByEmailIndex")
+DAY_INDEX = os.environ.get("SUBMISSIONS_DAY_INDEX", "SubmissionsByDayIndex")
+# Page size when the caller does not pass limit, and the largest page allowed
+QUERY_DEFAULT_LIMIT = int(os.environ.get("SUBMISSIONS_QUERY_DEFAULT_LIMIT", "25"))
+QUERY_MAX_LIMIT = int(os.environ.get("SUBMISSIONS_QUERY_MAX_LIMIT", "100"))
+# Widest date range one query may cover (each day in it is a separate partition)
+QUERY_MAX_DAYS = int(os.environ.get("SUBMISSIONS_QUERY_MAX_DAYS", "366"))
+# Bearer token for GET /submissions on http_adapter; the route is disabled when unset
+SUBMISSIONS_QUERY_TOKEN = os.environ.get("SUBMISSIONS_QUERY_TOKEN", "")
+
+BY_EMAIL = "email"
+BY_DATE = "date"
+CURSOR_VERSION = 1
+
+_INDEX_KEYS = {
+    BY_EMAIL: {"submissionId", "timestamp", "emailNormalized"},
+    BY_DATE: {"submissionId", "timestamp", "dayBucket"},
+}
+
+
+class QueryError(Exception):
+    """Raised for a query the caller must fix (bad parameters or cursor)."""
+
+
+def normalize_email(email: str) -> str:
+    """The form of an address used as the email index key."""
+    return email.strip().lower()
+
+
+def day_bucket(timestamp: str) -> str:
+    """The date part of a submission timestamp, used as the day index key."""
+    return timestamp[:10]
+
+
+def index_attributes(email: str, timestamp: str) -> Dict[str, str]:
+    """Attributes that place a submission in both lookup indexes."""
+    return {"emailNormalized": normalize_email(email), "dayBucket": day_bucket(timestamp)}
+
+
+def encode_cursor(kind: str, key: Dict[str, Any], day: Optional[str] = None) -> str:
+    """Opaque pagination token holding the index and position to resume from."""
+    state: Dict[str, Any] = {"v": CURSOR_VERSION, "i": kind, "k": deserialize_item(key) if key else None}
+    if day is not None:
+        state["d"] = day
+    raw = json.dumps(state, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, kind: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Return the (ExclusiveStartKey, day) pair in ``cursor``."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        state = json.loads(raw)
+    except ValueError:
+        raise QueryError("Invalid cursor")
+    if not isinstance(state, dict) or state.get("v") != CURSOR_VERSION or state.get("i") != kind:
+        raise QueryError("Invalid cursor")
+
+    key = state.get("k")
+    if key is not None:
+        if (
+            not isinstance(key, dict)
+            or set(key) != _INDEX_KEYS[kind]
+            or not all(isinstance(value, str) for value in key.values())
+        ):
+            raise QueryError("Invalid cursor")
+        key = serialize_item(key)
+    day = state.get("d")
+    if day is not None and not isinstance(day, str):
+        raise QueryError("Invalid cursor")
+    return key, day
+
+
+def parse_day(value: str) -> date:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        raise QueryError(f"Invalid date {value!r}; use YYYY-MM-DD")
+
+
+def parse_limit(value: Optional[str]) -> int:
+    if value is None or value == "":
+        return QUERY_DEFAULT_LIMIT
+    if not value.isdigit() or int(value) < 1:
+        raise QueryError("limit must be a positive integer")
+    return min(int(value), QUERY_MAX_LIMIT)
+
+
+def by_email(
+    client: Any,
+    table_name: str,
+    email: str,
+    limit: int = QUERY_DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> Dict[str, Any]:
+    """Submissions from ``email``, newest first, optionally limited to ``start``..``end`` (inclusive)."""
+    email = normalize_email(email)
+    condition = "emailNormalized = :email"
+    values: Dict[str, Any] = {":email": email}
+    if start is not None or end is not None:
+        # Timestamps sort as strings; "YYYY-MM-DD" sorts before every timestamp on that day
+        condition += " AND #ts BETWEEN :start AND :end"
+        values[":start"] = start.isoformat() if start else "0000"
+        values[":end"] = (end + timedelta(days=1)).isoformat() if end else "9999"
+
+    args: Dict[str, Any] = {
+        "TableName": table_name,
+        "IndexName": EMAIL_INDEX,
+        "KeyConditionExpression": condition,
+        "ExpressionAttributeValues": serialize_item(values),
+        "ScanIndexForward": False,
+        "Limit": limit,
+    }
+    if ":start" in values:
+        args["ExpressionAttributeNames"] = {"#ts": "timestamp"}
+    if cursor:
+        start_key, _ = decode_cursor(cursor, BY_EMAIL)
+        if start_key is None or start_key["emailNormalized"]["S"] != email:
+            raise QueryError("Cursor does not belong to this query")
+        args["ExclusiveStartKey"] = start_key
+
+    response = client.query(**args)
+    last_key = response.get("LastEvaluatedKey")
+    return {
+        "items": [decode_item(item) for item in response.get("Items", [])],
+        "nextCursor": encode_cursor(BY_EMAIL, last_key) if last_key else None,
+    }
+
+
+def by_date(
+    client: Any,
+    table_name: str,
+    start: date,
+    end: date,
+    limit: int = QUERY_DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Submissions between ``start`` and ``end`` (inclusive), newest first."""
+    if start > end:
+        raise QueryError("from must not be after to")
+    if (end - start).days >= QUERY_MAX_DAYS:
+        raise QueryError(f"Date range is limited to {QUERY_MAX_DAYS} days")
+
+    day = end
+    start_key = None
+    if cursor:
+        start_key, cursor_day = decode_cursor(cursor, BY_DATE)
+        day = parse_day(cursor_day or "")
+        if not start <= day <= end or (start_key is not None and start_key["dayBucket"]["S"] != day.isoformat()):
+            raise QueryError("Cursor does not belong to this query")
+
+    items: List[Dict[str, Any]] = []
+    while day >= start:
+        args: Dict[str, Any] = {
+            "TableName": table_name,
+            "IndexName": DAY_INDEX,
+            "KeyConditionExpression": "dayBucket = :day",
+            "ExpressionAttributeValues": serialize_item({":day": day.isoformat()}),
+            "ScanIndexForward": False,
+            "Limit": limit - len(items),
+        }
+        if start_key:
+            args["ExclusiveStartKey"] = start_key
+        response = client.query(**args)
+        items.extend(decode_item(item) for item in response.get("Items", []))
+        start_key = response.get("LastEvaluatedKey")
+
+        if len(items) >= limit:
+            if start_key:
+                return {"items": items, "nextCursor": encode_cursor(BY_DATE, start_key, day.isoformat())}
+            if day > start:
+                return {"items": items, "nextCursor": encode_cursor(BY_DATE, {}, (day - timedelta(days=1)).isoformat())}
+            return {"items": items, "nextCursor": None}
+        if not start_key:
+            day -= timedelta(days=1)
+
+    return {"items": items, "nextCursor": None}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Admin handler for GET /submissions.
+    Lists submissions by ``email`` or by ``from``/``to`` date range, one page per call.
+    """
+    # Imported here so contact_handler can import this module for index_attributes
+    import contact_handler
+
+    headers = {"Content-Type": "application/json"}
+    if event.get("httpMethod", "GET") != "GET":
+        return contact_handler.create_error_response(405, "Method not allowed", headers)
+
+    params = event.get("queryStringParameters") or {}
+    try:
+        limit = parse_limit(params.get("limit"))
+        start = parse_day(params["from"]) if params.get("from") else None
+        end = parse_day(params["to"]) if params.get("to") else None
+        client = contact_handler.get_dynamodb_client()
+        if params.get("email"):
+            result = by_email(
+                client, contact_handler.DYNAMODB_TABLE, params["email"], limit, params.get("cursor"), start, end
+            )
+        elif start is not None or end is not None:
+            end = end or datetime.utcnow().date()
+            result = by_date(client, contact_handler.DYNAMODB_TABLE, start or end, end, limit, params.get("cursor"))
+        else:
+            raise QueryError("Pass email, or from/to dates")
+    except QueryError as e:
+        return contact_handler.create_error_response(400, str(e), headers)
+    except Exception as e:
+        print(f"Submission query failed: {str(e)}")
+        return contact_handler.create_error_response(500, "Internal server error", headers)
+
+    result["count"] = len(result["items"])
+    return {"statusCode": 200, "headers": headers, "body": json.dumps(result, default=_json_default)}
+
+
+def backfill(client: Any, table_name: str, page_size: int = 500) -> int:
+    """Add the index attributes to rows stored before the indexes existed; returns rows updated."""
+    # The email may be stored under its compact name (see item_codec)
+    email_names = stored_names(["email"])
+    scan_args: Dict[str, Any] = {
+        "TableName": table_name,
+        "FilterExpression": "attribute_not_exists(dayBucket) OR attribute_not_exists(emailNormalized)",
+        "ProjectionExpression": "submissionId, #ts, " + ", ".join(f"#e{i}" for i in range(len(email_names))),
+        "ExpressionAttributeNames": {"#ts": "timestamp", **{f"#e{i}": name for i, name in enumerate(email_names)}},
+        "Limit": page_size,
+    }
+    updated = 0
+    while True:
+        response = client.scan(**scan_args)
+        for item in (decode_item(raw) for raw in response.get("Items", [])):
+            client.update_item(
+                TableName=table_name,
+                Key=serialize_item({"submissionId": item["submissionId"], "timestamp": item["timestamp"]}),
+                UpdateExpression="SET emailNormalized = :email, dayBucket = :day",
+                ExpressionAttributeValues=serialize_item(
+                    {
+                        ":email": normalize_email(item.get("email", "")),
+                        ":day": day_bucket(item["timestamp"]),
+                    }
+                ),
+            )
+            updated += 1
+        if "LastEvaluatedKey" not in response:
+            return updated
+        scan_args["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Query or backfill the submission lookup indexes")
+    parser.add_argument("command", choices=["query", "backfill"])
+    parser.add_argument("--table", default=os.environ.get("DYNAMODB_TABLE", ""), help="submissions table name")
+    parser.add_argument("--email", help="list submissions from this address")
+    parser.add_argument("--from", dest="start", help="first day (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end", help="last day (YYYY-MM-DD, default today)")
+    parser.add_argument("--limit", type=int, default=QUERY_DEFAULT_LIMIT, help="results per page")
+    parser.add_argument("--cursor", help="nextCursor from the previous page")
+    parser.add_argument("--endpoint-url", help="DynamoDB endpoint, e.g. DynamoDB Local")
+    args = parser.parse_args()
+    if not args.table:
+        parser.error("--table (or DYNAMODB_TABLE) is required")
+
+    import aws_clients
+
+    client = aws_clients.create_client("dynamodb", endpoint_url=args.endpoint_url)
+    if args.command == "backfill":
+        print(json.dumps({"updated": backfill(client, args.table)}))
+        return
+
+    try:
+        start = parse_day(args.start) if args.start else None
+        end = parse_day(args.end) if args.end else None
+        if args.email:
+            result = by_email(client, args.table, args.email, args.limit, args.cursor, start, end)
+        elif start is not None:
+            result = by_date(client, args.table, start, end or datetime.utcnow().date(), args.limit, args.cursor)
+        else:
+            parser.error("query needs --email or --from")
+    except QueryError as e:
+        parser.exit(1, f"error: {str(e)}\n")
+    print(json.dumps(result, default=_json_default, indent=2))
+
+
+if __name__ == "__main__":
+    main()
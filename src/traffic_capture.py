@@ -0,0 +1,304 @@
+"""Capture of live contact form traffic, and deterministic replay of a capture.
+
+With ``CAPTURE_ENABLED=true``, ``lambda_handler`` writes a sampled fraction
+(``CAPTURE_SAMPLE_RATE``) of its requests as JSON lines::
+
+    {"capture": 1, "t": 1714564800.123, "ms": 41.7, "status": 200, "event": {...}}
+
+``t`` is the arrival time, ``ms`` the handler latency and ``status`` the
+response code (with the error message for rejected requests). Captures taken
+while a spam model is loaded also carry ``"spamModel": true``. Lines go to
+``CAPTURE_FILE`` when set, up to ``CAPTURE_MAX_BYTES``, and otherwise to the
+function log, where they can be exported from CloudWatch Logs.
+
+Events are sanitized before they are written. Only the method, path, a few
+headers, the body and the source IP are kept. Every letter and digit in the
+body is replaced, keeping length, case, punctuation and whitespace, so
+validation and size limits see the same shapes. Blocklisted spam terms are kept
+as they are, so spam is still rejected on replay. The replacement is derived
+from a keyed hash of the original text (``CAPTURE_SALT``, random per container
+when unset), so identical submissions stay identical and duplicates are still
+duplicates. Source IPs and ``Idempotency-Key`` values are replaced by keyed
+pseudonyms the same way, which keeps per-client rate limiting intact.
+
+A spam model judges the whole message, and the masked text cannot carry that
+judgement: spam that only the model caught passes on replay, and a masked
+message may score differently. ``report`` lists spam outcomes that changed on
+such captures as ``spamModelDiffs`` rather than as mismatches.
+
+``replay`` feeds a capture to any target (the handler in-process, or an HTTP
+endpoint) at the original pace, scaled, or as fast as possible, and
+``report`` gives latency percentiles and the requests whose outcome differs
+from the capture. ``benchmarks/replay_capture.py`` is the command-line driver.
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import codec
+import spam_filter
+import spam_model
+
+CAPTURE_ENABLED = os.environ.get("CAPTURE_ENABLED", "false").lower() == "true"
+# Fraction of requests captured
+CAPTURE_SAMPLE_RATE = float(os.environ.get("CAPTURE_SAMPLE_RATE", "0.1"))
+# JSONL file to append to; the function log when unset
+CAPTURE_FILE = os.environ.get("CAPTURE_FILE", "")
+# Capturing to CAPTURE_FILE stops once it reaches this size
+CAPTURE_MAX_BYTES = int(os.environ.get("CAPTURE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Key for the pseudonyms; set it to get the same pseudonyms from every container
+CAPTURE_SALT = os.environ.get("CAPTURE_SALT", "").encode("utf-8") or os.urandom(16)
+
+# Headers kept in captured events (matched case-insensitively)
+KEPT_HEADERS = ("content-type", "user-agent")
+PSEUDONYM_HEADERS = ("idempotency-key",)
+
+_LOWER = "abcdefghijklmnopqrstuvwxyz"
+_UPPER = _LOWER.upper()
+_DIGITS = "0123456789"
+
+_lock = threading.Lock()
+_written = 0
+
+
+def _keyed_digest(value: str) -> bytes:
+    return hmac.new(CAPTURE_SALT, value.encode("utf-8"), hashlib.sha256).digest()
+
+
+def mask_text(text: str) -> str:
+    """Replace letters and digits in ``text``, keeping blocklisted spam terms."""
+    kept = [(match.start, match.end) for match in spam_filter.get_matcher().find_all(text)]
+    picks = random.Random(_keyed_digest(text)).choices(range(26), k=len(text))
+    chars = list(text)
+    span = 0
+    for index, ch in enumerate(chars):
+        while span < len(kept) and kept[span][1] <= index:
+            span += 1
+        if span < len(kept) and kept[span][0] <= index:
+            continue
+        if ch.isdigit():
+            chars[index] = _DIGITS[picks[index] % 10]
+        elif ch.isalpha():
+            chars[index] = (_UPPER if ch.isupper() else _LOWER)[picks[index]]
+    return "".join(chars)
+
+
+def pseudonymous_ip(ip: str) -> str:
+    """A stable address in 10.0.0.0/8 standing in for ``ip``."""
+    digest = _keyed_digest("ip:" + ip)
+    return f"10.{digest[0]}.{digest[1]}.{digest[2]}"
+
+
+def _sanitize_value(value: Any) -> Any:
+    if isinstance(value, str):
+        return mask_text(value)
+    if isinstance(value, dict):
+        return {key: _sanitize_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_sanitize_value(item) for item in value]
+    return value
+
+
+def _sanitize_body(body: str) -> str:
+    try:
+        parsed = codec.loads(body)
+    except (codec.JSONDecodeError, ValueError):
+        # Not JSON: masking letters and digits keeps it just as malformed
+        return mask_text(body)
+    return codec.dumps(_sanitize_value(parsed))
+
+
+def sanitize(event: Dict[str, Any]) -> Dict[str, Any]:
+    """The parts of an API Gateway event that replay needs, without personal data."""
+    sanitized: Dict[str, Any] = {key: event[key] for key in ("httpMethod", "path") if key in event}
+
+    headers = {}
+    for name, value in (event.get("headers") or {}).items():
+        if name.lower() in KEPT_HEADERS:
+            headers[name] = value
+        elif name.lower() in PSEUDONYM_HEADERS and value:
+            headers[name] = _keyed_digest("header:" + value).hex()
+    if headers:
+        sanitized["headers"] = headers
+
+    body = event.get("body")
+    if body:
+        if event.get("isBase64Encoded"):
+            try:
+                decoded = base64.b64decode(body).decode("utf-8")
+            except ValueError:
+                decoded = None
+            if decoded is None:
+                sanitized["body"] = body
+            else:
+                sanitized["body"] = base64.b64encode(_sanitize_body(decoded).encode("utf-8")).decode("ascii")
+            sanitized["isBase64Encoded"] = True
+        else:
+            sanitized["body"] = _sanitize_body(body)
+    elif body is not None:
+        sanitized["body"] = body
+
+    source_ip = ((event.get("requestContext") or {}).get("identity") or {}).get("sourceIp")
+    if source_ip:
+        sanitized["requestContext"] = {"identity": {"sourceIp": pseudonymous_ip(source_ip)}}
+    return sanitized
+
+
+def outcome(response: Dict[str, Any]) -> Dict[str, Any]:
+    """Status code, plus the error message of a rejected request."""
+    result: Dict[str, Any] = {"status": response.get("statusCode")}
+    if result["status"] != 200:
+        try:
+            result["error"] = codec.loads(response.get("body") or "{}").get("error")
+        except (codec.JSONDecodeError, ValueError, AttributeError):
+            pass
+    return result
+
+
+def record(event: Dict[str, Any], response: Dict[str, Any], arrived: float, elapsed: float) -> bool:
+    """Capture one request if it is sampled; True when it was written."""
+    global _written
+    if random.random() >= CAPTURE_SAMPLE_RATE:
+        return False
+    try:
+        line = codec.dumps(
+            {
+                "capture": 1,
+                "t": round(arrived, 6),
+                "ms": round(elapsed * 1000, 3),
+                **outcome(response),
+                **({"spamModel": True} if spam_model.get_model() is not None else {}),
+                "event": sanitize(event),
+            }
+        )
+        if not CAPTURE_FILE:
+            print(line)
+            return True
+        with _lock:
+            if _written == 0 and os.path.exists(CAPTURE_FILE):
+                _written = os.path.getsize(CAPTURE_FILE)
+            if _written + len(line) + 1 > CAPTURE_MAX_BYTES:
+                return False
+            with open(CAPTURE_FILE, "a", encoding="utf-8") as fh:
+                fh.write(line + "\n")
+            _written += len(line) + 1
+        return True
+    except Exception as e:
+        # Never fail a request because it could not be captured
+        print(f"Traffic capture failed: {str(e)}")
+        return False
+
+
+def load(lines: Iterable[str]) -> List[Dict[str, Any]]:
+    """Captured requests from JSONL lines, oldest first.
+
+    Lines that are not captures are skipped, and anything before the first
+    ``{`` is ignored, so an exported Lambda log can be read as it is.
+    """
+    records = []
+    for line in lines:
+        start = line.find("{")
+        if start < 0 or '"capture"' not in line:
+            continue
+        try:
+            entry = codec.loads(line[start:])
+        except (codec.JSONDecodeError, ValueError):
+            continue
+        if isinstance(entry, dict) and entry.get("capture") == 1 and "event" in entry:
+            records.append(entry)
+    records.sort(key=lambda entry: entry["t"])
+    return records
+
+
+def replay(
+    records: List[Dict[str, Any]],
+    invoke: Callable[[Dict[str, Any]], Dict[str, Any]],
+    speed: float = 1.0,
+    concurrency: int = 16,
+    clock: Callable[[], float] = time.perf_counter,
+    sleep: Callable[[float], None] = time.sleep,
+) -> List[Dict[str, Any]]:
+    """Send every captured event to ``invoke`` and return one result per record.
+
+    Events are sent at their captured offsets divided by ``speed``; a ``speed``
+    of 0 sends them as fast as ``concurrency`` workers allow. Each result holds
+    the response ``status`` (and ``error``), the ``latency`` in seconds and the
+    ``lag``: how late the event was sent against its schedule, which grows when
+    the target cannot keep up.
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(records)
+    first = records[0]["t"] if records else 0.0
+
+    def send(index: int, scheduled: float) -> None:
+        started = clock()
+        try:
+            response = invoke(records[index]["event"])
+            result = outcome(response)
+        except Exception as e:
+            result = {"status": None, "error": f"{type(e).__name__}: {str(e)}"}
+        result["latency"] = clock() - started
+        result["lag"] = max(0.0, started - scheduled)
+        results[index] = result
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="replay") as pool:
+        began = clock()
+        for index, entry in enumerate(records):
+            scheduled = began + ((entry["t"] - first) / speed if speed > 0 else 0.0)
+            delay = scheduled - clock()
+            if delay > 0:
+                sleep(delay)
+            pool.submit(send, index, scheduled)
+    return [result for result in results if result is not None]  # every send has finished
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))]
+
+
+def summarize(seconds: List[float]) -> Dict[str, float]:
+    """Latency percentiles in milliseconds."""
+    ordered = sorted(seconds)
+    summary = {f"p{pct}_ms": _percentile(ordered, pct) * 1000 for pct in (50, 90, 95, 99)}
+    summary["max_ms"] = ordered[-1] * 1000 if ordered else 0.0
+    summary["count"] = len(ordered)
+    return summary
+
+
+def report(records: List[Dict[str, Any]], results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Replay latency against captured latency, and the outcomes that changed.
+
+    On captures taken with a spam model, a change to or from a spam rejection
+    comes from masking, not from the target, and goes to ``spamModelDiffs``.
+    """
+    mismatches: List[Tuple[int, Dict[str, Any], Dict[str, Any]]] = []
+    spam_model_diffs: List[Tuple[int, Dict[str, Any], Dict[str, Any]]] = []
+    by_status: Dict[str, int] = {}
+    for index, (entry, result) in enumerate(zip(records, results)):
+        by_status[str(result["status"])] = by_status.get(str(result["status"]), 0) + 1
+        expected = {"status": entry.get("status"), "error": entry.get("error")}
+        actual = {"status": result["status"], "error": result.get("error")}
+        if expected == actual:
+            continue
+        if entry.get("spamModel") and spam_filter.SPAM_ERROR in (expected["error"], actual["error"]):
+            spam_model_diffs.append((index, expected, actual))
+        else:
+            mismatches.append((index, expected, actual))
+    return {
+        "requests": len(results),
+        "latency": summarize([result["latency"] for result in results]),
+        "capturedLatency": summarize([entry["ms"] / 1000 for entry in records if "ms" in entry]),
+        "lag": summarize([result["lag"] for result in results]),
+        "byStatus": by_status,
+        "matched": len(results) - len(mismatches) - len(spam_model_diffs),
+        "mismatches": [{"index": index, "expected": exp, "actual": act} for index, exp, act in mismatches],
+        "spamModelDiffs": [{"index": index, "expected": exp, "actual": act} for index, exp, act in spam_model_diffs],
+    }
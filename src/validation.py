@@ -0,0 +1,148 @@
+"""Declarative validation for contact form payloads.
+
+``CONTACT_FORM_SCHEMA`` mirrors the request body schema of ``POST /contact`` in
+``infrastructure/template.yaml`` (a unit test keeps the two in lock-step). The
+schema is compiled once at import into a list of per-field check functions, so
+validating a payload is a tight loop with no regex compilation or schema
+interpretation. All errors are collected in a single pass.
+"""
+
+import re
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+CONTACT_FORM_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "required": ["name", "email", "message"],
+    "properties": {
+        "name": {"type": "string", "minLength": 1, "maxLength": 100},
+        "email": {"type": "string", "format": "email"},
+        "message": {"type": "string", "minLength": 10, "maxLength": 1000},
+    },
+}
+
+# Supported "format" keywords and the error reported when a value does not match
+FORMATS: Dict[str, Tuple["re.Pattern[str]", str]] = {
+    "email": (
+        re.compile(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"),
+        "Please provide a valid email address",
+    ),
+}
+
+
+class FieldError(NamedTuple):
+    """A single validation failure."""
+
+    field: str
+    code: str
+    message: str
+
+
+class ValidationResult(NamedTuple):
+    """Outcome of validating one payload."""
+
+    valid: bool
+    errors: Tuple[FieldError, ...]
+    data: Dict[str, str]
+
+    @property
+    def error(self) -> Optional[str]:
+        """Message of the highest-priority error, or None when valid."""
+        return self.errors[0].message if self.errors else None
+
+
+# A compiled field check returns (cleaned value, required error, other errors)
+FieldCheck = Callable[[Dict[str, Any]], Tuple[Optional[str], Optional[FieldError], List[FieldError]]]
+
+
+class Validator:
+    """Validator compiled from a schema; reuse one instance for all payloads."""
+
+    def __init__(self, schema: Dict[str, Any]) -> None:
+        self.schema = schema
+        required = set(schema.get("required", ()))
+        self._checks: List[Tuple[str, FieldCheck]] = [
+            (name, _compile_field(name, spec, name in required)) for name, spec in schema.get("properties", {}).items()
+        ]
+
+    def validate(self, data: Any) -> ValidationResult:
+        """Validate one payload, reporting every error found."""
+        if not isinstance(data, dict):
+            error = FieldError("", "type", "Request body must be a JSON object")
+            return ValidationResult(False, (error,), {})
+
+        cleaned: Dict[str, str] = {}
+        required_errors: List[FieldError] = []
+        other_errors: List[FieldError] = []
+        for name, check in self._checks:
+            value, required_error, errors = check(data)
+            if required_error is not None:
+                required_errors.append(required_error)
+            else:
+                if value is not None:
+                    cleaned[name] = value
+                other_errors.extend(errors)
+
+        # Missing fields are reported before constraint violations
+        errors = tuple(required_errors + other_errors)
+        return ValidationResult(not errors, errors, cleaned)
+
+    def validate_many(self, payloads: Iterable[Any]) -> List[ValidationResult]:
+        """Validate a batch of payloads with the same compiled checks."""
+        validate = self.validate
+        return [validate(payload) for payload in payloads]
+
+
+def compile_schema(schema: Dict[str, Any]) -> Validator:
+    """Compile an OpenAPI-style object schema into a reusable validator."""
+    return Validator(schema)
+
+
+def _compile_field(name: str, spec: Dict[str, Any], required: bool) -> FieldCheck:
+    label = name.capitalize()
+    want_string = spec.get("type") == "string"
+    min_length = spec.get("minLength")
+    max_length = spec.get("maxLength")
+    check_length = min_length is not None or max_length is not None
+    low = min_length if min_length is not None else 0
+    high = max_length if max_length is not None else float("inf")
+
+    pattern = None
+    format_message = ""
+    if "format" in spec:
+        if spec["format"] not in FORMATS:
+            raise ValueError(f"Unsupported format {spec['format']!r} for field {name!r}")
+        pattern, format_message = FORMATS[spec["format"]]
+    match = pattern.match if pattern is not None else None
+
+    required_error = FieldError(name, "required", f'Field "{name}" is required')
+    length_error = FieldError(name, "length", _length_message(label, min_length, max_length))
+    format_error = FieldError(name, "format", format_message)
+    type_error = FieldError(name, "type", f"{label} must be a string")
+
+    def check(data: Dict[str, Any]) -> Tuple[Optional[str], Optional[FieldError], List[FieldError]]:
+        raw = data.get(name)
+        if want_string and raw is not None and not isinstance(raw, str):
+            return None, None, [type_error]
+        value = str(raw).strip() if raw else ""
+        if not value:
+            return None, (required_error if required else None), []
+
+        errors = []
+        if check_length and not low <= len(value) <= high:
+            errors.append(length_error)
+        if match is not None and not match(value):
+            errors.append(format_error)
+        return value, None, errors
+
+    return check
+
+
+def _length_message(label: str, min_length: Optional[int], max_length: Optional[int]) -> str:
+    if min_length is not None and max_length is not None:
+        return f"{label} must be between {min_length} and {max_length} characters"
+    if min_length is not None:
+        return f"{label} must be at least {min_length} characters"
+    return f"{label} must be at most {max_length} characters"
+
+
+CONTACT_FORM_VALIDATOR = compile_schema(CONTACT_FORM_SCHEMA)
@@ -0,0 +1,48 @@
+"""Shared fixtures for backend unit tests."""
+
+import os
+import sys
+
+import boto3
+import pytest
+from moto import mock_aws
+
+# Add src, and benchmarks for the shared table definitions, to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+
+# Set required environment variables before any handler module is imported
+os.environ.setdefault("CONTACT_EMAIL", "test@example.com")
+os.environ.setdefault("DYNAMODB_TABLE", "test-contact-table")
+os.environ.setdefault("CORS_ORIGIN", "*")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+
+# Imported after the defaults above so the benchmark defaults do not replace them
+from _support import create_state_table, create_submissions_table  # noqa: E402
+
+
+@pytest.fixture
+def aws():
+    """Start moto and provision the submissions and state tables and a verified SES identity."""
+    import aws_clients
+
+    aws_clients.reset_breakers()
+    with mock_aws():
+        client = boto3.client("dynamodb", region_name="us-east-1")
+        create_submissions_table(client, "test-contact-table")
+        create_state_table(client, "test-state-table")
+        dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+        table = dynamodb.Table("test-contact-table")
+        state_table = dynamodb.Table("test-state-table")
+        ses = boto3.client("ses", region_name="us-east-1")
+        ses.verify_email_identity(EmailAddress="test@example.com")
+        yield {
+            "table": table,
+            "client": client,
+            "table_name": table.name,
+            "state_table": state_table,
+            "state_table_name": state_table.name,
+            "ses": ses,
+        }
@@ -0,0 +1,140 @@
+"""Unit tests for the TTL archive stream consumer and replay."""
+
+import base64
+import gzip
+import json
+
+import boto3
+import pytest
+
+import archiver
+import contact_handler
+import item_codec
+import outbox
+from archiver import ArchiveWriter, LocalSink, S3Sink
+
+LONG_MESSAGE = "Archived message body, long enough to be stored compressed. " * 4
+TTL_IDENTITY = {"type": "Service", "principalId": "dynamodb.amazonaws.com"}
+
+
+def row(i, day="2024-05-01", message="Archived message body"):
+    item = contact_handler.build_submission_item(
+        f"sub-{i:04d}", f"{day}T10:00:{i % 60:02d}", "Jane", "jane@example.com", message, "10.0.0.1", "pytest"
+    )
+    item["ttl"] = 1_700_000_000
+    return item
+
+
+def as_delivered(image):
+    # Lambda hands stream images over as JSON, with Binary values base64-encoded
+    return json.loads(json.dumps(image, default=lambda value: base64.b64encode(value).decode("ascii")))
+
+
+def record(item, sequence, event_name="REMOVE", identity=TTL_IDENTITY, version=0):
+    return {
+        "eventName": event_name,
+        "userIdentity": identity,
+        "dynamodb": {"SequenceNumber": str(sequence), "OldImage": as_delivered(item_codec.encode_item(item, version))},
+    }
+
+
+def archived_rows(sink):
+    rows = []
+    for key in sink.list(""):
+        rows.extend(json.loads(line) for line in gzip.decompress(sink.get(key)).splitlines())
+    return rows
+
+
+@pytest.fixture
+def sink(tmp_path, monkeypatch):
+    local = LocalSink(str(tmp_path))
+    monkeypatch.setattr(archiver, "_sink", local)
+    return local
+
+
+class TestStreamHandler:
+    def test_archives_only_ttl_removals(self, sink):
+        event = {
+            "Records": [
+                record(row(1), 100),
+                record(row(2), 101, identity=None),  # deleted on purpose
+                record(row(3), 102, event_name="MODIFY"),
+                record(row(4, day="2024-05-02", message=LONG_MESSAGE), 103, version=1),  # compressed Binary
+            ]
+        }
+
+        summary = archiver.stream_handler(event, None)
+
+        assert summary == {"archived": 2, "skipped": 2, "files": 2}
+        assert sink.list("") == [
+            "submissions/day=2024-05-01/100-100.ndjson.gz",
+            "submissions/day=2024-05-02/103-103.ndjson.gz",
+        ]
+        rows = archived_rows(sink)
+        assert [r["submissionId"] for r in rows] == ["sub-0001", "sub-0004"]
+        assert rows[1]["message"] == LONG_MESSAGE and "m" not in rows[1]
+
+    def test_retried_batch_overwrites_its_files(self, sink):
+        event = {"Records": [record(row(i), 200 + i) for i in range(5)]}
+
+        archiver.stream_handler(event, None)
+        archiver.stream_handler(event, None)
+
+        assert sink.list("") == ["submissions/day=2024-05-01/200-204.ndjson.gz"]
+        assert len(archived_rows(sink)) == 5
+
+
+class TestArchiveWriter:
+    def test_splits_parts_and_bounds_buffer(self, sink):
+        writer = ArchiveWriter(sink, part_bytes=2000, max_buffer_bytes=3000)
+        peak = 0
+        for i in range(60):
+            writer.add(row(i, day=f"2024-05-0{1 + i % 3}"), str(1000 + i))
+            peak = max(peak, writer._buffered)
+        writer.flush()
+
+        line_bytes = len(json.dumps(row(0))) + 1
+        assert peak < 3000 + line_bytes
+        assert len(writer.keys) > 3
+        assert sorted(r["submissionId"] for r in archived_rows(sink)) == [f"sub-{i:04d}" for i in range(60)]
+
+    def test_list_partitions(self, sink):
+        writer = ArchiveWriter(sink, part_bytes=1)
+        for i in range(3):
+            writer.add(row(i, day="2024-05-01" if i else "2024-04-30"), str(i))
+
+        assert archiver.list_partitions(sink) == [("2024-04-30", 1), ("2024-05-01", 2)]
+
+
+class TestReplay:
+    def test_replays_partition_without_outbox_state(self, sink, aws):
+        pending = {**row(1), **outbox.pending_attributes(0)}
+        writer = ArchiveWriter(sink)
+        writer.add(pending, "1")
+        writer.add(row(2), "2")
+        writer.add(row(3, day="2024-05-02"), "3")
+        writer.flush()
+
+        written = archiver.replay(sink, "2024-05-01", aws["client"], aws["table_name"], now=1_800_000_000)
+        again = archiver.replay(sink, "2024-05-01", aws["client"], aws["table_name"], now=1_800_000_000)
+
+        items = sorted(aws["table"].scan()["Items"], key=lambda item: item["submissionId"])
+        assert written == again == 2
+        assert [item["submissionId"] for item in items] == ["sub-0001", "sub-0002"]
+        assert all(item["ttl"] == 1_800_000_000 + 30 * 86400 for item in items)
+        assert "outboxQueue" not in items[0] and "nextAttemptAt" not in items[0]
+        assert items[0]["emailStatus"] == outbox.STATUS_PENDING
+        assert items[1]["message"] == "Archived message body"
+
+
+class TestS3Sink:
+    def test_round_trip_through_bucket(self, aws, monkeypatch):
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket="archive-bucket")
+        monkeypatch.setattr(archiver, "_sink", S3Sink(s3, "archive-bucket"))
+
+        archiver.stream_handler({"Records": [record(row(i), 10 + i) for i in range(3)]}, None)
+
+        (key,) = s3.list_objects_v2(Bucket="archive-bucket")["Contents"]
+        assert key["Key"] == "submissions/day=2024-05-01/10-12.ndjson.gz"
+        assert len(list(archiver.read_partition(archiver.get_sink(), "2024-05-01"))) == 3
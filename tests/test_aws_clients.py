@@ -0,0 +1,251 @@
+"""Unit tests for the shared AWS client factory and circuit breakers."""
+
+import importlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from botocore.exceptions import (
+    ClientError,
+    EndpointConnectionError,
+    NoCredentialsError,
+    ParamValidationError,
+    ReadTimeoutError,
+)
+
+import aws_clients
+import contact_handler
+import outbox
+from aws_clients import CircuitBreaker, CircuitOpenError
+
+SEND_EMAIL_OK = (
+    b'<SendEmailResponse xmlns="http://ses.amazonaws.com/doc/2010-12-01/">'
+    b"<SendEmailResult><MessageId>stand-in</MessageId></SendEmailResult>"
+    b"<ResponseMetadata><RequestId>1</RequestId></ResponseMetadata></SendEmailResponse>"
+)
+SERVICE_UNAVAILABLE = (
+    b"<ErrorResponse><Error><Type>Receiver</Type><Code>ServiceUnavailable</Code>"
+    b"<Message>Service is unavailable</Message></Error><RequestId>1</RequestId></ErrorResponse>"
+)
+
+
+class StandInEndpoint:
+    """Local HTTP server standing in for SES, with switchable faults."""
+
+    def __init__(self):
+        self.mode = "ok"
+        self.requests = 0
+        endpoint = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                endpoint.requests += 1
+                if endpoint.mode == "hang":
+                    time.sleep(1)
+                status, body = (500, SERVICE_UNAVAILABLE) if endpoint.mode == "error" else (200, SEND_EMAIL_OK)
+                self.send_response(status)
+                self.send_header("Content-Type", "text/xml")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def endpoint():
+    stand_in = StandInEndpoint()
+    yield stand_in
+    stand_in.close()
+
+
+def send(client):
+    return client.send_email(
+        Source="test@example.com",
+        Destination={"ToAddresses": ["test@example.com"]},
+        Message={"Subject": {"Data": "s"}, "Body": {"Text": {"Data": "b"}}},
+    )
+
+
+class TestClientConfig:
+    """Timeouts and retries against the stand-in endpoint."""
+
+    def test_defaults(self):
+        config = aws_clients.build_config()
+
+        assert config.connect_timeout == aws_clients.AWS_CONNECT_TIMEOUT
+        assert config.read_timeout == aws_clients.AWS_READ_TIMEOUT
+        assert config.retries == {"mode": "adaptive", "total_max_attempts": aws_clients.AWS_MAX_ATTEMPTS}
+        assert config.tcp_keepalive is True
+
+    def test_handler_import_skips_boto3(self):
+        # boto3 pulls in s3transfer, which dominated cold-start import time
+        code = "import sys, contact_handler; print(sorted({'boto3', 's3transfer'} & set(sys.modules)))"
+        src = os.path.dirname(aws_clients.__file__)
+        env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [src, os.environ.get("PYTHONPATH")]))}
+
+        output = subprocess.run([sys.executable, "-c", code], env=env, check=True, capture_output=True, text=True)
+
+        assert output.stdout.strip() == "[]"
+
+    def test_success(self, endpoint):
+        client = aws_clients.create_client("ses", endpoint_url=endpoint.url)
+
+        assert send(client)["MessageId"] == "stand-in"
+
+    def test_server_errors_are_retried_then_raised(self, endpoint):
+        endpoint.mode = "error"
+        client = aws_clients.create_client("ses", endpoint_url=endpoint.url, retries={"total_max_attempts": 3})
+
+        with pytest.raises(ClientError) as raised:
+            send(client)
+
+        assert endpoint.requests == 3
+        assert aws_clients.is_dependency_failure(raised.value)
+
+    def test_hung_endpoint_times_out(self, endpoint):
+        endpoint.mode = "hang"
+        client = aws_clients.create_client(
+            "ses", endpoint_url=endpoint.url, read_timeout=0.2, retries={"total_max_attempts": 1}
+        )
+
+        started = time.monotonic()
+        with pytest.raises(ReadTimeoutError) as raised:
+            send(client)
+
+        assert time.monotonic() - started < 1
+        assert aws_clients.is_dependency_failure(raised.value)
+
+    def test_client_errors_are_not_dependency_failures(self):
+        error = ClientError(
+            {"Error": {"Code": "MessageRejected"}, "ResponseMetadata": {"HTTPStatusCode": 400}}, "SendEmail"
+        )
+
+        assert not aws_clients.is_dependency_failure(error)
+
+    def test_client_side_botocore_errors_are_not_dependency_failures(self):
+        assert not aws_clients.is_dependency_failure(ParamValidationError(report="Invalid type for parameter"))
+        assert not aws_clients.is_dependency_failure(NoCredentialsError())
+        assert aws_clients.is_dependency_failure(EndpointConnectionError(endpoint_url="https://email.example"))
+
+
+class TestCircuitBreaker:
+    def make(self, now):
+        return CircuitBreaker(
+            "ses", failure_rate=0.5, min_calls=4, window_seconds=10, open_seconds=30, clock=lambda: now[0]
+        )
+
+    def test_opens_at_failure_rate_and_short_circuits(self, endpoint):
+        endpoint.mode = "error"
+        client = aws_clients.create_client("ses", endpoint_url=endpoint.url, retries={"total_max_attempts": 1})
+        breaker = self.make([0.0])
+
+        for _ in range(4):
+            with pytest.raises(ClientError):
+                breaker.call(send, client)
+        with pytest.raises(CircuitOpenError):
+            breaker.call(send, client)
+
+        assert breaker.state == aws_clients.OPEN
+        assert endpoint.requests == 4
+
+    def test_stays_closed_below_threshold(self):
+        breaker = self.make([0.0])
+
+        for failed in (True, False, False, False, False):
+            assert breaker.allow()
+            breaker.record(failed)
+
+        assert breaker.state == aws_clients.CLOSED
+
+    def test_old_failures_leave_the_window(self):
+        now = [0.0]
+        breaker = self.make(now)
+        for _ in range(3):
+            breaker.record(True)
+        now[0] = 11.0
+
+        breaker.record(True)
+
+        assert breaker.state == aws_clients.CLOSED
+
+    def test_half_open_trial_closes_or_reopens(self, endpoint):
+        now = [0.0]
+        breaker = self.make(now)
+        for _ in range(4):
+            breaker.record(True)
+        assert breaker.is_open()
+
+        now[0] = 31.0
+        assert not breaker.is_open()
+        assert breaker.allow() is True
+        assert breaker.allow() is False  # one trial at a time
+        breaker.record(True)
+        assert breaker.is_open()
+
+        now[0] = 62.0
+        client = aws_clients.create_client("ses", endpoint_url=endpoint.url)
+        breaker.call(send, client)
+        assert breaker.state == aws_clients.CLOSED
+
+
+class TestHandlerDegradedSes:
+    """Sync submissions keep succeeding while SES fails, with emails handed to the outbox."""
+
+    @pytest.fixture
+    def handler(self, aws, endpoint, monkeypatch):
+        importlib.reload(contact_handler)
+        monkeypatch.setattr(contact_handler, "EMAIL_DELIVERY_MODE", "sync")
+        monkeypatch.setattr(
+            contact_handler,
+            "_ses_client",
+            aws_clients.create_client("ses", endpoint_url=endpoint.url, retries={"total_max_attempts": 1}),
+        )
+        monkeypatch.setitem(aws_clients._breakers, "ses", CircuitBreaker("ses", min_calls=2, open_seconds=60))
+        return contact_handler
+
+    def submit(self, handler, i):
+        event = {
+            "httpMethod": "POST",
+            "body": json.dumps({"name": "Jane", "email": "jane@example.com", "message": f"Degraded SES test {i}"}),
+            "requestContext": {"identity": {"sourceIp": f"10.0.1.{i}"}},
+        }
+        return handler.lambda_handler(event, None)["statusCode"]
+
+    def test_failed_sends_are_deferred_then_short_circuited(self, handler, aws, endpoint):
+        endpoint.mode = "error"
+
+        assert [self.submit(handler, i) for i in range(4)] == [200] * 4
+
+        # Two failed sends opened the breaker; later submissions never called SES
+        assert endpoint.requests == 2
+        items = aws["table"].scan()["Items"]
+        assert len(items) == 4
+        assert all(item["outboxQueue"] == outbox.EMAIL_QUEUE for item in items)
+        assert sum("ServiceUnavailable" in item.get("lastError", "") for item in items) == 2
+
+    def test_outbox_worker_pauses_while_open(self, handler, aws, endpoint):
+        endpoint.mode = "error"
+        for i in range(3):
+            self.submit(handler, i)
+
+        summary = handler.outbox_handler({}, None)
+
+        assert summary["sent"] == 0
+        assert summary["retried"] == 0
+        assert endpoint.requests == 2
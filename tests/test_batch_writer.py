@@ -0,0 +1,181 @@
+"""Unit tests for the micro-batched DynamoDB writer."""
+
+import importlib
+import json
+import threading
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+
+import contact_handler
+from batch_writer import BatchWriteError, BatchWriter
+
+
+class FakeBatchWriteItem:
+    """Stand-in for batch_write_item that records calls and can leave items unprocessed."""
+
+    def __init__(
+        self, unprocessed_rounds=0, fail_calls=0, error_code="ProvisionedThroughputExceededException", bad_ids=()
+    ):
+        self.calls = []
+        self.bad_ids = set(bad_ids)
+        self.unprocessed_rounds = unprocessed_rounds
+        self.fail_calls = fail_calls
+        self.error_code = error_code
+        self.lock = threading.Lock()
+
+    def __call__(self, RequestItems):
+        with self.lock:
+            self.calls.append(RequestItems)
+            if self.fail_calls:
+                self.fail_calls -= 1
+                raise ClientError({"Error": {"Code": self.error_code}}, "BatchWriteItem")
+            ((table_name, requests),) = RequestItems.items()
+            if any(request["PutRequest"]["Item"]["id"] in self.bad_ids for request in requests):
+                raise ClientError({"Error": {"Code": "ValidationException"}}, "BatchWriteItem")
+            if self.unprocessed_rounds:
+                self.unprocessed_rounds -= 1
+                # Leave the second half of the batch unprocessed
+                return {"UnprocessedItems": {table_name: requests[len(requests) // 2 :]}}
+            return {"UnprocessedItems": {}}
+
+
+def make_writer(fake, **kwargs):
+    kwargs.setdefault("max_linger_seconds", 0.01)
+    return BatchWriter(fake, "submissions", sleep=lambda seconds: None, key_names=("id",), **kwargs)
+
+
+class TestBatching:
+    """Grouping and flushing."""
+
+    def test_items_are_grouped_into_batches_of_25(self):
+        fake = FakeBatchWriteItem()
+        writer = make_writer(fake, max_linger_seconds=1.0)
+
+        writer.write_many({"id": str(i)} for i in range(60))
+
+        sizes = [len(call["submissions"]) for call in fake.calls]
+        assert sum(sizes) == 60
+        assert max(sizes) == 25
+        writer.close()
+
+    def test_linger_flushes_partial_batch(self):
+        fake = FakeBatchWriteItem()
+        writer = make_writer(fake)
+
+        writer.write({"id": "1"}, timeout=2)
+
+        assert len(fake.calls) == 1
+        writer.close()
+
+    def test_concurrent_callers_share_batches(self):
+        fake = FakeBatchWriteItem()
+        writer = make_writer(fake, max_linger_seconds=0.05)
+        threads = [threading.Thread(target=writer.write, args=({"id": str(i)},)) for i in range(20)]
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sum(len(call["submissions"]) for call in fake.calls) == 20
+        assert len(fake.calls) < 20
+        writer.close()
+
+    def test_flush_writes_from_calling_thread(self):
+        fake = FakeBatchWriteItem()
+        writer = make_writer(fake, max_linger_seconds=60)
+        future = writer.submit({"id": "1"})
+
+        writer.flush()
+
+        assert future.done()
+        writer.close()
+
+    def test_rejects_oversized_batches(self):
+        with pytest.raises(ValueError):
+            BatchWriter(FakeBatchWriteItem(), "submissions", max_batch_size=26)
+
+
+class TestRetries:
+    """Unprocessed items and transient errors."""
+
+    def test_unprocessed_items_are_retried(self):
+        fake = FakeBatchWriteItem(unprocessed_rounds=2)
+        writer = make_writer(fake)
+
+        writer.write_many([{"id": str(i)} for i in range(10)], timeout=2)
+
+        retried = [len(call["submissions"]) for call in fake.calls[1:]]
+        assert retried == [5, 3]
+        writer.close()
+
+    def test_transient_errors_are_retried(self):
+        fake = FakeBatchWriteItem(fail_calls=2)
+        writer = make_writer(fake)
+
+        writer.write({"id": "1"}, timeout=2)
+
+        assert len(fake.calls) == 3
+        writer.close()
+
+    def test_gives_up_after_max_attempts(self):
+        fake = FakeBatchWriteItem(fail_calls=100)
+        writer = make_writer(fake, max_attempts=3)
+
+        with pytest.raises(BatchWriteError):
+            writer.write({"id": "1"}, timeout=2)
+        assert len(fake.calls) == 3
+        writer.close()
+
+    def test_non_transient_errors_fail_without_retry(self):
+        fake = FakeBatchWriteItem(fail_calls=100, error_code="ValidationException")
+        writer = make_writer(fake)
+
+        with pytest.raises(BatchWriteError) as excinfo:
+            writer.write({"id": "1"}, timeout=2)
+        assert len(fake.calls) == 1
+        assert isinstance(excinfo.value.__cause__, ClientError)
+        writer.close()
+
+    def test_bad_item_fails_only_its_own_future(self):
+        fake = FakeBatchWriteItem(bad_ids={"2"})
+        writer = make_writer(fake, max_linger_seconds=1.0)
+
+        futures = [writer.submit({"id": str(i), "message": "m"}) for i in range(4)]
+        writer.flush()
+
+        assert [future.exception(timeout=2) is None for future in futures] == [True, True, False, True]
+        # The failed batch, then each item alone
+        assert [len(call["submissions"]) for call in fake.calls] == [4, 1, 1, 1, 1]
+        writer.close()
+
+    def test_closed_writer_rejects_items(self):
+        writer = make_writer(FakeBatchWriteItem())
+        writer.close()
+
+        with pytest.raises(BatchWriteError):
+            writer.submit({"id": "1"})
+
+
+class TestHandlerIntegration:
+    """Submissions routed through the batch writer."""
+
+    def test_handler_stores_submission_via_batch_writer(self, aws, monkeypatch):
+        importlib.reload(contact_handler)
+        monkeypatch.setattr(contact_handler, "BATCH_WRITES", True)
+        event = {
+            "httpMethod": "POST",
+            "body": json.dumps(
+                {"name": "Jane Doe", "email": "jane@example.com", "message": "Batched submission message."}
+            ),
+        }
+
+        response = contact_handler.lambda_handler(event, None)
+
+        assert response["statusCode"] == 200
+        submission_id = json.loads(response["body"])["submissionId"]
+        items = boto3.resource("dynamodb", region_name="us-east-1").Table("test-contact-table").scan()["Items"]
+        assert [item["submissionId"] for item in items] == [submission_id]
+        contact_handler.get_batch_writer().close()
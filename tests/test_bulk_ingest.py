@@ -0,0 +1,139 @@
+"""Unit tests for bulk NDJSON ingestion."""
+
+import json
+import sys
+
+import pytest
+
+import bulk_ingest
+import contact_handler
+from bulk_ingest import ingest, iter_lines, parse_timestamp
+
+
+def ndjson(*records):
+    return [json.dumps(record).encode() if isinstance(record, dict) else record for record in records]
+
+
+def record(i, **overrides):
+    return {
+        "name": f"Person {i}",
+        "email": f"Person{i}@Example.com",
+        "message": f"Historical inquiry number {i}.",
+        **overrides,
+    }
+
+
+class TestIterLines:
+    """Streaming line splitter."""
+
+    def test_lines_span_chunk_boundaries(self):
+        chunks = [b'{"a":', b'1}\n{"b"', b":2}\n", b'{"c":3}']
+
+        assert list(iter_lines(chunks)) == [b'{"a":1}', b'{"b":2}', b'{"c":3}']
+
+    def test_oversized_lines_are_replaced_with_none(self):
+        chunks = [b"short\n", b"x" * 20, b"x" * 20, b"\nnext\n"]
+
+        assert list(iter_lines(chunks, max_line_bytes=16)) == [b"short", None, b"next"]
+
+
+class TestParseTimestamp:
+    """Timestamps normalised to naive UTC ISO strings."""
+
+    def test_utc_suffix_and_offsets(self):
+        assert parse_timestamp("2023-05-01T10:00:00Z") == "2023-05-01T10:00:00"
+        assert parse_timestamp("2023-05-01T12:00:00+02:00") == "2023-05-01T10:00:00"
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            parse_timestamp("yesterday")
+
+
+class TestIngest:
+    """End-to-end import against moto."""
+
+    def run(self, aws, lines, **kwargs):
+        reports = []
+        summary = ingest(lines, aws["client"], aws["table_name"], reports.append, **kwargs)
+        return summary, reports
+
+    def test_report_has_one_entry_per_line_in_order(self, aws, mocker):
+        send = mocker.spy(contact_handler, "send_email_notification")
+        lines = ndjson(
+            record(1, submissionId="legacy-1", timestamp="2022-01-02T03:04:05Z"),
+            b"{not json",
+            b"   ",
+            record(2, message="short"),
+            record(3, message="Cheap casino chips for sale"),
+            record(4, submissionId="legacy-1"),
+            b"[1, 2]",
+            record(5),
+        )
+
+        summary, reports = self.run(aws, lines)
+
+        assert [(r["line"], r["status"]) for r in reports] == [
+            (1, "accepted"),
+            (2, "rejected"),
+            (4, "rejected"),
+            (5, "rejected"),
+            (6, "rejected"),
+            (7, "rejected"),
+            (8, "accepted"),
+        ]
+        assert reports[1]["error"] == "Invalid JSON"
+        assert "spam" in reports[3]["error"]
+        assert reports[4]["error"] == "Duplicate submissionId in this import"
+        assert summary["accepted"] == 2 and summary["rejected"] == 5 and summary["blank"] == 1
+        send.assert_not_called()
+
+    def test_items_are_stored_as_imported(self, aws):
+        self.run(aws, ndjson(record(1, submissionId="legacy-1", timestamp="2022-01-02T03:04:05Z")), source="typeform")
+
+        (item,) = aws["table"].scan()["Items"]
+        assert item["submissionId"] == "legacy-1"
+        assert item["timestamp"] == "2022-01-02T03:04:05"
+        assert item["email"] == "person1@example.com"
+        assert item["status"] == "imported"
+        assert item["importSource"] == "typeform"
+        assert "ttl" not in item
+
+    def test_ttl_from_import_time(self, aws):
+        self.run(aws, ndjson(record(1)), ttl_days=30, clock=lambda: 1_700_000_000)
+
+        (item,) = aws["table"].scan()["Items"]
+        assert item["ttl"] == 1_700_000_000 + 30 * 86400
+
+    def test_non_string_fields_reject_only_their_line(self, aws):
+        summary, reports = self.run(aws, ndjson(record(1, name=12345), record(2, email=None), record(3)))
+
+        assert [r["status"] for r in reports] == ["rejected", "rejected", "accepted"]
+        assert reports[0]["error"] == "Name must be a string"
+        assert summary["accepted"] == 1
+
+    def test_many_records_with_small_in_flight_window(self, aws):
+        summary, reports = self.run(aws, (json.dumps(record(i)).encode() for i in range(120)), max_in_flight=7)
+
+        assert summary["accepted"] == 120
+        assert [r["line"] for r in reports] == list(range(1, 121))
+        assert aws["table"].scan(Select="COUNT")["Count"] == 120
+
+
+class TestCli:
+    """Command-line entry point."""
+
+    def test_file_import_writes_report(self, aws, tmp_path, monkeypatch, capsys):
+        source = tmp_path / "inquiries.ndjson"
+        source.write_bytes(b"\n".join(ndjson(record(1), b"oops", record(2))) + b"\n")
+        report = tmp_path / "report.ndjson"
+        monkeypatch.setattr(
+            sys,
+            "argv",
+            ["bulk_ingest.py", str(source), "--table", aws["table_name"], "--report", str(report), "--writers", "2"],
+        )
+
+        bulk_ingest.main()
+
+        statuses = [json.loads(line)["status"] for line in report.read_text().splitlines()]
+        assert statuses == ["accepted", "rejected", "accepted"]
+        assert json.loads(capsys.readouterr().err)["accepted"] == 2
@@ -0,0 +1,68 @@
+"""Unit tests for the JSON codec and precomputed response bodies."""
+
+import importlib
+import json
+import sys
+
+import pytest
+
+import codec
+import contact_handler
+
+DOCUMENT = {"name": "Zoë", "nested": {"list": [1, 2.5, None, True]}, "message": 'quote " and \\ slash'}
+
+
+@pytest.fixture(params=["default", "stdlib"])
+def backend(request, monkeypatch):
+    """The codec module as loaded here, and again with orjson hidden."""
+    if request.param == "stdlib":
+        monkeypatch.setitem(sys.modules, "orjson", None)
+        importlib.reload(codec)
+    yield codec
+    if request.param == "stdlib":
+        monkeypatch.undo()
+        importlib.reload(codec)
+
+
+class TestCodec:
+    def test_round_trip_and_compact_output(self, backend):
+        encoded = backend.dumps(DOCUMENT)
+
+        assert encoded == json.dumps(DOCUMENT, separators=(",", ":"), ensure_ascii=False)
+        assert backend.loads(encoded) == DOCUMENT
+        assert backend.loads(encoded.encode("utf-8")) == DOCUMENT
+
+    def test_decode_error_type(self, backend):
+        with pytest.raises(backend.JSONDecodeError):
+            backend.loads("{not json")
+        with pytest.raises(ValueError):
+            backend.loads(b"")
+
+    def test_stdlib_fallback_selected_without_orjson(self, monkeypatch):
+        monkeypatch.setitem(sys.modules, "orjson", None)
+        try:
+            assert importlib.reload(codec).BACKEND == "json"
+        finally:
+            monkeypatch.undo()
+            importlib.reload(codec)
+
+
+class TestResponses:
+    def test_success_body(self):
+        response = contact_handler.create_success_response('id-"1"', contact_handler.CORS_HEADERS)
+
+        assert json.loads(response["body"]) == {
+            "message": contact_handler.SUCCESS_MESSAGE,
+            "submissionId": 'id-"1"',
+        }
+
+    def test_error_bodies_are_reused(self):
+        first = contact_handler.create_error_response(400, "Invalid JSON in request body", {})
+        second = contact_handler.create_error_response(400, "Invalid JSON in request body", {})
+
+        assert json.loads(first["body"]) == {"error": "Invalid JSON in request body", "statusCode": 400}
+        assert first["body"] is second["body"]
+
+    def test_preflight_and_rate_limit_headers(self):
+        assert json.loads(contact_handler.PREFLIGHT_BODY) == {"message": "CORS preflight successful"}
+        assert contact_handler.RATE_LIMITED_HEADERS == {**contact_handler.CORS_HEADERS, "Retry-After": "60"}
@@ -0,0 +1,116 @@
+"""Unit tests for concurrent store-and-send delivery."""
+
+import importlib
+import json
+import time
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+
+import contact_handler
+import metrics
+import outbox
+
+DELAY = 0.3
+
+
+def add_latency(client, event_name, seconds):
+    """Sleep before every matching API call made through ``client`` (stand-in round trip)."""
+    client.meta.events.register(event_name, lambda **kwargs: time.sleep(seconds))
+
+
+def fail_with(client, event_name, code, status):
+    def _raise(model, **kwargs):
+        raise ClientError({"Error": {"Code": code}, "ResponseMetadata": {"HTTPStatusCode": status}}, model.name)
+
+    client.meta.events.register(event_name, _raise)
+
+
+@pytest.fixture
+def handler(aws, monkeypatch):
+    """contact_handler in concurrent mode with its own (instrumentable) clients."""
+    importlib.reload(contact_handler)
+    monkeypatch.setattr(contact_handler, "EMAIL_DELIVERY_MODE", "concurrent")
+    monkeypatch.setattr(contact_handler, "_ses_client", boto3.client("ses", region_name="us-east-1"))
+    monkeypatch.setattr(contact_handler, "_dynamodb_client", boto3.client("dynamodb", region_name="us-east-1"))
+    metrics.collector.reset()
+    return contact_handler
+
+
+def submit(handler, i):
+    event = {
+        "httpMethod": "POST",
+        "body": json.dumps({"name": "Jane", "email": "jane@example.com", "message": f"Concurrent delivery test {i}"}),
+        "headers": {"User-Agent": "pytest"},
+        "requestContext": {"identity": {"sourceIp": f"10.0.2.{i}"}},
+    }
+    return handler.lambda_handler(event, None)
+
+
+def sent_count(aws):
+    return int(aws["ses"].get_send_quota()["SentLast24Hours"])
+
+
+class TestConcurrentDelivery:
+    def test_latency_is_the_slower_call(self, handler, aws, monkeypatch):
+        submit(handler, 0)  # warm up clients and templates
+        add_latency(handler._dynamodb_client, "before-call.dynamodb.PutItem", DELAY)
+        add_latency(handler._ses_client, "before-call.ses.SendEmail", DELAY)
+
+        started = time.perf_counter()
+        assert submit(handler, 1)["statusCode"] == 200
+        concurrent = time.perf_counter() - started
+
+        monkeypatch.setattr(handler, "EMAIL_DELIVERY_MODE", "sync")
+        started = time.perf_counter()
+        assert submit(handler, 2)["statusCode"] == 200
+        sequential = time.perf_counter() - started
+
+        assert sequential >= 2 * DELAY
+        assert concurrent < 1.6 * DELAY
+        assert sent_count(aws) == 3
+        stages = metrics.collector.records()[1]["stages"]
+        assert stages["Store"] >= DELAY * 1000 and stages["Email"] >= DELAY * 1000
+
+    def test_pool_survives_invocations(self, handler):
+        submit(handler, 0)
+        executor = handler.get_email_executor()
+
+        submit(handler, 1)
+
+        assert handler.get_email_executor() is executor
+        assert not executor._shutdown
+
+    def test_ses_outage_defers_to_outbox(self, handler, aws):
+        fail_with(handler._ses_client, "before-call.ses.SendEmail", "ServiceUnavailable", 503)
+
+        assert submit(handler, 0)["statusCode"] == 200
+
+        (item,) = aws["table"].scan()["Items"]
+        assert item["emailStatus"] == outbox.STATUS_PENDING
+        assert item["outboxQueue"] == outbox.EMAIL_QUEUE
+        assert "ServiceUnavailable" in item["lastError"]
+        assert metrics.collector.count(metrics.EMAIL_DEFERRED) == 1
+
+    def test_rejected_email_is_recorded_on_row(self, handler, aws):
+        fail_with(handler._ses_client, "before-call.ses.SendEmail", "MessageRejected", 400)
+
+        assert submit(handler, 0)["statusCode"] == 200
+
+        (item,) = aws["table"].scan()["Items"]
+        assert item["emailStatus"] == outbox.STATUS_FAILED
+        assert "outboxQueue" not in item
+        assert "MessageRejected" in item["lastError"]
+        assert metrics.collector.count(metrics.EMAIL_FAILED) == 1
+
+    def test_store_failure_fails_request_after_send_finishes(self, handler, aws):
+        add_latency(handler._ses_client, "before-call.ses.SendEmail", DELAY)
+        fail_with(handler._dynamodb_client, "before-call.dynamodb.PutItem", "InternalServerError", 500)
+
+        response = submit(handler, 0)
+
+        assert response["statusCode"] == 500
+        assert aws["table"].scan()["Items"] == []
+        # The in-flight send completed before the response was returned
+        assert sent_count(aws) == 1
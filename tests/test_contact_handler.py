@@ -3,6 +3,8 @@
 import json
 import os
 import sys
+import threading
+import time
 import importlib
 import pytest
 from unittest.mock import Mock
@@ -218,6 +220,47 @@ class TestLambdaHandler:
         response = lambda_handler(event, lambda_context)
         assert response["statusCode"] == 400
 
+    @mock_aws
+    def test_non_string_field(self, lambda_context):
+        """Test handler answers 400, not 500, for a field of the wrong type."""
+        from contact_handler import lambda_handler
+
+        event = {
+            "httpMethod": "POST",
+            "body": json.dumps({"name": 12345, "email": "john@example.com", "message": "Test message that is long"}),
+        }
+
+        response = lambda_handler(event, lambda_context)
+        assert response["statusCode"] == 400
+        assert json.loads(response["body"])["error"] == "Name must be a string"
+
+
+class TestSharedState:
+    """Container-wide objects under concurrent first requests (http_adapter)."""
+
+    def test_concurrent_first_use_builds_each_object_once(self, mocker):
+        importlib.reload(contact_handler)
+
+        def slow_client(service, **kwargs):
+            time.sleep(0.05)
+            return Mock(name=service)
+
+        create = mocker.patch.object(contact_handler.aws_clients, "create_client", side_effect=slow_client)
+        results = []
+
+        def first_request():
+            results.append((contact_handler.get_dynamodb_client(), contact_handler.get_rate_limiter()))
+
+        threads = [threading.Thread(target=first_request) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert create.call_count == 1
+        assert len({id(client) for client, _ in results}) == 1
+        assert len({id(limiter) for _, limiter in results}) == 1
+
 
 class TestErrorResponse:
     """Test error response creation."""
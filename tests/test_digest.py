@@ -0,0 +1,233 @@
+"""Unit tests for digest email delivery."""
+
+import importlib
+import json
+import time
+
+import boto3
+import pytest
+
+import contact_handler
+import digest
+import outbox
+
+
+@pytest.fixture
+def handler(aws, monkeypatch):
+    """contact_handler bound to the moto backend and running in digest mode."""
+    importlib.reload(contact_handler)
+    monkeypatch.setattr(contact_handler, "EMAIL_DELIVERY_MODE", "digest")
+    return contact_handler
+
+
+def submit(handler, i, email="jane@example.com"):
+    event = {
+        "httpMethod": "POST",
+        "body": json.dumps({"name": f"Person {i}", "email": email, "message": f"Project inquiry number {i} <b>hi</b>"}),
+        "headers": {"User-Agent": "pytest"},
+        "requestContext": {"identity": {"sourceIp": f"10.0.0.{i + 1}"}},
+    }
+    assert handler.lambda_handler(event, None)["statusCode"] == 200
+
+
+def sent_messages():
+    ses = boto3.client("ses", region_name="us-east-1")
+    return int(ses.get_send_quota()["SentLast24Hours"])
+
+
+class TestDigestMode:
+    """Submissions wait on the digest queue until the window closes or the batch fills."""
+
+    def test_submissions_queue_without_sending(self, handler, aws):
+        submit(handler, 0)
+
+        (item,) = aws["table"].scan()["Items"]
+        assert item["outboxQueue"] == outbox.DIGEST_QUEUE
+        assert item["emailStatus"] == outbox.STATUS_PENDING
+        assert sent_messages() == 0
+
+    def test_waits_for_window(self, handler, aws):
+        submit(handler, 0)
+
+        summary = digest.drain(aws["client"], aws["table_name"], handler.send_digest_notification, window_seconds=300)
+
+        assert summary["digests"] == 0
+        assert summary["waiting"] == 1
+        assert sent_messages() == 0
+
+    def test_window_close_sends_one_email_for_all(self, handler, aws):
+        for i in range(4):
+            submit(handler, i)
+
+        summary = digest.drain(
+            aws["client"],
+            aws["table_name"],
+            handler.send_digest_notification,
+            clock=lambda: time.time() + 301,
+            window_seconds=300,
+        )
+
+        assert summary == {"digests": 1, "sent": 4, "retried": 0, "failed": 0, "skipped": 0, "waiting": 0}
+        assert sent_messages() == 1
+        assert all(item["emailStatus"] == outbox.STATUS_SENT for item in aws["table"].scan()["Items"])
+
+    def test_mark_sent_failure_does_not_resend_digest(self, handler, aws, monkeypatch):
+        for i in range(3):
+            submit(handler, i)
+        mark_sent = outbox.mark_sent
+        calls = []
+
+        def flaky_mark_sent(client, table_name, item, now):
+            calls.append(item["submissionId"])
+            if len(calls) == 1:
+                raise RuntimeError("Throttling")
+            mark_sent(client, table_name, item, now)
+
+        monkeypatch.setattr(outbox, "mark_sent", flaky_mark_sent)
+        now = time.time() + 301
+
+        summary = digest.drain(aws["client"], aws["table_name"], handler.send_digest_notification, clock=lambda: now)
+
+        assert summary["digests"] == 1
+        assert summary["sent"] == 3
+        assert len(calls) == 3
+        assert (
+            digest.drain(aws["client"], aws["table_name"], handler.send_digest_notification, clock=lambda: now)[
+                "digests"
+            ]
+            == 0
+        )
+        assert sent_messages() == 1
+
+    def test_full_batch_sends_before_window(self, handler, aws):
+        for i in range(5):
+            submit(handler, i)
+
+        summary = digest.drain(
+            aws["client"], aws["table_name"], handler.send_digest_notification, window_seconds=300, max_items=2
+        )
+
+        assert summary["digests"] == 2
+        assert summary["sent"] == 4
+        assert summary["waiting"] == 1
+
+    def test_failed_digest_retries_every_row(self, handler, aws):
+        for i in range(3):
+            submit(handler, i)
+
+        def failing_send(items):
+            raise RuntimeError("Throttling")
+
+        now = time.time() + 301
+        summary = digest.drain(aws["client"], aws["table_name"], failing_send, clock=lambda: now)
+
+        assert summary["retried"] == 3
+        assert all(item["emailAttempts"] == 1 for item in aws["table"].scan()["Items"])
+
+        # Retried rows go out as soon as their backoff ends, without waiting another window
+        later = now + outbox.OUTBOX_MAX_DELAY_SECONDS
+        summary = digest.drain(
+            aws["client"],
+            aws["table_name"],
+            handler.send_digest_notification,
+            clock=lambda: later,
+            window_seconds=10**6,
+        )
+        assert summary["sent"] == 3
+
+    def test_digest_handler_ignores_email_queue(self, handler, aws, monkeypatch):
+        monkeypatch.setattr(handler, "EMAIL_DELIVERY_MODE", "outbox")
+        submit(handler, 0)
+
+        assert handler.digest_handler({}, None)["sent"] == 0
+        assert handler.outbox_handler({}, None)["sent"] == 1
+
+
+class TestRender:
+    def test_lists_every_submission_escaped(self):
+        items = [
+            {
+                "name": f"Person {i}",
+                "email": f"p{i}@example.com",
+                "message": "<script>x</script>",
+                "submissionId": f"sub-{i}",
+                "timestamp": f"2024-05-01T10:0{i}:00.123456",
+            }
+            for i in range(3)
+        ]
+
+        subject, html_body, text_body = digest.render(items)
+
+        assert subject == "Portfolio Contact Form: 3 new messages"
+        assert "3 submissions received between 2024-05-01 10:00:00 and 2024-05-01 10:02:00" in text_body
+        assert all(f"sub-{i}" in html_body and f"p{i}@example.com" in text_body for i in range(3))
+        assert '<div class="entry">' in html_body
+        assert "<script>" not in html_body
+        assert "&lt;script&gt;" in html_body
+
+    def test_time_range_uses_stored_timestamps(self):
+        # A retried row can come back ahead of newer ones
+        items = [
+            {"name": "A", "email": "a@example.com", "message": "m", "submissionId": "a", "timestamp": t}
+            for t in ("2024-05-01T10:05:00", "2024-05-01T10:01:00.5", "2024-05-01T10:09:00")
+        ]
+
+        _, _, text_body = digest.render(items)
+
+        assert "between 2024-05-01 10:01:00 and 2024-05-01 10:09:00" in text_body
+
+
+class TestBurstDetector:
+    def test_switches_on_over_threshold_and_holds_for_next_window(self):
+        now = [1_000_020.0]
+        detector = digest.BurstDetector(threshold=3, window_seconds=60, clock=lambda: now[0])
+
+        assert [detector.hit() for _ in range(4)] == [False, False, False, True]
+        now[0] += 60
+        assert detector.hit() is True
+        now[0] += 60
+        assert detector.hit() is False
+
+    def test_shared_count_across_detectors(self, aws):
+        clock = lambda: 1_000_020.0  # noqa: E731
+        detectors = [digest.BurstDetector(3, 60, aws["client"], aws["state_table_name"], clock=clock) for _ in range(2)]
+
+        results = [detectors[i % 2].hit() for i in range(4)]
+
+        assert results == [False, False, False, True]
+
+    def test_shared_count_is_updated_in_steps(self, aws):
+        clock = lambda: 1_000_020.0  # noqa: E731
+        detectors = [
+            digest.BurstDetector(20, 60, aws["client"], aws["state_table_name"], clock=clock) for _ in range(2)
+        ]
+        calls = []
+        update_item = aws["client"].update_item
+
+        def counting_update_item(**kwargs):
+            calls.append(kwargs)
+            return update_item(**kwargs)
+
+        aws["client"].update_item = counting_update_item
+        try:
+            results = [detectors[i % 2].hit() for i in range(24)]
+        finally:
+            del aws["client"].update_item
+
+        # One UpdateItem per two hits in each container
+        assert len(calls) == 12
+        # Never before the 21st hit, and at most one unsynced hit per container late
+        assert 20 <= results.index(True) <= 22
+        assert all(results[results.index(True) :])
+
+    def test_handler_switches_to_digest_during_burst(self, aws, monkeypatch):
+        importlib.reload(contact_handler)
+        monkeypatch.setattr(digest, "DIGEST_AUTO_THRESHOLD", 2)
+        monkeypatch.setattr(contact_handler, "_burst_detector", digest.BurstDetector(threshold=2))
+
+        for i in range(3):
+            submit(contact_handler, i)
+
+        queues = sorted(item.get("outboxQueue", "-") for item in aws["table"].scan()["Items"])
+        assert queues == ["-", "-", outbox.DIGEST_QUEUE]
+        assert sent_messages() == 2
@@ -0,0 +1,48 @@
+"""Unit tests for the DynamoDB attribute-value serializer."""
+
+from decimal import Decimal
+
+import pytest
+
+from dynamo_serializer import deserialize_item, serialize_item, to_attribute_value
+
+
+class TestSerializer:
+    """Round trips through the low-level wire format."""
+
+    def test_submission_item_round_trip(self):
+        item = {
+            "submissionId": "abc",
+            "timestamp": "2024-01-01T00:00:00",
+            "ttl": 1700000000,
+            "emailAttempts": 0,
+            "verified": True,
+            "notes": None,
+        }
+
+        serialized = serialize_item(item)
+
+        assert serialized["submissionId"] == {"S": "abc"}
+        assert serialized["ttl"] == {"N": "1700000000"}
+        assert deserialize_item(serialized) == item
+
+    def test_nested_values(self):
+        item = {"meta": {"tags": ["a", "b"], "score": Decimal("0.5")}, "labels": {"x", "y"}}
+
+        assert deserialize_item(serialize_item(item)) == item
+
+    def test_binary_from_stream_json(self):
+        image = {"m": {"B": "cGF5bG9hZA=="}, "tags": {"BS": ["AQI=", b"\x03"]}}
+
+        assert deserialize_item(image) == {"m": b"payload", "tags": {b"\x01\x02", b"\x03"}}
+
+    def test_matches_boto3_type_serializer(self):
+        from boto3.dynamodb.types import TypeSerializer
+
+        value = {"name": "Jane", "count": 3, "flags": [True, None]}
+
+        assert to_attribute_value(value) == TypeSerializer().serialize(value)
+
+    def test_rejects_unsupported_types(self):
+        with pytest.raises(TypeError):
+            to_attribute_value(object())
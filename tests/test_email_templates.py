@@ -0,0 +1,87 @@
+"""Unit tests for the precompiled email templates."""
+
+import importlib
+
+import pytest
+from moto import mock_aws
+
+import contact_handler
+import email_templates
+from email_templates import CompiledTemplate, TemplateError, load_templates
+
+FIELDS = {
+    "name": "Jane <b>Doe</b>",
+    "email": "jane@example.com",
+    "message": 'Hi & "welcome"\nSecond line',
+    "submission_id": "abc-123",
+    "timestamp": "2024-01-01 12:00:00",
+}
+
+
+class TestCompiledTemplate:
+    """Parsing and rendering."""
+
+    def test_render_fills_fields(self):
+        template = CompiledTemplate("Hello ${name}, you owe $$5 from $email.")
+
+        assert template.fields == ("name", "email")
+        assert template.render({"name": "Ann", "email": "a@b.co"}) == "Hello Ann, you owe $5 from a@b.co."
+
+    def test_escape_is_applied_to_values_only(self):
+        template = CompiledTemplate("<p>${name}</p>", escape=email_templates._escape_html)
+
+        assert template.render({"name": "<script>"}) == "<p>&lt;script&gt;</p>"
+
+    def test_missing_field_raises(self):
+        with pytest.raises(TemplateError):
+            CompiledTemplate("${name}").render({})
+
+
+class TestBundledTemplates:
+    """The contact notification templates shipped with the handler."""
+
+    def test_html_escapes_user_input(self):
+        html_body, text_body = load_templates("contact_notification").render(FIELDS)
+
+        assert "Jane &lt;b&gt;Doe&lt;/b&gt;" in html_body
+        assert "Hi &amp; &quot;welcome&quot;" in html_body
+        assert "<b>" not in html_body
+        assert "Jane <b>Doe</b>" in text_body
+
+    def test_single_timestamp_in_both_bodies(self):
+        html_body, text_body = load_templates("contact_notification").render(FIELDS)
+
+        assert "Timestamp: 2024-01-01 12:00:00 UTC" in html_body
+        assert "Timestamp: 2024-01-01 12:00:00 UTC" in text_body
+
+    def test_templates_can_be_swapped(self, tmp_path):
+        (tmp_path / "custom.html").write_text("<h1>${name}</h1>", encoding="utf-8")
+        (tmp_path / "custom.txt").write_text("From ${name}", encoding="utf-8")
+
+        templates = load_templates("custom", str(tmp_path))
+
+        assert templates.render({"name": "A&B"}) == ("<h1>A&amp;B</h1>", "From A&B")
+
+    def test_templates_are_cached_per_container(self):
+        assert email_templates.get_templates("contact_notification") is email_templates.get_templates(
+            "contact_notification"
+        )
+
+
+class TestSendEmailNotification:
+    """send_email_notification renders the templates."""
+
+    @mock_aws
+    def test_sends_rendered_email(self, mocker):
+        import boto3
+
+        boto3.client("ses", region_name="us-east-1").verify_email_identity(EmailAddress="test@example.com")
+        importlib.reload(contact_handler)
+        spy = mocker.spy(email_templates.CompiledTemplate, "render")
+
+        contact_handler.send_email_notification(
+            "Jane", "jane@example.com", "Hello there, friend!", "abc", "2024-01-02T03:04:05.678901"
+        )
+
+        assert spy.call_count == 2
+        assert all(call.args[1]["timestamp"] == "2024-01-02 03:04:05" for call in spy.call_args_list)
@@ -0,0 +1,118 @@
+"""Unit tests for the parallel-scan table export."""
+
+import csv
+import gzip
+import io
+import json
+import os
+
+import pytest
+
+from export_table import ExportError, export_table
+
+
+def seed(table, count):
+    with table.batch_writer() as writer:
+        for i in range(count):
+            writer.put_item(
+                Item={
+                    "submissionId": f"sub-{i:04d}",
+                    "timestamp": f"2024-01-01T00:00:{i % 60:02d}",
+                    "name": f"Person {i}",
+                    "email": f"person{i}@example.com",
+                    "message": f"Message number {i}, with a comma",
+                    "status": "received",
+                    "ttl": 1_900_000_000 + i,
+                }
+            )
+
+
+def read_ndjson(out_dir):
+    rows = []
+    for name in sorted(os.listdir(out_dir)):
+        if name.endswith(".ndjson.gz"):
+            with gzip.open(os.path.join(out_dir, name), "rt", encoding="utf-8") as fh:
+                rows.extend(json.loads(line) for line in fh)
+    return rows
+
+
+class FlakyClient:
+    """Delegates to a real client but fails after a number of scan calls."""
+
+    def __init__(self, client, fail_after):
+        self.client = client
+        self.calls = 0
+        self.fail_after = fail_after
+
+    def scan(self, **kwargs):
+        self.calls += 1
+        if self.calls > self.fail_after:
+            raise RuntimeError("connection reset")
+        return self.client.scan(**kwargs)
+
+
+class TestExport:
+    """Exports against moto."""
+
+    def test_parallel_ndjson_export(self, aws, tmp_path):
+        seed(aws["table"], 60)
+
+        summary = export_table(aws["client"], aws["table_name"], str(tmp_path), segments=3, page_size=7)
+
+        rows = read_ndjson(tmp_path)
+        assert summary["totalItems"] == 60
+        assert sorted(row["submissionId"] for row in rows) == [f"sub-{i:04d}" for i in range(60)]
+        assert isinstance(rows[0]["ttl"], int)
+        assert len([n for n in os.listdir(tmp_path) if n.startswith("segment-")]) == 3
+
+    def test_csv_with_projection(self, aws, tmp_path):
+        seed(aws["table"], 10)
+
+        export_table(
+            aws["client"],
+            aws["table_name"],
+            str(tmp_path),
+            fmt="csv",
+            segments=2,
+            attributes=["submissionId", "message"],
+        )
+
+        rows = []
+        for name in sorted(os.listdir(tmp_path)):
+            if name.endswith(".csv.gz"):
+                with gzip.open(tmp_path / name, "rt", encoding="utf-8", newline="") as fh:
+                    rows.extend(csv.DictReader(io.StringIO(fh.read())))
+        assert len(rows) == 10
+        assert set(rows[0]) == {"submissionId", "message"}
+        assert "," in rows[0]["message"]
+
+    def test_resume_exports_each_item_once(self, aws, tmp_path):
+        seed(aws["table"], 50)
+        flaky = FlakyClient(aws["client"], fail_after=4)
+
+        with pytest.raises(RuntimeError):
+            export_table(flaky, aws["table_name"], str(tmp_path), segments=2, page_size=5)
+
+        # A page written after the last checkpoint is discarded on resume
+        unfinished = [
+            segment
+            for segment, state in json.loads((tmp_path / "checkpoint.json").read_text())["segments"].items()
+            if not state["done"]
+        ]
+        with open(tmp_path / f"segment-{int(unfinished[0]):04d}.ndjson.gz", "ab") as fh:
+            fh.write(gzip.compress(b'{"submissionId": "partial-page"}\n'))
+
+        summary = export_table(aws["client"], aws["table_name"], str(tmp_path), segments=2, page_size=5, resume=True)
+
+        ids = [row["submissionId"] for row in read_ndjson(tmp_path)]
+        assert sorted(ids) == [f"sub-{i:04d}" for i in range(50)]
+        assert summary["totalItems"] == 50
+
+    def test_refuses_to_overwrite_or_mix_exports(self, aws, tmp_path):
+        seed(aws["table"], 3)
+        export_table(aws["client"], aws["table_name"], str(tmp_path), segments=2)
+
+        with pytest.raises(ExportError):
+            export_table(aws["client"], aws["table_name"], str(tmp_path), segments=2)
+        with pytest.raises(ExportError):
+            export_table(aws["client"], aws["table_name"], str(tmp_path), segments=4, resume=True)
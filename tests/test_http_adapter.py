@@ -0,0 +1,235 @@
+"""Unit tests for the HTTP server adapter."""
+
+import asyncio
+import http.client
+import importlib
+import json
+import socket
+import threading
+
+import pytest
+
+import aws_clients
+import bulk_ingest
+import contact_handler
+import http_adapter
+import metrics
+import submission_queries
+from http_adapter import ContactFormApp, build_event, render_metrics
+
+
+def call_app(app, method, path, body=b"", headers=None):
+    """Drive the ASGI app for one request and return (status, headers, body)."""
+    sent = []
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": b"",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+        "client": ("198.51.100.20", 50000),
+    }
+    asyncio.run(app(scope, receive, send))
+    start, body_message = sent
+    return start["status"], {k.decode(): v.decode() for k, v in start["headers"]}, body_message["body"]
+
+
+def form_body(message="Hello from the HTTP adapter test suite."):
+    return json.dumps({"name": "Jane", "email": "jane@example.com", "message": message}).encode()
+
+
+class TestBuildEvent:
+    """HTTP request to API Gateway proxy event."""
+
+    def test_event_shape(self):
+        event = build_event(
+            "POST", "/contact", "a=1", [("content-type", "application/json"), ("user-agent", "curl")], b"{}", "10.0.0.1"
+        )
+
+        assert event["httpMethod"] == "POST"
+        assert event["headers"] == {"Content-Type": "application/json", "User-Agent": "curl"}
+        assert event["queryStringParameters"] == {"a": "1"}
+        assert event["body"] == "{}"
+        assert event["isBase64Encoded"] is False
+        assert event["requestContext"]["identity"]["sourceIp"] == "10.0.0.1"
+
+    def test_binary_body_is_base64_encoded(self):
+        event = build_event("POST", "/contact", "", [], b"\xff\xfe", "10.0.0.1")
+
+        assert event["isBase64Encoded"] is True
+        assert event["body"] == "//4="
+
+    def test_forwarded_for_only_when_trusted(self, monkeypatch):
+        headers = [("x-forwarded-for", "203.0.113.5, 10.0.0.2")]
+        event = build_event("POST", "/contact", "", headers, b"", "10.0.0.1")
+        assert event["requestContext"]["identity"]["sourceIp"] == "10.0.0.1"
+
+        monkeypatch.setattr(http_adapter, "HTTP_TRUST_FORWARDED_FOR", True)
+        event = build_event("POST", "/contact", "", headers, b"", "10.0.0.1")
+        assert event["requestContext"]["identity"]["sourceIp"] == "203.0.113.5"
+
+
+class TestContactFormApp:
+    """Routing and handler dispatch."""
+
+    @pytest.fixture
+    def app(self, aws):
+        importlib.reload(contact_handler)
+        metrics.collector.reset()
+        app = ContactFormApp(handler=contact_handler.lambda_handler, workers=4)
+        yield app
+        app.executor.shutdown()
+
+    def test_startup_sizes_client_pools_to_workers(self, aws, monkeypatch):
+        importlib.reload(contact_handler)
+        monkeypatch.setattr(aws_clients, "AWS_MAX_POOL_CONNECTIONS", 10)
+        app = ContactFormApp(handler=contact_handler.lambda_handler, workers=48)
+
+        app.startup()
+
+        assert contact_handler.get_dynamodb_client().meta.config.max_pool_connections == 48
+        assert contact_handler.get_ses_client().meta.config.max_pool_connections == 48
+        app.executor.shutdown()
+
+    def test_healthz(self, app):
+        status, _, body = call_app(app, "GET", "/healthz")
+
+        assert status == 200
+        assert json.loads(body) == {"status": "ok"}
+
+    def test_unknown_path_and_method(self, app):
+        assert call_app(app, "GET", "/nope")[0] == 404
+        assert call_app(app, "GET", "/contact")[0] == 405
+
+    def test_oversized_body_rejected(self, app):
+        app.max_body_bytes = 10
+
+        assert call_app(app, "POST", "/contact", form_body())[0] == 413
+
+    def test_submission_goes_through_lambda_handler(self, app, aws):
+        status, headers, body = call_app(app, "POST", "/contact", form_body(), {"User-Agent": "pytest"})
+
+        assert status == 200
+        assert headers["access-control-allow-origin"] == "*"
+        assert "submissionId" in json.loads(body)
+        (item,) = aws["table"].scan()["Items"]
+        assert item["userAgent"] == "pytest"
+        assert item["clientIp"] == "198.51.100.20"
+
+    def test_metrics_endpoint(self, app):
+        call_app(app, "POST", "/contact", form_body())
+        call_app(app, "POST", "/contact", b"not json")
+
+        text = render_metrics(metrics.collector)
+
+        assert 'contact_requests_total{status="200"} 1' in text
+        assert 'contact_requests_total{status="400"} 1' in text
+        assert 'contact_outcomes_total{outcome="Submitted"} 1' in text
+        assert 'contact_stage_latency_ms_count{stage="Store"} 1' in text
+        assert call_app(app, "GET", "/metrics")[2].decode() == text
+
+    def test_submissions_route_requires_token(self, app, monkeypatch):
+        assert call_app(app, "GET", "/submissions")[0] == 404
+
+        monkeypatch.setattr(submission_queries, "SUBMISSIONS_QUERY_TOKEN", "s3cret")
+
+        assert call_app(app, "GET", "/submissions")[0] == 401
+        status, _, body = call_app(app, "GET", "/submissions", headers={"Authorization": "Bearer s3cret"})
+        assert status == 400
+        assert json.loads(body)["error"] == "Pass email, or from/to dates"
+
+
+class TestServe:
+    """The built-in HTTP/1.1 server."""
+
+    @pytest.fixture
+    def server(self, aws):
+        importlib.reload(contact_handler)
+        app = ContactFormApp(handler=contact_handler.lambda_handler, workers=4)
+        ready = threading.Event()
+        loop = asyncio.new_event_loop()
+        task = loop.create_task(http_adapter.serve(app, "127.0.0.1", 0, ready))
+
+        def run():
+            try:
+                loop.run_until_complete(task)
+            except asyncio.CancelledError:
+                pass
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        assert ready.wait(5)
+
+        yield app
+        loop.call_soon_threadsafe(task.cancel)
+        thread.join(5)
+        loop.close()
+
+    def test_keep_alive_requests_over_a_socket(self, server, aws):
+        connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+        for i in range(2):
+            connection.request("POST", "/contact", form_body(f"Keep-alive message number {i} for the test."))
+            response = connection.getresponse()
+            assert response.status == 200
+            assert "submissionId" in json.loads(response.read())
+        connection.close()
+
+        assert len(aws["table"].scan()["Items"]) == 2
+
+    def raw_exchange(self, server, request):
+        with socket.create_connection(("127.0.0.1", server.port), timeout=5) as sock:
+            sock.sendall(request)
+            response = b""
+            while chunk := sock.recv(4096):
+                response += chunk
+        return response
+
+    def test_malformed_request_line_gets_400(self, server):
+        response = self.raw_exchange(server, b"GARBAGE\r\nHost: x\r\n\r\n")
+
+        assert response.startswith(b"HTTP/1.1 400 Bad Request\r\n")
+        assert b"Connection: close" in response
+
+    def test_malformed_content_length_gets_400(self, server):
+        response = self.raw_exchange(server, b"POST /contact HTTP/1.1\r\nContent-Length: ten\r\n\r\n")
+
+        assert response.startswith(b"HTTP/1.1 400 Bad Request\r\n")
+        assert b"Connection: close" in response
+
+    def test_bulk_route_requires_token(self, server, monkeypatch):
+        connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+        connection.request("POST", "/bulk", b"")
+        assert connection.getresponse().status == 404
+
+        monkeypatch.setattr(bulk_ingest, "BULK_INGEST_TOKEN", "s3cret")
+        connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+        connection.request("POST", "/bulk", b"", {"Authorization": "Bearer wrong"})
+        assert connection.getresponse().status == 401
+
+    def test_bulk_import_streams_report(self, server, aws, monkeypatch):
+        monkeypatch.setattr(bulk_ingest, "BULK_INGEST_TOKEN", "s3cret")
+        monkeypatch.setattr(http_adapter, "READ_CHUNK_BYTES", 256)
+        lines = [
+            json.dumps({"name": f"P{i}", "email": f"p{i}@example.com", "message": f"Imported inquiry {i} body."})
+            for i in range(50)
+        ]
+        body = ("\n".join(lines[:25] + ["not json"] + lines[25:]) + "\n").encode()
+
+        connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=10)
+        connection.request("POST", "/bulk?source=legacy", body, {"Authorization": "Bearer s3cret"})
+        response = connection.getresponse()
+        entries = [json.loads(line) for line in response.read().decode().splitlines()]
+
+        assert response.status == 200
+        assert response.getheader("Transfer-Encoding") == "chunked"
+        assert entries[25] == {"line": 26, "status": "rejected", "error": "Invalid JSON"}
+        assert entries[-1]["summary"]["accepted"] == 50
+        assert aws["table"].scan(Select="COUNT")["Count"] == 50
@@ -0,0 +1,185 @@
+"""Unit tests for idempotent submissions."""
+
+import importlib
+import json
+
+import pytest
+
+import contact_handler
+import idempotency
+import rate_limit
+from idempotency import IdempotencyStore, KeyReusedError, TTLCache, derive_key
+
+
+class FakeClock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestDeriveKey:
+    """Key derivation."""
+
+    def test_header_key_wins_and_is_case_insensitive(self):
+        first = derive_key({"Idempotency-Key": "abc"}, "Jane", "jane@example.com", "Hello there!")
+        second = derive_key({"idempotency-key": "abc"}, "Other", "other@example.com", "Different message")
+
+        assert first == second
+        assert first.startswith("header#")
+
+    def test_content_key_ignores_case_and_whitespace(self):
+        now = 1_700_000_000
+        first = derive_key({}, "Jane Doe", "Jane@Example.com", "Hello  there,\nfriend", now)
+        second = derive_key(None, " jane doe ", "jane@example.com", "hello there, friend", now)
+
+        assert first == second
+
+    def test_content_key_changes_between_windows(self):
+        now = 1_700_000_000
+        first = derive_key({}, "Jane", "jane@example.com", "Hello there!", now)
+        later = derive_key({}, "Jane", "jane@example.com", "Hello there!", now + idempotency.IDEMPOTENCY_WINDOW_SECONDS)
+
+        assert first != later
+
+
+class TestTTLCache:
+    """In-memory cache."""
+
+    def test_entries_expire(self):
+        clock = FakeClock()
+        cache = TTLCache(max_size=10, ttl_seconds=5, clock=clock)
+        cache.put("k", "v")
+
+        assert cache.get("k") == "v"
+        clock.now += 5
+        assert cache.get("k") is None
+
+    def test_size_is_bounded(self):
+        cache = TTLCache(max_size=2, ttl_seconds=60)
+        for key in "abc":
+            cache.put(key, key)
+
+        assert cache.get("a") is None
+        assert cache.get("c") == "c"
+
+
+class TestIdempotencyStore:
+    """Claims across containers via the state table."""
+
+    def test_duplicate_detected_by_conditional_put(self, aws):
+        first_container = IdempotencyStore(aws["client"], aws["state_table_name"], 300)
+        second_container = IdempotencyStore(aws["client"], aws["state_table_name"], 300)
+
+        assert first_container.claim("key", "sub-1") is None
+        assert second_container.claim("key", "sub-2") == "sub-1"
+
+    def test_release_allows_retry(self, aws):
+        store = IdempotencyStore(aws["client"], aws["state_table_name"], 300)
+        store.claim("key", "sub-1")
+
+        store.release("key")
+
+        assert store.claim("key", "sub-2") is None
+
+    def test_expired_record_is_reclaimed(self, aws):
+        clock = FakeClock()
+        store = IdempotencyStore(aws["client"], aws["state_table_name"], 300, clock=clock)
+        store.claim("key", "sub-1")
+
+        clock.now += 301
+        other = IdempotencyStore(aws["client"], aws["state_table_name"], 300, clock=clock)
+        assert other.claim("key", "sub-2") is None
+
+    def test_key_reused_for_other_content_raises(self, aws):
+        first_container = IdempotencyStore(aws["client"], aws["state_table_name"], 300)
+        second_container = IdempotencyStore(aws["client"], aws["state_table_name"], 300)
+        first_container.claim("key", "sub-1", "hash-a")
+
+        assert second_container.claim("key", "sub-2", "hash-a") == "sub-1"
+        with pytest.raises(KeyReusedError) as excinfo:
+            second_container.claim("key", "sub-3", "hash-b")
+        assert excinfo.value.submission_id == "sub-1"
+
+    def test_claim_retries_when_record_vanishes(self, aws, mocker):
+        IdempotencyStore(aws["client"], aws["state_table_name"], 300).claim("key", "sub-1")
+        real_get_item = aws["client"].get_item
+
+        def released_meanwhile(**kwargs):
+            # The owner's submission failed and released the key between our put and get
+            aws["client"].delete_item(TableName=kwargs["TableName"], Key=kwargs["Key"])
+            return real_get_item(**kwargs)
+
+        mocker.patch.object(aws["client"], "get_item", side_effect=released_meanwhile)
+        store = IdempotencyStore(aws["client"], aws["state_table_name"], 300)
+
+        assert store.claim("key", "sub-2") is None
+        item = aws["state_table"].get_item(Key={"pk": "idempotency#key", "sk": "-"})["Item"]
+        assert item["submissionId"] == "sub-2"
+
+    def test_local_only_store(self):
+        store = IdempotencyStore()
+
+        assert store.claim("key", "sub-1") is None
+        assert store.claim("key", "sub-2") == "sub-1"
+
+
+class TestHandler:
+    """Duplicate submissions through lambda_handler."""
+
+    @pytest.fixture
+    def handler(self, aws, monkeypatch):
+        monkeypatch.setattr(idempotency, "STATE_TABLE", aws["state_table_name"])
+        importlib.reload(contact_handler)
+        return contact_handler
+
+    @pytest.fixture
+    def event(self):
+        return {
+            "httpMethod": "POST",
+            "body": json.dumps({"name": "Jane", "email": "jane@example.com", "message": "Hello, this is a message."}),
+            "headers": {"Idempotency-Key": "form-1"},
+            "requestContext": {"identity": {"sourceIp": "198.51.100.7"}},
+        }
+
+    def test_duplicate_returns_original_id_without_email(self, handler, aws, event, mocker):
+        send = mocker.patch.object(handler, "send_email_notification")
+
+        first = json.loads(handler.lambda_handler(event, None)["body"])
+        second = json.loads(handler.lambda_handler(event, None)["body"])
+
+        assert second["submissionId"] == first["submissionId"]
+        assert send.call_count == 1
+        assert len(aws["table"].scan()["Items"]) == 1
+
+    def test_reused_key_with_other_content_is_rejected(self, handler, aws, event, mocker):
+        mocker.patch.object(handler, "send_email_notification")
+        other = dict(event, body=json.dumps({**json.loads(event["body"]), "message": "A different message body."}))
+
+        assert handler.lambda_handler(event, None)["statusCode"] == 200
+        response = handler.lambda_handler(other, None)
+
+        assert response["statusCode"] == 422
+        assert "Idempotency-Key" in json.loads(response["body"])["error"]
+        assert len(aws["table"].scan()["Items"]) == 1
+
+    def test_failed_submission_can_be_retried(self, handler, event, mocker):
+        mocker.patch.object(handler, "send_email_notification", side_effect=[RuntimeError("SES down"), None])
+
+        assert handler.lambda_handler(event, None)["statusCode"] == 500
+        assert handler.lambda_handler(event, None)["statusCode"] == 200
+
+    def test_rate_limited_requests_claim_nothing(self, handler, event, monkeypatch, mocker):
+        mocker.patch.object(handler, "send_email_notification")
+        monkeypatch.setattr(rate_limit, "RATE_LIMIT_ENABLED", True)
+        monkeypatch.setattr(rate_limit, "RATE_LIMIT_BURST", 1)
+        claim = mocker.spy(handler.get_idempotency_store(), "claim")
+
+        statuses = [
+            handler.lambda_handler({**event, "headers": {"Idempotency-Key": f"form-{i}"}}, None)["statusCode"]
+            for i in range(3)
+        ]
+
+        assert statuses == [200, 429, 429]
+        assert claim.call_count == 1
@@ -0,0 +1,137 @@
+"""Unit tests for the compact submission item format."""
+
+import csv
+import gzip
+import importlib
+import io
+import os
+import string
+from datetime import date
+
+import pytest
+
+import contact_handler
+import item_codec
+import outbox
+import submission_queries
+from export_table import export_table
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0 Safari/537.36"
+)
+MESSAGE = "Hello, I would like to discuss a cloud migration project with you. " * 5
+
+
+def submission(submission_id="sub-1", message=MESSAGE, user_agent=USER_AGENT):
+    return contact_handler.build_submission_item(
+        submission_id, "2024-05-01T10:00:00", "Jane", "jane@example.com", message, "10.0.0.1", user_agent
+    )
+
+
+class TestCodec:
+    def test_compact_round_trip(self):
+        item = submission()
+
+        raw = item_codec.encode_item(item, 1)
+
+        assert raw["v"] == {"N": "1"}
+        assert set(raw) >= {"n", "e", "m", "ip", "ua", "st", "submissionId", "timestamp", "ttl", "dayBucket"}
+        assert "B" in raw["m"] and "B" in raw["ua"]
+        assert item_codec.item_size(raw) < item_codec.item_size(item_codec.encode_item(item, 0)) / 2
+        assert item_codec.decode_item(raw) == item
+
+    def test_short_values_stay_plain(self):
+        raw = item_codec.encode_item(submission(message="Short hello", user_agent="curl/8.0"), 1)
+
+        assert raw["m"] == {"S": "Short hello"}
+        assert raw["ua"] == {"S": "curl/8.0"}
+
+    def test_incompressible_values_stay_plain(self):
+        distinct = string.ascii_letters + string.digits + "-_!"
+
+        assert item_codec.compress(distinct) == distinct
+
+    def test_version_zero_is_the_original_layout(self):
+        item = submission()
+        raw = item_codec.encode_item(item, 0)
+
+        assert "v" not in raw and raw["message"] == {"S": MESSAGE}
+        assert item_codec.decode_item(raw) == item
+
+    def test_unknown_versions_and_tags(self):
+        with pytest.raises(ValueError):
+            item_codec.encode_item(submission(), 2)
+        with pytest.raises(ValueError):
+            item_codec.decode_item({"v": {"N": "9"}})
+        with pytest.raises(ValueError):
+            item_codec.decompress(b"\x7fdata")
+
+    def test_stored_names(self):
+        assert item_codec.stored_names(["submissionId", "message"]) == ["v", "submissionId", "message", "m"]
+
+    def test_write_units(self):
+        assert item_codec.write_units({"a": {"S": "x" * 1000}}) == 1
+        assert item_codec.write_units({"a": {"S": "x" * 1030}}) == 2
+
+
+class TestMixedTable:
+    """Rows in both formats in one table, read through every reader."""
+
+    @pytest.fixture
+    def mixed(self, aws, monkeypatch):
+        importlib.reload(contact_handler)
+        for i, version in enumerate((0, 1, 0, 1)):
+            monkeypatch.setattr(item_codec, "ITEM_FORMAT", version)
+            contact_handler.store_submission(
+                f"sub-{i}",
+                f"2024-05-01T10:00:0{i}",
+                "Jane",
+                "jane@example.com",
+                MESSAGE,
+                {"headers": {"User-Agent": USER_AGENT}},
+                extra_attributes=outbox.pending_attributes(0),
+            )
+        return aws
+
+    def test_outbox_and_queries_decode_both_formats(self, mixed):
+        due = outbox.fetch_due(mixed["client"], mixed["table_name"], 10, 10)
+        by_email = submission_queries.by_email(mixed["client"], mixed["table_name"], "jane@example.com")
+        by_day = submission_queries.by_date(mixed["client"], mixed["table_name"], date(2024, 5, 1), date(2024, 5, 1))
+
+        for items in (due, by_email["items"], by_day["items"]):
+            assert len(items) == 4
+            assert all(item["message"] == MESSAGE and item["userAgent"] == USER_AGENT for item in items)
+            assert all("m" not in item and "v" not in item for item in items)
+
+    def test_export_with_projection(self, mixed, tmp_path):
+        export_table(
+            mixed["client"], mixed["table_name"], str(tmp_path), fmt="csv", segments=1, attributes=["message", "name"]
+        )
+
+        (name,) = [n for n in os.listdir(tmp_path) if n.endswith(".csv.gz")]
+        with gzip.open(tmp_path / name, "rt", encoding="utf-8", newline="") as fh:
+            rows = list(csv.DictReader(io.StringIO(fh.read())))
+        assert rows == [{"message": MESSAGE, "name": "Jane"}] * 4
+
+    def test_backfill_reads_compact_email(self, mixed):
+        for raw in mixed["client"].scan(TableName=mixed["table_name"])["Items"]:
+            mixed["client"].update_item(
+                TableName=mixed["table_name"],
+                Key={"submissionId": raw["submissionId"], "timestamp": raw["timestamp"]},
+                UpdateExpression="REMOVE emailNormalized",
+            )
+
+        assert submission_queries.backfill(mixed["client"], mixed["table_name"]) == 4
+        assert len(submission_queries.by_email(mixed["client"], mixed["table_name"], "jane@example.com")["items"]) == 4
+
+    def test_migrate_rewrites_old_rows_once(self, mixed):
+        before = [item_codec.decode_item(raw) for raw in mixed["client"].scan(TableName=mixed["table_name"])["Items"]]
+
+        assert item_codec.migrate(mixed["client"], mixed["table_name"]) == 2
+        assert item_codec.migrate(mixed["client"], mixed["table_name"]) == 0
+
+        raws = mixed["client"].scan(TableName=mixed["table_name"])["Items"]
+        assert all(raw["v"] == {"N": "1"} for raw in raws)
+        after = [item_codec.decode_item(raw) for raw in raws]
+        key = lambda item: item["submissionId"]  # noqa: E731
+        assert sorted(after, key=key) == sorted(before, key=key)
@@ -0,0 +1,137 @@
+"""Unit tests for per-stage request metrics."""
+
+import importlib
+import json
+
+import pytest
+
+import contact_handler
+import metrics
+import rate_limit
+from metrics import MetricsCollector, RequestMetrics
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRequestMetrics:
+    """Timers, counters and EMF output."""
+
+    def test_stages_are_timed_in_milliseconds(self):
+        clock = FakeClock()
+        emitted = []
+        request = RequestMetrics(emit=emitted.append, clock=clock, sink=MetricsCollector())
+
+        with request.stage("Parse"):
+            clock.now += 0.002
+        clock.now += 0.001
+        record = request.finish(200)
+
+        assert record["stages"]["Parse"] == pytest.approx(2.0)
+        assert record["stages"]["Total"] == pytest.approx(3.0)
+
+    def test_emf_document_declares_every_metric(self):
+        emitted = []
+        request = RequestMetrics(emit=emitted.append, clock=FakeClock(), sink=MetricsCollector())
+        with request.stage("Store"):
+            pass
+        request.count(metrics.SUBMITTED)
+        request.finish(200)
+
+        document = json.loads(emitted[0])
+        directive = document["_aws"]["CloudWatchMetrics"][0]
+        declared = {metric["Name"]: metric["Unit"] for metric in directive["Metrics"]}
+
+        assert declared == {
+            "StoreLatency": "Milliseconds",
+            "TotalLatency": "Milliseconds",
+            "Requests": "Count",
+            "Submitted": "Count",
+        }
+        assert directive["Dimensions"] == [["FunctionName"]]
+        assert document["Submitted"] == 1
+        assert document["StatusCode"] == 200
+
+    def test_sampling_skips_output_but_not_collection(self):
+        emitted = []
+        sink = MetricsCollector()
+        RequestMetrics(emit=emitted.append, sample_rate=0.0, sink=sink).finish(200)
+
+        assert emitted == []
+        assert len(sink.records()) == 1
+
+    def test_server_errors_are_always_emitted(self):
+        emitted = []
+        sink = MetricsCollector()
+        RequestMetrics(emit=emitted.append, sample_rate=0.0, sink=sink).finish(500)
+
+        assert len(emitted) == 1
+        assert sink.count(metrics.SERVER_ERROR) == 1
+
+    def test_sampled_counts_are_scaled_to_estimate_totals(self, mocker):
+        mocker.patch.object(metrics.random, "random", return_value=0.1)
+        emitted = []
+        for status in (200, 500):
+            request = RequestMetrics(emit=emitted.append, sample_rate=0.25, sink=MetricsCollector())
+            request.count(metrics.SUBMITTED)
+            request.finish(status)
+
+        ok, error = (json.loads(line) for line in emitted)
+        assert (ok["SampleRate"], ok["Requests"], ok["Submitted"]) == (0.25, 4, 4)
+        assert (error["SampleRate"], error["Requests"], error["ServerError"]) == (1.0, 1, 1)
+
+    def test_collector_is_bounded(self):
+        sink = MetricsCollector(max_records=2)
+        for _ in range(3):
+            RequestMetrics(emit=lambda line: None, sink=sink).finish(200)
+
+        assert len(sink.records()) == 2
+
+
+class TestHandlerMetrics:
+    """Stages and outcomes recorded by lambda_handler."""
+
+    @pytest.fixture
+    def handler(self, aws):
+        importlib.reload(contact_handler)
+        metrics.collector.reset()
+        return contact_handler
+
+    @staticmethod
+    def event(message="Hello, this is a test message for metrics.", ip="203.0.113.10"):
+        return {
+            "httpMethod": "POST",
+            "body": json.dumps({"name": "Jane", "email": "jane@example.com", "message": message}),
+            "headers": {},
+            "requestContext": {"identity": {"sourceIp": ip}},
+        }
+
+    def test_successful_submission_records_each_stage(self, handler, monkeypatch):
+        monkeypatch.setattr(rate_limit, "RATE_LIMIT_ENABLED", True)
+        handler.lambda_handler(self.event(), None)
+
+        (record,) = metrics.collector.records()
+        assert {"Parse", "Validate", "Idempotency", "RateLimit", "Store", "Email", "Total"} <= set(record["stages"])
+        assert record["counters"] == {metrics.SUBMITTED: 1}
+
+    def test_spam_and_validation_failures_are_counted_separately(self, handler):
+        handler.lambda_handler(self.event(message="Cheap casino bonus, click now!"), None)
+        handler.lambda_handler(self.event(message="short"), None)
+
+        assert metrics.collector.count(metrics.SPAM_REJECTED) == 1
+        assert metrics.collector.count(metrics.VALIDATION_FAILED) == 1
+
+    def test_server_error_is_counted_and_logged(self, handler, mocker, capsys):
+        mocker.patch.object(handler, "send_email_notification", side_effect=RuntimeError("SES down"))
+
+        response = handler.lambda_handler(self.event(), None)
+
+        assert response["statusCode"] == 500
+        assert metrics.collector.count(metrics.SERVER_ERROR) == 1
+        emf_lines = [line for line in capsys.readouterr().out.splitlines() if line.startswith('{"_aws"')]
+        assert json.loads(emf_lines[-1])["ServerError"] == 1
@@ -0,0 +1,179 @@
+"""Unit tests for the transactional email outbox."""
+
+import importlib
+import json
+import random
+
+import boto3
+import pytest
+
+import contact_handler
+import outbox
+
+# Fixed clock later than any row written during the test
+NOW = 4_000_000_000
+
+
+@pytest.fixture
+def handler(aws, monkeypatch):
+    """contact_handler bound to the moto backend and running in outbox mode."""
+    importlib.reload(contact_handler)
+    monkeypatch.setattr(contact_handler, "EMAIL_DELIVERY_MODE", "outbox")
+    return contact_handler
+
+
+@pytest.fixture
+def contact_event():
+    """API Gateway event for a valid submission."""
+    return {
+        "httpMethod": "POST",
+        "body": json.dumps(
+            {
+                "name": "Jane Doe",
+                "email": "jane@example.com",
+                "message": "Hello, I would like to talk about a project.",
+            }
+        ),
+        "headers": {"User-Agent": "pytest"},
+        "requestContext": {"identity": {"sourceIp": "10.0.0.1"}},
+    }
+
+
+def sent_count():
+    ses = boto3.client("ses", region_name="us-east-1")
+    return int(ses.get_send_quota()["SentLast24Hours"])
+
+
+def only_item(table):
+    items = table.scan()["Items"]
+    assert len(items) == 1
+    return items[0]
+
+
+class TestOutboxMode:
+    """Handler behaviour when email delivery is deferred."""
+
+    def test_handler_writes_pending_row_without_sending(self, handler, aws, contact_event):
+        response = handler.lambda_handler(contact_event, None)
+
+        assert response["statusCode"] == 200
+        item = only_item(aws["table"])
+        assert item["emailStatus"] == outbox.STATUS_PENDING
+        assert item["outboxQueue"] == outbox.EMAIL_QUEUE
+        assert sent_count() == 0
+
+    def test_handler_succeeds_when_ses_is_down(self, handler, contact_event, monkeypatch):
+        def broken_send(*args, **kwargs):
+            raise RuntimeError("Throttling")
+
+        monkeypatch.setattr(handler, "send_email_notification", broken_send)
+        response = handler.lambda_handler(contact_event, None)
+
+        assert response["statusCode"] == 200
+
+
+class TestDrain:
+    """Outbox worker behaviour."""
+
+    def test_drain_sends_and_marks_rows(self, handler, aws, contact_event):
+        handler.lambda_handler(contact_event, None)
+
+        summary = handler.outbox_handler({}, None)
+
+        assert summary["sent"] == 1
+        assert sent_count() == 1
+        item = only_item(aws["table"])
+        assert item["emailStatus"] == outbox.STATUS_SENT
+        assert "outboxQueue" not in item
+        assert outbox.fetch_due(aws["client"], aws["table_name"], NOW, 10) == []
+
+    def test_drain_sends_stored_submission_time(self, handler, aws, contact_event, mocker):
+        handler.lambda_handler(contact_event, None)
+        stored = only_item(aws["table"])["timestamp"]
+        send = mocker.patch.object(handler, "send_email_notification")
+
+        handler.outbox_handler({}, None)
+
+        assert send.call_args.args[4] == stored
+
+    def test_drain_processes_multiple_batches(self, handler, aws, contact_event):
+        for i in range(5):
+            body = dict(json.loads(contact_event["body"]), message=f"Project inquiry number {i}")
+            handler.lambda_handler(dict(contact_event, body=json.dumps(body)), None)
+
+        summary = outbox.drain(aws["client"], aws["table_name"], handler._send_outbox_item, batch_size=2)
+
+        assert summary["sent"] == 5
+        assert sent_count() == 5
+
+    def test_mark_sent_failure_does_not_abort_drain(self, handler, aws, contact_event, monkeypatch):
+        for i in range(3):
+            body = dict(json.loads(contact_event["body"]), message=f"Project inquiry number {i}")
+            handler.lambda_handler(dict(contact_event, body=json.dumps(body)), None)
+        mark_sent = outbox.mark_sent
+        calls = []
+
+        def flaky_mark_sent(client, table_name, item, now):
+            calls.append(item["submissionId"])
+            if len(calls) == 1:
+                raise RuntimeError("Throttling")
+            mark_sent(client, table_name, item, now)
+
+        monkeypatch.setattr(outbox, "mark_sent", flaky_mark_sent)
+
+        summary = outbox.drain(aws["client"], aws["table_name"], handler._send_outbox_item)
+
+        assert summary["sent"] == 3
+        assert sent_count() == 3
+        # The unmarked row stays leased, so an immediate second drain does not re-send it
+        assert outbox.drain(aws["client"], aws["table_name"], handler._send_outbox_item)["sent"] == 0
+        assert sent_count() == 3
+
+    def test_failed_send_schedules_retry(self, handler, aws, contact_event):
+        handler.lambda_handler(contact_event, None)
+
+        def failing_send(item):
+            raise RuntimeError("Throttling")
+
+        summary = outbox.drain(aws["client"], aws["table_name"], failing_send, clock=lambda: NOW)
+
+        assert summary["retried"] == 1
+        item = only_item(aws["table"])
+        assert item["emailStatus"] == outbox.STATUS_PENDING
+        assert item["emailAttempts"] == 1
+        assert item["nextAttemptAt"] > NOW
+        assert "Throttling" in item["lastError"]
+
+    def test_gives_up_after_max_attempts(self, handler, aws, contact_event, monkeypatch):
+        monkeypatch.setattr(outbox, "OUTBOX_MAX_ATTEMPTS", 2)
+        handler.lambda_handler(contact_event, None)
+
+        def failing_send(item):
+            raise RuntimeError("MessageRejected")
+
+        outbox.drain(aws["client"], aws["table_name"], failing_send, clock=lambda: NOW)
+        summary = outbox.drain(aws["client"], aws["table_name"], failing_send, clock=lambda: NOW + 86_400)
+
+        assert summary["failed"] == 1
+        item = only_item(aws["table"])
+        assert item["emailStatus"] == outbox.STATUS_FAILED
+        assert "outboxQueue" not in item
+
+    def test_claimed_row_is_not_sent_twice(self, handler, aws, contact_event):
+        handler.lambda_handler(contact_event, None)
+        item = outbox.fetch_due(aws["client"], aws["table_name"], NOW, 10)[0]
+
+        assert outbox.claim(aws["client"], aws["table_name"], item, NOW) is True
+        assert outbox.claim(aws["client"], aws["table_name"], item, NOW) is False
+
+
+class TestBackoff:
+    """Retry delay calculation."""
+
+    def test_backoff_grows_and_is_capped(self):
+        rng = random.Random(7)
+        delays = [outbox.backoff_delay(attempt, rng) for attempt in range(1, 12)]
+
+        assert delays[0] >= outbox.OUTBOX_BASE_DELAY_SECONDS // 2
+        assert delays[3] > delays[0]
+        assert max(delays) <= outbox.OUTBOX_MAX_DELAY_SECONDS
@@ -0,0 +1,133 @@
+"""Unit tests for on-demand invocation profiling."""
+
+import json
+import sys
+import tracemalloc
+
+import pytest
+
+import contact_handler
+import profiling
+from rate_limit import LocalRateLimiter
+
+
+def event(**headers):
+    body = {"name": "Jane", "email": "jane@example.com", "message": "Hello, I would like to talk about a project."}
+    return {
+        "httpMethod": "POST",
+        "body": json.dumps(body),
+        "headers": {"Content-Type": "application/json", **headers},
+        "requestContext": {"identity": {"sourceIp": "203.0.113.7"}},
+    }
+
+
+def records(capsys):
+    return profiling.load(capsys.readouterr().out.splitlines())
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_TOKEN", "s3cret")
+    monkeypatch.setattr(profiling, "PROFILE_SAMPLE_RATE", 0.0)
+    monkeypatch.setattr(profiling, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(profiling, "_budget", LocalRateLimiter(capacity=2, refill_per_second=0, max_clients=1))
+
+
+class TestTrigger:
+    def test_header_needs_the_token(self, enabled):
+        assert profiling.start(event(**{"X-Profile": "wrong"})) is None
+        assert profiling.start(event()) is None
+
+        session = profiling.start(event(**{"x-profile": "s3cret"}))
+        assert session is not None
+        session.finish(200)
+
+    def test_one_profile_at_a_time_and_per_minute_cap(self, enabled, capsys):
+        first = profiling.start(event(**{"X-Profile": "s3cret"}))
+
+        assert profiling.start(event(**{"X-Profile": "s3cret"})) is None  # busy
+        first.finish(200)
+        profiling.start(event(**{"X-Profile": "s3cret"})).finish(200)
+        assert profiling.start(event(**{"X-Profile": "s3cret"})) is None  # budget spent
+        assert len(records(capsys)) == 2
+        assert not tracemalloc.is_tracing()
+
+
+class TestHandlerProfile:
+    def test_logs_hot_functions_and_allocations(self, aws, enabled, capsys, mocker):
+        mocker.patch.object(contact_handler, "send_email_notification")
+
+        response = contact_handler.lambda_handler(event(**{"X-Profile": "s3cret"}), None)
+        (record,) = records(capsys)
+
+        assert response["statusCode"] == 200 and record["status"] == 200
+        assert 0 < len(record["cpu"]["top"]) <= profiling.PROFILE_TOP_N
+        assert len(record["cpu"]["stacks"]) <= profiling.PROFILE_MAX_STACKS + 1
+        assert any(stack.startswith("contact_handler.py:_handle_submission") for stack in record["cpu"]["stacks"])
+        assert not any("profiling.py" in stack for stack in record["cpu"]["stacks"])
+        assert record["memory"]["peakKiB"] > 0 and record["memory"]["top"]
+
+    def test_unsampled_requests_are_not_profiled(self, aws, enabled, capsys, mocker):
+        mocker.patch.object(contact_handler, "send_email_notification")
+
+        contact_handler.lambda_handler(event(), None)
+
+        assert records(capsys) == []
+
+
+class TestFold:
+    def test_splits_time_over_callers_by_call_count(self):
+        main = ("app.py", 1, "main")
+        worker = ("app.py", 10, "worker")
+        helper = ("lib.py", 5, "helper")
+        stats = {
+            main: (1, 1, 0.001, 0.010, {}),
+            worker: (1, 1, 0.002, 0.006, {main: (1, 1, 0.002, 0.006)}),
+            helper: (4, 4, 0.004, 0.004, {main: (1, 1, 0.001, 0.001), worker: (3, 3, 0.003, 0.003)}),
+        }
+
+        folded = profiling.fold(stats)
+
+        assert folded == pytest.approx(
+            {
+                "app.py:main": 0.001,
+                "app.py:main;app.py:worker": 0.002,
+                "app.py:main;lib.py:helper": 0.001,
+                "app.py:main;app.py:worker;lib.py:helper": 0.003,
+            }
+        )
+
+    def test_recursion_does_not_loop(self):
+        walk = ("tree.py", 3, "walk")
+        stats = {walk: (2, 6, 0.005, 0.005, {walk: (4, 4, 0.004, 0.004)})}
+
+        assert profiling.fold(stats) == {"tree.py:walk": 0.005}
+
+
+class TestReport:
+    LINES = [
+        "START RequestId: 1",
+        '2024-05-01T10:00:01Z\tabc\t{"profile": 1, "wallMs": 40, "cpu": {"top": [{"fn": "a", "ownMs": 3.0}],'
+        ' "stacks": {"m;a": 3000, "m": 500}}, "memory": {"peakKiB": 100, "top": [], "stacks": {"x.py:1": 64}}}',
+        '{"profile": 1, "wallMs": 60, "cpu": {"top": [{"fn": "a", "ownMs": 1.0}], "stacks": {"m;a": 1000}}}',
+        '{"capture": 1, "t": 1, "status": 400, "event": {}}',
+    ]
+
+    def test_merges_records_into_folded_stacks(self):
+        loaded = profiling.load(self.LINES)
+
+        assert len(loaded) == 2
+        assert profiling.merge(loaded) == {"m;a": 4000, "m": 500}
+        assert profiling.merge(loaded, "memory") == {"x.py:1": 64}
+        assert profiling.hottest(loaded, 5) == [("a", 4.0, 2)]
+
+    def test_cli_writes_folded_file(self, tmp_path, monkeypatch, capsys):
+        log = tmp_path / "log.txt"
+        log.write_text("\n".join(self.LINES), encoding="utf-8")
+        out = tmp_path / "cpu.folded"
+        monkeypatch.setattr(sys, "argv", ["profiling.py", str(log), "--out", str(out)])
+
+        profiling.main()
+
+        assert out.read_text(encoding="utf-8") == "m 500\nm;a 4000\n"
+        assert "2 profiled invocations" in capsys.readouterr().out
@@ -0,0 +1,121 @@
+"""Unit tests for per-client rate limiting."""
+
+import importlib
+import json
+
+import pytest
+
+import contact_handler
+import rate_limit
+from rate_limit import LocalRateLimiter, RateLimiter, SharedRateLimiter
+
+
+class FakeClock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestLocalRateLimiter:
+    """In-container token buckets."""
+
+    def test_burst_then_reject(self):
+        limiter = LocalRateLimiter(capacity=3, refill_per_second=1, clock=FakeClock())
+
+        assert [limiter.allow("1.1.1.1") for _ in range(4)] == [True, True, True, False]
+
+    def test_tokens_refill_over_time(self):
+        clock = FakeClock()
+        limiter = LocalRateLimiter(capacity=1, refill_per_second=0.5, clock=clock)
+        limiter.allow("1.1.1.1")
+
+        clock.now += 1
+        assert limiter.allow("1.1.1.1") is False
+        clock.now += 1
+        assert limiter.allow("1.1.1.1") is True
+
+    def test_clients_are_independent(self):
+        limiter = LocalRateLimiter(capacity=1, refill_per_second=0, clock=FakeClock())
+
+        assert limiter.allow("1.1.1.1") is True
+        assert limiter.allow("2.2.2.2") is True
+        assert limiter.allow("1.1.1.1") is False
+
+    def test_memory_is_bounded_by_lru_eviction(self):
+        limiter = LocalRateLimiter(capacity=1, refill_per_second=0, max_clients=2, clock=FakeClock())
+        limiter.allow("a")
+        limiter.allow("b")
+        limiter.allow("a")  # "a" is now most recently used
+        limiter.allow("c")  # evicts "b"
+
+        assert len(limiter) == 2
+        assert limiter.allow("a") is False
+        assert limiter.allow("b") is True
+
+
+class TestSharedRateLimiter:
+    """Cross-container counter in the state table."""
+
+    def test_limit_holds_across_instances(self, aws):
+        clock = FakeClock()
+        first = SharedRateLimiter(aws["client"], aws["state_table_name"], limit=3, clock=clock)
+        second = SharedRateLimiter(aws["client"], aws["state_table_name"], limit=3, clock=clock)
+
+        results = [first.allow("1.1.1.1"), second.allow("1.1.1.1"), first.allow("1.1.1.1"), second.allow("1.1.1.1")]
+
+        assert results == [True, True, True, False]
+
+    def test_new_window_resets_count(self, aws):
+        clock = FakeClock(1_700_000_040.0)
+        limiter = SharedRateLimiter(aws["client"], aws["state_table_name"], limit=1, window_seconds=60, clock=clock)
+
+        assert limiter.allow("1.1.1.1") is True
+        assert limiter.allow("1.1.1.1") is False
+        clock.now += 60
+        assert limiter.allow("1.1.1.1") is True
+
+    def test_fails_open_on_errors(self, aws):
+        limiter = SharedRateLimiter(aws["client"], "missing-table", limit=1)
+
+        assert limiter.allow("1.1.1.1") is True
+
+    def test_combined_limiter_checks_local_first(self, aws):
+        local = LocalRateLimiter(capacity=1, refill_per_second=0, clock=FakeClock())
+        shared = SharedRateLimiter(aws["client"], aws["state_table_name"], limit=10)
+        limiter = RateLimiter(local, shared)
+
+        assert limiter.admit("1.1.1.1") is True
+        assert limiter.admit("1.1.1.1") is False
+        assert aws["state_table"].scan()["Items"][0]["hits"] == 1
+
+
+class TestHandler:
+    """429 responses from lambda_handler."""
+
+    @pytest.fixture
+    def handler(self, aws, monkeypatch):
+        monkeypatch.setattr(rate_limit, "RATE_LIMIT_ENABLED", True)
+        monkeypatch.setattr(rate_limit, "RATE_LIMIT_BURST", 2)
+        monkeypatch.setattr(rate_limit, "STATE_TABLE", aws["state_table_name"])
+        importlib.reload(contact_handler)
+        return contact_handler
+
+    def test_rejects_flood_without_sending_email(self, handler, mocker):
+        send = mocker.patch.object(handler, "send_email_notification")
+
+        def event(i):
+            return {
+                "httpMethod": "POST",
+                "body": json.dumps({"name": "Jane", "email": "jane@example.com", "message": f"Flood message {i}"}),
+                "requestContext": {"identity": {"sourceIp": "203.0.113.9"}},
+            }
+
+        statuses = [handler.lambda_handler(event(i), None)["statusCode"] for i in range(3)]
+
+        assert statuses == [200, 200, 429]
+        assert send.call_count == 2
+        rejected = handler.lambda_handler(event(3), None)
+        assert rejected["headers"]["Retry-After"] == "60"
+        assert "Access-Control-Allow-Origin" in rejected["headers"]
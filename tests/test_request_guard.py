@@ -0,0 +1,117 @@
+"""Unit tests for the pre-parse request guard."""
+
+import base64
+import json
+
+import pytest
+
+import codec
+import contact_handler
+import request_guard
+from request_guard import RequestRejected
+from validation import CONTACT_FORM_SCHEMA
+
+VALID = {"name": "Jane Doe", "email": "jane@example.com", "message": "Hello, I would like to get in touch."}
+
+
+def event(body, headers=None, is_base64=False):
+    return {"httpMethod": "POST", "body": body, "headers": headers, "isBase64Encoded": is_base64}
+
+
+def rejected(evt, **limits):
+    with pytest.raises(RequestRejected) as raised:
+        request_guard.parse_body(evt, **limits)
+    return raised.value.status_code
+
+
+class TestLimits:
+    def test_limit_fits_largest_valid_payload(self):
+        # Every field at its maximum length, every character escaped as a surrogate pair
+        widest = {"name": "😀" * 100, "email": "a" * 310 + "@example.com", "message": "😀" * 1000}
+        body = json.dumps(widest, indent=2)
+
+        assert len(body.encode("utf-8")) <= request_guard.max_body_bytes(CONTACT_FORM_SCHEMA)
+        assert request_guard.parse_body(event(body)) == widest
+
+    def test_oversized_body(self):
+        assert rejected(event("x" * (request_guard.REQUEST_MAX_BODY_BYTES + 1))) == 413
+
+    def test_multibyte_text_is_measured_in_bytes(self):
+        body = json.dumps({"message": "é" * 60}, ensure_ascii=False)
+
+        assert rejected(event(body), max_bytes=100) == 413
+
+    def test_base64_rejected_before_decoding(self, monkeypatch):
+        monkeypatch.setattr(request_guard.base64, "b64decode", pytest.fail)
+        body = base64.b64encode(b"{" + b" " * 10000 + b"}").decode()
+
+        assert rejected(event(body, is_base64=True), max_bytes=1000) == 413
+
+    def test_base64_body_is_decoded(self):
+        body = base64.b64encode(json.dumps(VALID).encode()).decode()
+
+        assert request_guard.parse_body(event(body, is_base64=True)) == VALID
+
+    def test_bad_base64_or_utf8(self):
+        assert rejected(event("not base64!", is_base64=True)) == 400
+        assert rejected(event(base64.b64encode(b"\xff\xfe").decode(), is_base64=True)) == 400
+
+    @pytest.mark.parametrize(
+        "content_type, allowed",
+        [
+            ("application/json", True),
+            ("Application/JSON; charset=utf-8", True),
+            ("application/merge-patch+json", True),
+            ("text/plain", False),
+            ("application/x-www-form-urlencoded", False),
+        ],
+    )
+    def test_content_type(self, content_type, allowed):
+        evt = event(json.dumps(VALID), headers={"content-type": content_type})
+
+        if allowed:
+            assert request_guard.parse_body(evt) == VALID
+        else:
+            assert rejected(evt) == 415
+
+    def test_nested_values_and_too_many_fields(self):
+        assert rejected(event('{"name": {"a": 1}, "message": "x"}')) == 400
+        assert rejected(event('{"name": [[[[[[[[[[]]]]]]]]]]}')) == 400
+        many = json.dumps({f"f{i}": i for i in range(50)})
+        assert rejected(event(many), max_fields=20) == 400
+
+
+class TestBoundedParse:
+    @pytest.mark.parametrize(
+        "body",
+        [
+            json.dumps(VALID),
+            json.dumps(VALID, indent=4),
+            '{ "a" : "q\\"uote\\\\ \\u00e9 \\ud83d\\ude00\\n" , "b":-1.5e3,"c":0,"d":true,"e":false,"f":null }',
+            '{"a": 1, "a": 2}',
+            "{}",
+            '["not", "an", "object"]',
+            '"just a string"',
+        ],
+    )
+    def test_matches_json_loads(self, body):
+        assert request_guard.parse_form(body, 20) == json.loads(body)
+
+    @pytest.mark.parametrize(
+        "body",
+        ['{"a" 1}', '{"a": 1,}', '{"a": 01}', '{"a": "x"} extra', '{"a": "unterminated}', "{a: 1}", '{"a": tru}'],
+    )
+    def test_malformed_json(self, body):
+        with pytest.raises(codec.JSONDecodeError):
+            request_guard.parse_form(body, 20)
+
+
+class TestHandler:
+    def test_rejections_are_answered_before_parsing(self, aws):
+        oversized = event(json.dumps({**VALID, "message": "x" * 50000}))
+        wrong_type = event(json.dumps(VALID), headers={"Content-Type": "text/html"})
+
+        for evt, status in ((oversized, 413), (wrong_type, 415)):
+            response = contact_handler.lambda_handler(evt, None)
+            assert response["statusCode"] == status
+            assert "error" in json.loads(response["body"])
@@ -0,0 +1,81 @@
+"""Unit tests for the Aho-Corasick spam term matcher."""
+
+import pytest
+
+import spam_filter
+from contact_handler import validate_form_data
+from spam_filter import SpamMatcher, normalize
+
+
+@pytest.fixture
+def matcher():
+    return SpamMatcher(["loan", "casino", "free money", "he", "she", "hers"])
+
+
+class TestMatching:
+    """Term matching semantics."""
+
+    def test_whole_words_only(self, matcher):
+        assert matcher.find_all("I loaned my bike to a friend") == []
+        assert [m.term for m in matcher.find_all("Need a loan today?")] == ["loan"]
+
+    def test_returns_all_matches_with_original_positions(self, matcher):
+        text = "Casino night: free  money for everyone"
+
+        matches = matcher.find_all(text)
+
+        assert [(m.term, text[m.start : m.end]) for m in matches] == [
+            ("casino", "Casino"),
+            ("free money", "free  money"),
+        ]
+
+    def test_overlapping_terms(self, matcher):
+        assert [m.term for m in matcher.find_all("she said hers")] == ["she", "hers"]
+
+    def test_unicode_normalization(self, matcher):
+        assert matcher.contains_any("ＣＡＳＩＮＯ bonus")
+        assert matcher.contains_any("Cheap lóan offer")
+
+    def test_normalize_collapses_whitespace_and_tracks_offsets(self):
+        normalized, offsets = normalize("  Aé\t\tb")
+
+        assert normalized == "ae b"
+        assert offsets == [2, 3, 4, 6]
+
+    def test_duplicate_and_empty_terms_are_ignored(self):
+        assert len(SpamMatcher(["Loan", "loan", "  ", "LOAN"])) == 1
+
+
+class TestLargeBlocklists:
+    """Thousands of terms."""
+
+    def test_matches_against_thousands_of_terms(self):
+        terms = [f"term{i}" for i in range(5000)]
+        matcher = SpamMatcher(terms)
+
+        assert [m.term for m in matcher.find_all("contains term4321 and term17.")] == ["term4321", "term17"]
+
+    def test_terms_file(self, tmp_path, monkeypatch):
+        path = tmp_path / "terms.txt"
+        path.write_text("# blocklist\nlottery winner\nseo services  # marketing\n", encoding="utf-8")
+        monkeypatch.setattr(spam_filter, "SPAM_TERMS_FILE", str(path))
+        monkeypatch.setattr(spam_filter, "_matcher", None)
+
+        assert spam_filter.get_matcher().terms == ["lottery winner", "seo services"]
+
+
+class TestValidationIntegration:
+    """Spam check inside validate_form_data."""
+
+    def test_loaned_is_not_spam(self):
+        data = {"name": "Jane", "email": "jane@example.com", "message": "I loaned the book you recommended."}
+
+        assert validate_form_data(data)["valid"] is True
+
+    def test_spam_is_rejected(self):
+        data = {"name": "Jane", "email": "jane@example.com", "message": "Get a quick LOAN approved today!"}
+
+        result = validate_form_data(data)
+
+        assert result["valid"] is False
+        assert "spam" in result["error"].lower()
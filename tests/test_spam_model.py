@@ -0,0 +1,120 @@
+"""Unit tests for the hashed-feature naive Bayes spam classifier."""
+
+import json
+import random
+
+import pytest
+
+import contact_handler
+import item_codec
+import spam_model
+from spam_model import SpamModel
+
+HAM = [
+    "Hi, I saw your portfolio and would like to discuss a cloud migration project",
+    "Hello, we are hiring a DevOps engineer for our team, are you available for a call next week",
+    "Thanks for the talk at the meetup, could you share the slides on Terraform modules",
+    "I need help with a Kubernetes cluster upgrade and our CI pipeline, what are your rates",
+    "Great article on serverless cost optimisation, do you consult on AWS Lambda architecture",
+]
+SPAM = [
+    "Cheap loans approved today, click here to claim your cash bonus now",
+    "Win big at the online casino, free spins and a deposit bonus, click here",
+    "Earn passive income with crypto trading signals, guaranteed returns, act now",
+    "Buy followers and likes cheap, boost your ranking today, limited offer",
+    "Claim your free gift card now, you have been selected as a winner, click here",
+]
+
+
+def corpus(rng, size=400):
+    samples = []
+    for i in range(size):
+        is_spam = i % 2 == 0
+        text = rng.choice(SPAM if is_spam else HAM)
+        words = text.split()
+        rng.shuffle(words)
+        samples.append((" ".join(words[: rng.randint(6, len(words))]), is_spam))
+    return samples
+
+
+@pytest.fixture(scope="module")
+def model():
+    return spam_model.train(corpus(random.Random(3)), bits=12, chunk_size=50)
+
+
+class TestModel:
+    def test_separates_held_out_messages(self, model):
+        held_out = corpus(random.Random(11), 200)
+
+        correct = sum(model.is_spam(text, 0.5) == is_spam for text, is_spam in held_out)
+
+        assert correct / len(held_out) > 0.95
+        assert model.probability(SPAM[0]) > 0.99 and model.probability(HAM[0]) < 0.01
+
+    def test_features_are_stable_and_normalized(self):
+        assert spam_model.features("Click HERE now", 12) == spam_model.features("  click   here NOW ", 12)
+        assert len(spam_model.features("a b c", 12)) == 5  # three words, two pairs
+
+    def test_serialized_round_trip(self, model, tmp_path):
+        path = tmp_path / "model.bin"
+        model.save(str(path))
+
+        loaded = SpamModel.load(str(path))
+
+        assert loaded.bits == 12 and loaded.weights == model.weights
+        assert loaded.probability(SPAM[1]) == pytest.approx(model.probability(SPAM[1]), rel=1e-6)
+        with pytest.raises(ValueError):
+            SpamModel.from_bytes(b"JUNK" + path.read_bytes()[4:])
+
+    def test_batch_scores_match_single_scores(self, model):
+        texts = HAM + SPAM + [""]
+
+        scores = model.score_batch(texts)
+
+        assert list(scores) == pytest.approx([model.probability(text) for text in texts], rel=1e-5)
+
+    def test_training_needs_both_classes(self):
+        with pytest.raises(ValueError):
+            spam_model.train([(HAM[0], False)], bits=8)
+
+
+class TestTable:
+    def test_trains_from_labeled_rows_and_rescores(self, aws, tmp_path):
+        examples = tmp_path / "spam.ndjson"
+        examples.write_text("".join(json.dumps({"message": text, "label": "spam"}) + "\n" for text in SPAM))
+        for i, text in enumerate(HAM + SPAM[:1]):
+            item = contact_handler.build_submission_item(
+                f"sub-{i}", f"2024-05-01T10:00:0{i}", "Jane", "jane@example.com", text, "10.0.0.1", "pytest"
+            )
+            if i < len(HAM):
+                item[spam_model.LABEL_ATTRIBUTE] = "ham"
+            aws["client"].put_item(TableName=aws["table_name"], Item=item_codec.encode_item(item, i % 2))
+
+        rows = list(spam_model.labeled_rows(aws["client"], aws["table_name"], page_size=2))
+        trained = spam_model.train(list(spam_model.read_examples(str(examples))) + rows, bits=12)
+        result = spam_model.rescore(aws["client"], aws["table_name"], trained, threshold=0.5, update=True)
+
+        assert sorted(rows) == sorted((text, False) for text in HAM)
+        assert result == {"scanned": 6, "flagged": [f"sub-{len(HAM)}"]}
+        scores = {item["submissionId"]: item["spamScore"] for item in aws["table"].scan()["Items"]}
+        assert scores[f"sub-{len(HAM)}"] > 0.5 and scores["sub-0"] < 0.5
+
+
+class TestHandler:
+    def test_model_runs_after_blocklist(self, model, monkeypatch):
+        monkeypatch.setattr(spam_model, "_model", model)
+        form = {"name": "Jane", "email": "jane@example.com"}
+
+        assert contact_handler.validate_form_data({**form, "message": SPAM[3]})["spam"] is True
+        assert contact_handler.validate_form_data({**form, "message": HAM[0]})["valid"] is True
+        # "loan" is on the blocklist, which stays a hard check
+        assert contact_handler.validate_form_data({**form, "message": HAM[0] + " and a loan"})["spam"] is True
+
+    def test_model_replaces_blocklist_when_opted_in(self, model, monkeypatch):
+        monkeypatch.setattr(spam_model, "_model", model)
+        monkeypatch.setattr(spam_model, "SPAM_MODEL_SKIP_BLOCKLIST", True)
+        form = {"name": "Jane", "email": "jane@example.com"}
+
+        assert contact_handler.validate_form_data({**form, "message": SPAM[3]})["spam"] is True
+        # The model judges the whole message
+        assert contact_handler.validate_form_data({**form, "message": HAM[0] + " and a loan"})["valid"] is True
@@ -0,0 +1,148 @@
+"""Unit tests for the sharded dashboard counters."""
+
+import importlib
+import json
+import random
+from datetime import date, datetime
+
+import pytest
+
+import contact_handler
+import stats
+from stats import StatsCounter
+
+# 2024-05-01T12:00:00Z
+NOON = 1_714_564_800.0
+
+
+class FakeClock:
+    def __init__(self, now=NOON):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestStatsCounter:
+    def test_counts_are_spread_over_shards_and_summed_on_read(self, aws):
+        counter = StatsCounter(
+            aws["client"], aws["state_table_name"], shards=4, clock=FakeClock(), rng=random.Random(1)
+        )
+
+        for i in range(40):
+            counter.record(stats.ACCEPTED, f"user{i}@{'gmail.com' if i % 4 else 'Example.COM'}")
+        counter.record(stats.SPAM, "bot@spam.example")
+        counter.record(stats.INVALID)
+        counter.flush()
+
+        rows = aws["state_table"].scan()["Items"]
+        assert len(rows) == 4
+        assert {row["pk"] for row in rows} == {f"stats#2024-05-01#{shard}" for shard in range(4)}
+        assert all(row["ttl"] == 1_714_521_600 + 401 * 86400 for row in rows)
+
+        (day,) = stats.daily_counts(aws["client"], aws["state_table_name"], date(2024, 5, 1), date(2024, 5, 1), 4)
+        assert day == {
+            "day": "2024-05-01",
+            "accepted": 40,
+            "invalid": 1,
+            "spam": 1,
+            "failed": 0,
+            "domains": {"gmail.com": 30, "example.com": 10},
+        }
+
+    def test_series_covers_empty_days(self, aws):
+        clock = FakeClock()
+        counter = StatsCounter(aws["client"], aws["state_table_name"], shards=2, clock=clock)
+        counter.record(stats.ACCEPTED, "a@example.com")
+        clock.now += 2 * 86400
+        counter.record(stats.FAILED)
+
+        series = stats.daily_counts(aws["client"], aws["state_table_name"], date(2024, 4, 30), date(2024, 5, 3), 2)
+
+        assert [(d["day"], d["accepted"], d["failed"]) for d in series] == [
+            ("2024-04-30", 0, 0),
+            ("2024-05-01", 1, 0),
+            ("2024-05-02", 0, 0),
+            ("2024-05-03", 0, 1),
+        ]
+
+    def test_rejections_are_written_at_most_once_per_interval(self, aws, mocker):
+        clock = FakeClock()
+        counter = StatsCounter(aws["client"], aws["state_table_name"], shards=2, clock=clock, flush_seconds=10)
+        update = mocker.spy(aws["client"], "update_item")
+
+        for _ in range(100):
+            counter.record(stats.INVALID)
+            counter.record(stats.SPAM, "bot@spam.example")
+        assert update.call_count == 0
+
+        clock.now += 10
+        counter.record(stats.FAILED)
+        assert update.call_count == 1
+
+        (day,) = stats.daily_counts(aws["client"], aws["state_table_name"], date(2024, 5, 1), date(2024, 5, 1), 2)
+        assert (day["invalid"], day["spam"], day["failed"], day["domains"]) == (100, 100, 1, {})
+
+    def test_domains_per_row_are_capped(self, aws):
+        def counter():
+            return StatsCounter(aws["client"], aws["state_table_name"], shards=1, clock=FakeClock(), max_domains=2)
+
+        first, second = counter(), counter()  # two containers writing to the same row
+        for domain in ("a.example", "b.example", "c.example", "c.example"):
+            first.record(stats.ACCEPTED, f"x@{domain}")
+        second.record(stats.ACCEPTED, "x@b.example")
+        second.record(stats.ACCEPTED, "x@d.example")
+
+        (row,) = aws["state_table"].scan()["Items"]
+        (day,) = stats.daily_counts(aws["client"], aws["state_table_name"], date(2024, 5, 1), date(2024, 5, 1), 1)
+        assert row["domainCount"] == 2
+        assert day["accepted"] == 6
+        assert day["domains"] == {"a.example": 1, "b.example": 2, "other": 3}
+
+    def test_reads_are_batched(self, aws, mocker):
+        spy = mocker.spy(aws["client"], "batch_get_item")
+
+        series = stats.daily_counts(aws["client"], aws["state_table_name"], date(2024, 1, 1), date(2024, 1, 31), 8)
+
+        assert len(series) == 31
+        assert spy.call_count == 3  # 248 keys, 100 per call
+
+    def test_fails_open_on_errors(self, aws):
+        counter = StatsCounter(aws["client"], "missing-table")
+
+        assert counter.record(stats.ACCEPTED, "a@example.com") is False
+
+    def test_email_domain(self):
+        assert stats.email_domain("Jane@Mail.Example.com ") == "mail.example.com"
+        assert stats.email_domain("no-at-sign") == "other"
+        assert stats.email_domain("trailing@") == "other"
+
+
+class TestHandler:
+    """Outcomes counted by lambda_handler."""
+
+    @pytest.fixture
+    def handler(self, aws, monkeypatch):
+        monkeypatch.setattr(stats, "STATE_TABLE", aws["state_table_name"])
+        importlib.reload(contact_handler)
+        return contact_handler
+
+    def test_counts_each_outcome(self, handler, aws, mocker):
+        mocker.patch.object(handler, "send_email_notification")
+
+        def event(body):
+            return {"httpMethod": "POST", "body": json.dumps(body) if isinstance(body, dict) else body}
+
+        valid = {"name": "Jane", "email": "jane@example.com", "message": "Hello there, a real message"}
+        handler.lambda_handler(event(valid), None)
+        handler.lambda_handler(event({**valid, "message": "Buy viagra now at our casino"}), None)
+        handler.lambda_handler(event({**valid, "email": "not-an-email"}), None)
+        handler.lambda_handler(event("{not json"), None)
+        mocker.patch.object(handler, "store_submission", side_effect=RuntimeError("boom"))
+        handler.lambda_handler(event({**valid, "message": "Another real message"}), None)
+        handler.get_stats_counter().flush()  # rejections and failures wait for the next flush
+
+        today = datetime.utcnow().date()
+        (day,) = stats.daily_counts(aws["client"], aws["state_table_name"], today, today)
+        assert (day["accepted"], day["spam"], day["invalid"], day["failed"]) == (1, 1, 2, 1)
+        assert day["domains"] == {"example.com": 1}
@@ -0,0 +1,179 @@
+"""Unit tests for the indexed submission lookups."""
+
+import importlib
+import json
+from datetime import date
+
+import pytest
+
+import contact_handler
+import submission_queries
+from submission_queries import QueryError, by_date, by_email, decode_cursor, encode_cursor
+
+
+def seed(table, rows):
+    """Write (submissionId, timestamp, email) rows with their index attributes."""
+    with table.batch_writer() as writer:
+        for submission_id, timestamp, email in rows:
+            writer.put_item(
+                Item={
+                    "submissionId": submission_id,
+                    "timestamp": timestamp,
+                    "email": email,
+                    **submission_queries.index_attributes(email, timestamp),
+                }
+            )
+
+
+def page_through(query, limit):
+    """Follow nextCursor until exhausted; return (submission IDs, pages)."""
+    ids, cursor, pages = [], None, 0
+    while True:
+        result = query(limit=limit, cursor=cursor)
+        ids.extend(item["submissionId"] for item in result["items"])
+        pages += 1
+        cursor = result["nextCursor"]
+        if cursor is None:
+            return ids, pages
+
+
+class TestIndexAttributes:
+    def test_normalized_email_and_day(self):
+        assert submission_queries.index_attributes("  Jane@Example.COM ", "2024-05-01T10:00:00.123") == {
+            "emailNormalized": "jane@example.com",
+            "dayBucket": "2024-05-01",
+        }
+
+    def test_store_submission_populates_indexes(self, aws):
+        importlib.reload(contact_handler)
+        contact_handler.store_submission("sub-1", "2024-05-01T10:00:00", "Jane", "jane@example.com", "Hi there", {})
+
+        (item,) = aws["table"].scan()["Items"]
+        assert item["emailNormalized"] == "jane@example.com"
+        assert item["dayBucket"] == "2024-05-01"
+
+
+class TestCursor:
+    def test_round_trip(self):
+        key = {"submissionId": {"S": "a"}, "timestamp": {"S": "2024-05-01T00:00:00"}, "dayBucket": {"S": "2024-05-01"}}
+
+        assert decode_cursor(encode_cursor("date", key, "2024-05-01"), "date") == (key, "2024-05-01")
+
+    @pytest.mark.parametrize(
+        "cursor",
+        [
+            "not base64 !",
+            encode_cursor("email", {"submissionId": {"S": "a"}}),
+            encode_cursor("date", {}, "2024-05-01"),
+        ],
+    )
+    def test_rejects_foreign_or_malformed_cursor(self, cursor):
+        with pytest.raises(QueryError):
+            decode_cursor(cursor, "email")
+
+
+class TestByEmail:
+    def test_newest_first_and_paginates(self, aws):
+        seed(aws["table"], [(f"sub-{i}", f"2024-05-{i + 1:02d}T09:00:00", "jane@example.com") for i in range(7)])
+        seed(aws["table"], [("other", "2024-05-03T09:00:00", "john@example.com")])
+
+        ids, pages = page_through(
+            lambda **kw: by_email(aws["client"], aws["table_name"], " JANE@example.com", **kw), limit=3
+        )
+
+        assert ids == [f"sub-{i}" for i in reversed(range(7))]
+        assert pages == 3
+
+    def test_date_range(self, aws):
+        seed(aws["table"], [(f"sub-{i}", f"2024-05-{i + 1:02d}T09:00:00", "jane@example.com") for i in range(7)])
+
+        result = by_email(
+            aws["client"], aws["table_name"], "jane@example.com", start=date(2024, 5, 2), end=date(2024, 5, 4)
+        )
+
+        assert [item["submissionId"] for item in result["items"]] == ["sub-3", "sub-2", "sub-1"]
+
+    def test_cursor_for_another_email_rejected(self, aws):
+        seed(aws["table"], [(f"sub-{i}", f"2024-05-0{i + 1}T09:00:00", "jane@example.com") for i in range(3)])
+        cursor = by_email(aws["client"], aws["table_name"], "jane@example.com", limit=1)["nextCursor"]
+
+        with pytest.raises(QueryError):
+            by_email(aws["client"], aws["table_name"], "john@example.com", cursor=cursor)
+
+
+class TestByDate:
+    def test_spans_days_newest_first(self, aws):
+        rows = [
+            (f"d{day}-{n}", f"2024-05-{day:02d}T{n:02d}:00:00", f"p{n}@example.com")
+            for day in (1, 2, 4)
+            for n in range(3)
+        ]
+        seed(aws["table"], rows + [("outside", "2024-05-06T00:00:00", "x@example.com")])
+
+        ids, _ = page_through(
+            lambda **kw: by_date(aws["client"], aws["table_name"], date(2024, 5, 1), date(2024, 5, 5), **kw), limit=2
+        )
+
+        assert ids == [f"d{day}-{n}" for day in (4, 2, 1) for n in (2, 1, 0)]
+
+    def test_page_boundary_at_end_of_day(self, aws):
+        seed(
+            aws["table"], [("a", "2024-05-02T00:00:00", "a@example.com"), ("b", "2024-05-01T00:00:00", "b@example.com")]
+        )
+
+        first = by_date(aws["client"], aws["table_name"], date(2024, 5, 1), date(2024, 5, 2), limit=1)
+        second = by_date(
+            aws["client"], aws["table_name"], date(2024, 5, 1), date(2024, 5, 2), limit=1, cursor=first["nextCursor"]
+        )
+
+        assert [item["submissionId"] for item in first["items"] + second["items"]] == ["a", "b"]
+
+    def test_range_validation(self, aws):
+        with pytest.raises(QueryError):
+            by_date(aws["client"], aws["table_name"], date(2024, 5, 2), date(2024, 5, 1))
+        with pytest.raises(QueryError):
+            by_date(aws["client"], aws["table_name"], date(2020, 1, 1), date(2024, 1, 1))
+
+
+class TestLambdaHandler:
+    @pytest.fixture(autouse=True)
+    def handler(self, aws):
+        importlib.reload(contact_handler)
+        seed(aws["table"], [("sub-1", "2024-05-01T09:00:00", "jane@example.com")])
+
+    def call(self, **params):
+        response = submission_queries.lambda_handler({"httpMethod": "GET", "queryStringParameters": params}, None)
+        return response["statusCode"], json.loads(response["body"])
+
+    def test_lists_by_email(self):
+        status, body = self.call(email="jane@example.com", limit="10")
+
+        assert status == 200
+        assert body["count"] == 1
+        assert body["items"][0]["submissionId"] == "sub-1"
+        assert body["nextCursor"] is None
+
+    def test_lists_by_date(self):
+        status, body = self.call(**{"from": "2024-05-01", "to": "2024-05-01"})
+
+        assert status == 200
+        assert [item["submissionId"] for item in body["items"]] == ["sub-1"]
+
+    @pytest.mark.parametrize(
+        "params",
+        [{}, {"email": "jane@example.com", "limit": "zero"}, {"from": "May 1"}, {"email": "a@b.c", "cursor": "junk"}],
+    )
+    def test_bad_requests(self, params):
+        assert self.call(**params)[0] == 400
+
+
+class TestBackfill:
+    def test_adds_missing_index_attributes(self, aws):
+        aws["table"].put_item(
+            Item={"submissionId": "old", "timestamp": "2023-01-01T00:00:00", "email": "Old@Example.com"}
+        )
+        seed(aws["table"], [("new", "2024-01-01T00:00:00", "new@example.com")])
+
+        assert submission_queries.backfill(aws["client"], aws["table_name"]) == 1
+        result = by_email(aws["client"], aws["table_name"], "old@example.com")
+        assert [item["submissionId"] for item in result["items"]] == ["old"]
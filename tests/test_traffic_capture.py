@@ -0,0 +1,162 @@
+"""Unit tests for traffic capture and replay."""
+
+import base64
+import importlib
+import json
+
+import pytest
+
+import contact_handler
+import spam_filter
+import spam_model
+import traffic_capture
+
+MESSAGE = "Hello Jane, call me on 555-0100 about the AWS migration."
+
+
+def event(body, ip="203.0.113.7", **extra):
+    return {
+        "httpMethod": "POST",
+        "body": body if isinstance(body, str) else json.dumps(body),
+        "headers": {"Content-Type": "application/json", "Authorization": "secret", "Idempotency-Key": "abc"},
+        "requestContext": {"identity": {"sourceIp": ip}, "accountId": "123"},
+        **extra,
+    }
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestSanitize:
+    def test_masks_personal_data_and_keeps_shape(self):
+        original = event({"name": "Jane Doe", "email": "jane@example.com", "message": MESSAGE})
+
+        sanitized = traffic_capture.sanitize(original)
+        body = json.loads(sanitized["body"])
+
+        assert "Authorization" not in sanitized["headers"]
+        assert sanitized["headers"]["Idempotency-Key"] != "abc"
+        assert sanitized["requestContext"] == {"identity": {"sourceIp": traffic_capture.pseudonymous_ip("203.0.113.7")}}
+        assert "Jane" not in sanitized["body"] and "example" not in sanitized["body"] and "555" not in sanitized["body"]
+        assert len(body["message"]) == len(MESSAGE) and body["message"].count(" ") == MESSAGE.count(" ")
+        assert body["email"].count("@") == 1 and body["email"][0].islower() and body["name"][0].isupper()
+
+    def test_is_deterministic_and_keeps_spam_terms(self):
+        first = traffic_capture.sanitize(event({"message": "Cheap LOAN offers today"}))
+        second = traffic_capture.sanitize(event({"message": "Cheap LOAN offers today"}))
+
+        assert first == second
+        assert json.loads(first["body"])["message"].split()[1] == "LOAN"
+
+    def test_base64_and_malformed_bodies(self):
+        encoded = base64.b64encode(json.dumps({"message": MESSAGE}).encode()).decode()
+
+        sanitized = traffic_capture.sanitize(event(encoded, isBase64Encoded=True))
+        malformed = traffic_capture.sanitize(event('{"name": "Jane",'))
+
+        assert len(json.loads(base64.b64decode(sanitized["body"]))["message"]) == len(MESSAGE)
+        assert malformed["body"].startswith('{"') and malformed["body"].endswith('",')
+
+
+class TestCaptureAndReplay:
+    @pytest.fixture
+    def handler(self, aws, tmp_path, monkeypatch):
+        monkeypatch.setattr(traffic_capture, "CAPTURE_ENABLED", True)
+        monkeypatch.setattr(traffic_capture, "CAPTURE_SAMPLE_RATE", 1.0)
+        monkeypatch.setattr(traffic_capture, "CAPTURE_FILE", str(tmp_path / "capture.jsonl"))
+        monkeypatch.setattr(traffic_capture, "_written", 0)
+        importlib.reload(contact_handler)
+        return contact_handler
+
+    def test_replay_reproduces_captured_outcomes(self, handler, tmp_path, mocker):
+        mocker.patch.object(handler, "send_email_notification")
+        valid = {"name": "Jane", "email": "jane@example.com", "message": MESSAGE}
+        for body in (valid, {**valid, "message": "Visit our casino for free spins"}, {**valid, "email": "x"}, "{bad"):
+            handler.lambda_handler(event(body), None)
+
+        with open(tmp_path / "capture.jsonl", encoding="utf-8") as fh:
+            records = traffic_capture.load(fh)
+        importlib.reload(handler)  # a fresh container, as for a real replay
+        results = traffic_capture.replay(records, lambda e: handler.lambda_handler(e, None), speed=0, concurrency=1)
+        summary = traffic_capture.report(records, results)
+
+        assert [r["status"] for r in records] == [200, 400, 400, 400]
+        assert records[1]["error"] == "Message content appears to be spam"
+        assert summary["matched"] == 4 and summary["mismatches"] == []
+        assert summary["byStatus"] == {"200": 1, "400": 3}
+
+    def test_marks_captures_taken_with_a_spam_model(self, handler, tmp_path, monkeypatch):
+        traffic_capture.record(event({"message": MESSAGE}), {"statusCode": 200}, 0.0, 0.001)
+        monkeypatch.setattr(spam_model, "_model", object())
+        traffic_capture.record(event({"message": MESSAGE}), {"statusCode": 200}, 1.0, 0.001)
+
+        with open(tmp_path / "capture.jsonl", encoding="utf-8") as fh:
+            records = traffic_capture.load(fh)
+
+        assert ["spamModel" in r for r in records] == [False, True]
+
+    def test_stops_at_size_cap(self, handler, monkeypatch):
+        monkeypatch.setattr(traffic_capture, "CAPTURE_MAX_BYTES", 10)
+
+        assert traffic_capture.record(event({"message": MESSAGE}), {"statusCode": 200}, 0.0, 0.001) is False
+
+
+class TestReplay:
+    def test_paces_events_by_speed(self):
+        clock = FakeClock()
+        records = [{"t": 100.0 + offset, "status": 200, "event": {"n": i}} for i, offset in enumerate((0, 1, 3))]
+
+        results = traffic_capture.replay(
+            records, lambda e: {"statusCode": 200}, speed=2, concurrency=1, clock=clock, sleep=clock.sleep
+        )
+
+        assert clock.sleeps == [0.5, 1.0]
+        assert all(result["status"] == 200 for result in results)
+
+    def test_report_lists_changed_outcomes(self):
+        records = [{"t": 0, "ms": 5, "status": 200, "event": {}}, {"t": 1, "ms": 7, "status": 200, "event": {}}]
+        responses = iter([{"statusCode": 200}, {"statusCode": 500, "body": '{"error": "boom"}'}])
+
+        summary = traffic_capture.report(
+            records, traffic_capture.replay(records, lambda e: next(responses), speed=0, concurrency=1)
+        )
+
+        assert summary["matched"] == 1
+        assert summary["mismatches"] == [
+            {"index": 1, "expected": {"status": 200, "error": None}, "actual": {"status": 500, "error": "boom"}}
+        ]
+
+    def test_report_separates_spam_model_diffs(self):
+        spam = {"status": 400, "error": spam_filter.SPAM_ERROR}
+        records = [
+            {"t": 0, "status": 400, "error": spam_filter.SPAM_ERROR, "spamModel": True, "event": {}},
+            {"t": 1, "status": 400, "error": spam_filter.SPAM_ERROR, "event": {}},
+        ]
+
+        summary = traffic_capture.report(
+            records, traffic_capture.replay(records, lambda e: {"statusCode": 200}, speed=0, concurrency=1)
+        )
+
+        assert summary["matched"] == 0
+        assert summary["spamModelDiffs"] == [{"index": 0, "expected": spam, "actual": {"status": 200, "error": None}}]
+        assert [m["index"] for m in summary["mismatches"]] == [1]
+
+    def test_load_skips_other_log_lines(self):
+        lines = [
+            "START RequestId: 1",
+            '2024-05-01T10:00:01Z\tabc\t{"capture": 1, "t": 2, "status": 200, "event": {}}',
+            '{"capture": 1, "t": 1, "status": 400, "event": {}}',
+            '{"_aws": {}, "StatusCode": 200}',
+        ]
+
+        assert [r["t"] for r in traffic_capture.load(lines)] == [1, 2]
@@ -0,0 +1,105 @@
+"""Unit tests for the compiled validation engine."""
+
+import os
+
+import pytest
+import yaml
+
+from validation import CONTACT_FORM_SCHEMA, CONTACT_FORM_VALIDATOR, compile_schema
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(__file__), "..", "infrastructure", "template.yaml")
+
+
+class _CloudFormationLoader(yaml.SafeLoader):
+    """SafeLoader that tolerates CloudFormation short-form tags such as !Ref and !Sub."""
+
+
+def _construct_tag(loader, tag_suffix, node):
+    if isinstance(node, yaml.ScalarNode):
+        return loader.construct_scalar(node)
+    if isinstance(node, yaml.SequenceNode):
+        return loader.construct_sequence(node)
+    return loader.construct_mapping(node)
+
+
+_CloudFormationLoader.add_multi_constructor("!", _construct_tag)
+
+
+@pytest.fixture
+def valid_payload():
+    return {"name": "Jane Doe", "email": "jane@example.com", "message": "A message that is long enough."}
+
+
+class TestSchema:
+    """The Lambda schema stays in lock-step with API Gateway."""
+
+    def test_matches_api_gateway_request_schema(self):
+        with open(TEMPLATE_PATH, encoding="utf-8") as fh:
+            template = yaml.load(fh, Loader=_CloudFormationLoader)  # nosec B506 - SafeLoader subclass
+        api = template["Resources"]["ContactFormApi"]["Properties"]["DefinitionBody"]
+        schema = api["paths"]["/contact"]["post"]["requestBody"]["content"]["application/json"]["schema"]
+
+        assert schema == CONTACT_FORM_SCHEMA
+
+    def test_unknown_format_is_rejected_at_compile_time(self):
+        with pytest.raises(ValueError):
+            compile_schema({"properties": {"site": {"type": "string", "format": "uri"}}})
+
+
+class TestValidator:
+    """Single-payload validation."""
+
+    def test_valid_payload_returns_cleaned_data(self, valid_payload):
+        payload = dict(valid_payload, name="  Jane Doe  ")
+
+        result = CONTACT_FORM_VALIDATOR.validate(payload)
+
+        assert result.valid is True
+        assert result.errors == ()
+        assert result.data["name"] == "Jane Doe"
+
+    def test_reports_all_errors_in_one_pass(self):
+        result = CONTACT_FORM_VALIDATOR.validate({"name": "a" * 101, "email": "nope", "message": "short"})
+
+        assert result.valid is False
+        assert [(e.field, e.code) for e in result.errors] == [
+            ("name", "length"),
+            ("email", "format"),
+            ("message", "length"),
+        ]
+
+    def test_missing_fields_are_reported_first(self, valid_payload):
+        payload = dict(valid_payload, name="a" * 101)
+        del payload["email"]
+
+        result = CONTACT_FORM_VALIDATOR.validate(payload)
+
+        assert result.error == 'Field "email" is required'
+        assert len(result.errors) == 2
+
+    def test_non_string_values_are_rejected(self, valid_payload):
+        result = CONTACT_FORM_VALIDATOR.validate(dict(valid_payload, name=12345, message=["a" * 20]))
+
+        assert result.valid is False
+        assert [(e.field, e.code) for e in result.errors] == [("name", "type"), ("message", "type")]
+        assert result.error == "Name must be a string"
+
+    def test_non_object_payload(self):
+        result = CONTACT_FORM_VALIDATOR.validate(["not", "an", "object"])
+
+        assert result.valid is False
+        assert "object" in result.error
+
+
+class TestValidateMany:
+    """Batch validation."""
+
+    def test_validates_each_payload(self, valid_payload):
+        payloads = [valid_payload, {}, dict(valid_payload, email="bad")] * 1000
+
+        results = CONTACT_FORM_VALIDATOR.validate_many(payloads)
+
+        assert len(results) == 3000
+        assert [r.valid for r in results[:3]] == [True, False, False]
+        assert results[1].error == 'Field "name" is required'
+        assert len(results[1].errors) == 3